@@ -12,15 +12,14 @@ Configuration:
 from __future__ import annotations
 
 import os
-import subprocess
 import sys
 from pathlib import Path
 
 try:
-    from _utils import get_config_int, get_project_root
+    from _utils import get_config_int, get_project_root, run_streaming
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
-    from _utils import get_config_int, get_project_root
+    from _utils import get_config_int, get_project_root, run_streaming
 
 
 TEST_SCRIPT = os.getenv("TEST_SCRIPT", "test")
@@ -56,19 +55,11 @@ def main() -> None:
     print(f"Timeout: {TEST_TIMEOUT}s")
 
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=TEST_TIMEOUT,
-        )
-
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
+        result = run_streaming(cmd, cwd=project_root, timeout=TEST_TIMEOUT)
+
+        if result.timed_out:
+            print(f"❌ Tests timed out after {TEST_TIMEOUT}s.", file=sys.stderr)
+            sys.exit(1)
 
         if result.returncode != 0:
             print(f"❌ Tests failed (exit {result.returncode}).", file=sys.stderr)
@@ -77,9 +68,6 @@ def main() -> None:
         print("✅ All tests passed")
         sys.exit(0)
 
-    except subprocess.TimeoutExpired:
-        print(f"❌ Tests timed out after {TEST_TIMEOUT}s.", file=sys.stderr)
-        sys.exit(1)
     except FileNotFoundError:
         print(f"❌ {pm} not found.", file=sys.stderr)
         print("Install Node.js: https://nodejs.org", file=sys.stderr)
@@ -17,15 +17,14 @@ Configuration:
 from __future__ import annotations
 
 import os
-import subprocess
 import sys
 from pathlib import Path
 
 try:
-    from _utils import get_config_int
+    from _utils import get_config_int, run_streaming
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
-    from _utils import get_config_int
+    from _utils import get_config_int, run_streaming
 
 from _php_toolchain import find_php_tool, php_project_root, skip
 
@@ -70,27 +69,16 @@ def main() -> None:
     cmd = build_test_cmd(tool, coverage)
 
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=PHP_TEST_TIMEOUT,
-        )
-    except subprocess.TimeoutExpired:
-        print(f"❌ Test suite timed out after {PHP_TEST_TIMEOUT}s", file=sys.stderr)
-        sys.exit(1)
+        result = run_streaming(cmd, cwd=project_root, timeout=PHP_TEST_TIMEOUT)
     except OSError as exc:
         print(f"❌ Error running tests: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    if result.stdout:
-        print(result.stdout)
+    if result.timed_out:
+        print(f"❌ Test suite timed out after {PHP_TEST_TIMEOUT}s", file=sys.stderr)
+        sys.exit(1)
 
     if result.returncode != 0:
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
         print("\n❌ Test suite failed.", file=sys.stderr)
         sys.exit(1)
 
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""Append-only benchmark history keyed by commit, branch and machine.
+
+Every benchmark run (benchmark_performance.py, run_benchmarks.py) appends one
+row per benchmark to a SQLite database under .cortex/benchmark_results,
+tagged with the git SHA, branch, dirty flag, a machine fingerprint and a
+timestamp. Nothing is overwritten or pruned; bench_history.py renders trends
+and regression reports from it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _bench_stats import change_points, quantile
+    from _utils import get_benchmark_results_dir
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_stats import change_points, quantile
+    from _utils import get_benchmark_results_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL,
+    sha TEXT,
+    branch TEXT,
+    dirty INTEGER,
+    machine TEXT,
+    machine_desc TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS result (
+    run_id INTEGER REFERENCES run (id),
+    name TEXT,
+    median_s REAL,
+    q1_s REAL,
+    q3_s REAL,
+    n INTEGER,
+    samples TEXT,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS result_by_name ON result (name, run_id);
+"""
+# (key, scale to seconds) in preference order, for results of foreign runners
+_TIME_KEYS = (
+    ("median_s", 1.0),
+    ("median_time_ms", 1e-3),
+    ("median_ms", 1e-3),
+    ("mean_s", 1.0),
+    ("mean_time_ms", 1e-3),
+    ("mean_ms", 1e-3),
+    ("avg_time_ms", 1e-3),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RunContext:
+    """Where and on what a benchmark run was taken."""
+
+    sha: str
+    branch: str
+    dirty: bool
+    machine: str
+    machine_desc: str
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryPoint:
+    """One benchmark's result in one recorded run."""
+
+    run_id: int
+    timestamp: float
+    sha: str
+    branch: str
+    dirty: bool
+    machine: str
+    median_s: float
+    q1_s: float
+    q3_s: float
+    n: int
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    """A persistent change in a benchmark's level between two runs."""
+
+    before: HistoryPoint
+    after: HistoryPoint
+    before_s: float
+    after_s: float
+
+    @property
+    def ratio(self) -> float:
+        """New level relative to the old one."""
+        return self.after_s / self.before_s if self.before_s else 1.0
+
+
+def history_db_path(project_root: Path) -> Path:
+    """Return the history database path under .cortex/benchmark_results."""
+    return get_benchmark_results_dir(project_root, create=False) / "history.db"
+
+
+def _git(project_root: Path, *args: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_fingerprint() -> tuple[str, str]:
+    """Return ``(fingerprint, description)`` of this machine and interpreter.
+
+    Timings are only comparable on the same CPU model and core count and the
+    same Python build, so those make up the fingerprint.
+    """
+    desc = (
+        f"{platform.system()} {platform.machine()}, {_cpu_model()}, "
+        + f"{os.cpu_count() or 0} cpus, {platform.python_implementation()} "
+        + platform.python_version()
+    )
+    return hashlib.sha1(desc.encode()).hexdigest()[:12], desc
+
+
+def run_context(project_root: Path) -> RunContext:
+    """Collect git and machine details for a new run."""
+    machine, desc = machine_fingerprint()
+    return RunContext(
+        sha=_git(project_root, "rev-parse", "HEAD") or "unknown",
+        branch=_git(project_root, "rev-parse", "--abbrev-ref", "HEAD") or "unknown",
+        dirty=bool(_git(project_root, "status", "--porcelain", "--untracked-files=no")),
+        machine=machine,
+        machine_desc=desc,
+    )
+
+
+def extract_timings(data: object) -> dict[str, float]:
+    """Find ``{name: seconds}`` in a results JSON of unknown layout.
+
+    Walks the document for objects that carry a name (``name`` or
+    ``benchmark``) and a median or mean time in seconds or milliseconds;
+    used for runners whose results format this module does not own.
+    """
+    found: dict[str, float] = {}
+    stack: list[object] = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        name = node.get("name") or node.get("benchmark")
+        if isinstance(name, str):
+            for key, scale in _TIME_KEYS:
+                value = node.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    found[name] = float(value) * scale
+                    break
+        stack.extend(node.values())
+    return found
+
+
+class BenchmarkHistory:
+    """SQLite store of every recorded benchmark run (append-only)."""
+
+    def __init__(self, db_path: Path):
+        """Open (creating if needed) the history database."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        _ = self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def record(
+        self,
+        context: RunContext,
+        results: dict[str, Sequence[float]],
+        source: str,
+        timestamp: float | None = None,
+    ) -> int:
+        """Append one run: ``results`` maps benchmark name to its samples.
+
+        Returns:
+            The new run id
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO run (timestamp, sha, branch, dirty, machine, machine_desc, "
+            + "source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                time.time() if timestamp is None else timestamp,
+                context.sha,
+                context.branch,
+                int(context.dirty),
+                context.machine,
+                context.machine_desc,
+                source,
+            ),
+        )
+        run_id = int(cursor.lastrowid or 0)
+        rows = []
+        for name, samples in results.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            rows.append(
+                (
+                    run_id,
+                    name,
+                    statistics.median(ordered),
+                    quantile(ordered, 0.25),
+                    quantile(ordered, 0.75),
+                    len(ordered),
+                    json.dumps(list(samples)),
+                )
+            )
+        _ = self.conn.executemany(
+            "INSERT OR REPLACE INTO result "
+            + "(run_id, name, median_s, q1_s, q3_s, n, samples) "
+            + "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        return run_id
+
+    def machines(self) -> dict[str, str]:
+        """``{fingerprint: description}`` of every machine with recorded runs."""
+        return {
+            str(machine): str(desc)
+            for machine, desc in self.conn.execute(
+                "SELECT machine, machine_desc FROM run GROUP BY machine"
+            )
+        }
+
+    def names(self) -> list[str]:
+        """Every benchmark name ever recorded."""
+        return [
+            str(row[0])
+            for row in self.conn.execute(
+                "SELECT DISTINCT name FROM result ORDER BY name"
+            )
+        ]
+
+    def series(
+        self,
+        name: str,
+        machine: str | None = None,
+        branch: str | None = None,
+    ) -> list[HistoryPoint]:
+        """Oldest-first results of one benchmark, optionally filtered."""
+        query = (
+            "SELECT run.id, run.timestamp, run.sha, run.branch, run.dirty, "
+            + "run.machine, result.median_s, result.q1_s, result.q3_s, result.n "
+            + "FROM result JOIN run ON run.id = result.run_id WHERE result.name = ?"
+        )
+        params: list[object] = [name]
+        if machine is not None:
+            query += " AND run.machine = ?"
+            params.append(machine)
+        if branch is not None:
+            query += " AND run.branch = ?"
+            params.append(branch)
+        query += " ORDER BY run.timestamp, run.id"
+        return [
+            HistoryPoint(
+                run_id=int(row[0]),
+                timestamp=float(row[1]),
+                sha=str(row[2]),
+                branch=str(row[3]),
+                dirty=bool(row[4]),
+                machine=str(row[5]),
+                median_s=float(row[6]),
+                q1_s=float(row[7]),
+                q3_s=float(row[8]),
+                n=int(row[9]),
+            )
+            for row in self.conn.execute(query, params)
+        ]
+
+
+def record_results(
+    project_root: Path,
+    results: dict[str, Sequence[float]],
+    source: str,
+    context: RunContext | None = None,
+) -> int:
+    """Append ``results`` for the current commit and machine; returns run id."""
+    history = BenchmarkHistory(history_db_path(project_root))
+    try:
+        return history.record(context or run_context(project_root), results, source)
+    finally:
+        history.close()
+
+
+def find_steps(
+    points: Sequence[HistoryPoint],
+    min_runs: int,
+    min_change: float,
+    min_sigma: float,
+) -> list[Step]:
+    """Persistent level changes in an oldest-first series (see change_points)."""
+    values = [p.median_s for p in points]
+    bounds = [0, *change_points(values, min_runs, min_change, min_sigma), len(values)]
+    return [
+        Step(
+            before=points[start - 1],
+            after=points[start],
+            before_s=statistics.median(values[prev:start]),
+            after_s=statistics.median(values[start:end]),
+        )
+        for prev, start, end in zip(bounds, bounds[1:], bounds[2:])
+    ]
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Robust statistics for benchmark samples.
+
+Timings are skewed and heavy-tailed (GC, scheduler, frequency scaling), so
+summaries use the median and IQR, confidence intervals come from a seeded
+bootstrap of the median, and baseline comparisons use the Mann-Whitney U test
+(normal approximation with tie correction), which assumes no distribution.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import statistics
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+BOOTSTRAP_RESAMPLES = 2000
+_SEED = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Summary:
+    """Distribution summary of one benchmark's per-call timings (seconds)."""
+
+    n: int
+    median: float
+    q1: float
+    q3: float
+    ci_low: float
+    ci_high: float
+
+    @property
+    def iqr(self) -> float:
+        """Interquartile range."""
+        return self.q3 - self.q1
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    """Current run vs baseline for one benchmark."""
+
+    ratio: float
+    p_value: float
+    significant: bool
+    regression: bool
+    improvement: bool
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration with three significant digits and a fitting unit."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g}{unit}"
+    return f"{seconds / 1e-9:.3g}ns"
+
+
+def format_bytes(size: float) -> str:
+    """Human-readable byte count."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.3g}{unit}"
+        size /= 1024
+    return f"{size:.3g}GiB"
+
+
+def parse_scales(text: str) -> tuple[int, ...]:
+    """Parse a scale list such as ``1k,10k,100k`` (suffixes k and m)."""
+    scales: set[int] = set()
+    for part in text.lower().split(","):
+        part = part.strip()
+        if not part:
+            continue
+        factor = {"k": 1_000, "m": 1_000_000}.get(part[-1], 1)
+        digits = part[:-1] if factor > 1 else part
+        try:
+            value = int(float(digits) * factor)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid scale: {part!r}") from None
+        if value <= 0:
+            raise argparse.ArgumentTypeError(f"scale must be positive: {part!r}")
+        scales.add(value)
+    if not scales:
+        raise argparse.ArgumentTypeError("no scales given")
+    return tuple(sorted(scales))
+
+
+def format_scale(n: int) -> str:
+    """Inverse of parse_scales for round numbers (10000 -> 10k)."""
+    for suffix, factor in (("m", 1_000_000), ("k", 1_000)):
+        if n >= factor and n % factor == 0:
+            return f"{n // factor}{suffix}"
+    return str(n)
+
+
+def growth_exponent(n1: int, t1: float, n2: int, t2: float) -> float | None:
+    """Exponent k of t ~ n^k between two scales (1 linear, 2 quadratic)."""
+    if t1 <= 0 or t2 <= 0 or n1 == n2:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated quantile of already sorted values."""
+    if not sorted_values:
+        raise ValueError("quantile of empty sample")
+    pos = (len(sorted_values) - 1) * q
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def bootstrap_median_ci(
+    samples: Sequence[float],
+    confidence: float = 0.95,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+) -> tuple[float, float]:
+    """Percentile bootstrap confidence interval for the median (seeded)."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value
+    rng = random.Random(_SEED)
+    n = len(samples)
+    medians = sorted(
+        statistics.median(rng.choices(samples, k=n)) for _ in range(resamples)
+    )
+    alpha = (1 - confidence) / 2
+    return quantile(medians, alpha), quantile(medians, 1 - alpha)
+
+
+def summarize(samples: Sequence[float], confidence: float = 0.95) -> Summary:
+    """Median, quartiles and bootstrap CI of ``samples``."""
+    ordered = sorted(samples)
+    ci_low, ci_high = bootstrap_median_ci(ordered, confidence)
+    return Summary(
+        n=len(ordered),
+        median=statistics.median(ordered),
+        q1=quantile(ordered, 0.25),
+        q3=quantile(ordered, 0.75),
+        ci_low=ci_low,
+        ci_high=ci_high,
+    )
+
+
+def mann_whitney_p(a: Sequence[float], b: Sequence[float]) -> float:
+    """Two-sided Mann-Whitney U p-value (normal approximation, tie-corrected).
+
+    Returns 1.0 when either sample is empty or all values are tied.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = rank
+        t = j - i + 1
+        tie_term += t**3 - t
+        i = j + 1
+    rank_sum_a = sum(r for r, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def compare(
+    baseline: Sequence[float],
+    current: Sequence[float],
+    alpha: float = 0.01,
+    min_change: float = 0.05,
+) -> Comparison:
+    """Compare ``current`` with ``baseline``.
+
+    A change counts only when it is statistically significant (p < alpha)
+    and the medians differ by more than ``min_change`` (relative), so noise
+    and negligible shifts never fail a run.
+    """
+    base_median = statistics.median(baseline)
+    ratio = statistics.median(current) / base_median if base_median else 1.0
+    p_value = mann_whitney_p(baseline, current)
+    significant = p_value < alpha and abs(ratio - 1) > min_change
+    return Comparison(
+        ratio=ratio,
+        p_value=p_value,
+        significant=significant,
+        regression=significant and ratio > 1,
+        improvement=significant and ratio < 1,
+    )
+
+
+def _noise_sigma(values: Sequence[float]) -> float:
+    """Robust noise scale of a series from its successive differences.
+
+    Differences cancel level shifts, so the MAD of the differences reflects
+    run-to-run noise even when the series contains steps.
+    """
+    diffs = [b - a for a, b in zip(values, values[1:])]
+    center = statistics.median(diffs)
+    mad = statistics.median(abs(d - center) for d in diffs)
+    # Floor the noise at 0.1% of the level so flat series stay finite
+    floor = abs(statistics.median(values)) * 1e-3 or 1e-12
+    return max(1.4826 * mad / math.sqrt(2), floor)
+
+
+def _segment_medians(values: Sequence[float], cuts: list[int]) -> list[float]:
+    bounds = [0, *cuts, len(values)]
+    return [statistics.median(values[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+def change_points(
+    values: Sequence[float],
+    min_size: int = 3,
+    min_change: float = 0.05,
+    min_sigma: float = 5.0,
+) -> list[int]:
+    """Indexes where a series steps to a new level.
+
+    Optimal partitioning (dynamic programming) of the series into segments
+    of at least ``min_size`` points, minimising squared error in units of
+    the noise scale plus a penalty of ``min_sigma**2`` per change, so an
+    isolated step must be about ``min_sigma`` standard errors to be found.
+    Steps whose adjacent segment medians differ by no more than
+    ``min_change`` (relative) are then merged away, smallest first. A single
+    noisy run never forms a step.
+
+    Returns:
+        Sorted indexes of the first value of each new segment
+    """
+    n = len(values)
+    if n < 2 * min_size:
+        return []
+    sigma = _noise_sigma(values)
+    s1 = [0.0]
+    s2 = [0.0]
+    for v in values:
+        x = v / sigma
+        s1.append(s1[-1] + x)
+        s2.append(s2[-1] + x * x)
+
+    def cost(i: int, j: int) -> float:
+        total = s1[j] - s1[i]
+        return s2[j] - s2[i] - total * total / (j - i)
+
+    penalty = min_sigma * min_sigma
+    best = [math.inf] * (n + 1)
+    last = [0] * (n + 1)
+    best[0] = -penalty
+    for j in range(min_size, n + 1):
+        for i in range(0, j - min_size + 1):
+            if best[i] == math.inf:
+                continue
+            candidate = best[i] + cost(i, j) + penalty
+            if candidate < best[j]:
+                best[j], last[j] = candidate, i
+    cuts: list[int] = []
+    j = n
+    while j > 0:
+        j = last[j]
+        if j > 0:
+            cuts.append(j)
+    cuts.sort()
+
+    while cuts:
+        medians = _segment_medians(values, cuts)
+        changes = [
+            abs(after / before - 1) if before else 0.0
+            for before, after in zip(medians, medians[1:])
+        ]
+        smallest = min(range(len(changes)), key=changes.__getitem__)
+        if changes[smallest] > min_change:
+            break
+        del cuts[smallest]
+    return cuts
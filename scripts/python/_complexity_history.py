@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Complexity and size trends over git history, memoized by blob id.
+
+A file's metrics depend only on its content, and most files are unchanged
+from one commit to the next. The history walk therefore works on git object
+ids rather than checkouts:
+
+1. ``git log --first-parent`` lists the last N commits of HEAD.
+2. One ``git cat-file --batch-check`` call resolves each commit's source
+   subtree id; consecutive commits that did not touch the sources share it.
+3. ``git ls-tree -r`` lists each distinct subtree once.
+4. Blobs not yet in the cache are streamed through one ``git cat-file
+   --batch`` and analyzed exactly once; results are stored in a sqlite cache
+   keyed by blob id (and ANALYZER_VERSION), so later runs over overlapping
+   history analyze only new blobs.
+
+The cost therefore follows the number of distinct blobs, not commits ×
+files. Trend series are emitted as change points: ``[commit index, values]``
+whenever a function's or module's metrics differ from the previous commit,
+with ``[index, None]`` when it disappears.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import sqlite3
+import subprocess
+import sys
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _utils import get_cache_dir
+    from analyze_complexity import calculate_complexity, calculate_nesting_depth
+    from analyze_function_lengths import count_logical_lines
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_cache_dir
+    from analyze_complexity import calculate_complexity, calculate_nesting_depth
+    from analyze_function_lengths import count_logical_lines
+
+# Bump when a metric's definition changes; older cache rows are ignored
+ANALYZER_VERSION = 1
+_SQL_CHUNK = 500
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionMetrics:
+    """Size and complexity of one function in one blob."""
+
+    name: str
+    length: int
+    complexity: int
+    nesting: int
+
+
+@dataclass(frozen=True, slots=True)
+class BlobMetrics:
+    """Metrics of one Python source blob (``parsed`` is False on syntax errors)."""
+
+    lines: int
+    functions: tuple[FunctionMetrics, ...]
+    parsed: bool = True
+
+    @property
+    def complexity(self) -> int:
+        """Summed complexity of the module's functions."""
+        return sum(f.complexity for f in self.functions)
+
+    @property
+    def max_complexity(self) -> int:
+        """Complexity of the module's most complex function."""
+        return max((f.complexity for f in self.functions), default=0)
+
+
+@dataclass(frozen=True, slots=True)
+class CommitInfo:
+    """A commit in the walked history."""
+
+    sha: str
+    timestamp: int
+
+
+@dataclass(slots=True)
+class History:
+    """Source blobs per commit (oldest first) and the metrics of each blob."""
+
+    commits: list[CommitInfo]
+    trees: list[dict[str, str]]
+    blobs: dict[str, BlobMetrics]
+    analyzed: int = 0
+
+
+def _function_nodes(
+    tree: ast.AST,
+) -> Iterator[tuple[str, ast.FunctionDef | ast.AsyncFunctionDef]]:
+    """Yield ``(qualname, node)`` for every function, methods and nested ones too."""
+    stack: list[tuple[str, ast.AST]] = [("", tree)]
+    while stack:
+        prefix, node = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{prefix}{child.name}"
+                yield name, child
+                stack.append((f"{name}.<locals>.", child))
+            elif isinstance(child, ast.ClassDef):
+                stack.append((f"{prefix}{child.name}.", child))
+            else:
+                stack.append((prefix, child))
+
+
+def analyze_source(text: str) -> BlobMetrics:
+    """Measure one file's content."""
+    source_lines = text.splitlines()
+    lines = sum(
+        1 for line in source_lines if line.strip() and not line.lstrip().startswith("#")
+    )
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return BlobMetrics(lines=lines, functions=(), parsed=False)
+    functions = [
+        FunctionMetrics(
+            name=name,
+            length=count_logical_lines(node, source_lines),
+            complexity=calculate_complexity(node),
+            nesting=calculate_nesting_depth(node),
+        )
+        for name, node in _function_nodes(tree)
+    ]
+    functions.sort(key=lambda f: f.name)
+    return BlobMetrics(lines=lines, functions=tuple(functions))
+
+
+class BlobCache:
+    """Persistent sqlite cache of ``blob id -> BlobMetrics``."""
+
+    def __init__(self, db_path: Path):
+        """Open (creating if needed) the cache database."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        _ = self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            + "sha TEXT NOT NULL, version INTEGER NOT NULL, data TEXT NOT NULL, "
+            + "PRIMARY KEY (sha, version))"
+        )
+
+    def get_many(self, shas: Iterable[str]) -> dict[str, BlobMetrics]:
+        """Cached metrics for those of ``shas`` that have them."""
+        found: dict[str, BlobMetrics] = {}
+        pending = list(shas)
+        for i in range(0, len(pending), _SQL_CHUNK):
+            chunk = pending[i : i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT sha, data FROM blobs WHERE version = ? AND sha IN ({marks})",
+                (ANALYZER_VERSION, *chunk),
+            )
+            for sha, data in rows:
+                lines, functions, parsed = json.loads(data)
+                found[sha] = BlobMetrics(
+                    lines=lines,
+                    functions=tuple(FunctionMetrics(*f) for f in functions),
+                    parsed=parsed,
+                )
+        return found
+
+    def put_many(self, metrics: dict[str, BlobMetrics]) -> None:
+        """Store metrics for newly analyzed blobs."""
+        rows = [
+            (
+                sha,
+                ANALYZER_VERSION,
+                json.dumps(
+                    [
+                        m.lines,
+                        [
+                            [f.name, f.length, f.complexity, f.nesting]
+                            for f in m.functions
+                        ],
+                        m.parsed,
+                    ]
+                ),
+            )
+            for sha, m in metrics.items()
+        ]
+        with self.conn:
+            _ = self.conn.executemany(
+                "INSERT OR REPLACE INTO blobs (sha, version, data) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self.conn.close()
+
+
+def blob_cache_path(project_root: Path) -> Path:
+    """Return the blob cache database path under .cortex/.cache."""
+    return get_cache_dir(project_root, "complexity_history", create=False) / "blobs.db"
+
+
+def _git(project_root: Path, *args: str, stdin: str | None = None) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=project_root,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def list_commits(project_root: Path, count: int, ref: str = "HEAD") -> list[CommitInfo]:
+    """The last ``count`` first-parent commits of ``ref``, oldest first."""
+    out = _git(
+        project_root, "log", "--first-parent", f"-n{count}", "--format=%H %ct", ref
+    )
+    commits = [
+        CommitInfo(sha, int(ts))
+        for sha, _, ts in (line.partition(" ") for line in out.splitlines())
+    ]
+    commits.reverse()
+    return commits
+
+
+def source_trees(
+    project_root: Path, commits: list[CommitInfo], src_rel: str
+) -> list[str | None]:
+    """Tree id of ``src_rel`` in each commit (None where it does not exist)."""
+    spec = src_rel.strip("/")
+    queries = "".join(
+        f"{c.sha}:{spec}\n" if spec else f"{c.sha}^{{tree}}\n" for c in commits
+    )
+    out = _git(project_root, "cat-file", "--batch-check", stdin=queries)
+    trees: list[str | None] = []
+    for line in out.splitlines():
+        parts = line.split()
+        trees.append(parts[0] if len(parts) == 3 and parts[1] == "tree" else None)
+    return trees
+
+
+def list_python_blobs(project_root: Path, tree: str, src_rel: str) -> dict[str, str]:
+    """``{path: blob id}`` of the Python sources (not tests) under a tree."""
+    out = _git(project_root, "ls-tree", "-r", "-z", tree)
+    prefix = f"{src_rel.strip('/')}/" if src_rel.strip("/") else ""
+    blobs: dict[str, str] = {}
+    for entry in out.split("\0"):
+        meta, _, path = entry.partition("\t")
+        parts = meta.split()
+        if len(parts) != 3 or parts[1] != "blob" or not path.endswith(".py"):
+            continue
+        if Path(path).name.startswith("test_"):
+            continue
+        blobs[prefix + path] = parts[2]
+    return blobs
+
+
+def read_blobs(project_root: Path, shas: list[str]) -> Iterator[tuple[str, bytes]]:
+    """Stream blob contents through one ``git cat-file --batch`` process."""
+    if not shas:
+        return
+    proc = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        cwd=project_root,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    assert proc.stdin is not None and proc.stdout is not None
+    stdin = proc.stdin
+
+    def feed() -> None:
+        # Written from a thread so a full stdout pipe cannot deadlock us
+        try:
+            for sha in shas:
+                _ = stdin.write(f"{sha}\n".encode())
+        finally:
+            stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    try:
+        for _ in shas:
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                continue  # "<sha> missing"
+            content = proc.stdout.read(int(header[2]))
+            _ = proc.stdout.read(1)  # Trailing newline
+            yield header[0].decode(), content
+    finally:
+        writer.join()
+        proc.stdout.close()
+        _ = proc.wait()
+
+
+def build_history(
+    project_root: Path, src_rel: str, count: int, cache: BlobCache
+) -> History:
+    """Walk the last ``count`` commits and measure every distinct source blob."""
+    commits = list_commits(project_root, count)
+    tree_ids = source_trees(project_root, commits, src_rel)
+    listed: dict[str, dict[str, str]] = {}
+    trees: list[dict[str, str]] = []
+    for tree in tree_ids:
+        if tree is None:
+            trees.append({})
+            continue
+        if tree not in listed:
+            listed[tree] = list_python_blobs(project_root, tree, src_rel)
+        trees.append(listed[tree])
+
+    wanted = {sha for tree in listed.values() for sha in tree.values()}
+    blobs = cache.get_many(wanted)
+    missing = sorted(wanted - blobs.keys())
+    fresh = {
+        sha: analyze_source(content.decode("utf-8", errors="replace"))
+        for sha, content in read_blobs(project_root, missing)
+    }
+    cache.put_many(fresh)
+    blobs.update(fresh)
+    return History(commits=commits, trees=trees, blobs=blobs, analyzed=len(fresh))
+
+
+def _change_points(
+    values: Iterable[tuple[object, ...] | None],
+) -> list[list[object]]:
+    points: list[list[object]] = []
+    previous: tuple[object, ...] | None = None
+    for index, value in enumerate(values):
+        if value == previous:
+            continue
+        if value is None:
+            points.append([index, None])
+        else:
+            points.append([index, *value])
+        previous = value
+    return points
+
+
+def module_series(history: History) -> dict[str, list[list[object]]]:
+    """``[index, lines, functions, complexity, max complexity]`` change points."""
+    paths = sorted({path for tree in history.trees for path in tree})
+    series: dict[str, list[list[object]]] = {}
+    for path in paths:
+        values: list[tuple[object, ...] | None] = []
+        for tree in history.trees:
+            blob = history.blobs.get(tree.get(path, ""))
+            values.append(
+                None
+                if blob is None
+                else (
+                    blob.lines,
+                    len(blob.functions),
+                    blob.complexity,
+                    blob.max_complexity,
+                )
+            )
+        series[path] = _change_points(values)
+    return series
+
+
+def function_series(history: History) -> dict[str, list[list[object]]]:
+    """``[index, length, complexity, nesting]`` change points per ``path::name``."""
+    per_commit: list[dict[str, tuple[object, ...]]] = []
+    memo: dict[str, dict[str, tuple[object, ...]]] = {}
+    for tree in history.trees:
+        functions: dict[str, tuple[object, ...]] = {}
+        for path, sha in tree.items():
+            if sha not in memo:
+                blob = history.blobs.get(sha)
+                memo[sha] = (
+                    {}
+                    if blob is None
+                    else {
+                        f.name: (f.length, f.complexity, f.nesting)
+                        for f in blob.functions
+                    }
+                )
+            for name, value in memo[sha].items():
+                functions[f"{path}::{name}"] = value
+        per_commit.append(functions)
+    keys = sorted({key for functions in per_commit for key in functions})
+    return {
+        key: _change_points(functions.get(key) for functions in per_commit)
+        for key in keys
+    }
+
+
+def _growth(
+    series: dict[str, list[list[object]]], column: int
+) -> list[tuple[str, int, int]]:
+    """``(key, first, last)`` for series still present at the newest commit."""
+    grown: list[tuple[str, int, int]] = []
+    for key, points in series.items():
+        last = points[-1]
+        if last[1] is None:
+            continue
+        first = next(p for p in points if p[1] is not None)
+        start, end = first[column], last[column]
+        assert isinstance(start, int) and isinstance(end, int)
+        if end > start:
+            grown.append((key, start, end))
+    grown.sort(key=lambda g: (g[1] - g[2], g[0]))
+    return grown
+
+
+def build_report(
+    history: History,
+    modules: dict[str, list[list[object]]],
+    functions: dict[str, list[list[object]]],
+) -> dict[str, object]:
+    """JSON-serializable trend report of a walked history."""
+    return {
+        "analyzer_version": ANALYZER_VERSION,
+        "commits": [{"sha": c.sha, "timestamp": c.timestamp} for c in history.commits],
+        "distinct_blobs": len(history.blobs),
+        "module_columns": ["lines", "functions", "complexity", "max_complexity"],
+        "modules": modules,
+        "function_columns": ["length", "complexity", "nesting"],
+        "functions": functions,
+    }
+
+
+def print_trend_summary(
+    history: History,
+    modules: dict[str, list[list[object]]],
+    functions: dict[str, list[list[object]]],
+    top: int,
+) -> None:
+    """Print cache statistics and the biggest growers over the walked history."""
+    distinct = len(history.blobs)
+    print(
+        f"📊 {len(history.commits)} commits, {distinct} distinct source blobs "
+        + f"({history.analyzed} analyzed, {distinct - history.analyzed} from cache)"
+    )
+    module_growth = _growth(modules, 3)
+    if module_growth:
+        print("\n📈 Modules with the most complexity growth:")
+        for path, start, end in module_growth[:top]:
+            print(f"   {path}: {start} → {end}")
+    function_growth = _growth(functions, 2)
+    if function_growth:
+        print("\n📈 Functions with the most complexity growth:")
+        for key, start, end in function_growth[:top]:
+            print(f"   {key}: {start} → {end}")
+    if not module_growth and not function_growth:
+        print("\n✅ No complexity growth over the walked history")
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""Bounded-memory readers for coverage.py data.
+
+Two sources are supported, both yielding one ``FileCoverage`` at a time:
+
+- ``coverage.json`` (``coverage json`` / ``--cov-report=json``): the ``files``
+  object is parsed incrementally, one per-file entry at a time, so memory is
+  bounded by the largest single entry rather than the whole report.
+- ``.coverage`` SQLite database: executed lines are read straight from the
+  ``line_bits`` / ``arc`` tables; statements come from coverage.py's parser
+  when importable (honouring the project's ``exclude_lines``), otherwise from
+  an approximate AST scan.
+
+``summarize_coverage`` folds either stream into the aggregate percentage and a
+top-N gap list without holding every file in memory.
+"""
+
+from __future__ import annotations
+
+import ast
+import heapq
+import json
+import os
+import re
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, cast
+
+JSON_CHUNK_SIZE = 1 << 16
+_SQLITE_HEADER = b"SQLite format 3\x00"
+_COVERAGE_CONFIG_FILES = (".coveragerc", "setup.cfg", "tox.ini", "pyproject.toml")
+_DEFAULT_EXCLUDE = r"#\s*(pragma|PRAGMA)[:\s]?\s*(no|NO)\s*(cover|COVER)"
+
+
+@dataclass(frozen=True, slots=True)
+class FileCoverage:
+    """Line (and optional branch) coverage of one measured file."""
+
+    path: str
+    num_statements: int
+    covered_lines: int
+    missing_lines: tuple[int, ...]
+    num_branches: int = 0
+    covered_branches: int = 0
+    executed_lines: tuple[int, ...] = ()
+
+    @property
+    def missing_count(self) -> int:
+        """Number of statements never executed."""
+        return self.num_statements - self.covered_lines
+
+
+@dataclass(slots=True)
+class CoverageSummary:
+    """Aggregate totals plus the files with the most uncovered lines."""
+
+    file_count: int = 0
+    num_statements: int = 0
+    covered_lines: int = 0
+    num_branches: int = 0
+    covered_branches: int = 0
+    top_gaps: list[FileCoverage] = field(default_factory=list)
+
+    @property
+    def percent_covered(self) -> float:
+        """Coverage percentage as reported by coverage.py (lines + branches)."""
+        denominator = self.num_statements + self.num_branches
+        if denominator == 0:
+            return 100.0
+        return (self.covered_lines + self.covered_branches) / denominator * 100.0
+
+
+# ---------------------------------------------------------------------------
+# coverage.json (streaming)
+# ---------------------------------------------------------------------------
+
+
+class _JsonStream:
+    """Minimal pull parser over a text stream built on ``raw_decode``."""
+
+    def __init__(self, handle: IO[str], chunk_size: int = JSON_CHUNK_SIZE):
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume ``char`` (after whitespace) or raise ``JSONDecodeError``."""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(
+                f"Expected {char!r}, found {found or 'EOF'!r}", self._buf, self._pos
+            )
+        self._pos += 1
+
+    def value(self) -> object:
+        """Decode the next complete JSON value, reading more input as needed."""
+        _ = self.peek()
+        read_size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            # A scalar ending exactly at the buffer edge may be truncated.
+            if end == len(self._buf) and self._fill(read_size):
+                continue
+            self._pos = end
+            return obj
+
+
+def iter_json_files(
+    path: Path, chunk_size: int = JSON_CHUNK_SIZE
+) -> Iterator[tuple[str, dict[str, object]]]:
+    """Yield ``(filepath, entry)`` pairs from a coverage JSON report's ``files``.
+
+    Only one per-file entry is held in memory at a time; other top-level keys
+    (``meta``, ``totals``) are decoded and discarded.
+    """
+    with open(path, encoding="utf-8") as handle:
+        stream = _JsonStream(handle, chunk_size)
+        stream.expect("{")
+        while (char := stream.peek()) != "}":
+            if char == ",":
+                stream.expect(",")
+                continue
+            key = stream.value()
+            stream.expect(":")
+            if key != "files":
+                _ = stream.value()
+                continue
+            stream.expect("{")
+            while (inner := stream.peek()) != "}":
+                if inner == ",":
+                    stream.expect(",")
+                    continue
+                filepath = stream.value()
+                stream.expect(":")
+                entry = stream.value()
+                if isinstance(filepath, str) and isinstance(entry, dict):
+                    yield filepath, cast(dict[str, object], entry)
+            stream.expect("}")
+
+
+def _as_int(value: object, default: int = 0) -> int:
+    return int(value) if isinstance(value, (int, float)) else default
+
+
+def file_coverage_from_json(filepath: str, entry: dict[str, object]) -> FileCoverage:
+    """Build a ``FileCoverage`` from one coverage JSON ``files`` entry."""
+    missing_raw = entry.get("missing_lines", [])
+    missing = (
+        tuple(int(n) for n in cast(list[object], missing_raw) if isinstance(n, int))
+        if isinstance(missing_raw, list)
+        else ()
+    )
+    summary_raw = entry.get("summary")
+    summary = (
+        cast(dict[str, object], summary_raw) if isinstance(summary_raw, dict) else {}
+    )
+    executed_raw = entry.get("executed_lines", [])
+    executed = (
+        tuple(int(n) for n in cast(list[object], executed_raw) if isinstance(n, int))
+        if isinstance(executed_raw, list)
+        else ()
+    )
+    covered = _as_int(summary.get("covered_lines"), len(executed))
+    statements = _as_int(summary.get("num_statements"), covered + len(missing))
+    return FileCoverage(
+        path=filepath,
+        num_statements=statements,
+        covered_lines=covered,
+        missing_lines=missing,
+        num_branches=_as_int(summary.get("num_branches")),
+        covered_branches=_as_int(summary.get("covered_branches")),
+        executed_lines=executed,
+    )
+
+
+# ---------------------------------------------------------------------------
+# .coverage SQLite database
+# ---------------------------------------------------------------------------
+
+
+def is_coverage_db(path: Path) -> bool:
+    """Return True when ``path`` is a SQLite file (coverage.py data file)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def default_data_file(project_root: Path) -> Path:
+    """Return the coverage data file path (COVERAGE_FILE or ``.coverage``)."""
+    raw = os.getenv("COVERAGE_FILE")
+    if not raw:
+        return project_root / ".coverage"
+    path = Path(raw)
+    return path if path.is_absolute() else project_root / path
+
+
+def open_coverage_db(path: Path) -> sqlite3.Connection:
+    """Open a coverage data file read-only."""
+    return sqlite3.connect(f"file:{path.resolve()}?mode=ro", uri=True)
+
+
+def decode_numbits(numbits: bytes) -> list[int]:
+    """Decode a coverage.py numbits blob into sorted line numbers."""
+    lines: list[int] = []
+    for byte_index, byte in enumerate(numbits):
+        if not byte:
+            continue
+        base = byte_index * 8
+        for bit in range(8):
+            if byte & (1 << bit):
+                lines.append(base + bit)
+    return lines
+
+
+def db_has_arcs(conn: sqlite3.Connection) -> bool:
+    """Return True when the data file recorded branch arcs instead of lines."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'has_arcs'").fetchone()
+    return bool(row) and str(row[0]).lower() in ("1", "true")
+
+
+def executed_lines(
+    conn: sqlite3.Connection,
+    file_id: int,
+    has_arcs: bool,
+    context_ids: Iterable[int] | None = None,
+) -> set[int]:
+    """Return executed line numbers of one file, optionally per context subset."""
+    context_filter = ""
+    params: list[int] = [file_id]
+    if context_ids is not None:
+        ids = list(context_ids)
+        if not ids:
+            return set()
+        context_filter = f" AND context_id IN ({','.join('?' * len(ids))})"
+        params.extend(ids)
+
+    lines: set[int] = set()
+    if has_arcs:
+        query = "SELECT fromno, tono FROM arc WHERE file_id = ?" + context_filter
+        for fromno, tono in conn.execute(query, params):
+            if fromno > 0:
+                lines.add(fromno)
+            if tono > 0:
+                lines.add(tono)
+    else:
+        query = "SELECT numbits FROM line_bits WHERE file_id = ?" + context_filter
+        for (numbits,) in conn.execute(query, params):
+            lines.update(decode_numbits(numbits))
+    return lines
+
+
+def iter_context_lines(
+    conn: sqlite3.Connection,
+) -> Iterator[tuple[str, str, list[int]]]:
+    """Yield ``(raw_path, context, executed_lines)`` per file and context.
+
+    Contexts are recorded by ``--cov-context=test`` as ``nodeid|phase``; the
+    empty context holds lines run outside any test (imports, collection).
+    """
+    if db_has_arcs(conn):
+        query = (
+            "SELECT file.path, context.context, arc.fromno, arc.tono FROM arc "
+            "JOIN file ON file.id = arc.file_id "
+            "JOIN context ON context.id = arc.context_id "
+            "ORDER BY arc.file_id, arc.context_id"
+        )
+        key: tuple[str, str] | None = None
+        lines: set[int] = set()
+        for path, context, fromno, tono in conn.execute(query):
+            if (path, context) != key:
+                if key is not None:
+                    yield key[0], key[1], sorted(lines)
+                key, lines = (path, context), set()
+            lines.update(n for n in (fromno, tono) if n > 0)
+        if key is not None:
+            yield key[0], key[1], sorted(lines)
+        return
+
+    query = (
+        "SELECT file.path, context.context, line_bits.numbits FROM line_bits "
+        "JOIN file ON file.id = line_bits.file_id "
+        "JOIN context ON context.id = line_bits.context_id"
+    )
+    for path, context, numbits in conn.execute(query):
+        yield path, context, decode_numbits(numbits)
+
+
+def coverage_exclude_regex(project_root: Path) -> str:
+    """Return the project's combined ``exclude_lines`` regex."""
+    try:
+        import coverage
+        from coverage.misc import join_regex
+    except ImportError:
+        return _DEFAULT_EXCLUDE
+
+    for name in _COVERAGE_CONFIG_FILES:
+        config_path = project_root / name
+        if config_path.exists():
+            cov = coverage.Coverage(data_file=None, config_file=str(config_path))
+            return join_regex(cov.config.exclude_list)
+    return join_regex(
+        coverage.Coverage(data_file=None, config_file=False).config.exclude_list
+    )
+
+
+def coverage_omit_patterns(project_root: Path) -> list[str]:
+    """Return the project's ``[run] omit`` patterns (none without coverage.py)."""
+    try:
+        import coverage
+    except ImportError:
+        return []
+
+    for name in _COVERAGE_CONFIG_FILES:
+        config_path = project_root / name
+        if config_path.exists():
+            cov = coverage.Coverage(data_file=None, config_file=str(config_path))
+            return list(cov.config.run_omit or [])
+    return []
+
+
+def statement_lines(source: Path, exclude_regex: str) -> set[int]:
+    """Return executable statement lines of a Python source file.
+
+    Uses coverage.py's parser when available so numbers match its reports;
+    otherwise falls back to first lines of AST statements (docstrings and
+    lines matching ``exclude_regex`` removed).
+    """
+    try:
+        from coverage.parser import PythonParser
+    except ImportError:
+        PythonParser = None
+
+    if PythonParser is not None:
+        parser = PythonParser(filename=str(source), exclude=exclude_regex)
+        parser.parse_source()
+        return set(parser.statements)
+
+    text = source.read_text(encoding="utf-8")
+    tree = ast.parse(text, filename=str(source))
+    docstrings: set[int] = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(
+                node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+            )
+            and ast.get_docstring(node, clean=False) is not None
+        ):
+            docstrings.add(node.body[0].lineno)
+    excluded_re = re.compile(exclude_regex)
+    source_lines = text.splitlines()
+    return {
+        node.lineno
+        for node in ast.walk(tree)
+        if isinstance(node, ast.stmt)
+        and node.lineno not in docstrings
+        and not excluded_re.search(source_lines[node.lineno - 1])
+    }
+
+
+def _display_path(raw_path: str, root: Path) -> str:
+    try:
+        return Path(raw_path).resolve().relative_to(root).as_posix()
+    except ValueError:
+        return raw_path
+
+
+def iter_db_files(
+    db_path: Path, project_root: Path, only: set[str] | None = None
+) -> Iterator[FileCoverage]:
+    """Yield per-file coverage from a ``.coverage`` SQLite data file.
+
+    Files that no longer exist on disk (or fail to parse) are skipped. When
+    ``only`` is given, files whose project-relative path is not in it are
+    skipped before any source parsing.
+    """
+    exclude_regex = coverage_exclude_regex(project_root)
+    root = project_root.resolve()
+    conn = open_coverage_db(db_path)
+    try:
+        has_arcs = db_has_arcs(conn)
+        files = conn.execute("SELECT id, path FROM file ORDER BY path").fetchall()
+        for file_id, raw_path in files:
+            display = _display_path(raw_path, root)
+            if only is not None and display not in only:
+                continue
+            source = Path(raw_path)
+            if not source.is_file():  # coverage.py's parser raises NoSource
+                continue
+            try:
+                statements = statement_lines(source, exclude_regex)
+            except (OSError, SyntaxError, UnicodeDecodeError):
+                continue
+            executed = executed_lines(conn, file_id, has_arcs) & statements
+            yield FileCoverage(
+                path=display,
+                num_statements=len(statements),
+                covered_lines=len(executed),
+                missing_lines=tuple(sorted(statements - executed)),
+                executed_lines=tuple(sorted(executed)),
+            )
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Dispatch and aggregation
+# ---------------------------------------------------------------------------
+
+
+def iter_coverage_files(
+    path: Path, project_root: Path, only: set[str] | None = None
+) -> Iterator[FileCoverage]:
+    """Yield per-file coverage from either a JSON report or a SQLite data file.
+
+    Args:
+        path: coverage.json report or .coverage data file
+        project_root: Root that reported paths are made relative to
+        only: Optional set of project-relative POSIX paths to restrict to
+    """
+    if is_coverage_db(path):
+        yield from iter_db_files(path, project_root, only)
+        return
+    for filepath, entry in iter_json_files(path):
+        if only is not None and Path(filepath).as_posix() not in only:
+            continue
+        yield file_coverage_from_json(filepath, entry)
+
+
+def restrict_to_lines(item: FileCoverage, lines: set[int]) -> FileCoverage | None:
+    """Return ``item`` reduced to the statements on ``lines`` (None if none are).
+
+    Used for diff coverage: ``lines`` is the set of changed line numbers.
+    Branch totals are dropped since arcs cannot be attributed to lines here.
+    """
+    executed = lines.intersection(item.executed_lines)
+    missing = lines.intersection(item.missing_lines)
+    if not executed and not missing:
+        return None
+    return FileCoverage(
+        path=item.path,
+        num_statements=len(executed) + len(missing),
+        covered_lines=len(executed),
+        missing_lines=tuple(sorted(missing)),
+        executed_lines=tuple(sorted(executed)),
+    )
+
+
+def summarize_coverage(
+    files: Iterable[FileCoverage],
+    top_n: int,
+    path_filter: Callable[[str], bool] | None = None,
+) -> CoverageSummary:
+    """Fold a per-file stream into totals and the top-N gaps (bounded memory).
+
+    Args:
+        files: Per-file coverage stream
+        top_n: Number of largest gaps to keep
+        path_filter: Optional predicate; files it rejects are ignored entirely
+
+    Returns:
+        CoverageSummary with ``top_gaps`` sorted by uncovered lines, descending
+    """
+    summary = CoverageSummary()
+    heap: list[tuple[int, int, FileCoverage]] = []
+    for seq, item in enumerate(files):
+        if path_filter is not None and not path_filter(item.path):
+            continue
+        summary.file_count += 1
+        summary.num_statements += item.num_statements
+        summary.covered_lines += item.covered_lines
+        summary.num_branches += item.num_branches
+        summary.covered_branches += item.covered_branches
+        if item.missing_count <= 0 or top_n <= 0:
+            continue
+        # Ties keep the earlier file (lower seq) since -seq sorts it higher.
+        entry = (item.missing_count, -seq, item)
+        if len(heap) < top_n:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            _ = heapq.heapreplace(heap, entry)
+    summary.top_gaps = [
+        item for _count, _seq, item in sorted(heap, key=lambda e: e[:2], reverse=True)
+    ]
+    return summary
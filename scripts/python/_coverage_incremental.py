@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Incremental coverage: reuse the last full run's per-test coverage data.
+
+A passing full run in incremental mode records per-test contexts
+(``--cov-context=test``); its ``.coverage`` file becomes the baseline, stored
+with a snapshot of every source and test file. Later runs compare the tree
+with that snapshot:
+
+- A changed source file is measured afresh: every test whose context touched
+  it is re-run and its cached lines are dropped (their numbers may have moved).
+- A changed or new test file is re-run whole.
+- A new source file is counted from fresh data only (uncovered if unimported).
+
+A change that leaves no test to re-run (an untested new source file, a
+deleted test file) is still gated, on the pruned baseline alone.
+
+The merged dataset is the baseline minus changed source files and the
+contexts of re-run, edited or deleted tests, plus everything the partial run
+recorded. The total is computed from it file by file, with statements from
+coverage.py's parser as in _coverage_data.py. Branch arcs are folded into
+executed lines, so the merged total counts statements only.
+
+Every run is compared with the baseline rather than with the previous run, so
+the re-run set grows until the next full run refreshes the baseline. A full
+run is forced when there is no baseline, when it is older than
+COVERAGE_INCREMENTAL_MAX_AGE_DAYS, after COVERAGE_INCREMENTAL_FULL_EVERY
+incremental runs, when conftest.py / pytest or coverage configuration / a
+dependency lock changed, when a non-test module under the tests directory
+changed, or when a changed source file was only executed at import time (no
+test context to re-run).
+
+Configuration:
+    COVERAGE_INCREMENTAL_FULL_EVERY: Incremental runs between forced full
+        runs (default: 10)
+    COVERAGE_INCREMENTAL_MAX_AGE_DAYS: Baseline age that forces a full run
+        (default: 7)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+try:
+    from _coverage_data import (
+        FileCoverage,
+        coverage_exclude_regex,
+        coverage_omit_patterns,
+        db_has_arcs,
+        iter_context_lines,
+        open_coverage_db,
+        statement_lines,
+    )
+    from _test_impact import config_fingerprint, is_test_file, nodeid_path, sha1_file
+    from _utils import get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _coverage_data import (
+        FileCoverage,
+        coverage_exclude_regex,
+        coverage_omit_patterns,
+        db_has_arcs,
+        iter_context_lines,
+        open_coverage_db,
+        statement_lines,
+    )
+    from _test_impact import config_fingerprint, is_test_file, nodeid_path, sha1_file
+    from _utils import get_cache_dir, get_config_int
+
+COVERAGE_INCREMENTAL_FULL_EVERY = get_config_int("COVERAGE_INCREMENTAL_FULL_EVERY", 10)
+COVERAGE_INCREMENTAL_MAX_AGE_DAYS = get_config_int(
+    "COVERAGE_INCREMENTAL_MAX_AGE_DAYS", 7
+)
+
+STATE_VERSION = 1
+BASELINE_DATA = "baseline.coverage"
+BASELINE_STATE = "baseline.json"
+
+FileStamp = tuple[int, int, str]  # (mtime_ns, size, sha1)
+
+
+@dataclass(frozen=True, slots=True)
+class IncrementalPlan:
+    """Tests to run and the files whose cached coverage must be replaced."""
+
+    targets: list[str] | None  # None: full run (refreshes the baseline)
+    reason: str
+    changed_sources: frozenset[str] = field(default_factory=frozenset)
+    changed_tests: frozenset[str] = field(default_factory=frozenset)
+
+
+def baseline_dir(project_root: Path) -> Path:
+    """Return the directory holding the baseline data file and snapshot."""
+    return get_cache_dir(project_root, "coverage_incremental")
+
+
+def _relative(raw_path: str, root: Path) -> str | None:
+    try:
+        return Path(raw_path).resolve().relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+
+def snapshot(
+    project_root: Path,
+    source_dir: Path,
+    tests_dir: Path,
+    previous: dict[str, FileStamp] | None = None,
+) -> dict[str, FileStamp]:
+    """Stamp every ``.py`` file under the source and tests directories.
+
+    Files whose mtime and size match ``previous`` keep their stored hash
+    instead of being read again.
+    """
+    root = project_root.resolve()
+    stamps: dict[str, FileStamp] = {}
+    for directory in (source_dir, tests_dir):
+        if not directory.exists():
+            continue
+        for path in directory.rglob("*.py"):
+            rel = _relative(str(path), root)
+            if rel is None:
+                continue
+            stat = path.stat()
+            known = (previous or {}).get(rel)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                stamps[rel] = known
+            else:
+                stamps[rel] = (stat.st_mtime_ns, stat.st_size, sha1_file(path))
+    return stamps
+
+
+def _load_state(directory: Path) -> dict[str, object] | None:
+    path = directory / BASELINE_STATE
+    if not path.exists() or not (directory / BASELINE_DATA).exists():
+        return None
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+    return state
+
+
+def _write_state(directory: Path, state: dict[str, object]) -> None:
+    path = directory / BASELINE_STATE
+    tmp = path.with_suffix(".tmp")
+    _ = tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def save_baseline(
+    project_root: Path, data_file: Path, source_dir: Path, tests_dir: Path
+) -> None:
+    """Store a passing full run's data file as the new baseline."""
+    directory = baseline_dir(project_root)
+    tmp = directory / f"{BASELINE_DATA}.tmp"
+    _ = shutil.copyfile(data_file, tmp)
+    os.replace(tmp, directory / BASELINE_DATA)
+    _write_state(
+        directory,
+        {
+            "version": STATE_VERSION,
+            "built_at": time.time(),
+            "config_hash": config_fingerprint(project_root, tests_dir),
+            "runs_since_full": 0,
+            "files": snapshot(project_root, source_dir, tests_dir),
+        },
+    )
+
+
+def note_incremental_run(project_root: Path) -> None:
+    """Count a completed incremental run towards the forced full run."""
+    directory = baseline_dir(project_root)
+    state = _load_state(directory)
+    if state is None:
+        return
+    state["runs_since_full"] = int(str(state.get("runs_since_full", 0))) + 1
+    _write_state(directory, state)
+
+
+def contexts_touching(
+    data_file: Path, project_root: Path, paths: set[str]
+) -> dict[str, set[str]]:
+    """Map each project-relative path to the contexts that executed it.
+
+    The empty context stands for lines run outside any test (imports).
+    """
+    root = project_root.resolve()
+    conn = open_coverage_db(data_file)
+    try:
+        table = "arc" if db_has_arcs(conn) else "line_bits"
+        file_ids = {
+            int(file_id): rel
+            for file_id, raw_path in conn.execute("SELECT id, path FROM file")
+            if (rel := _relative(raw_path, root)) in paths
+        }
+        touched: dict[str, set[str]] = {}
+        query = (
+            f"SELECT DISTINCT context.context FROM {table} "
+            + f"JOIN context ON context.id = {table}.context_id "
+            + f"WHERE {table}.file_id = ?"
+        )
+        for file_id, rel in file_ids.items():
+            touched[rel] = {str(row[0]) for row in conn.execute(query, (file_id,))}
+        return touched
+    finally:
+        conn.close()
+
+
+def _full(reason: str) -> IncrementalPlan:
+    return IncrementalPlan(None, reason)
+
+
+def plan_incremental(
+    project_root: Path, source_dir: Path, tests_dir: Path
+) -> IncrementalPlan:
+    """Decide between a full run and re-running only the affected tests."""
+    directory = baseline_dir(project_root)
+    state = _load_state(directory)
+    if state is None:
+        return _full("no incremental coverage baseline yet")
+    age_days = (time.time() - float(str(state.get("built_at", 0)))) / 86400
+    if age_days > COVERAGE_INCREMENTAL_MAX_AGE_DAYS:
+        return _full(f"baseline is {age_days:.0f} days old")
+    runs = int(str(state.get("runs_since_full", 0)))
+    if runs >= COVERAGE_INCREMENTAL_FULL_EVERY:
+        return _full(f"{runs} incremental runs since the last full run")
+    if state.get("config_hash") != config_fingerprint(project_root, tests_dir):
+        return _full("conftest.py or test configuration changed")
+
+    raw_files = state.get("files")
+    previous: dict[str, FileStamp] = {
+        rel: (int(stamp[0]), int(stamp[1]), str(stamp[2]))
+        for rel, stamp in (raw_files.items() if isinstance(raw_files, dict) else [])
+    }
+    current = snapshot(project_root, source_dir, tests_dir, previous)
+    changed = {
+        rel
+        for rel in previous.keys() | current.keys()
+        if (previous.get(rel) or (0, 0, ""))[2] != (current.get(rel) or (0, 0, ""))[2]
+    }
+    tests_prefix = _relative(str(tests_dir), project_root.resolve())
+    in_tests = {
+        rel
+        for rel in changed
+        if tests_prefix is not None and rel.startswith(f"{tests_prefix}/")
+    }
+    helpers = sorted(rel for rel in in_tests if not is_test_file(Path(rel)))
+    if helpers:
+        return _full(f"test helper {helpers[0]} changed")
+    changed_tests = frozenset(in_tests)
+    changed_sources = frozenset(changed - in_tests)
+
+    touched = contexts_touching(
+        directory / BASELINE_DATA, project_root, set(changed_sources)
+    )
+    import_only = sorted(rel for rel, contexts in touched.items() if contexts == {""})
+    if import_only:
+        return _full(f"{import_only[0]} is only executed at import time")
+    nodeids = {
+        context.rsplit("|", 1)[0]
+        for contexts in touched.values()
+        for context in contexts
+        if context
+    }
+    rerun = {
+        nodeid
+        for nodeid in nodeids
+        if nodeid_path(nodeid) not in changed_tests
+        and (project_root / nodeid_path(nodeid)).exists()
+    }
+    whole = sorted(rel for rel in changed_tests if (project_root / rel).exists())
+    return IncrementalPlan(
+        whole + sorted(rerun),
+        f"{len(rerun)} tests touch {len(changed_sources)} changed source files, "
+        + f"{len(whole)} changed test files",
+        changed_sources,
+        changed_tests,
+    )
+
+
+def merge_coverage(
+    baseline_file: Path,
+    fresh_file: Path | None,
+    project_root: Path,
+    plan: IncrementalPlan,
+) -> dict[str, set[int]]:
+    """Executed lines per project-relative file: fresh data over the baseline.
+
+    Cached contexts are dropped for changed source files, for tests the
+    partial run re-ran, and for tests whose file was edited or deleted.
+    ``fresh_file`` is None when the changes left no test to re-run (a new
+    untested module, a deleted test file): the baseline is pruned all the same.
+    """
+    root = project_root.resolve()
+    executed: dict[str, set[int]] = {}
+    rerun: set[str] = set()
+    if fresh_file is not None:
+        conn = open_coverage_db(fresh_file)
+        try:
+            for raw_path, context, lines in iter_context_lines(conn):
+                rel = _relative(raw_path, root)
+                if rel is None:
+                    continue
+                executed.setdefault(rel, set()).update(lines)
+                if context:
+                    rerun.add(context.rsplit("|", 1)[0])
+        finally:
+            conn.close()
+
+    conn = open_coverage_db(baseline_file)
+    try:
+        for raw_path, context, lines in iter_context_lines(conn):
+            rel = _relative(raw_path, root)
+            if rel is None or rel in plan.changed_sources:
+                continue
+            if context:
+                nodeid = context.rsplit("|", 1)[0]
+                test_file = nodeid_path(nodeid)
+                if (
+                    nodeid in rerun
+                    or test_file in plan.changed_tests
+                    or not (project_root / test_file).exists()
+                ):
+                    continue
+            executed.setdefault(rel, set()).update(lines)
+    finally:
+        conn.close()
+    return executed
+
+
+def iter_merged_files(
+    executed: dict[str, set[int]], project_root: Path, source_dir: Path
+) -> Iterator[FileCoverage]:
+    """Yield per-file coverage for every measured source file.
+
+    Like ``--cov=<source_dir>``, files never imported count as uncovered.
+    """
+    exclude_regex = coverage_exclude_regex(project_root)
+    omit = coverage_omit_patterns(project_root)
+    root = project_root.resolve()
+    for path in sorted(source_dir.rglob("*.py")):
+        if any(fnmatch(str(path.resolve()), pattern) for pattern in omit):
+            continue
+        rel = _relative(str(path), root)
+        if rel is None:
+            continue
+        try:
+            statements = statement_lines(path, exclude_regex)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+        hit = executed.get(rel, set()) & statements
+        yield FileCoverage(
+            path=rel,
+            num_statements=len(statements),
+            covered_lines=len(hit),
+            missing_lines=tuple(sorted(statements - hit)),
+            executed_lines=tuple(sorted(hit)),
+        )
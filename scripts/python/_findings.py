@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compact finding storage shared by the Python analyzers.
+
+Analyzer visitors run once per AST node, so building a validated pydantic
+model per finding dominates whole-repo runs. Visitors append plain tuples to
+a ``FindingStore`` instead; rows are validated into the analyzer's model only
+at the output boundary (``to_models``), or printed straight from ``rows``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class FindingStore:
+    """Append-only tuple store with a fixed column layout."""
+
+    __slots__ = ("_rows", "fields")
+
+    def __init__(self, fields: tuple[str, ...]):
+        """Initialize store.
+
+        Args:
+            fields: Column names, matching the target model's field names
+        """
+        self.fields = fields
+        self._rows: list[tuple[object, ...]] = []
+
+    def add(self, *row: object) -> None:
+        """Append one finding; values are positional in ``fields`` order."""
+        self._rows.append(row)
+
+    def extend(self, other: FindingStore) -> None:
+        """Append all rows of another store with the same layout."""
+        if other.fields != self.fields:
+            raise ValueError(f"Field layout mismatch: {other.fields} != {self.fields}")
+        self._rows.extend(other._rows)
+
+    def rows(self) -> list[tuple[object, ...]]:
+        """Return the raw rows (not copied; do not mutate)."""
+        return self._rows
+
+    def column(self, name: str) -> Iterator[object]:
+        """Yield a single column by field name."""
+        index = self.fields.index(name)
+        return (row[index] for row in self._rows)
+
+    def to_models(self, model: type[ModelT]) -> list[ModelT]:
+        """Validate every row into ``model`` (the output boundary).
+
+        Args:
+            model: Pydantic model whose fields match ``fields``
+
+        Returns:
+            List of validated model instances in insertion order
+        """
+        fields = self.fields
+        validate = model.model_validate
+        return [validate(dict(zip(fields, row))) for row in self._rows]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __bool__(self) -> bool:
+        return bool(self._rows)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Changed-line index against the merge base, parsed from ``git diff -U0``.
+
+Used by the diff-coverage gate (check_diff_coverage.py) and by
+analyze_coverage_gaps.py --diff to restrict reports to lines touched by the
+current change (committed, staged, unstaged and untracked).
+
+Configuration:
+    DIFF_BASE: Ref to diff against via its merge base with HEAD
+        (default: first of origin/main, main, origin/master, master that exists)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+_DEFAULT_BASES = ("origin/main", "main", "origin/master", "master")
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@")
+
+
+def _git(project_root: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["git", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def resolve_merge_base(project_root: Path, base_ref: str | None = None) -> str | None:
+    """Return the merge-base commit of HEAD and the diff base, or None.
+
+    Args:
+        project_root: Path inside the git work tree
+        base_ref: Explicit base ref; defaults to DIFF_BASE or the first
+            existing default branch ref
+
+    Returns:
+        Commit SHA, or None when no base ref exists (e.g. not a git repo)
+    """
+    candidates: Iterable[str]
+    explicit = base_ref or os.getenv("DIFF_BASE")
+    candidates = (explicit,) if explicit else _DEFAULT_BASES
+    for ref in candidates:
+        result = _git(project_root, "merge-base", "HEAD", ref)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    return None
+
+
+def parse_unified_diff(diff_text: str) -> dict[str, set[int]]:
+    """Parse ``git diff -U0`` output into ``{path: added_or_modified_lines}``.
+
+    Paths are the post-image (``+++ b/...``) paths; deleted files and
+    deletion-only hunks contribute no lines. File headers are only read
+    between ``diff`` lines and the first hunk, so hunk content that starts
+    with ``-- `` or ``++ `` is not mistaken for one.
+    """
+    changed: dict[str, set[int]] = {}
+    current: set[int] | None = None
+    in_hunk = False
+    after_old_header = False
+    for line in diff_text.splitlines():
+        if line.startswith("diff "):
+            current, in_hunk, after_old_header = None, False, False
+            continue
+        if not in_hunk and line.startswith("--- "):
+            after_old_header = True
+            continue
+        if after_old_header and line.startswith("+++ "):
+            after_old_header = False
+            target = line[4:]
+            if target == "/dev/null":
+                current = None
+            else:
+                path = target[2:] if target.startswith("b/") else target
+                current = changed.setdefault(path, set())
+            continue
+        after_old_header = False
+        if not line.startswith("@@"):
+            continue
+        in_hunk = True
+        if current is None:
+            continue
+        match = _HUNK_RE.match(line)
+        if match is None:
+            continue
+        start = int(match.group("start"))
+        count = int(match.group("count") or "1")
+        current.update(range(start, start + count))
+    return {path: lines for path, lines in changed.items() if lines}
+
+
+def _untracked_lines(project_root: Path) -> dict[str, set[int]]:
+    """Treat every line of untracked (not ignored) files as added.
+
+    ``git ls-files`` lists paths relative to ``project_root`` (its cwd).
+    """
+    result = _git(project_root, "ls-files", "--others", "--exclude-standard")
+    changed: dict[str, set[int]] = {}
+    if result.returncode != 0:
+        return changed
+    for rel in result.stdout.splitlines():
+        try:
+            with open(project_root / rel, encoding="utf-8") as f:
+                count = sum(1 for _ in f)
+        except (OSError, UnicodeDecodeError):
+            continue
+        if count:
+            changed[rel] = set(range(1, count + 1))
+    return changed
+
+
+def changed_lines(
+    project_root: Path,
+    base_ref: str | None = None,
+    include_untracked: bool = True,
+) -> dict[str, set[int]] | None:
+    """Return lines added or modified since the merge base, keyed by path.
+
+    The diff runs from the merge base to the working tree, so it covers
+    committed, staged and unstaged edits. Paths are relative to
+    ``project_root`` (``git diff --relative``, like ``git ls-files`` for
+    untracked files), in POSIX form; changes outside it are left out.
+
+    Returns:
+        Mapping of path to changed line numbers, or None when no merge base
+        can be resolved
+    """
+    merge_base = resolve_merge_base(project_root, base_ref)
+    if merge_base is None:
+        return None
+    result = _git(
+        project_root,
+        "diff",
+        "-U0",
+        "--no-color",
+        "--no-ext-diff",
+        "--no-renames",
+        "--relative",
+        merge_base,
+    )
+    if result.returncode != 0:
+        return None
+    changed = parse_unified_diff(result.stdout)
+    if include_untracked:
+        for path, lines in _untracked_lines(project_root).items():
+            changed.setdefault(path, set()).update(lines)
+    return changed
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""AST checks for pydantic overhead on hot paths.
+
+Validation is the expensive part of pydantic. These checks flag places where
+it runs more often than the data needs:
+
+- ``model_validate``/``validate_python`` or model construction inside loops
+  and comprehensions (validate the batch once, or ``model_construct``)
+- attribute assignment in loops on ``validate_assignment=True`` models
+- ``model_dump()`` output fed back into validation (the data is already
+  valid; ``model_construct`` or passing the instance skips the round trip)
+- ``model_copy(deep=True)``, which copies the whole object graph
+- ``TypeAdapter`` built inside a function, rebuilding its schema per call
+
+Findings use analyze_performance.py's row layout (type, severity, line,
+function, message), so both analyze_performance.py and
+check_pydantic_performance.py report them.
+"""
+
+from __future__ import annotations
+
+import ast
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+try:
+    from _findings import FindingStore
+except ImportError:
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _findings import FindingStore
+
+VALIDATE_METHODS = frozenset(
+    {
+        "model_validate",
+        "model_validate_json",
+        "model_validate_strings",
+        "validate_python",
+        "validate_json",
+    }
+)
+DUMP_METHODS = frozenset({"model_dump", "model_dump_json"})
+MODEL_BASES = frozenset({"BaseModel", "RootModel"})
+_CACHE_DECORATORS = frozenset({"cache", "lru_cache", "cached_property"})
+_CONSTRUCT_HINT = "use model_construct() where the data is already validated"
+
+
+@dataclass(frozen=True, slots=True)
+class ModelIndex:
+    """Pydantic model class names, and those validating on assignment."""
+
+    models: frozenset[str] = frozenset()
+    validating: frozenset[str] = frozenset()
+
+
+def _name_of(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript):  # RootModel[list[int]]
+        return _name_of(node.value)
+    return None
+
+
+def _validate_assignment(node: ast.ClassDef) -> bool | None:
+    """The class's own ``validate_assignment`` setting, None when unset."""
+    for stmt in node.body:
+        targets: list[ast.expr] = []
+        value: ast.expr | None = None
+        if isinstance(stmt, ast.Assign):
+            targets, value = stmt.targets, stmt.value
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            targets, value = [stmt.target], stmt.value
+        if not any(isinstance(t, ast.Name) and t.id == "model_config" for t in targets):
+            continue
+        if isinstance(value, ast.Call):
+            for keyword in value.keywords:
+                if keyword.arg == "validate_assignment":
+                    return _truthy(keyword.value)
+        elif isinstance(value, ast.Dict):
+            for key, item in zip(value.keys, value.values):
+                if isinstance(key, ast.Constant) and key.value == "validate_assignment":
+                    return _truthy(item)
+    return None
+
+
+def _truthy(node: ast.expr) -> bool | None:
+    # Non-literal settings (e.g. a shared constant) count as unknown
+    return bool(node.value) if isinstance(node, ast.Constant) else None
+
+
+def collect_models(trees: Iterable[ast.AST]) -> ModelIndex:
+    """Index the pydantic models defined across ``trees``.
+
+    Subclasses of indexed models are models too, and inherit
+    ``validate_assignment`` unless they set it themselves. Classes are
+    matched by bare name, so same-named classes in different modules merge.
+    """
+    classes: dict[str, tuple[set[str], bool | None]] = {}
+    for tree in trees:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                bases = {name for b in node.bases if (name := _name_of(b))}
+                classes[node.name] = (bases, _validate_assignment(node))
+
+    models = set(MODEL_BASES)
+    validating: set[str] = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, (bases, own) in classes.items():
+            if name not in models and bases & models:
+                models.add(name)
+                changed = True
+            inherited = own is None and bool(bases & validating)
+            if name in models and name not in validating and (own or inherited):
+                validating.add(name)
+                changed = True
+    return ModelIndex(frozenset(models - MODEL_BASES), frozenset(validating))
+
+
+def _collection_item(annotation: ast.expr | None, models: frozenset[str]) -> str | None:
+    """Model named by ``list[Model]``-style annotations."""
+    if isinstance(annotation, ast.Subscript):
+        items = annotation.slice
+        elements = items.elts if isinstance(items, ast.Tuple) else [items]
+        for element in elements:
+            name = _annotated_model(element, models)
+            if name is not None:
+                return name
+    return None
+
+
+def _annotated_model(annotation: ast.expr | None, models: frozenset[str]) -> str | None:
+    """Model named by an annotation such as ``Model``, ``"Model"``, ``Model | None``."""
+    if annotation is None:
+        return None
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        return annotation.value if annotation.value in models else None
+    if isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+        return _annotated_model(annotation.left, models) or _annotated_model(
+            annotation.right, models
+        )
+    name = _name_of(annotation) if not isinstance(annotation, ast.Subscript) else None
+    return name if name in models else None
+
+
+def _dotted(node: ast.expr) -> str:
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted(node.value)}.{node.attr}"
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Call):
+        return f"{_dotted(node.func)}(...)"
+    return "<expr>"
+
+
+class PydanticPerformanceVisitor(ast.NodeVisitor):
+    """AST visitor flagging avoidable pydantic validation on hot paths."""
+
+    def __init__(self, findings: FindingStore, index: ModelIndex):
+        """Initialize visitor.
+
+        Args:
+            findings: Store to append rows to (analyze_performance layout)
+            index: Known models, e.g. from ``collect_models`` over the project
+        """
+        self.findings = findings
+        self.index = index
+        self.function_name: str | None = None
+        self.function_depth = 0
+        self.cached_function = False
+        self.class_name: str | None = None
+        self.loop_depth = 0
+        # Per-function: variables known to hold a model (name -> model class),
+        # a collection of models, or model_dump() output
+        self.instances: dict[str, str] = {}
+        self.collections: dict[str, str] = {}
+        self.dumped: set[str] = set()
+
+    def _add(self, kind: str, severity: str, line: int, message: str) -> None:
+        self.findings.add(kind, severity, line, self.function_name, message)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        old_class = self.class_name
+        self.class_name = node.name
+        self.generic_visit(node)
+        self.class_name = old_class
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        saved = (
+            self.function_name,
+            self.cached_function,
+            self.class_name,
+            self.loop_depth,
+            self.instances,
+            self.collections,
+            self.dumped,
+        )
+        models = self.index.models
+        self.function_name = node.name
+        self.function_depth += 1
+        self.cached_function = any(
+            _name_of(d.func if isinstance(d, ast.Call) else d) in _CACHE_DECORATORS
+            for d in node.decorator_list
+        )
+        self.loop_depth = 0
+        self.instances, self.collections, self.dumped = {}, {}, set()
+        args = [*node.args.posonlyargs, *node.args.args, *node.args.kwonlyargs]
+        if args and self.class_name in models:
+            self.instances[args[0].arg] = self.class_name
+        for arg in args:
+            if model := _annotated_model(arg.annotation, models):
+                self.instances[arg.arg] = model
+            elif model := _collection_item(arg.annotation, models):
+                self.collections[arg.arg] = model
+        self.class_name = None
+        self.generic_visit(node)
+        self.function_depth -= 1
+        (
+            self.function_name,
+            self.cached_function,
+            self.class_name,
+            self.loop_depth,
+            self.instances,
+            self.collections,
+            self.dumped,
+        ) = saved
+
+    def _bind_loop_target(self, target: ast.expr, iterable: ast.expr) -> None:
+        if isinstance(target, ast.Name):
+            model = None
+            if isinstance(iterable, ast.Name):
+                model = self.collections.get(iterable.id)
+            if model is None:
+                _ = self.instances.pop(target.id, None)
+            else:
+                self.instances[target.id] = model
+
+    def _visit_loop(self, node: ast.For | ast.AsyncFor | ast.While) -> None:
+        if isinstance(node, ast.While):
+            head: list[ast.AST] = []
+            body: list[ast.AST] = [node.test, *node.body]
+        else:
+            self._bind_loop_target(node.target, node.iter)
+            head, body = [node.iter], [node.target, *node.body]
+        for child in head:
+            self.visit(child)
+        self.loop_depth += 1
+        for child in body:
+            self.visit(child)
+        self.loop_depth -= 1
+        for child in node.orelse:
+            self.visit(child)
+
+    def visit_For(self, node: ast.For) -> None:
+        self._visit_loop(node)
+
+    def visit_AsyncFor(self, node: ast.AsyncFor) -> None:
+        self._visit_loop(node)
+
+    def visit_While(self, node: ast.While) -> None:
+        self._visit_loop(node)
+
+    def _visit_comprehension(
+        self,
+        node: ast.ListComp | ast.SetComp | ast.GeneratorExp | ast.DictComp,
+        elements: list[ast.expr],
+    ) -> None:
+        # Only the outermost iterable is evaluated once
+        first = node.generators[0]
+        self.visit(first.iter)
+        self.loop_depth += 1
+        for generator in node.generators:
+            self._bind_loop_target(generator.target, generator.iter)
+            if generator is not first:
+                self.visit(generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in elements:
+            self.visit(element)
+        self.loop_depth -= 1
+
+    def visit_ListComp(self, node: ast.ListComp) -> None:
+        self._visit_comprehension(node, [node.elt])
+
+    def visit_SetComp(self, node: ast.SetComp) -> None:
+        self._visit_comprehension(node, [node.elt])
+
+    def visit_GeneratorExp(self, node: ast.GeneratorExp) -> None:
+        self._visit_comprehension(node, [node.elt])
+
+    def visit_DictComp(self, node: ast.DictComp) -> None:
+        self._visit_comprehension(node, [node.key, node.value])
+
+    def _produced_model(self, value: ast.expr) -> str | None:
+        """Model class an expression evaluates to an instance of, if known."""
+        if not isinstance(value, ast.Call):
+            return None
+        func = value.func
+        if isinstance(func, ast.Attribute) and func.attr in (
+            *VALIDATE_METHODS,
+            "model_construct",
+            "model_copy",
+        ):
+            name = _name_of(func.value)
+            if name in self.index.models:
+                return name
+            if isinstance(func.value, ast.Name):
+                return self.instances.get(func.value.id)
+            return None
+        name = _name_of(func)
+        return name if name in self.index.models else None
+
+    def _is_dump(self, value: ast.expr) -> bool:
+        if isinstance(value, ast.Name):
+            return value.id in self.dumped
+        return (
+            isinstance(value, ast.Call)
+            and isinstance(value.func, ast.Attribute)
+            and value.func.attr in DUMP_METHODS
+        )
+
+    def _bind(self, target: ast.expr, value: ast.expr | None) -> None:
+        if isinstance(target, ast.Attribute):
+            self._check_assignment(target)
+            return
+        if not isinstance(target, ast.Name):
+            return
+        name = target.id
+        _ = self.instances.pop(name, None)
+        self.dumped.discard(name)
+        if value is None:
+            return
+        if model := self._produced_model(value):
+            self.instances[name] = model
+        elif self._is_dump(value):
+            self.dumped.add(name)
+
+    def _check_assignment(self, target: ast.Attribute) -> None:
+        if self.loop_depth == 0 or not isinstance(target.value, ast.Name):
+            return
+        model = self.instances.get(target.value.id)
+        if model in self.index.validating:
+            self._add(
+                "pydantic_validate_assignment_in_loop",
+                "medium",
+                target.lineno,
+                (
+                    f"Assignment to {target.value.id}.{target.attr} in loop "
+                    f"re-validates ({model} has validate_assignment=True) - "
+                    "compute the value first and assign once, or build the "
+                    "model with all fields at the end"
+                ),
+            )
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self.visit(node.value)
+        for target in node.targets:
+            self._bind(target, node.value)
+            self.visit(target)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if node.value is not None:
+            self.visit(node.value)
+        self._bind(node.target, node.value)
+        if isinstance(node.target, ast.Name):
+            models = self.index.models
+            if model := _annotated_model(node.annotation, models):
+                self.instances.setdefault(node.target.id, model)
+            elif model := _collection_item(node.annotation, models):
+                self.collections[node.target.id] = model
+        self.visit(node.target)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.visit(node.value)
+        if isinstance(node.target, ast.Attribute):
+            self._check_assignment(node.target)
+        self.visit(node.target)
+
+    def _loop_severity(self, default: str) -> str:
+        return "high" if self.loop_depth > 0 else default
+
+    def _check_validate(self, node: ast.Call, func: ast.Attribute) -> None:
+        target = _dotted(func)
+        if node.args and self._is_dump(node.args[0]):
+            self._add(
+                "pydantic_dump_revalidate",
+                self._loop_severity("medium"),
+                node.lineno,
+                (
+                    f"{target}() re-validates model_dump() output - "
+                    f"pass the instance or {_CONSTRUCT_HINT}"
+                ),
+            )
+        elif self.loop_depth > 0:
+            self._add(
+                "pydantic_validate_in_loop",
+                "high",
+                node.lineno,
+                (
+                    f"{target}() in loop - validate the batch once "
+                    f"(TypeAdapter(list[...])) or {_CONSTRUCT_HINT}"
+                ),
+            )
+
+    def _check_constructor(self, node: ast.Call, model: str) -> None:
+        unpacked = [k.value for k in node.keywords if k.arg is None]
+        if any(self._is_dump(value) for value in unpacked):
+            self._add(
+                "pydantic_dump_revalidate",
+                self._loop_severity("medium"),
+                node.lineno,
+                (
+                    f"{model}(**model_dump()) re-validates already validated "
+                    f"data - {_CONSTRUCT_HINT}"
+                ),
+            )
+        elif self.loop_depth > 0:
+            self._add(
+                "pydantic_validate_in_loop",
+                "high",
+                node.lineno,
+                (
+                    f"{model}() constructed in loop validates every item - "
+                    f"{_CONSTRUCT_HINT}"
+                ),
+            )
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        name = _name_of(func)
+        if isinstance(func, ast.Attribute) and func.attr in VALIDATE_METHODS:
+            self._check_validate(node, func)
+        elif isinstance(func, ast.Attribute) and func.attr == "model_copy":
+            deep = any(k.arg == "deep" and _truthy(k.value) for k in node.keywords)
+            if deep:
+                self._add(
+                    "pydantic_deep_copy",
+                    self._loop_severity("medium"),
+                    node.lineno,
+                    (
+                        "model_copy(deep=True) copies the whole object graph - "
+                        "copy shallowly with update= for the changed fields"
+                    ),
+                )
+        elif name == "TypeAdapter":
+            if self.function_depth > 0 and not self.cached_function:
+                self._add(
+                    "pydantic_type_adapter_in_function",
+                    self._loop_severity("medium"),
+                    node.lineno,
+                    (
+                        "TypeAdapter built per call rebuilds its schema - "
+                        "create it once at module level"
+                    ),
+                )
+        elif name in self.index.models:
+            self._check_constructor(node, name)
+        self.generic_visit(node)
+
+
+def check_tree(tree: ast.AST, findings: FindingStore, index: ModelIndex) -> None:
+    """Append the pydantic hot-path findings of one module to ``findings``."""
+    PydanticPerformanceVisitor(findings, index).visit(tree)
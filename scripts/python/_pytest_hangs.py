@@ -0,0 +1,70 @@
+"""Pytest plugin: per-test hang watchdog built on faulthandler.
+
+Loaded by run_tests.py via ``-p _pytest_hangs`` when TEST_HANG_TIMEOUT is set.
+Each process (every xdist worker, or the single pytest process) keeps a dump
+file named after its worker id and pid holding the running test's node id. Around
+each test it opens the file and arms
+``faulthandler.dump_traceback_later(budget, exit=True)``: a hung test gets all
+thread stacks appended to the file and only that worker exits, so the rest of
+the suite keeps running on the other workers and the replacement xdist starts
+(run_tests.py drops ``-x`` with the watchdog on, so the crash does not stop the
+run). See _test_hangs.py for the report side.
+
+Environment (set by run_tests.py):
+    SYNAPSE_TEST_HANG_DIR: Directory for per-worker dump files
+    SYNAPSE_TEST_HANG_TIMEOUT: Per-test budget in seconds
+"""
+
+from __future__ import annotations
+
+import faulthandler
+import os
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+HANG_DIR_ENV = "SYNAPSE_TEST_HANG_DIR"
+HANG_TIMEOUT_ENV = "SYNAPSE_TEST_HANG_TIMEOUT"
+
+
+class HangWatchdog:
+    """Arms a faulthandler dump-and-exit timer around every test."""
+
+    def __init__(self, dump_path: Path, budget_s: float):
+        self.dump_path = dump_path
+        self.budget_s = budget_s
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None, None, None]:
+        # Rewrite the header so a dump always follows the test that hung; the
+        # file stays open while the timer is armed and is closed after the test
+        with open(self.dump_path, "w", encoding="utf-8") as dump_file:
+            _ = dump_file.write(f"{item.nodeid}\n")
+            dump_file.flush()
+            faulthandler.dump_traceback_later(self.budget_s, exit=True, file=dump_file)
+            try:
+                yield
+            finally:
+                faulthandler.cancel_dump_traceback_later()
+
+    def pytest_unconfigure(self) -> None:
+        faulthandler.cancel_dump_traceback_later()
+        self.dump_path.unlink(missing_ok=True)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the watchdog when run_tests.py sets a budget and dump dir."""
+    dump_dir = os.getenv(HANG_DIR_ENV)
+    try:
+        budget_s = float(os.getenv(HANG_TIMEOUT_ENV, "0"))
+    except ValueError:
+        return
+    if not dump_dir or budget_s <= 0:
+        return
+    workerinput: dict[str, str] = getattr(config, "workerinput", {})
+    worker = workerinput.get("workerid", "main")
+    # The pid keeps a replacement worker from truncating its predecessor's dump
+    dump_path = Path(dump_dir) / f"{worker}-{os.getpid()}.txt"
+    watchdog = HangWatchdog(dump_path, budget_s)
+    config.pluginmanager.register(watchdog, "synapse_hang_watchdog")
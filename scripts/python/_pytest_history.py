@@ -0,0 +1,178 @@
+"""Pytest plugin: record per-test history and order tests from it.
+
+Loaded by run_tests.py via ``-p _pytest_history`` with this directory on
+PYTHONPATH. On the xdist controller (or a non-distributed run) it folds every
+phase report into per-test durations/outcomes and writes them to the history
+store at session end. On each worker (or the single process) it reorders the
+collected items with ``_test_history.order_nodeids``; the order is computed
+from the same snapshot everywhere, so xdist's collection-consistency check
+still passes. Every process also times the setup of the project's own
+fixtures and the collection of each test module, and adds them to the store
+as pending rows that the controller's run then claims.
+
+Environment (set by run_tests.py):
+    SYNAPSE_TEST_HISTORY_DB: History database path; plugin is inert when unset
+    SYNAPSE_TEST_ORDER: Set to 0 to record without reordering
+    SYNAPSE_TEST_FULL_RUN: 1 when the session runs the whole suite
+    SYNAPSE_TEST_INSTRUMENTED: 1 when tracemalloc or the stack sampler slows
+        the tests down; the run's timings are then kept out of the medians
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+try:
+    from _test_history import (
+        FixtureKey,
+        FixtureTiming,
+        HistoryStore,
+        TestResult,
+        load_stats,
+        merge_phase,
+        order_nodeids,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _test_history import (
+        FixtureKey,
+        FixtureTiming,
+        HistoryStore,
+        TestResult,
+        load_stats,
+        merge_phase,
+        order_nodeids,
+    )
+
+HISTORY_DB_ENV = "SYNAPSE_TEST_HISTORY_DB"
+ORDER_ENV = "SYNAPSE_TEST_ORDER"
+FULL_RUN_ENV = "SYNAPSE_TEST_FULL_RUN"
+INSTRUMENTED_ENV = "SYNAPSE_TEST_INSTRUMENTED"
+
+
+class HistoryPlugin:
+    """Collects phase reports and applies duration-aware ordering."""
+
+    def __init__(self, db_path: Path, reorder: bool, is_worker: bool, rootpath: Path):
+        self.db_path = db_path
+        self.reorder = reorder
+        self.is_worker = is_worker
+        self.rootpath = rootpath
+        self.started_at = time.time()
+        self.results: dict[str, TestResult] = {}
+        self.fixtures: dict[FixtureKey, FixtureTiming] = {}
+        self.fixture_modules: dict[FixtureKey, set[str]] = {}
+        self.fixture_keys: dict[int, FixtureKey | None] = {}
+        self.collection: dict[str, float] = {}
+
+    def _fixture_key(self, fixturedef: pytest.FixtureDef[object]) -> FixtureKey | None:
+        """``("path:line", name)`` of a project fixture; None for plugin fixtures."""
+        if id(fixturedef) in self.fixture_keys:
+            return self.fixture_keys[id(fixturedef)]
+        key: FixtureKey | None = None
+        code = getattr(fixturedef.func, "__code__", None)
+        if code is not None:
+            try:
+                path = Path(code.co_filename).resolve().relative_to(self.rootpath)
+            except ValueError:
+                path = None
+            if path is not None and "site-packages" not in path.parts:
+                key = (f"{path.as_posix()}:{code.co_firstlineno}", fixturedef.argname)
+        self.fixture_keys[id(fixturedef)] = key
+        return key
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(
+        self, fixturedef: pytest.FixtureDef[object], request: pytest.FixtureRequest
+    ) -> Generator[None, None, None]:
+        # Dependencies are set up before this hook, so the time is exclusive
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        key = self._fixture_key(fixturedef)
+        if key is None:
+            return
+        timing = self.fixtures.get(key)
+        if timing is None:
+            timing = self.fixtures[key] = FixtureTiming(str(fixturedef.scope))
+            self.fixture_modules[key] = set()
+        timing.setups += 1
+        timing.setup_s += elapsed
+        modules = self.fixture_modules[key]
+        modules.add(request.node.nodeid.split("::", 1)[0])
+        timing.modules = len(modules)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(
+        self, collector: pytest.Collector
+    ) -> Generator[None, None, None]:
+        if not isinstance(collector, pytest.Module):
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        self.collection[collector.nodeid] = time.perf_counter() - start
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: list[pytest.Item]) -> None:
+        if not self.reorder:
+            return
+        stats = load_stats(self.db_path)
+        if not stats:
+            return
+        order = order_nodeids([item.nodeid for item in items], stats)
+        items[:] = [items[i] for i in order]
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if self.is_worker:
+            return
+        merge_phase(
+            self.results, report.nodeid, report.when, report.outcome, report.duration
+        )
+
+    def pytest_sessionfinish(self, exitstatus: int) -> None:
+        # xdist workers finish before the controller records the run
+        record = not self.is_worker and bool(self.results)
+        if not record and not (self.fixtures or self.collection):
+            return
+        store = HistoryStore(self.db_path)
+        try:
+            store.add_pending(self.fixtures, self.collection)
+            if not record:
+                return
+            _ = store.record_run(
+                self.results,
+                self.started_at,
+                int(exitstatus),
+                full_run=os.getenv(FULL_RUN_ENV) == "1",
+                instrumented=os.getenv(INSTRUMENTED_ENV) == "1",
+            )
+        finally:
+            store.close()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the history plugin when run_tests.py provides a store."""
+    db_path = os.getenv(HISTORY_DB_ENV)
+    if not db_path:
+        return
+    is_worker = hasattr(config, "workerinput")
+    if not is_worker and Path(db_path).exists():
+        store = HistoryStore(Path(db_path))
+        try:
+            store.discard_pending()
+        finally:
+            store.close()
+    plugin = HistoryPlugin(
+        Path(db_path),
+        reorder=os.getenv(ORDER_ENV, "1") != "0",
+        is_worker=is_worker,
+        rootpath=config.rootpath.resolve(),
+    )
+    config.pluginmanager.register(plugin, "synapse_history")
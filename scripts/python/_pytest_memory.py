@@ -0,0 +1,225 @@
+"""Pytest plugin: per-test peak memory measurement built on tracemalloc.
+
+Loaded by run_tests.py via ``-p _pytest_memory`` with ``--memory``. Around
+each test call tracemalloc is restarted, so its peak counts only what the
+test itself allocated, and the process's peak RSS (``ru_maxrss``) is read
+before and after. Between calls tracing is off, which keeps fixture setup
+and pytest's own bookkeeping out of the figures and the overhead.
+
+Tests with a baseline get a budget. A watcher thread polls the traced size
+while the test runs and snapshots the live allocations whenever the test
+is over budget and has grown another quarter, so the report can name the
+sites responsible for the peak rather than whatever survived to the end.
+
+Each process (every xdist worker, or the single pytest process) appends
+one JSON line per test to ``<worker>-<pid>.jsonl`` in the record
+directory; see _test_memory.py for the report side.
+
+Environment (set by run_tests.py):
+    SYNAPSE_TEST_MEMORY_DIR: Directory for per-worker record files
+    SYNAPSE_TEST_MEMORY_BASELINE: Baseline file giving per-test budgets
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+try:
+    from _test_memory import (
+        TEST_MEMORY_GROWTH_PCT,
+        TEST_MEMORY_MIN_KB,
+        budget_bytes,
+        load_memory_baseline,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _test_memory import (
+        TEST_MEMORY_GROWTH_PCT,
+        TEST_MEMORY_MIN_KB,
+        budget_bytes,
+        load_memory_baseline,
+    )
+
+MEMORY_DIR_ENV = "SYNAPSE_TEST_MEMORY_DIR"
+MEMORY_BASELINE_ENV = "SYNAPSE_TEST_MEMORY_BASELINE"
+
+TRACE_FRAMES = 16
+TOP_SITES = 5
+POLL_INTERVAL_S = 0.002
+_LIBRARY_DIRS = tuple(
+    {
+        sysconfig.get_paths()[key]
+        for key in ("stdlib", "platstdlib", "purelib", "platlib")
+    }
+)
+
+
+def max_rss_bytes() -> int:
+    """Peak resident set size of this process so far (0 when unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _site_label(traceback: tracemalloc.Traceback, root: Path) -> str:
+    """Innermost frame outside the stdlib and site-packages, as ``path:line``."""
+    frames = list(reversed(traceback))  # Tracebacks list the oldest call first
+    chosen = frames[0]
+    for frame in frames:
+        if not frame.filename.startswith((*_LIBRARY_DIRS, "<")):
+            chosen = frame
+            break
+    path = Path(chosen.filename)
+    try:
+        path = path.relative_to(root)
+    except ValueError:
+        pass
+    return f"{path}:{chosen.lineno}"
+
+
+def top_sites(
+    snapshot: tracemalloc.Snapshot, root: Path, limit: int = TOP_SITES
+) -> list[tuple[str, int]]:
+    """Largest live allocation sites of a snapshot, attributed to project code."""
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+    )
+    sizes: Counter[str] = Counter()
+    for stat in snapshot.statistics("traceback"):
+        sizes[_site_label(stat.traceback, root)] += stat.size
+    # Sites under 1% of the total are noise from pytest's own machinery
+    floor = sum(sizes.values()) // 100
+    return [(site, size) for site, size in sizes.most_common(limit) if size >= floor]
+
+
+class PeakWatcher:
+    """Background thread snapshotting allocations of a test over budget."""
+
+    def __init__(self, interval_s: float = POLL_INTERVAL_S):
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._armed = threading.Event()
+        self._budget = 0
+        self._generation = 0
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._snapshot_size = 0
+        self._thread: threading.Thread | None = None
+
+    def arm(self, budget: int) -> None:
+        """Start watching the current test against ``budget`` bytes."""
+        with self._lock:
+            self._budget = budget
+            self._generation += 1
+            self._snapshot = None
+            self._snapshot_size = 0
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="synapse-memory-watcher", daemon=True
+            )
+            self._thread.start()
+        self._armed.set()
+
+    def disarm(self) -> tracemalloc.Snapshot | None:
+        """Stop watching; return the snapshot taken nearest the peak, if any."""
+        self._armed.clear()
+        with self._lock:
+            self._generation += 1
+            snapshot, self._snapshot = self._snapshot, None
+        return snapshot
+
+    def _run(self) -> None:
+        while True:
+            _ = self._armed.wait()
+            with self._lock:
+                generation = self._generation
+                threshold = max(self._budget, self._snapshot_size * 5 // 4)
+            if not tracemalloc.is_tracing():
+                time.sleep(self.interval_s)
+                continue
+            current, _ = tracemalloc.get_traced_memory()
+            if current > threshold:
+                try:
+                    snapshot = tracemalloc.take_snapshot()
+                except RuntimeError:  # Tracing stopped under us
+                    snapshot = None
+                with self._lock:
+                    if snapshot is not None and generation == self._generation:
+                        self._snapshot = snapshot
+                        self._snapshot_size = current
+            time.sleep(self.interval_s)
+
+
+class MemoryProfiler:
+    """Measures the tracemalloc peak and RSS growth of every test call."""
+
+    def __init__(self, record_path: Path, budgets: dict[str, int], root: Path):
+        self.record_path = record_path
+        self.budgets = budgets
+        self.root = root
+        self.watcher = PeakWatcher()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Generator[None, None, None]:
+        budget = self.budgets.get(item.nodeid)
+        rss_before = max_rss_bytes()
+        # Restarting drops earlier tests' traces, so the peak starts at zero
+        tracemalloc.stop()
+        tracemalloc.start(TRACE_FRAMES)
+        if budget is not None:
+            self.watcher.arm(budget)
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = self.watcher.disarm() if budget is not None else None
+            if snapshot is None and budget is not None and peak > budget:
+                # Too brief for the watcher: fall back to what is still live
+                snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            record: dict[str, object] = {
+                "nodeid": item.nodeid,
+                "peak": peak,
+                "rss": max(0, max_rss_bytes() - rss_before),
+            }
+            if snapshot is not None:
+                record["sites"] = top_sites(snapshot, self.root)
+            # Appended per test: no handle outlives a failing hook
+            with open(self.record_path, "a", encoding="utf-8") as record_file:
+                _ = record_file.write(json.dumps(record) + "\n")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the profiler when run_tests.py sets a record directory."""
+    record_dir = os.getenv(MEMORY_DIR_ENV)
+    if not record_dir:
+        return
+    baseline_path = os.getenv(MEMORY_BASELINE_ENV)
+    baseline = load_memory_baseline(Path(baseline_path)) if baseline_path else {}
+    min_bytes = TEST_MEMORY_MIN_KB * 1024
+    budgets = {
+        nodeid: budget_bytes(peak, TEST_MEMORY_GROWTH_PCT, min_bytes)
+        for nodeid, peak in baseline.items()
+    }
+    workerinput: dict[str, str] = getattr(config, "workerinput", {})
+    worker = workerinput.get("workerid", "main")
+    record_path = Path(record_dir) / f"{worker}-{os.getpid()}.jsonl"
+    profiler = MemoryProfiler(record_path, budgets, Path(str(config.rootpath)))
+    config.pluginmanager.register(profiler, "synapse_memory_profiler")
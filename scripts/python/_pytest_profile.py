@@ -0,0 +1,71 @@
+"""Pytest plugin: statistical CPU profile of the tests a process runs.
+
+Loaded by run_tests.py via ``-p _pytest_profile`` with ``--profile``. The
+first test a process runs arms a SIGPROF stack sampler (_stack_sampler.py)
+that ticks on CPU time, so idle waits cost nothing and the xdist controller,
+which runs no tests, records nothing. Frames under the project root are
+labelled with their relative path so samples can be attributed to source
+files. At session end the process writes ``<worker>-<pid>.collapsed`` into
+the record directory; see _test_profile.py for the report side.
+
+Environment (set by run_tests.py):
+    SYNAPSE_TEST_PROFILE_DIR: Directory for per-worker collapsed stacks
+    SYNAPSE_TEST_PROFILE_SAMPLE_US: Sampling interval in microseconds
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+try:
+    from _stack_sampler import StackSampler, path_labeler, sampling_available
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _stack_sampler import StackSampler, path_labeler, sampling_available
+
+PROFILE_DIR_ENV = "SYNAPSE_TEST_PROFILE_DIR"
+PROFILE_SAMPLE_US_ENV = "SYNAPSE_TEST_PROFILE_SAMPLE_US"
+
+
+class SuiteProfiler:
+    """Samples the process from its first test until the session ends."""
+
+    def __init__(self, output_path: Path, sampler: StackSampler):
+        self.output_path = output_path
+        self.sampler = sampler
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self) -> Generator[None, None, None]:
+        if not self.sampler.running:
+            self.sampler.start()
+        yield
+
+    def pytest_sessionfinish(self) -> None:
+        self.sampler.stop()
+        if self.sampler.samples:
+            _ = self.sampler.write(self.output_path)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the profiler when run_tests.py sets a record directory."""
+    record_dir = os.getenv(PROFILE_DIR_ENV)
+    if not record_dir or not sampling_available():
+        return
+    try:
+        interval_us = int(os.getenv(PROFILE_SAMPLE_US_ENV, "5000"))
+    except ValueError:
+        return
+    workerinput: dict[str, str] = getattr(config, "workerinput", {})
+    worker = workerinput.get("workerid", "main")
+    output_path = Path(record_dir) / f"{worker}-{os.getpid()}.collapsed"
+    sampler = StackSampler(
+        interval_us / 1e6, clock="cpu", label=path_labeler(Path(config.rootpath))
+    )
+    config.pluginmanager.register(
+        SuiteProfiler(output_path, sampler), "synapse_suite_profiler"
+    )
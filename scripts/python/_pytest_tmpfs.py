@@ -0,0 +1,36 @@
+"""Pytest plugin: per-worker temporary directories on a tmpfs.
+
+Loaded by run_tests.py via ``-p _pytest_tmpfs`` in --tmpfs mode. Every
+process (each xdist worker, or the single pytest process) points ``TMPDIR``
+and ``tempfile.tempdir`` at its own subdirectory of the session, so
+``tempfile.TemporaryDirectory()`` in tests and in the subprocesses they start
+lands in RAM without workers sharing a directory. ``--basetemp`` (tmp_path)
+is split per worker by xdist itself. See _test_tmpfs.py for the session side.
+
+Environment (set by run_tests.py):
+    SYNAPSE_TEST_TMPFS_DIR: Session directory on the tmpfs
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TMPFS_DIR_ENV = "SYNAPSE_TEST_TMPFS_DIR"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Give this process its own temp directory inside the session."""
+    session_dir = os.getenv(TMPFS_DIR_ENV)
+    if not session_dir:
+        return
+    workerinput: dict[str, str] = getattr(config, "workerinput", {})
+    worker = workerinput.get("workerid", "main")
+    # The pid keeps a replacement worker out of its predecessor's leftovers
+    worker_tmp = Path(session_dir) / "tmp" / f"{worker}-{os.getpid()}"
+    worker_tmp.mkdir(parents=True, exist_ok=True)
+    os.environ["TMPDIR"] = str(worker_tmp)
+    tempfile.tempdir = str(worker_tmp)
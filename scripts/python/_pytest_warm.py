@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Warm pytest worker for post-edit test runs.
+
+A long-lived server per project imports pytest, the project's conftest files,
+test modules and their ``src`` dependencies once (a ``--collect-only`` pass),
+then listens on a Unix socket. For each request it forks a child that drops
+project modules whose source changed since warm-up (plus project modules that
+imported names from them), runs ``pytest.main`` on the requested node ids and
+sends back the exit code and output tail. The parent never runs tests, so
+every child starts from the same pristine warm state.
+
+post_edit_hook.py uses it when POST_EDIT_WARM=1: it talks to a running server
+and otherwise starts one in the background and runs pytest cold that time.
+A server holds an exclusive lock file from before warm-up until it exits, so
+edits made while it warms up (or while it is alive without a socket) do not
+start more servers.
+The server exits when pytest configuration changes (conftest.py,
+pyproject.toml, setup.cfg, pytest.ini, uv.lock), after the idle timeout, or
+when its socket is removed. POSIX only (fork + Unix sockets).
+
+Usage:
+    python _pytest_warm.py serve <project_root>
+
+Configuration:
+    POST_EDIT_WARM_IDLE: Seconds without requests before the server exits
+        (default: 1800)
+    POST_EDIT_WARM_TIMEOUT: Per-request test timeout in seconds (default: 60)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+
+try:
+    from _utils import get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_cache_dir, get_config_int
+
+POST_EDIT_WARM_IDLE = get_config_int("POST_EDIT_WARM_IDLE", 1800)
+POST_EDIT_WARM_TIMEOUT = get_config_int("POST_EDIT_WARM_TIMEOUT", 60)
+
+OUTPUT_TAIL_LINES = 200
+_CONFIG_FILES = ("pyproject.toml", "setup.cfg", "pytest.ini", "tox.ini", "uv.lock")
+
+
+@dataclass(frozen=True, slots=True)
+class WarmResult:
+    """Outcome of one warm test run."""
+
+    returncode: int
+    output: str
+
+
+def warm_supported() -> bool:
+    """Return True when the platform supports the warm worker."""
+    return os.name == "posix" and hasattr(os, "fork")
+
+
+def socket_path(project_root: Path) -> Path:
+    """Return the server socket path for ``project_root``.
+
+    Lives in the temp dir (keyed by the project path) because Unix socket
+    paths are limited to ~100 bytes.
+    """
+    digest = hashlib.sha1(str(project_root.resolve()).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"synapse-pytest-{digest}.sock"
+
+
+def lock_path(project_root: Path) -> Path:
+    """Return the lock file held by the server for its whole lifetime."""
+    return socket_path(project_root).with_suffix(".lock")
+
+
+def _try_lock(path: Path) -> int | None:
+    """Take an exclusive lock on ``path``; None when another process holds it."""
+    fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def server_running(project_root: Path) -> bool:
+    """Return True while a server is warming up or serving (lock is held)."""
+    fd = _try_lock(lock_path(project_root))
+    if fd is None:
+        return True
+    os.close(fd)
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def run_warm(
+    project_root: Path,
+    args: list[str],
+    timeout: float = POST_EDIT_WARM_TIMEOUT,
+) -> WarmResult | None:
+    """Run pytest ``args`` in the warm worker.
+
+    Returns:
+        The result, or None when no usable server is running (the caller
+        should run pytest cold)
+    """
+    path = socket_path(project_root)
+    if not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout + 5)
+            conn.connect(str(path))
+            conn.sendall(json.dumps({"args": args}).encode() + b"\n")
+            response = json.loads(_read_line(conn) or "{}")
+    except (OSError, json.JSONDecodeError):
+        return None
+    if "returncode" not in response:
+        return None
+    return WarmResult(int(response["returncode"]), str(response.get("output", "")))
+
+
+def start_server(project_root: Path, python_cmd: list[str]) -> None:
+    """Start a detached warm server unless one is already alive or starting.
+
+    The server is usable once its socket appears.
+    """
+    if server_running(project_root):
+        return
+    log_path = get_cache_dir(project_root, "pytest_warm") / "server.log"
+    with open(log_path, "ab") as log:
+        _ = subprocess.Popen(
+            [*python_cmd, str(Path(__file__).resolve()), "serve", str(project_root)],
+            cwd=project_root,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+def _read_line(conn: socket.socket) -> str:
+    chunks: list[bytes] = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+def _config_fingerprint(project_root: Path) -> tuple[tuple[str, int], ...]:
+    paths = [project_root / name for name in _CONFIG_FILES]
+    paths.extend(project_root.glob("conftest.py"))
+    paths.extend((project_root / "tests").rglob("conftest.py"))
+    stamps: list[tuple[str, int]] = []
+    for path in sorted(paths):
+        with contextlib.suppress(OSError):
+            stamps.append((str(path), path.stat().st_mtime_ns))
+    return tuple(stamps)
+
+
+def _module_file(module: ModuleType) -> str | None:
+    path = getattr(module, "__file__", None)
+    return os.path.realpath(path) if isinstance(path, str) else None
+
+
+def _project_modules(project_root: Path) -> dict[str, str]:
+    """Return ``{module_name: source_path}`` for loaded project modules."""
+    root = os.path.realpath(project_root) + os.sep
+    found: dict[str, str] = {}
+    for name, module in list(sys.modules.items()):
+        path = _module_file(module)
+        if path and path.startswith(root) and "site-packages" not in path:
+            found[name] = path
+    return found
+
+
+def _source_stamps(modules: dict[str, str]) -> dict[str, int]:
+    stamps: dict[str, int] = {}
+    for name, path in modules.items():
+        try:
+            stamps[name] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamps[name] = -1
+    return stamps
+
+
+def evict_changed_modules(project_root: Path, warm_stamps: dict[str, int]) -> set[str]:
+    """Drop changed project modules, and project modules bound to them, from sys.modules.
+
+    A module is stale when its source mtime differs from warm-up. Project
+    modules holding a stale module or any object defined in one (``import x``
+    or ``from x import f``) are dropped too, repeatedly, so re-imports see the
+    new code everywhere. Third-party modules stay warm.
+
+    Returns:
+        Names of the evicted modules
+    """
+    modules = _project_modules(project_root)
+    current = _source_stamps(modules)
+    stale = {
+        name
+        for name, stamp in warm_stamps.items()
+        if name in modules and current.get(name) != stamp
+    }
+    changed = True
+    while changed:
+        changed = False
+        for name in modules:
+            if name in stale:
+                continue
+            module = sys.modules.get(name)
+            if module is None:
+                continue
+            for value in vars(module).values():
+                owner = (
+                    value.__name__
+                    if isinstance(value, ModuleType)
+                    else getattr(value, "__module__", None)
+                )
+                if owner in stale:
+                    stale.add(name)
+                    changed = True
+                    break
+    for name in stale:
+        _ = sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+    return stale
+
+
+def _run_child(
+    conn: socket.socket,
+    project_root: Path,
+    warm_stamps: dict[str, int],
+    args: list[str],
+) -> None:
+    """Child side of a request: reload, run pytest, send the result."""
+    import pytest
+
+    _ = evict_changed_modules(project_root, warm_stamps)
+    with tempfile.TemporaryFile() as out:
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        try:
+            returncode = int(pytest.main(args))
+        except SystemExit as e:  # sys.exit() outside a test; report, don't unwind
+            print(f"Warm worker: pytest exited with {e.code!r}")
+            returncode = e.code if isinstance(e.code, int) else 1
+        except KeyboardInterrupt:
+            print("Warm worker: interrupted")
+            returncode = 2  # pytest.ExitCode.INTERRUPTED
+        except Exception as e:  # report it, never leak into the parent
+            print(f"Warm worker error: {e!r}")
+            returncode = 3
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _ = out.seek(0)
+        lines = out.read().decode("utf-8", errors="replace").splitlines()
+    response = {
+        "returncode": returncode,
+        "output": "\n".join(lines[-OUTPUT_TAIL_LINES:]),
+    }
+    conn.sendall(json.dumps(response).encode() + b"\n")
+
+
+def parse_request(line: str) -> list[str] | None:
+    """Return the pytest args of a request line, or None when it is malformed.
+
+    A request is ``{"args": [str, ...]}``; anything else (bad JSON, a client
+    from another version) is answered with an error instead of crashing.
+    """
+    try:
+        request = json.loads(line or "{}")
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(request, dict):
+        return None
+    args = request.get("args")
+    if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+        return None
+    return args
+
+
+def _wait_child(pid: int, timeout: float) -> bool:
+    """Wait for a forked child; kill it after ``timeout``. Returns False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        done, _ = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return True
+        time.sleep(0.01)
+    with contextlib.suppress(ProcessLookupError):
+        os.kill(pid, signal.SIGKILL)
+    _ = os.waitpid(pid, 0)
+    return False
+
+
+def _preload(project_root: Path) -> None:
+    """Import pytest, conftest, test modules and their dependencies."""
+    import pytest
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _ = pytest.main(["--collect-only", "-q", "-p", "no:cacheprovider", "tests"])
+
+
+def _bind(path: Path) -> socket.socket | None:
+    """Bind the server socket, or return None when a live server owns it."""
+    if path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+        except OSError:
+            path.unlink(missing_ok=True)
+        else:
+            return None
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(4)
+    return server
+
+
+def serve(project_root: Path) -> int:
+    """Warm up and serve test requests until idle, stale or unlinked."""
+    lock_fd = _try_lock(lock_path(project_root))
+    if lock_fd is None:
+        print("Warm worker already running or starting")
+        return 0
+    try:
+        return _serve_locked(project_root)
+    finally:
+        os.close(lock_fd)
+
+
+def _serve_locked(project_root: Path) -> int:
+    os.chdir(project_root)
+    started = time.monotonic()
+    _preload(project_root)
+    warm_stamps = _source_stamps(_project_modules(project_root))
+    fingerprint = _config_fingerprint(project_root)
+
+    path = socket_path(project_root)
+    server = _bind(path)
+    if server is None:
+        print(f"Warm worker already running at {path}")
+        return 0
+    print(
+        f"Warm worker ready in {time.monotonic() - started:.1f}s "
+        + f"({len(warm_stamps)} project modules) at {path}",
+        flush=True,
+    )
+    server.settimeout(POST_EDIT_WARM_IDLE)
+    try:
+        while path.exists():
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                print("Warm worker idle; exiting", flush=True)
+                break
+            with conn:
+                conn.settimeout(None)
+                args = parse_request(_read_line(conn))
+                if args is None:
+                    conn.sendall(b'{"error": "malformed request"}\n')
+                    continue
+                if _config_fingerprint(project_root) != fingerprint:
+                    conn.sendall(b'{"stale": true}\n')
+                    print("Pytest configuration changed; exiting", flush=True)
+                    break
+                pid = os.fork()
+                if pid == 0:
+                    server.close()
+                    try:
+                        _run_child(conn, project_root, warm_stamps, args)
+                    finally:
+                        os._exit(0)
+                if not _wait_child(pid, POST_EDIT_WARM_TIMEOUT):
+                    msg = f"Warm worker: tests exceeded {POST_EDIT_WARM_TIMEOUT}s"
+                    response = {"returncode": 1, "output": msg}
+                    conn.sendall(json.dumps(response).encode() + b"\n")
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
+    return 0
+
+
+def main() -> int:
+    """Entry point: ``serve <project_root>``."""
+    if len(sys.argv) != 3 or sys.argv[1] != "serve":
+        print(__doc__)
+        return 2
+    if not warm_supported():
+        print("Warm worker requires fork and Unix sockets", file=sys.stderr)
+        return 1
+    return serve(Path(sys.argv[2]).resolve())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
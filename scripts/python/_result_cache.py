@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Per-gate, per-file result cache keyed by file content.
+
+A gate's result for a file is reused while the file's content digest and the
+gate's version string (script/config fingerprint) are unchanged, so saving a
+file without changing it, or re-running a gate over files it already checked,
+never re-analyses them. Stored as JSON under .cortex/.cache/gate_results.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _utils import get_cache_dir
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_cache_dir
+
+_FORMAT_VERSION = 1
+_MAX_OUTPUT_LINES = 40
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResult:
+    """A stored gate result for one file."""
+
+    ok: bool
+    output: str
+
+
+def file_digest(path: Path) -> str | None:
+    """Return the SHA-1 of ``path``'s content, or None when unreadable."""
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class ResultCache:
+    """JSON-backed cache of ``(gate, file) -> result`` keyed by content."""
+
+    def __init__(self, project_root: Path):
+        """Load the cache for ``project_root`` (empty when missing or corrupt)."""
+        self.project_root = project_root
+        self.path = get_cache_dir(project_root, "gate_results") / "results.json"
+        self._entries: dict[str, list[object]] = {}
+        self._digests: dict[Path, tuple[int, int, str | None]] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == _FORMAT_VERSION:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self._entries = entries
+
+    def _key(self, gate: str, path: Path) -> str:
+        try:
+            rel = path.resolve().relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            rel = str(path)
+        return f"{gate}\0{rel}"
+
+    def digest(self, path: Path) -> str | None:
+        """Content digest of ``path``, re-hashed only when mtime/size change."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        memo = self._digests.get(path)
+        if memo is not None and memo[:2] == (st.st_mtime_ns, st.st_size):
+            return memo[2]
+        value = file_digest(path)
+        self._digests[path] = (st.st_mtime_ns, st.st_size, value)
+        return value
+
+    def lookup(self, gate: str, version: str, path: Path) -> CachedResult | None:
+        """Return the cached result when content and gate version match."""
+        entry = self._entries.get(self._key(gate, path))
+        if entry is None or len(entry) != 4:
+            return None
+        cached_version, cached_digest, ok, output = entry
+        if cached_version != version or cached_digest != self.digest(path):
+            return None
+        return CachedResult(bool(ok), str(output))
+
+    def store(
+        self, gate: str, version: str, path: Path, ok: bool, output: str = ""
+    ) -> None:
+        """Record a result for the file's current content."""
+        digest = self.digest(path)
+        if digest is None:
+            return
+        tail = "\n".join(output.splitlines()[-_MAX_OUTPUT_LINES:])
+        self._entries[self._key(gate, path)] = [version, digest, ok, tail]
+        self._dirty = True
+
+    def forget(self, path: Path) -> None:
+        """Drop every gate's entry for ``path`` (e.g. after deletion)."""
+        suffix = self._key("", path)
+        stale = [key for key in self._entries if key.endswith(suffix)]
+        for key in stale:
+            del self._entries[key]
+        self._dirty = self._dirty or bool(stale)
+
+    def save(self) -> None:
+        """Write the cache atomically when it changed."""
+        if not self._dirty:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        payload = {"version": _FORMAT_VERSION, "entries": self._entries}
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
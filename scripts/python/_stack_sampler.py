@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Signal-based stack sampler producing collapsed stacks for flamegraphs.
+
+A POSIX interval timer interrupts the process every ``interval_s`` of CPU
+time (``clock="cpu"``, SIGPROF) or wall time (``clock="wall"``, SIGALRM) and
+the handler records the main thread's Python stack. Counts are emitted in
+Brendan Gregg's collapsed format (``root;caller;leaf count``), which
+flamegraph.pl, speedscope and inferno read directly.
+
+Sampling costs one stack walk per tick and nothing between ticks, so unlike
+cProfile it does not inflate call-heavy code. Only the thread that installed
+the handler (the main thread) is sampled. Unavailable on Windows.
+
+Frames are labelled ``module:qualname:line``; ``path_labeler(root)`` swaps
+in the root-relative path for project files so samples can be attributed
+to source files.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from types import CodeType, FrameType
+
+Handler = Callable[[int, FrameType | None], object] | int | None
+Labeler = Callable[[FrameType], str]
+
+_CLOCKS = {
+    "cpu": ("ITIMER_PROF", "SIGPROF"),
+    "wall": ("ITIMER_REAL", "SIGALRM"),
+}
+
+
+def sampling_available() -> bool:
+    """Whether interval-timer sampling works on this platform."""
+    return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+
+_labels: dict[CodeType, str] = {}
+
+
+def frame_label(frame: FrameType) -> str:
+    """``module:qualname:line`` label of a frame's function (cached per code)."""
+    code = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        module = Path(code.co_filename).stem
+        label = f"{module}:{name}:{code.co_firstlineno}".replace(";", ",")
+        _labels[code] = label
+    return label
+
+
+def path_labeler(root: Path) -> Labeler:
+    """Labeller using ``relative/path.py:qualname:line`` for files under ``root``.
+
+    Frames elsewhere, including an in-tree virtualenv's site-packages, keep
+    the short ``frame_label``.
+    """
+    prefix = str(root.resolve()) + os.sep
+    labels: dict[CodeType, str] = {}
+
+    def label(frame: FrameType) -> str:
+        code = frame.f_code
+        cached = labels.get(code)
+        if cached is None:
+            filename = code.co_filename
+            if filename.startswith(prefix) and "site-packages" not in filename:
+                name = getattr(code, "co_qualname", code.co_name)
+                relative = Path(filename[len(prefix) :]).as_posix()
+                cached = f"{relative}:{name}:{code.co_firstlineno}".replace(";", ",")
+            else:
+                cached = frame_label(frame)
+            labels[code] = cached
+        return cached
+
+    return label
+
+
+def collapse(
+    frame: FrameType | None, skip: int = 0, label: Labeler = frame_label
+) -> str:
+    """Root-first ``;``-joined stack of ``frame``, without its ``skip`` leaves."""
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels[skip:]))
+
+
+class StackSampler:
+    """Collect stack samples of the main thread between start() and stop()."""
+
+    def __init__(
+        self,
+        interval_s: float = 0.001,
+        clock: str = "cpu",
+        label: Labeler = frame_label,
+    ) -> None:
+        if clock not in _CLOCKS:
+            raise ValueError(f"clock must be one of {sorted(_CLOCKS)}")
+        self.interval_s: float = interval_s
+        self.label: Labeler = label
+        self.counts: Counter[str] = Counter()
+        timer, sig = _CLOCKS[clock]
+        self._timer: int = getattr(signal, timer, 0)
+        self._signal: int = getattr(signal, sig, 0)
+        self._previous: Handler = signal.SIG_DFL
+        self._running: bool = False
+        self._sampling: bool = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the timer is armed."""
+        return self._running
+
+    @property
+    def samples(self) -> int:
+        """Number of samples taken."""
+        return sum(self.counts.values())
+
+    def _sample(self, _signum: int, frame: FrameType | None) -> None:
+        # A tick can land while a slow handler is still running; drop it
+        # rather than nest (nested handlers recurse until RecursionError)
+        if frame is None or self._sampling:
+            return
+        self._sampling = True
+        try:
+            self.counts[collapse(frame, label=self.label)] += 1
+        finally:
+            self._sampling = False
+
+    def start(self) -> None:
+        """Install the handler and arm the timer."""
+        if not sampling_available():
+            print(
+                "⚠️  Stack sampling is not supported on this platform", file=sys.stderr
+            )
+            return
+        self._previous = signal.signal(self._signal, self._sample)
+        _ = signal.setitimer(self._timer, self.interval_s, self.interval_s)
+        self._running = True
+
+    def stop(self) -> None:
+        """Disarm the timer and restore the previous handler."""
+        if not self._running:
+            return
+        _ = signal.setitimer(self._timer, 0, 0)
+        _ = signal.signal(self._signal, self._previous)
+        self._running = False
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest stacks first."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+    def write(self, path: Path) -> Path:
+        """Write collapsed stacks to ``path``."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _ = path.write_text(self.collapsed(), encoding="utf-8")
+        return path
+
+
+def self_counts(counts: Counter[str]) -> Counter[str]:
+    """Samples per leaf function (where the time was actually spent)."""
+    leaves: Counter[str] = Counter()
+    for stack, n in counts.items():
+        leaves[stack.rsplit(";", 1)[-1]] += n
+    return leaves
+
+
+def total_counts(counts: Counter[str]) -> Counter[str]:
+    """Samples per function anywhere on the stack (inclusive time)."""
+    totals: Counter[str] = Counter()
+    for stack, n in counts.items():
+        for label in set(stack.split(";")):
+            totals[label] += n
+    return totals
+
+
+def parse_collapsed(text: str) -> Counter[str]:
+    """Read collapsed-stack lines (``stack count``) back into counts."""
+    counts: Counter[str] = Counter()
+    for line in text.splitlines():
+        stack, _, n = line.rpartition(" ")
+        if stack and n.isdigit():
+            counts[stack] += int(n)
+    return counts
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Per-test call-duration regression gate and wall-clock summary.
+
+The ``_pytest_history`` plugin stores every test's setup/call/teardown time
+per run (see _test_history.py). After a passing run, run_tests.py compares
+each test's call time with the median of its previous runs and fails the
+tests that exceed
+
+    median × TEST_DURATION_FACTOR + TEST_DURATION_SLACK_MS
+
+The absolute slack keeps millisecond tests from failing on scheduler noise;
+tests with fewer than TEST_DURATION_MIN_RUNS earlier runs are not judged.
+Because the median rolls, a deliberate slowdown stops failing once it makes
+up half of the window (TEST_HISTORY_WINDOW runs).
+
+Known-noisy tests are listed in an allowlist file, one node-id glob pattern
+per line (``#`` starts a comment); a pattern matching a test's node id
+without its parametrization (``[...]``) covers every parametrization.
+
+Configuration:
+    TEST_DURATION_FACTOR: Allowed multiple of the median call time;
+        0 disables the gate (default: 3)
+    TEST_DURATION_SLACK_MS: Absolute slack added to the limit (default: 250)
+    TEST_DURATION_MIN_RUNS: Earlier runs needed before a test is judged
+        (default: 3)
+    TEST_DURATION_TOP: Wall-clock contributors listed (default: 10)
+    TEST_DURATION_ALLOWLIST: Allowlist file (default:
+        <tests dir>/duration_allowlist.txt)
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+try:
+    from _test_history import TestResult
+    from _utils import get_config_int, get_config_path
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _test_history import TestResult
+    from _utils import get_config_int, get_config_path
+
+TEST_DURATION_FACTOR = get_config_int("TEST_DURATION_FACTOR", 3)
+TEST_DURATION_SLACK_MS = get_config_int("TEST_DURATION_SLACK_MS", 250)
+TEST_DURATION_MIN_RUNS = get_config_int("TEST_DURATION_MIN_RUNS", 3)
+TEST_DURATION_TOP = get_config_int("TEST_DURATION_TOP", 10)
+
+ALLOWLIST_FILE = "duration_allowlist.txt"
+_TREND_POINTS = 5
+
+
+@dataclass(frozen=True, slots=True)
+class DurationRegression:
+    """A test whose call time exceeded its rolling-median limit."""
+
+    nodeid: str
+    call_s: float
+    median_s: float
+    limit_s: float
+
+
+def allowlist_path(project_root: Path, tests_dir: Path) -> Path:
+    """Return the configured allowlist file (default: next to the tests)."""
+    configured = get_config_path("TEST_DURATION_ALLOWLIST")
+    if configured is None:
+        return tests_dir / ALLOWLIST_FILE
+    return configured if configured.is_absolute() else project_root / configured
+
+
+def load_allowlist(path: Path) -> list[str]:
+    """Read node-id patterns; a missing file allows nothing."""
+    if not path.exists():
+        return []
+    patterns: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        pattern = line.split("#", 1)[0].strip()
+        if pattern:
+            patterns.append(pattern)
+    return patterns
+
+
+def is_allowlisted(nodeid: str, patterns: list[str]) -> bool:
+    """Whether ``nodeid`` (or its unparametrized id) matches a pattern."""
+    base = nodeid.split("[", 1)[0]
+    return any(fnmatchcase(nodeid, p) or fnmatchcase(base, p) for p in patterns)
+
+
+def find_duration_regressions(
+    latest: dict[str, TestResult],
+    previous: dict[str, list[TestResult]],
+    allowlist: list[str],
+    factor: float = TEST_DURATION_FACTOR,
+    slack_s: float = TEST_DURATION_SLACK_MS / 1000,
+    min_runs: int = TEST_DURATION_MIN_RUNS,
+) -> list[DurationRegression]:
+    """Tests whose latest call time exceeds ``median × factor + slack``.
+
+    Returns:
+        Regressions, the furthest over their limit first
+    """
+    regressions: list[DurationRegression] = []
+    for nodeid, result in latest.items():
+        history = previous.get(nodeid, [])
+        if len(history) < min_runs or is_allowlisted(nodeid, allowlist):
+            continue
+        median_s = statistics.median(r.call_s for r in history)
+        limit_s = median_s * factor + slack_s
+        if result.call_s > limit_s:
+            regressions.append(
+                DurationRegression(nodeid, result.call_s, median_s, limit_s)
+            )
+    regressions.sort(key=lambda r: -(r.call_s / r.limit_s))
+    return regressions
+
+
+def _trend(values: list[float]) -> str:
+    """Oldest-to-newest durations, e.g. ``0.10 → 0.12 → 0.95``."""
+    return " → ".join(f"{v:.2f}" for v in values)
+
+
+def print_duration_summary(
+    latest: dict[str, TestResult],
+    previous: dict[str, list[TestResult]],
+    top: int = TEST_DURATION_TOP,
+) -> None:
+    """Print the biggest wall-clock contributors with their recent trend."""
+    if not latest:
+        return
+    total_s = sum(r.total_s for r in latest.values())
+    heaviest = sorted(latest.items(), key=lambda item: -item[1].total_s)[:top]
+    print(f"\n⏱️  Wall-clock contributors ({len(latest)} tests, {total_s:.1f}s total):")
+    for nodeid, result in heaviest:
+        share = result.total_s / total_s * 100 if total_s else 0.0
+        history = [r.total_s for r in previous.get(nodeid, [])]
+        change = ""
+        if history:
+            median_s = statistics.median(history)
+            if median_s > 0:
+                change = f"  {(result.total_s / median_s - 1) * 100:+.0f}% vs median"
+        points = [*reversed(history[: _TREND_POINTS - 1]), result.total_s]
+        print(
+            f"  {result.total_s:7.2f}s {share:5.1f}%{change}  {nodeid}\n"
+            + f"           trend: {_trend(points)}"
+        )
+
+
+def print_duration_regressions(
+    regressions: list[DurationRegression], allowlist: Path
+) -> None:
+    """Print one line per test that exceeded its duration limit."""
+    print(
+        f"\n🔴 Test duration regressions (> median × {TEST_DURATION_FACTOR} "
+        + f"+ {TEST_DURATION_SLACK_MS} ms):",
+        file=sys.stderr,
+    )
+    for r in regressions:
+        print(
+            f"  {r.nodeid}: {r.call_s:.3f}s (median {r.median_s:.3f}s, "
+            + f"limit {r.limit_s:.3f}s)",
+            file=sys.stderr,
+        )
+    print(f"  Allowlist known-noisy tests in {allowlist}", file=sys.stderr)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Per-test hang watchdog dumps and their report.
+
+The ``_pytest_hangs`` plugin writes the running test's node id to a per-worker
+dump file and arms ``faulthandler.dump_traceback_later(exit=True)`` around
+each test. A test that outlives its budget gets every thread's stack appended
+to that file and its worker exits; pytest-xdist reports the crashed test,
+replaces the worker and carries on. A worker that finishes cleanly deletes
+its file, so any file left behind describes a hang.
+
+Configuration:
+    TEST_HANG_TIMEOUT: Per-test budget in seconds (setup + call + teardown);
+        0 disables the watchdog (default: 0)
+"""
+
+from __future__ import annotations
+
+import re
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _utils import get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_cache_dir, get_config_int
+
+TEST_HANG_TIMEOUT = get_config_int("TEST_HANG_TIMEOUT", 0)
+
+_THREAD_RE = re.compile(r"^(?:Current thread|Thread) 0x[0-9a-f]+")
+_FRAME_RE = re.compile(
+    r'^\s+File "(?P<file>[^"]+)", line (?P<line>\d+) in (?P<func>.+)$'
+)
+
+
+@dataclass(frozen=True, slots=True)
+class HangReport:
+    """One hung test and where it was blocked."""
+
+    worker: str
+    nodeid: str
+    blocking_frame: str
+    test_frame: str
+    dump_path: Path
+
+
+def hang_dump_dir(project_root: Path) -> Path:
+    """Return the dump directory for the current run (not created)."""
+    return get_cache_dir(project_root, "test_hangs", create=False)
+
+
+def reset_hang_dump_dir(project_root: Path) -> Path:
+    """Empty the dump directory so only this run's hangs are reported."""
+    dump_dir = hang_dump_dir(project_root)
+    shutil.rmtree(dump_dir, ignore_errors=True)
+    dump_dir.mkdir(parents=True, exist_ok=True)
+    return dump_dir
+
+
+def _thread_stacks(dump: str) -> list[list[str]]:
+    stacks: list[list[str]] = []
+    for line in dump.splitlines():
+        if _THREAD_RE.match(line):
+            stacks.append([])
+        elif stacks and _FRAME_RE.match(line):
+            stacks[-1].append(line.strip())
+    return stacks
+
+
+def parse_hang_dump(worker: str, text: str, dump_path: Path) -> HangReport | None:
+    """Parse a dump file: node id on the first line, then faulthandler output.
+
+    The blocking frame is the innermost frame of the thread running the test
+    (the one whose stack passes through the test's file); the test frame is
+    the test function's own frame (or the innermost frame in the test file).
+
+    Returns:
+        The report, or None when the file holds no stack dump
+    """
+    nodeid, _, dump = text.partition("\n")
+    stacks = [stack for stack in _thread_stacks(dump) if stack]
+    if not nodeid.strip() or not stacks:
+        return None
+    test_file = nodeid.split("::", 1)[0]
+    test_func = nodeid.rsplit("::", 1)[-1].split("[", 1)[0]
+    chosen = stacks[-1]
+    test_frame = ""
+    for stack in stacks:
+        in_test = [frame for frame in stack if f'{test_file}"' in frame]
+        if in_test:
+            chosen = stack
+            in_func = [frame for frame in in_test if frame.endswith(f" in {test_func}")]
+            test_frame = (in_func or in_test)[0]
+            break
+    return HangReport(
+        worker=worker,
+        nodeid=nodeid.strip(),
+        blocking_frame=chosen[0],
+        test_frame=test_frame,
+        dump_path=dump_path,
+    )
+
+
+def collect_hang_reports(dump_dir: Path) -> list[HangReport]:
+    """Return reports for every dump file left behind by a hung worker."""
+    reports: list[HangReport] = []
+    if not dump_dir.is_dir():
+        return reports
+    for dump_path in sorted(dump_dir.glob("*.txt")):
+        try:
+            text = dump_path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        worker = dump_path.stem.rsplit("-", 1)[0]
+        report = parse_hang_dump(worker, text, dump_path)
+        if report is not None:
+            reports.append(report)
+    return reports
+
+
+def running_tests(dump_dir: Path) -> list[str]:
+    """Return the tests workers were running when the suite was killed.
+
+    Workers killed from outside (e.g. by the whole-run TEST_TIMEOUT) leave
+    their dump file behind with only the current test's node id in it.
+    """
+    running: list[str] = []
+    if not dump_dir.is_dir():
+        return running
+    for dump_path in sorted(dump_dir.glob("*.txt")):
+        try:
+            nodeid = dump_path.read_text(encoding="utf-8").partition("\n")[0]
+        except (OSError, UnicodeDecodeError):
+            continue
+        if nodeid.strip():
+            running.append(nodeid.strip())
+    return running
+
+
+def print_hang_reports(reports: list[HangReport], budget: int) -> None:
+    """Print one entry per hung test."""
+    print(f"\n🔴 Hung tests (exceeded {budget}s per-test budget):", file=sys.stderr)
+    for report in reports:
+        print(f"  [{report.worker}] {report.nodeid}", file=sys.stderr)
+        print(f"      blocked at: {report.blocking_frame}", file=sys.stderr)
+        if report.test_frame and report.test_frame != report.blocking_frame:
+            print(f"      from test:  {report.test_frame}", file=sys.stderr)
+        print(f"      all stacks: {report.dump_path}", file=sys.stderr)
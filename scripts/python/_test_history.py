@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""Per-test duration and outcome history for Python test runs.
+
+Written by the ``_pytest_history`` plugin at the end of every run_tests.py
+session and read back to order the next run: previously failed tests first,
+then longest first, grouped by module so ``--dist loadscope`` hands the
+heaviest modules out first and xdist workers finish together.
+
+Each run also stores the setup time of the project's own fixtures and the
+collection time of each test module (read by analyze_test_slowness.py).
+Every process, xdist workers included, adds those under PENDING_RUN_ID;
+``record_run`` on the controller then claims them for the new run.
+
+Runs under tracemalloc or the stack sampler (run_tests.py --memory /
+--profile) are flagged ``instrumented``: their outcomes still count, but
+their much slower timings are left out of every duration query so they do
+not skew the ordering, the rolling medians or the duration gate.
+
+Configuration:
+    TEST_HISTORY_RUNS: Number of recent runs kept (default: 20)
+    TEST_HISTORY_WINDOW: Recent runs used for the median duration (default: 5)
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import sys
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _utils import get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_cache_dir, get_config_int
+
+TEST_HISTORY_RUNS = get_config_int("TEST_HISTORY_RUNS", 20)
+TEST_HISTORY_WINDOW = get_config_int("TEST_HISTORY_WINDOW", 5)
+
+OUTCOME_PASSED = "passed"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY,
+    started_at REAL,
+    duration_s REAL,
+    exit_status INTEGER,
+    full_run INTEGER,
+    instrumented INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS result (
+    run_id INTEGER REFERENCES run (id),
+    nodeid TEXT,
+    outcome TEXT,
+    setup_s REAL,
+    call_s REAL,
+    teardown_s REAL,
+    PRIMARY KEY (run_id, nodeid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS result_by_nodeid ON result (nodeid, run_id);
+CREATE TABLE IF NOT EXISTS fixture (
+    run_id INTEGER,
+    location TEXT,
+    name TEXT,
+    scope TEXT,
+    setups INTEGER,
+    modules INTEGER,
+    setup_s REAL,
+    PRIMARY KEY (run_id, location, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS collect (
+    run_id INTEGER,
+    module TEXT,
+    collect_s REAL,
+    PRIMARY KEY (run_id, module)
+) WITHOUT ROWID;
+"""
+
+# Run id of fixture/collection rows written before their run is recorded
+PENDING_RUN_ID = 0
+
+# Results whose timings are trustworthy (not from an instrumented run)
+_TIMED_RESULT = (
+    "outcome != ? AND run_id NOT IN (SELECT id FROM run WHERE instrumented = 1)"
+)
+
+
+@dataclass(slots=True)
+class TestResult:
+    """Phase durations and overall outcome of one test in one run."""
+
+    __test__ = False  # not a pytest test class
+
+    outcome: str = OUTCOME_PASSED
+    setup_s: float = 0.0
+    call_s: float = 0.0
+    teardown_s: float = 0.0
+
+    @property
+    def total_s(self) -> float:
+        """Setup + call + teardown time."""
+        return self.setup_s + self.call_s + self.teardown_s
+
+
+@dataclass(slots=True)
+class FixtureTiming:
+    """Setup cost of one fixture over one run."""
+
+    scope: str
+    setups: int = 0
+    modules: int = 0
+    setup_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        """Average time of one setup."""
+        return self.setup_s / self.setups if self.setups else 0.0
+
+
+# (definition "path:line", fixture name)
+FixtureKey = tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class TestStats:
+    """Recent history of one test."""
+
+    __test__ = False  # not a pytest test class
+
+    median_s: float
+    last_outcome: str
+    runs: int
+
+
+def history_db_path(project_root: Path) -> Path:
+    """Return the history database path under .cortex/.cache."""
+    return get_cache_dir(project_root, "test_history", create=False) / "history.db"
+
+
+class HistoryStore:
+    """SQLite store of recent per-test results."""
+
+    def __init__(self, db_path: Path):
+        """Open (creating if needed) the history database."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        _ = self.conn.executescript(_SCHEMA)
+        columns = {str(row[1]) for row in self.conn.execute("PRAGMA table_info(run)")}
+        if "instrumented" not in columns:  # Stores written before the flag
+            _ = self.conn.execute(
+                "ALTER TABLE run ADD COLUMN instrumented INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def record_run(
+        self,
+        results: dict[str, TestResult],
+        started_at: float,
+        exit_status: int,
+        full_run: bool,
+        instrumented: bool = False,
+    ) -> int:
+        """Store one session's results and prune old runs.
+
+        Args:
+            results: Per-test results of the session
+            started_at: Session start (epoch seconds)
+            exit_status: pytest exit status
+            full_run: The whole suite ran
+            instrumented: Timings were taken under tracemalloc or the stack
+                sampler and are excluded from duration queries
+
+        Returns:
+            The new run id
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO run "
+            + "(started_at, duration_s, exit_status, full_run, instrumented) "
+            + "VALUES (?, ?, ?, ?, ?)",
+            (
+                started_at,
+                time.time() - started_at,
+                exit_status,
+                int(full_run),
+                int(instrumented),
+            ),
+        )
+        run_id = int(cursor.lastrowid or 0)
+        for table in ("fixture", "collect"):
+            _ = self.conn.execute(
+                f"UPDATE {table} SET run_id = ? WHERE run_id = ?",
+                (run_id, PENDING_RUN_ID),
+            )
+        _ = self.conn.executemany(
+            "INSERT OR REPLACE INTO result "
+            + "(run_id, nodeid, outcome, setup_s, call_s, teardown_s) "
+            + "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, nodeid, r.outcome, r.setup_s, r.call_s, r.teardown_s)
+                for nodeid, r in results.items()
+            ],
+        )
+        self.prune(TEST_HISTORY_RUNS)
+        self.conn.commit()
+        return run_id
+
+    def prune(self, keep_runs: int) -> None:
+        """Delete all but the most recent ``keep_runs`` runs."""
+        stale = [
+            (int(row[0]),)
+            for row in self.conn.execute(
+                "SELECT id FROM run ORDER BY id DESC LIMIT -1 OFFSET ?", (keep_runs,)
+            )
+        ]
+        for table in ("result", "fixture", "collect"):
+            _ = self.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", stale)
+        _ = self.conn.executemany("DELETE FROM run WHERE id = ?", stale)
+
+    def add_pending(
+        self, fixtures: dict[FixtureKey, FixtureTiming], collection: dict[str, float]
+    ) -> None:
+        """Add one process's fixture and collection timings to the pending run.
+
+        Fixture setups add up across xdist workers; each worker collects every
+        module, so collection keeps the slowest worker's time.
+        """
+        with self.conn:
+            _ = self.conn.executemany(
+                "INSERT INTO fixture "
+                + "(run_id, location, name, scope, setups, modules, setup_s) "
+                + "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                + "ON CONFLICT (run_id, location, name) DO UPDATE SET "
+                + "setups = setups + excluded.setups, "
+                + "modules = modules + excluded.modules, "
+                + "setup_s = setup_s + excluded.setup_s",
+                [
+                    (PENDING_RUN_ID, loc, name, t.scope, t.setups, t.modules, t.setup_s)
+                    for (loc, name), t in fixtures.items()
+                ],
+            )
+            _ = self.conn.executemany(
+                "INSERT INTO collect (run_id, module, collect_s) VALUES (?, ?, ?) "
+                + "ON CONFLICT (run_id, module) DO UPDATE SET "
+                + "collect_s = max(collect_s, excluded.collect_s)",
+                [(PENDING_RUN_ID, module, s) for module, s in collection.items()],
+            )
+
+    def discard_pending(self) -> None:
+        """Drop pending rows left behind by an interrupted run."""
+        with self.conn:
+            for table in ("fixture", "collect"):
+                _ = self.conn.execute(
+                    f"DELETE FROM {table} WHERE run_id = ?", (PENDING_RUN_ID,)
+                )
+
+    def _latest_run_with(self, table: str) -> int | None:
+        row = self.conn.execute(
+            f"SELECT max(run_id) FROM {table} WHERE run_id != ? AND run_id IN "
+            + "(SELECT id FROM run WHERE instrumented = 0)",
+            (PENDING_RUN_ID,),
+        ).fetchone()
+        return None if row is None or row[0] is None else int(row[0])
+
+    def latest_fixtures(self) -> dict[FixtureKey, FixtureTiming]:
+        """Fixture setup timings of the most recent run that recorded them."""
+        run_id = self._latest_run_with("fixture")
+        return {
+            (str(location), str(name)): FixtureTiming(
+                str(scope), int(setups), int(modules), float(setup_s)
+            )
+            for location, name, scope, setups, modules, setup_s in self.conn.execute(
+                "SELECT location, name, scope, setups, modules, setup_s "
+                + "FROM fixture WHERE run_id = ?",
+                (run_id,),
+            )
+        }
+
+    def latest_collection(self) -> dict[str, float]:
+        """Per-module collection time of the most recent run that recorded it."""
+        run_id = self._latest_run_with("collect")
+        return {
+            str(module): float(collect_s)
+            for module, collect_s in self.conn.execute(
+                "SELECT module, collect_s FROM collect WHERE run_id = ?", (run_id,)
+            )
+        }
+
+    def phase_medians(self, window: int = TEST_HISTORY_WINDOW) -> dict[str, TestResult]:
+        """Median setup/call/teardown time of each test over its last ``window`` runs."""
+        phases: dict[str, list[tuple[float, float, float]]] = {}
+        for nodeid, setup_s, call_s, teardown_s in self.conn.execute(
+            "SELECT nodeid, setup_s, call_s, teardown_s FROM result "
+            + f"WHERE {_TIMED_RESULT} ORDER BY nodeid, run_id DESC",
+            (OUTCOME_SKIPPED,),
+        ):
+            values = phases.setdefault(str(nodeid), [])
+            if len(values) < window:
+                values.append((float(setup_s), float(call_s), float(teardown_s)))
+        return {
+            nodeid: TestResult(
+                setup_s=statistics.median(v[0] for v in values),
+                call_s=statistics.median(v[1] for v in values),
+                teardown_s=statistics.median(v[2] for v in values),
+            )
+            for nodeid, values in phases.items()
+        }
+
+    def durations(self, window: int = TEST_HISTORY_WINDOW) -> dict[str, list[float]]:
+        """Return each test's total durations over its last ``window`` runs.
+
+        Durations are newest first; skipped results and instrumented runs
+        are ignored.
+        """
+        series: dict[str, list[float]] = {}
+        for nodeid, total in self.conn.execute(
+            "SELECT nodeid, setup_s + call_s + teardown_s FROM result "
+            + f"WHERE {_TIMED_RESULT} ORDER BY nodeid, run_id DESC",
+            (OUTCOME_SKIPPED,),
+        ):
+            values = series.setdefault(str(nodeid), [])
+            if len(values) < window:
+                values.append(float(total))
+        return series
+
+    def latest_and_previous(
+        self, window: int = TEST_HISTORY_WINDOW
+    ) -> tuple[dict[str, TestResult], dict[str, list[TestResult]]]:
+        """Results of the most recent run, and each test's ``window`` runs before it.
+
+        Earlier results are newest first; skipped results and instrumented
+        runs are ignored.
+        """
+        row = self.conn.execute(
+            "SELECT max(id) FROM run WHERE instrumented = 0"
+        ).fetchone()
+        if row is None or row[0] is None:
+            return {}, {}
+        latest_id = int(row[0])
+        latest: dict[str, TestResult] = {}
+        previous: dict[str, list[TestResult]] = {}
+        for run_id, nodeid, outcome, setup_s, call_s, teardown_s in self.conn.execute(
+            "SELECT run_id, nodeid, outcome, setup_s, call_s, teardown_s FROM result "
+            + f"WHERE {_TIMED_RESULT} ORDER BY nodeid, run_id DESC",
+            (OUTCOME_SKIPPED,),
+        ):
+            result = TestResult(
+                str(outcome), float(setup_s), float(call_s), float(teardown_s)
+            )
+            if run_id == latest_id:
+                latest[str(nodeid)] = result
+                continue
+            values = previous.setdefault(str(nodeid), [])
+            if len(values) < window:
+                values.append(result)
+        return latest, previous
+
+    def stats(self, window: int = TEST_HISTORY_WINDOW) -> dict[str, TestStats]:
+        """Return median recent duration and last outcome per test."""
+        last_outcome: dict[str, str] = {}
+        runs: dict[str, int] = {}
+        for nodeid, outcome in self.conn.execute(
+            "SELECT nodeid, outcome FROM result ORDER BY nodeid, run_id DESC"
+        ):
+            key = str(nodeid)
+            if key not in last_outcome:
+                last_outcome[key] = str(outcome)
+            runs[key] = runs.get(key, 0) + 1
+        series = self.durations(window)
+        return {
+            nodeid: TestStats(
+                median_s=(
+                    statistics.median(series[nodeid]) if series.get(nodeid) else 0.0
+                ),
+                last_outcome=outcome,
+                runs=runs[nodeid],
+            )
+            for nodeid, outcome in last_outcome.items()
+        }
+
+
+def _module_of(nodeid: str) -> str:
+    return nodeid.split("::", 1)[0]
+
+
+def order_nodeids(nodeids: Sequence[str], stats: dict[str, TestStats]) -> list[int]:
+    """Return indexes of ``nodeids`` in run order.
+
+    Modules containing a previously failed test come first, then modules by
+    total measured duration (longest first). Within a module, failed tests
+    come first, then longest first. Tests without history are estimated at
+    the mean known duration. Ties keep collection order.
+    """
+    known = [s.median_s for s in stats.values() if s.runs]
+    default_s = sum(known) / len(known) if known else 0.0
+
+    def test_key(index: int) -> tuple[int, float]:
+        found = stats.get(nodeids[index])
+        if found is None:
+            return (1, -default_s)
+        return (0 if found.last_outcome == OUTCOME_FAILED else 1, -found.median_s)
+
+    modules: dict[str, list[int]] = {}
+    for index, nodeid in enumerate(nodeids):
+        modules.setdefault(_module_of(nodeid), []).append(index)
+
+    def module_key(indexes: list[int]) -> tuple[int, float]:
+        keys = [test_key(i) for i in indexes]
+        return (min(k[0] for k in keys), sum(k[1] for k in keys))
+
+    ordered: list[int] = []
+    for indexes in sorted(modules.values(), key=module_key):
+        ordered.extend(sorted(indexes, key=test_key))
+    return ordered
+
+
+def load_stats(db_path: Path) -> dict[str, TestStats]:
+    """Read test stats, returning an empty mapping when no history exists."""
+    if not db_path.exists():
+        return {}
+    store = HistoryStore(db_path)
+    try:
+        return store.stats()
+    except sqlite3.Error:
+        return {}
+    finally:
+        store.close()
+
+
+def merge_phase(
+    results: dict[str, TestResult],
+    nodeid: str,
+    when: str,
+    outcome: str,
+    duration: float,
+) -> None:
+    """Fold one pytest phase report into ``results``."""
+    result = results.setdefault(nodeid, TestResult())
+    if when == "setup":
+        result.setup_s = duration
+    elif when == "call":
+        result.call_s = duration
+    elif when == "teardown":
+        result.teardown_s = duration
+    if outcome == OUTCOME_FAILED:
+        result.outcome = OUTCOME_FAILED
+    elif outcome == OUTCOME_SKIPPED and result.outcome != OUTCOME_FAILED:
+        result.outcome = OUTCOME_SKIPPED
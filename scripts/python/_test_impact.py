@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""Test impact database: which tests execute which blocks of source code.
+
+Built from `.coverage` data recorded with `--cov-context=test`. Each source
+file is split into blocks (one per function or method, plus a ``<module>``
+block for everything else) with a checksum that ignores blank lines and
+comments. Each test is linked to every block that contains a line it
+executed.
+
+Selection re-splits only files whose content changed since they were
+recorded. A test is affected when a block it touches changed or
+disappeared. A ``<module>`` change affects every test touching the file.
+Edited or new test files are selected whole.
+
+Selection returns ``None`` (run everything) when the database is missing,
+older than TEST_IMPACT_MAX_AGE_DAYS, or built under a different conftest.py /
+pytest configuration / dependency lock.
+
+Configuration:
+    TEST_IMPACT_MAX_AGE_DAYS: Mapping age that forces a full run (default: 7)
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import sqlite3
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _coverage_data import iter_context_lines, open_coverage_db
+    from _utils import get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _coverage_data import iter_context_lines, open_coverage_db
+    from _utils import get_cache_dir, get_config_int
+
+TEST_IMPACT_MAX_AGE_DAYS = get_config_int("TEST_IMPACT_MAX_AGE_DAYS", 7)
+
+MODULE_BLOCK = "<module>"
+SCHEMA_VERSION = "1"
+CONFIG_FILES = (
+    "pyproject.toml",
+    "setup.cfg",
+    "setup.py",
+    "pytest.ini",
+    "tox.ini",
+    ".coveragerc",
+    "requirements.txt",
+    "requirements-dev.txt",
+    "uv.lock",
+    "poetry.lock",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS file (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha1 TEXT
+);
+CREATE TABLE IF NOT EXISTS block (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER REFERENCES file (id),
+    name TEXT,
+    start INTEGER,
+    end INTEGER,
+    checksum TEXT,
+    UNIQUE (file_id, name)
+);
+CREATE TABLE IF NOT EXISTS test (id INTEGER PRIMARY KEY, nodeid TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS test_block (
+    test_id INTEGER,
+    block_id INTEGER,
+    PRIMARY KEY (test_id, block_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS test_block_by_block ON test_block (block_id);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class CodeBlock:
+    """A function/method (or the module remainder) with a content checksum."""
+
+    name: str
+    start: int
+    end: int
+    checksum: str
+
+
+@dataclass(frozen=True, slots=True)
+class ImpactSelection:
+    """Result of impact analysis.
+
+    ``targets`` is None when a full run is required (``reason`` says why);
+    otherwise it holds pytest node ids and test file paths to run.
+    """
+
+    targets: list[str] | None
+    reason: str
+
+
+def impact_db_path(project_root: Path) -> Path:
+    """Return the test impact database path under .cortex/.cache."""
+    return get_cache_dir(project_root, "test_impact", create=False) / "impact.db"
+
+
+def _checksum(lines: Iterable[str]) -> str:
+    digest = hashlib.sha1()
+    for line in lines:
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            digest.update(stripped.encode("utf-8"))
+            digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def code_blocks(text: str) -> list[CodeBlock]:
+    """Split Python source into function blocks plus a ``<module>`` block.
+
+    Raises:
+        SyntaxError: If the source does not parse
+    """
+    tree = ast.parse(text)
+    lines = text.splitlines()
+    blocks: list[CodeBlock] = []
+    seen: dict[str, int] = {}
+    owned = [False] * (len(lines) + 1)
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{prefix}{child.name}"
+                seen[name] = seen.get(name, 0) + 1
+                if seen[name] > 1:
+                    name = f"{name}#{seen[name]}"
+                start = min([d.lineno for d in child.decorator_list] + [child.lineno])
+                end = child.end_lineno or child.lineno
+                blocks.append(
+                    CodeBlock(name, start, end, _checksum(lines[start - 1 : end]))
+                )
+                for line in range(start, end + 1):
+                    owned[line] = True
+                visit(child, f"{name}.")
+            elif isinstance(child, ast.ClassDef):
+                visit(child, f"{prefix}{child.name}.")
+            else:
+                visit(child, prefix)
+
+    visit(tree, "")
+    module_lines = (text for i, text in enumerate(lines, 1) if not owned[i])
+    blocks.append(CodeBlock(MODULE_BLOCK, 1, len(lines), _checksum(module_lines)))
+    return blocks
+
+
+def _line_owners(blocks: list[CodeBlock], block_ids: dict[str, int]) -> list[int]:
+    """Map each line number to the id of its innermost block."""
+    module = next(b for b in blocks if b.name == MODULE_BLOCK)
+    owners = [block_ids[MODULE_BLOCK]] * (module.end + 2)
+    # Outer functions first so nested (later-starting, shorter) ones overwrite.
+    for block in sorted(blocks, key=lambda b: (b.start, -b.end)):
+        if block.name == MODULE_BLOCK:
+            continue
+        for line in range(block.start, min(block.end, module.end) + 1):
+            owners[line] = block_ids[block.name]
+    return owners
+
+
+def sha1_file(path: Path) -> str:
+    """Return the SHA-1 hex digest of a file's bytes."""
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def config_fingerprint(project_root: Path, tests_dir: Path | None) -> str:
+    """Hash pytest/coverage configuration, dependency locks and conftest files."""
+    paths = [project_root / name for name in CONFIG_FILES]
+    paths.append(project_root / "conftest.py")
+    if tests_dir is not None and tests_dir.exists():
+        paths.extend(sorted(tests_dir.rglob("conftest.py")))
+    digest = hashlib.sha1()
+    for path in paths:
+        if path.is_file():
+            digest.update(str(path.relative_to(project_root)).encode("utf-8"))
+            digest.update(sha1_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def nodeid_path(nodeid: str) -> str:
+    """Return the test file part of a pytest node id."""
+    return nodeid.split("::", 1)[0]
+
+
+def is_test_file(path: Path) -> bool:
+    """Whether ``path`` is a pytest test module (test_*.py or *_test.py)."""
+    return path.suffix == ".py" and (
+        path.name.startswith("test_") or path.stem.endswith("_test")
+    )
+
+
+class ImpactDatabase:
+    """SQLite-backed mapping from code blocks to the tests that execute them."""
+
+    def __init__(self, project_root: Path, db_path: Path | None = None):
+        """Open (creating if needed) the impact database.
+
+        Args:
+            project_root: Project root; stored paths are relative to it
+            db_path: Database location (default: impact_db_path(project_root))
+        """
+        self.project_root = project_root
+        self.db_path = db_path or impact_db_path(project_root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        _ = self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        found = row.fetchone()
+        return None if found is None else str(found[0])
+
+    def _set_meta(self, key: str, value: str) -> None:
+        _ = self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _relative(self, raw_path: str) -> str | None:
+        try:
+            rel = Path(raw_path).resolve().relative_to(self.project_root.resolve())
+        except ValueError:
+            return None
+        return rel.as_posix()
+
+    def _upsert_file(self, rel: str, fingerprint: bool) -> int:
+        path = self.project_root / rel
+        row = self.conn.execute("SELECT id FROM file WHERE path = ?", (rel,)).fetchone()
+        if row is not None and not fingerprint:
+            return int(row[0])
+        stat = path.stat()
+        values = (stat.st_mtime_ns, stat.st_size, sha1_file(path), rel)
+        if row is None:
+            cursor = self.conn.execute(
+                "INSERT INTO file (mtime_ns, size, sha1, path) VALUES (?, ?, ?, ?)",
+                values,
+            )
+            return int(cursor.lastrowid or 0)
+        _ = self.conn.execute(
+            "UPDATE file SET mtime_ns = ?, size = ?, sha1 = ? WHERE path = ?", values
+        )
+        return int(row[0])
+
+    def _sync_blocks(
+        self, file_id: int, blocks: list[CodeBlock], fingerprint: bool
+    ) -> dict[str, int]:
+        """Upsert blocks by name (keeping ids so other tests' links survive)."""
+        existing = {
+            name: int(block_id)
+            for block_id, name in self.conn.execute(
+                "SELECT id, name FROM block WHERE file_id = ?", (file_id,)
+            )
+        }
+        ids: dict[str, int] = {}
+        for block in blocks:
+            block_id = existing.pop(block.name, None)
+            if block_id is None:
+                cursor = self.conn.execute(
+                    "INSERT INTO block (file_id, name, start, end, checksum) "
+                    + "VALUES (?, ?, ?, ?, ?)",
+                    (file_id, block.name, block.start, block.end, block.checksum),
+                )
+                block_id = int(cursor.lastrowid or 0)
+            elif fingerprint:
+                _ = self.conn.execute(
+                    "UPDATE block SET start = ?, end = ?, checksum = ? WHERE id = ?",
+                    (block.start, block.end, block.checksum, block_id),
+                )
+            ids[block.name] = block_id
+        if fingerprint:
+            for block_id in existing.values():
+                _ = self.conn.execute(
+                    "DELETE FROM test_block WHERE block_id = ?", (block_id,)
+                )
+                _ = self.conn.execute("DELETE FROM block WHERE id = ?", (block_id,))
+        return ids
+
+    def record(
+        self,
+        data_file: Path,
+        tests_dir: Path | None,
+        full_run: bool,
+        fingerprint: bool,
+    ) -> int:
+        """Update the mapping from a `--cov-context=test` coverage data file.
+
+        Args:
+            data_file: `.coverage` SQLite file recorded with test contexts
+            tests_dir: Tests directory (for the config fingerprint)
+            full_run: The whole suite ran; forget tests absent from the data
+                and mark the mapping fresh (only when ``fingerprint`` is set:
+                a failed run stopped by ``-x`` covers just a prefix)
+            fingerprint: Store current file contents as the new baseline.
+                Pass False after a failed run so the same change stays
+                "affected" next time.
+
+        Returns:
+            Number of tests recorded
+        """
+        cov = open_coverage_db(data_file)
+        owners_by_file: dict[str, list[int] | None] = {}
+        test_ids: dict[str, int] = {}
+        try:
+            for raw_path, context, lines in iter_context_lines(cov):
+                if not context:
+                    continue
+                nodeid = context.rsplit("|", 1)[0]
+                rel = self._relative(raw_path)
+                if rel is None:
+                    continue
+                if rel not in owners_by_file:
+                    owners_by_file[rel] = self._file_owners(rel, fingerprint)
+                owners = owners_by_file[rel]
+                if owners is None:
+                    continue
+                test_id = test_ids.get(nodeid)
+                if test_id is None:
+                    test_id = self._reset_test(nodeid)
+                    test_ids[nodeid] = test_id
+                block_ids = {owners[n] for n in lines if 0 < n < len(owners)}
+                _ = self.conn.executemany(
+                    "INSERT OR IGNORE INTO test_block (test_id, block_id) VALUES (?, ?)",
+                    [(test_id, block_id) for block_id in block_ids],
+                )
+        finally:
+            cov.close()
+
+        if fingerprint:
+            for test_file in {nodeid_path(n) for n in test_ids}:
+                if (self.project_root / test_file).is_file():
+                    _ = self._upsert_file(test_file, fingerprint=True)
+        if full_run and fingerprint:
+            self._forget_tests_except(set(test_ids))
+            self._set_meta(
+                "config_hash", config_fingerprint(self.project_root, tests_dir)
+            )
+            self._set_meta("built_at", str(time.time()))
+        self._set_meta("schema", SCHEMA_VERSION)
+        self.conn.commit()
+        return len(test_ids)
+
+    def _file_owners(self, rel: str, fingerprint: bool) -> list[int] | None:
+        path = self.project_root / rel
+        try:
+            blocks = code_blocks(path.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            return None
+        file_id = self._upsert_file(rel, fingerprint)
+        block_ids = self._sync_blocks(file_id, blocks, fingerprint)
+        return _line_owners(blocks, block_ids)
+
+    def _reset_test(self, nodeid: str) -> int:
+        row = self.conn.execute(
+            "SELECT id FROM test WHERE nodeid = ?", (nodeid,)
+        ).fetchone()
+        if row is None:
+            cursor = self.conn.execute(
+                "INSERT INTO test (nodeid) VALUES (?)", (nodeid,)
+            )
+            return int(cursor.lastrowid or 0)
+        _ = self.conn.execute("DELETE FROM test_block WHERE test_id = ?", (row[0],))
+        return int(row[0])
+
+    def _forget_tests_except(self, keep: set[str]) -> None:
+        stale = [
+            (int(test_id),)
+            for test_id, nodeid in self.conn.execute("SELECT id, nodeid FROM test")
+            if nodeid not in keep
+        ]
+        _ = self.conn.executemany("DELETE FROM test_block WHERE test_id = ?", stale)
+        _ = self.conn.executemany("DELETE FROM test WHERE id = ?", stale)
+
+    def select(
+        self, tests_dir: Path | None, only_paths: Iterable[str] | None = None
+    ) -> ImpactSelection:
+        """Return the tests affected by changes since the mapping was recorded.
+
+        Args:
+            tests_dir: Tests directory (new test files are selected whole)
+            only_paths: Restrict change detection to these project-relative
+                paths (e.g. the single file a post-edit hook saw change)
+        """
+        if self._meta("built_at") is None or self._meta("schema") != SCHEMA_VERSION:
+            return ImpactSelection(None, "no test-impact mapping recorded yet")
+        age_days = (time.time() - float(self._meta("built_at") or 0)) / 86400
+        if age_days > TEST_IMPACT_MAX_AGE_DAYS:
+            return ImpactSelection(None, f"mapping is {age_days:.0f} days old")
+        if self._meta("config_hash") != config_fingerprint(
+            self.project_root, tests_dir
+        ):
+            return ImpactSelection(None, "conftest.py or test configuration changed")
+
+        wanted = None if only_paths is None else set(only_paths)
+        known: dict[str, tuple[int, int, int, str]] = {
+            path: (int(file_id), int(mtime), int(size), str(sha1))
+            for file_id, path, mtime, size, sha1 in self.conn.execute(
+                "SELECT id, path, mtime_ns, size, sha1 FROM file"
+            )
+            if wanted is None or path in wanted
+        }
+        whole_files: set[str] = set()
+        affected_blocks: set[int] = set()
+        for rel, (file_id, mtime, size, sha1) in known.items():
+            path = self.project_root / rel
+            is_test = is_test_file(path)
+            if not path.exists():
+                if not is_test:
+                    affected_blocks.update(self._file_block_ids(file_id))
+                continue
+            stat = path.stat()
+            if (stat.st_mtime_ns, stat.st_size) == (mtime, size) or sha1_file(
+                path
+            ) == sha1:
+                continue
+            if is_test:
+                whole_files.add(rel)
+                continue
+            try:
+                current = code_blocks(path.read_text(encoding="utf-8"))
+            except (SyntaxError, UnicodeDecodeError) as e:
+                return ImpactSelection(None, f"cannot parse {rel}: {e}")
+            affected_blocks.update(self._changed_block_ids(file_id, current))
+
+        for rel in self._new_test_files(tests_dir, wanted, set(known)):
+            whole_files.add(rel)
+        if wanted is not None and not known and not whole_files:
+            return ImpactSelection(None, "file is not in the test-impact mapping")
+
+        nodeids = {
+            nodeid
+            for nodeid in self._tests_for_blocks(affected_blocks)
+            if nodeid_path(nodeid) not in whole_files
+            and (self.project_root / nodeid_path(nodeid)).exists()
+        }
+        targets = sorted(whole_files) + sorted(nodeids)
+        return ImpactSelection(
+            targets,
+            f"{len(nodeids)} affected tests, {len(whole_files)} changed test files",
+        )
+
+    def _file_block_ids(self, file_id: int) -> list[int]:
+        return [
+            int(row[0])
+            for row in self.conn.execute(
+                "SELECT id FROM block WHERE file_id = ?", (file_id,)
+            )
+        ]
+
+    def _changed_block_ids(self, file_id: int, current: list[CodeBlock]) -> set[int]:
+        checksums = {block.name: block.checksum for block in current}
+        stored = list(
+            self.conn.execute(
+                "SELECT id, name, checksum FROM block WHERE file_id = ?", (file_id,)
+            )
+        )
+        changed = {
+            int(block_id)
+            for block_id, name, checksum in stored
+            if checksums.get(name) != checksum
+        }
+        module_changed = any(
+            name == MODULE_BLOCK and int(block_id) in changed
+            for block_id, name, _checksum in stored
+        )
+        if module_changed:
+            return {int(block_id) for block_id, _name, _checksum in stored}
+        return changed
+
+    def _tests_for_blocks(self, block_ids: set[int]) -> set[str]:
+        nodeids: set[str] = set()
+        ids = list(block_ids)
+        for offset in range(0, len(ids), 500):
+            batch = ids[offset : offset + 500]
+            query = (
+                "SELECT DISTINCT test.nodeid FROM test_block "
+                + "JOIN test ON test.id = test_block.test_id "
+                + f"WHERE test_block.block_id IN ({','.join('?' * len(batch))})"
+            )
+            nodeids.update(str(row[0]) for row in self.conn.execute(query, batch))
+        return nodeids
+
+    def _new_test_files(
+        self, tests_dir: Path | None, wanted: set[str] | None, known: set[str]
+    ) -> list[str]:
+        if wanted is not None:
+            candidates = [self.project_root / rel for rel in wanted]
+        elif tests_dir is not None and tests_dir.exists():
+            candidates = list(tests_dir.rglob("*.py"))
+        else:
+            candidates = []
+        result: list[str] = []
+        recorded = {
+            str(row[0]) for row in self.conn.execute("SELECT path FROM file")
+        } | known
+        for path in candidates:
+            if not is_test_file(path) or not path.exists():
+                continue
+            try:
+                rel = path.resolve().relative_to(self.project_root.resolve()).as_posix()
+            except ValueError:
+                continue
+            if rel not in recorded:
+                result.append(rel)
+        return sorted(result)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Per-test peak memory records, baseline and regression report.
+
+The ``_pytest_memory`` plugin measures every test call: its tracemalloc peak
+(Python allocations made by the test, measured from zero) and how far it
+raised the worker's peak RSS. Each process appends JSON lines to its own
+file in the record directory; this module folds them into per-test and
+per-module figures, compares them with the baseline file and reports tests
+whose peak grew beyond the allowed ratio, with the allocation sites that were
+live when the test crossed its budget.
+
+The baseline (.cortex/benchmark_results/test_memory_baseline.json) gains
+tests it has not seen on every run; existing entries only change with
+``run_tests.py --memory --update-memory-baseline``.
+
+Configuration:
+    TEST_MEMORY_GROWTH_PCT: Allowed growth of a test's peak allocation over
+        its baseline, in percent (default: 50)
+    TEST_MEMORY_MIN_KB: Growth below this many KiB never fails, so tiny
+        tests do not trip on noise (default: 1024)
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _bench_stats import format_bytes
+    from _utils import get_benchmark_results_dir, get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_stats import format_bytes
+    from _utils import get_benchmark_results_dir, get_cache_dir, get_config_int
+
+TEST_MEMORY_GROWTH_PCT = get_config_int("TEST_MEMORY_GROWTH_PCT", 50)
+TEST_MEMORY_MIN_KB = get_config_int("TEST_MEMORY_MIN_KB", 1024)
+
+BASELINE_FILE = "test_memory_baseline.json"
+_BASELINE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class TestMemory:
+    """Memory figures of one test call."""
+
+    __test__ = False  # Not a pytest test class
+
+    nodeid: str
+    peak_bytes: int
+    rss_bytes: int
+    sites: tuple[tuple[str, int], ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryRegression:
+    """A test whose peak allocation outgrew its baseline."""
+
+    nodeid: str
+    baseline_bytes: int
+    peak_bytes: int
+    budget_bytes: int
+    sites: tuple[tuple[str, int], ...]
+
+
+def module_of(nodeid: str) -> str:
+    """Test file part of a node id."""
+    return nodeid.split("::", 1)[0]
+
+
+def memory_record_dir(project_root: Path) -> Path:
+    """Return the record directory for the current run (not created)."""
+    return get_cache_dir(project_root, "test_memory", create=False)
+
+
+def reset_memory_record_dir(project_root: Path) -> Path:
+    """Empty the record directory so only this run's tests are reported."""
+    record_dir = memory_record_dir(project_root)
+    shutil.rmtree(record_dir, ignore_errors=True)
+    record_dir.mkdir(parents=True, exist_ok=True)
+    return record_dir
+
+
+def memory_baseline_path(project_root: Path) -> Path:
+    """Return the baseline file path under .cortex/benchmark_results."""
+    return get_benchmark_results_dir(project_root, create=False) / BASELINE_FILE
+
+
+def budget_bytes(baseline: int, growth_pct: int, min_bytes: int) -> int:
+    """Largest peak a test with ``baseline`` may reach without failing."""
+    return max(baseline * (100 + growth_pct) // 100, baseline + min_bytes)
+
+
+def collect_memory_records(record_dir: Path) -> dict[str, TestMemory]:
+    """Read every worker's records; a test measured twice keeps its larger peak."""
+    records: dict[str, TestMemory] = {}
+    if not record_dir.is_dir():
+        return records
+    for path in sorted(record_dir.glob("*.jsonl")):
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                raw = json.loads(line)
+                record = TestMemory(
+                    nodeid=str(raw["nodeid"]),
+                    peak_bytes=int(raw["peak"]),
+                    rss_bytes=int(raw["rss"]),
+                    sites=tuple((str(s), int(n)) for s, n in raw.get("sites", [])),
+                )
+            except (ValueError, KeyError, TypeError):
+                continue  # Partial line from a worker that was killed mid-write
+            previous = records.get(record.nodeid)
+            if previous is None or record.peak_bytes > previous.peak_bytes:
+                records[record.nodeid] = record
+    return records
+
+
+def module_totals(tests: dict[str, dict[str, int]]) -> dict[str, dict[str, int]]:
+    """Per-module figures: the largest test peak and the summed RSS growth."""
+    modules: dict[str, dict[str, int]] = {}
+    for nodeid, entry in tests.items():
+        totals = modules.setdefault(module_of(nodeid), {"peak": 0, "rss": 0})
+        totals["peak"] = max(totals["peak"], entry["peak"])
+        totals["rss"] += entry["rss"]
+    return dict(sorted(modules.items()))
+
+
+def load_memory_baseline(path: Path) -> dict[str, int]:
+    """Baseline peak per test node id (empty when missing or unreadable)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _BASELINE_VERSION:
+        return {}
+    tests = data.get("tests", {})
+    return {
+        str(nodeid): int(entry["peak"])
+        for nodeid, entry in tests.items()
+        if isinstance(entry, dict) and "peak" in entry
+    }
+
+
+def save_memory_baseline(
+    path: Path, records: dict[str, TestMemory], replace: bool
+) -> int:
+    """Fold this run into the baseline file.
+
+    Args:
+        path: Baseline file
+        records: This run's per-test records
+        replace: Overwrite existing entries; otherwise only new tests are added
+
+    Returns:
+        Number of entries written from this run
+    """
+    tests: dict[str, dict[str, int]] = {}
+    if path.exists() and not replace:
+        try:
+            tests = json.loads(path.read_text(encoding="utf-8")).get("tests", {})
+        except (OSError, ValueError, AttributeError):
+            tests = {}
+    written = 0
+    for nodeid, record in records.items():
+        if replace or nodeid not in tests:
+            tests[nodeid] = {"peak": record.peak_bytes, "rss": record.rss_bytes}
+            written += 1
+    tests = dict(sorted(tests.items()))
+    data = {
+        "version": _BASELINE_VERSION,
+        "tests": tests,
+        "modules": module_totals(tests),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+    return written
+
+
+def find_memory_regressions(
+    records: dict[str, TestMemory],
+    baseline: dict[str, int],
+    growth_pct: int = TEST_MEMORY_GROWTH_PCT,
+    min_bytes: int = TEST_MEMORY_MIN_KB * 1024,
+) -> list[MemoryRegression]:
+    """Tests whose peak exceeds their budget, largest growth first."""
+    regressions: list[MemoryRegression] = []
+    for nodeid, record in records.items():
+        if nodeid not in baseline:
+            continue
+        budget = budget_bytes(baseline[nodeid], growth_pct, min_bytes)
+        if record.peak_bytes > budget:
+            regressions.append(
+                MemoryRegression(
+                    nodeid=nodeid,
+                    baseline_bytes=baseline[nodeid],
+                    peak_bytes=record.peak_bytes,
+                    budget_bytes=budget,
+                    sites=record.sites,
+                )
+            )
+    return sorted(
+        regressions, key=lambda r: r.peak_bytes - r.baseline_bytes, reverse=True
+    )
+
+
+def print_memory_summary(records: dict[str, TestMemory], top: int = 5) -> None:
+    """Print the tests and modules with the largest peaks."""
+    if not records:
+        return
+    heaviest = sorted(records.values(), key=lambda r: -r.peak_bytes)[:top]
+    print(f"\n📈 Peak memory ({len(records)} tests measured):")
+    for record in heaviest:
+        print(
+            f"  {format_bytes(record.peak_bytes):>9} peak"
+            + f"  {format_bytes(record.rss_bytes):>9} RSS  {record.nodeid}"
+        )
+    tests = {
+        r.nodeid: {"peak": r.peak_bytes, "rss": r.rss_bytes} for r in records.values()
+    }
+    modules = sorted(module_totals(tests).items(), key=lambda m: -m[1]["rss"])
+    print("  Modules by RSS growth:")
+    for module, totals in modules[:top]:
+        print(
+            f"  {format_bytes(totals['rss']):>9} RSS"
+            + f"  {format_bytes(totals['peak']):>9} max peak  {module}"
+        )
+
+
+def print_memory_regressions(regressions: list[MemoryRegression]) -> None:
+    """Print one entry per offending test with its top allocation sites."""
+    print(
+        f"\n🔴 Peak memory regressions (> {TEST_MEMORY_GROWTH_PCT}% "
+        + f"and > {format_bytes(TEST_MEMORY_MIN_KB * 1024)} over baseline):",
+        file=sys.stderr,
+    )
+    for r in regressions:
+        growth = (r.peak_bytes / r.baseline_bytes - 1) * 100 if r.baseline_bytes else 0
+        print(
+            f"  {r.nodeid}: {format_bytes(r.baseline_bytes)} → "
+            + f"{format_bytes(r.peak_bytes)} (+{growth:.0f}%, "
+            + f"budget {format_bytes(r.budget_bytes)})",
+            file=sys.stderr,
+        )
+        if not r.sites:
+            print("      (peak too brief to capture allocation sites)", file=sys.stderr)
+        for site, size in r.sites:
+            print(f"      {format_bytes(size):>9}  {site}", file=sys.stderr)
+    print(
+        "  Accept intended growth with: run_tests.py --memory --update-memory-baseline",
+        file=sys.stderr,
+    )
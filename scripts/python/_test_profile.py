@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Sampled CPU profile of the test suite and its hot-function report.
+
+The ``_pytest_profile`` plugin runs a signal-driven stack sampler (see
+_stack_sampler.py) in every process that runs tests and writes its collapsed
+stacks to the record directory when the session ends. This module merges
+the per-worker files into one collapsed-stack profile for flamegraph tools
+and ranks source functions by where the CPU went:
+
+- self: samples whose innermost source frame is the function, so time spent
+  in library calls made by source code counts against the caller that made
+  them rather than disappearing into the stdlib
+- total: samples with the function anywhere on the stack
+
+Samples with no source frame at all (pytest, fixtures, test bodies) are
+reported as a share but not ranked.
+
+Configuration:
+    TEST_PROFILE_SAMPLE_US: CPU-time sampling interval per worker in
+        microseconds (default: 5000)
+    TEST_PROFILE_TOP: Number of hot functions to print (default: 25)
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _stack_sampler import parse_collapsed
+    from _utils import get_benchmark_results_dir, get_cache_dir, get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _stack_sampler import parse_collapsed
+    from _utils import get_benchmark_results_dir, get_cache_dir, get_config_int
+
+TEST_PROFILE_SAMPLE_US = get_config_int("TEST_PROFILE_SAMPLE_US", 5000)
+TEST_PROFILE_TOP = get_config_int("TEST_PROFILE_TOP", 25)
+
+
+@dataclass(frozen=True, slots=True)
+class HotFunction:
+    """Samples attributed to one source function."""
+
+    label: str
+    self_samples: int
+    total_samples: int
+
+
+def profile_record_dir(project_root: Path) -> Path:
+    """Return the record directory for the current run (not created)."""
+    return get_cache_dir(project_root, "test_profile", create=False)
+
+
+def reset_profile_record_dir(project_root: Path) -> Path:
+    """Empty the record directory so only this run's samples are merged."""
+    record_dir = profile_record_dir(project_root)
+    shutil.rmtree(record_dir, ignore_errors=True)
+    record_dir.mkdir(parents=True, exist_ok=True)
+    return record_dir
+
+
+def collect_profile(record_dir: Path) -> Counter[str]:
+    """Merge every worker's collapsed stacks."""
+    counts: Counter[str] = Counter()
+    if not record_dir.is_dir():
+        return counts
+    for path in sorted(record_dir.glob("*.collapsed")):
+        try:
+            counts.update(parse_collapsed(path.read_text(encoding="utf-8")))
+        except OSError:
+            continue
+    return counts
+
+
+def hot_functions(counts: Counter[str], source_prefix: str) -> list[HotFunction]:
+    """Source functions ranked by self samples (ties by total samples).
+
+    Args:
+        counts: Collapsed stacks with path labels (``path_labeler``)
+        source_prefix: Root-relative prefix of source files, e.g. ``src/``
+    """
+    self_samples: Counter[str] = Counter()
+    total_samples: Counter[str] = Counter()
+    for stack, n in counts.items():
+        source = [
+            label for label in stack.split(";") if label.startswith(source_prefix)
+        ]
+        if not source:
+            continue
+        self_samples[source[-1]] += n
+        for label in set(source):
+            total_samples[label] += n
+    ranked = [
+        HotFunction(label, self_samples[label], total)
+        for label, total in total_samples.items()
+    ]
+    return sorted(ranked, key=lambda f: (-f.self_samples, -f.total_samples, f.label))
+
+
+def write_profile(
+    project_root: Path, counts: Counter[str], functions: list[HotFunction]
+) -> Path:
+    """Write the merged collapsed stacks and the ranking; returns the stem."""
+    profile_dir = get_benchmark_results_dir(project_root) / "profiles"
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    stem = profile_dir / f"tests-{time.strftime('%Y%m%d-%H%M%S')}"
+    _ = stem.with_suffix(".collapsed").write_text(
+        "".join(f"{stack} {n}\n" for stack, n in counts.most_common()),
+        encoding="utf-8",
+    )
+    report = {
+        "samples": sum(counts.values()),
+        "interval_us": TEST_PROFILE_SAMPLE_US,
+        "functions": [
+            {"function": f.label, "self": f.self_samples, "total": f.total_samples}
+            for f in functions
+        ],
+    }
+    _ = stem.with_suffix(".json").write_text(
+        json.dumps(report, indent=1) + "\n", encoding="utf-8"
+    )
+    return stem
+
+
+def print_profile_report(
+    counts: Counter[str], functions: list[HotFunction], top: int = TEST_PROFILE_TOP
+) -> None:
+    """Print the hottest source functions with their share of all samples."""
+    samples = sum(counts.values())
+    if not samples:
+        print("⚠️  No profile samples were recorded", file=sys.stderr)
+        return
+    in_source = sum(f.self_samples for f in functions)
+    cpu_s = samples * TEST_PROFILE_SAMPLE_US / 1e6
+    print(
+        f"\n🔥 Hot source functions ({samples} samples ≈ {cpu_s:.1f}s CPU; "
+        + f"{in_source / samples:.0%} under source code):"
+    )
+    print(f"  {'self':>6} {'total':>6}  function")
+    for f in functions[:top]:
+        print(
+            f"  {f.self_samples / samples:>6.1%} {f.total_samples / samples:>6.1%}"
+            + f"  {f.label}"
+        )
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""RAM-backed scratch space for test runs (run_tests.py --tmpfs).
+
+A session directory is created on a tmpfs (TEST_TMPFS_DIR, /dev/shm by
+default) for one run::
+
+    synapse-tests-<pid>-<random>/
+        tmp/<worker>-<pid>/   TMPDIR per process (see _pytest_tmpfs.py)
+        basetemp/<worker>/    pytest --basetemp, split per worker by xdist
+        .coverage*            COVERAGE_FILE and the workers' parallel files
+        coverage.xml/.json    reports, copied back to the project root
+
+While the session is open ``TMPDIR`` and ``COVERAGE_FILE`` are set in this
+process's environment, so pytest inherits them and the post-run steps (test
+impact, incremental and diff coverage) read the data file from RAM. Only the
+coverage XML/JSON reports are copied back; the session directory is removed
+on exit, on Ctrl-C and on SIGTERM/SIGHUP. A run killed outright (SIGKILL,
+OOM) leaves its directory behind; the next session removes directories whose
+owning process is gone.
+
+Configuration:
+    TEST_TMPFS_DIR: tmpfs mount for the session (default: /dev/shm)
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from pathlib import Path
+from types import FrameType
+
+try:
+    from _utils import get_config_path
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import get_config_path
+
+TEST_TMPFS_DIR = get_config_path("TEST_TMPFS_DIR") or Path("/dev/shm")
+
+SESSION_PREFIX = "synapse-tests-"
+REPORT_FILES = {"xml": "coverage.xml", "json": "coverage.json"}
+_ENV_KEYS = ("TMPDIR", "COVERAGE_FILE")
+_CLEANUP_SIGNALS = tuple(
+    getattr(signal, name) for name in ("SIGTERM", "SIGHUP") if hasattr(signal, name)
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Another user's process
+    return True
+
+
+def sweep_stale_sessions(base: Path) -> int:
+    """Remove session directories left by runs that no longer exist.
+
+    Returns:
+        Number of directories removed
+    """
+    removed = 0
+    for path in base.glob(f"{SESSION_PREFIX}*"):
+        pid_text = path.name.removeprefix(SESSION_PREFIX).split("-", 1)[0]
+        if not pid_text.isdigit() or _pid_alive(int(pid_text)):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def _raise_exit(signum: int, _frame: FrameType | None) -> None:
+    raise SystemExit(128 + signum)
+
+
+class TmpfsSession:
+    """One run's scratch directory on a tmpfs, removed by ``close()``."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.tmp_dir = root / "tmp"
+        self.basetemp = root / "basetemp"
+        self.data_file = root / ".coverage"
+        self._saved_env = {key: os.environ.get(key) for key in _ENV_KEYS}
+        self._saved_handlers: dict[int, object] = {}
+        self.tmp_dir.mkdir()
+        os.environ["TMPDIR"] = str(self.tmp_dir)
+        os.environ["COVERAGE_FILE"] = str(self.data_file)
+        for signum in _CLEANUP_SIGNALS:
+            # SystemExit unwinds through run_streaming (which kills the
+            # process group) and the caller's finally, which calls close()
+            self._saved_handlers[signum] = signal.signal(signum, _raise_exit)
+
+    def report_path(self, kind: str) -> Path:
+        """Return where a ``--cov-report`` of ``kind`` (xml/json) is written."""
+        return self.root / REPORT_FILES[kind]
+
+    def copy_reports(self, project_root: Path) -> list[Path]:
+        """Copy the coverage XML/JSON reports back to the project root."""
+        copied: list[Path] = []
+        for name in REPORT_FILES.values():
+            source = self.root / name
+            if source.exists():
+                _ = shutil.copyfile(source, project_root / name)
+                copied.append(project_root / name)
+        return copied
+
+    def close(self) -> None:
+        """Restore the environment and signal handlers; delete the session."""
+        for signum, handler in self._saved_handlers.items():
+            _ = signal.signal(signum, handler)  # pyright: ignore[reportArgumentType]
+        self._saved_handlers.clear()
+        for key, value in self._saved_env.items():
+            if value is None:
+                _ = os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def start_tmpfs_session(base: Path = TEST_TMPFS_DIR) -> TmpfsSession | None:
+    """Open a session under ``base``, or None when it is not a writable dir."""
+    if not base.is_dir() or not os.access(base, os.W_OK | os.X_OK):
+        print(
+            f"⚠️  {base} is not a writable directory; running on disk",
+            file=sys.stderr,
+        )
+        return None
+    removed = sweep_stale_sessions(base)
+    if removed:
+        print(f"🧹 Removed {removed} stale test session(s) from {base}")
+    root = Path(tempfile.mkdtemp(prefix=f"{SESSION_PREFIX}{os.getpid()}-", dir=base))
+    return TmpfsSession(root)
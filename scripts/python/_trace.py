@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Phase tracing and profiling for the gate scripts.
+
+Gates mark their phases (discovery, reading, parsing, visiting, reporting)
+with ``span()`` blocks or the ``@traced`` decorator. Importing this module
+is enough to enable the rest when requested via the environment:
+
+- GATE_TRACE=path writes Chrome trace-event JSON on exit, viewable in
+  Perfetto (ui.perfetto.dev) or chrome://tracing. The whole run is one root
+  span, and subprocess spawns and waits are recorded automatically. When the
+  path is a directory each process writes <script>-<pid>.json into it;
+  otherwise events are merged into the existing file, so a sequence of
+  gates can share one trace. The merge holds an exclusive lock on a
+  ``.<name>.lock`` file next to the trace (POSIX), so gates finishing in
+  parallel (watch.py) do not drop each other's events.
+- GATE_PROFILE=1 runs the gate under cProfile and dumps
+  .cortex/benchmark_results/profiles/<script>-<timestamp>.pstats on exit.
+
+With neither set, ``span()`` returns a shared no-op context manager and
+``@traced`` returns the function unchanged, so instrumentation costs one
+function call per span and nothing per decorated call.
+
+Configuration:
+    GATE_TRACE: Trace output file or directory (default: tracing off)
+    GATE_PROFILE: Set to 1 to dump a cProfile .pstats for the run
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import ParamSpec, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: merges are not serialized
+    fcntl = None
+
+try:
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_NULL_SPAN: AbstractContextManager[None] = contextlib.nullcontext()
+
+
+def _script_name() -> str:
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+
+class Tracer:
+    """Collects complete ("X") trace events for this process."""
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, object]] = []
+        self.pid: int = os.getpid()
+        self._lock: threading.Lock = threading.Lock()
+        # Wall-clock epoch so events of separate gate processes line up
+        self._epoch_us: float = time.time_ns() / 1000
+        self._origin_ns: int = time.perf_counter_ns()
+
+    def now_us(self) -> float:
+        """Current timestamp in trace microseconds."""
+        return self._epoch_us + (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def add(
+        self,
+        name: str,
+        start_us: float,
+        end_us: float,
+        category: str = "gate",
+        args: dict[str, object] | None = None,
+    ) -> None:
+        """Record one complete event on the calling thread."""
+        event: dict[str, object] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": end_us - start_us,
+            "pid": self.pid,
+            "tid": threading.get_native_id(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "gate", **args: object) -> Iterator[None]:
+        """Record the enclosed block as an event."""
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.add(name, start, self.now_us(), category, args or None)
+
+    def metadata(self) -> list[dict[str, object]]:
+        """Process and thread name events."""
+        names: dict[str, object] = {"name": _script_name()}
+        meta: list[dict[str, object]] = [
+            {"name": "process_name", "ph": "M", "pid": self.pid, "args": names}
+        ]
+        for tid in sorted({e["tid"] for e in self.events}, key=str):
+            label = "main" if tid == threading.main_thread().native_id else str(tid)
+            meta.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"name": label},
+                }
+            )
+        return meta
+
+    def write(self, target: Path) -> Path:
+        """Write (or merge) the events as Chrome trace JSON; returns the file."""
+        events = self.metadata() + self.events
+        if target.is_dir() or str(target).endswith(os.sep):
+            target.mkdir(parents=True, exist_ok=True)
+            target = target / f"{_script_name()}-{self.pid}.json"
+            self._replace(target, events)
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with _merge_lock(target):
+            if target.exists():
+                try:
+                    existing = json.loads(target.read_text(encoding="utf-8"))
+                    events = list(existing.get("traceEvents", [])) + events
+                except (OSError, ValueError, AttributeError):
+                    pass
+            self._replace(target, events)
+        return target
+
+    def _replace(self, target: Path, events: list[dict[str, object]]) -> None:
+        tmp = target.with_name(
+            f".{target.name}.{self.pid}.{threading.get_native_id()}.tmp"
+        )
+        _ = tmp.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )
+        _ = tmp.replace(target)
+
+
+@contextlib.contextmanager
+def _merge_lock(target: Path) -> Iterator[None]:
+    """Hold an exclusive lock for a read-merge-replace of ``target``.
+
+    The lock lives on a sidecar file because the trace itself is replaced.
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = target.with_name(f".{target.name}.lock")
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+_tracer: Tracer | None = None
+
+
+def tracing_enabled() -> bool:
+    """Whether spans are being recorded."""
+    return _tracer is not None
+
+
+def span(name: str, **args: object) -> AbstractContextManager[None]:
+    """Context manager recording a phase; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **args)
+
+
+def traced(
+    name: str | None = None,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator recording each call as a span (no wrapper when tracing is off)."""
+
+    def decorate(func: Callable[P, R]) -> Callable[P, R]:
+        tracer = _tracer
+        if tracer is None:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with tracer.span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _command_label(command: object) -> str:
+    """Short name of a Popen command, e.g. ``ruff`` or ``python -m pytest``."""
+    if isinstance(command, (list, tuple)):
+        parts = [
+            (
+                os.fsdecode(part)
+                if isinstance(part, (str, bytes, os.PathLike))
+                else str(part)
+            )
+            for part in command
+        ]
+    elif isinstance(command, (str, bytes, os.PathLike)):
+        parts = os.fsdecode(command).split()
+    else:
+        parts = []
+    if not parts:
+        return "subprocess"
+    label = Path(parts[0]).name
+    # "python -m tool" and "python script.py" are named after the tool
+    if len(parts) > 2 and parts[1] == "-m":
+        label += f" -m {parts[2]}"
+    elif len(parts) > 1 and parts[1].endswith(".py"):
+        label += f" {Path(parts[1]).name}"
+    return label
+
+
+def instrument_subprocess(tracer: Tracer) -> None:
+    """Record every Popen spawn, and the time spent waiting for it."""
+    popen = subprocess.Popen
+    original_init = popen.__init__
+    original_wait = popen.wait
+    original_communicate = popen.communicate
+    waiting = threading.local()
+
+    def __init__(
+        self: subprocess.Popen[object], *args: object, **kwargs: object
+    ) -> None:
+        command = args[0] if args else kwargs.get("args")
+        label = _command_label(command)
+        self._trace_label = label  # pyright: ignore[reportAttributeAccessIssue]
+        with tracer.span(f"spawn {label}", "subprocess", argv=str(command)[:500]):
+            original_init(self, *args, **kwargs)  # pyright: ignore[reportArgumentType]
+
+    def _timed(original: Callable[..., R]) -> Callable[..., R]:
+        def method(
+            self: subprocess.Popen[object], *args: object, **kwargs: object
+        ) -> R:
+            if getattr(waiting, "active", False):
+                return original(self, *args, **kwargs)
+            waiting.active = True
+            label = getattr(self, "_trace_label", "subprocess")
+            try:
+                with tracer.span(f"wait {label}", "subprocess", pid=self.pid):
+                    return original(self, *args, **kwargs)
+            finally:
+                waiting.active = False
+
+        return method
+
+    popen.__init__ = __init__  # pyright: ignore[reportAttributeAccessIssue]
+    popen.wait = _timed(original_wait)  # pyright: ignore[reportAttributeAccessIssue]
+    popen.communicate = _timed(  # pyright: ignore[reportAttributeAccessIssue]
+        original_communicate
+    )
+
+
+def _profile_path() -> Path:
+    root = get_project_root(Path(sys.argv[0]).resolve() if sys.argv[0] else None)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return (
+        get_benchmark_results_dir(root)
+        / "profiles"
+        / f"{_script_name()}-{stamp}-{os.getpid()}.pstats"
+    )
+
+
+def _start_profile() -> None:
+    profiler = cProfile.Profile()
+
+    def dump() -> None:
+        profiler.disable()
+        path = _profile_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        print(f"📊 cProfile stats written to {path}", file=sys.stderr)
+
+    atexit.register(dump)
+    profiler.enable()
+
+
+def _start_trace(target: Path) -> Tracer:
+    tracer = Tracer()
+    start = tracer.now_us()
+    argv = " ".join(sys.argv[1:])[:500]
+
+    def finish() -> None:
+        tracer.add(_script_name(), start, tracer.now_us(), "gate", {"argv": argv})
+        path = tracer.write(target)
+        print(f"🧭 Trace written to {path}", file=sys.stderr)
+
+    atexit.register(finish)
+    instrument_subprocess(tracer)
+    return tracer
+
+
+_trace_target = get_config_path("GATE_TRACE")
+if _trace_target is not None:
+    _tracer = _start_trace(_trace_target)
+if get_config_int("GATE_PROFILE", 0) == 1:
+    _start_profile()
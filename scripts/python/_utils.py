@@ -2,11 +2,22 @@
 """Shared utilities for Python quality check scripts.
 
 This module provides common functionality for finding project root,
-detecting source directories, and reading configuration from environment variables.
+detecting source directories, reading configuration from environment variables,
+and running child processes with live output.
 """
 
 import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import IO, TextIO
 
 
 def _get_cortex_dir_names() -> tuple[str, str]:
@@ -205,6 +216,58 @@ def get_synapse_scripts_dir(project_root: Path) -> Path:
     return scripts_dir
 
 
+def get_cache_dir(project_root: Path, name: str, create: bool = True) -> Path:
+    """Get a named cache directory under .cortex/.cache.
+
+    Mirrors cortex's ``get_cache_path`` layout so caches written by these
+    scripts sit next to the server's own, without importing cortex.
+
+    Args:
+        project_root: Path to project root
+        name: Cache subdirectory name
+        create: Create the directory if missing
+
+    Returns:
+        Path to the cache directory
+    """
+    cache_dir = project_root / _CORTEX_DIR_NAME / ".cache" / name
+    if create:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_benchmark_results_dir(project_root: Path, create: bool = True) -> Path:
+    """Get the benchmark results directory (.cortex/benchmark_results).
+
+    Args:
+        project_root: Path to project root
+        create: Create the directory if missing
+
+    Returns:
+        Path to the benchmark results directory
+    """
+    results_dir = project_root / _CORTEX_DIR_NAME / "benchmark_results"
+    if create:
+        results_dir.mkdir(parents=True, exist_ok=True)
+    return results_dir
+
+
+def get_reviews_dir(project_root: Path, create: bool = True) -> Path:
+    """Get the review artifacts directory (.cortex/reviews).
+
+    Args:
+        project_root: Path to project root
+        create: Create the directory if missing
+
+    Returns:
+        Path to the reviews directory
+    """
+    reviews_dir = project_root / _CORTEX_DIR_NAME / "reviews"
+    if create:
+        reviews_dir.mkdir(parents=True, exist_ok=True)
+    return reviews_dir
+
+
 def resolve_memory_bank_root(
     project_root: Path, structure_memory_bank_path: str | Path | None = None
 ) -> Path:
@@ -240,3 +303,191 @@ def resolve_memory_bank_file_path(
         )
         / file_name
     )
+
+
+# ---------------------------------------------------------------------------
+# Streaming subprocess runner
+# ---------------------------------------------------------------------------
+
+LineHandler = Callable[[str, str], None]
+"""Called with ``(stream, line)`` per output line; stream is "stdout"/"stderr"."""
+
+STREAM_TAIL_LINES = 200
+_KILL_GRACE_S = 5.0
+_DRAIN_GRACE_S = 2.0
+
+
+@dataclass(slots=True)
+class StreamResult:
+    """Outcome of ``run_streaming``."""
+
+    returncode: int
+    tail: list[str]
+    timed_out: bool
+    duration_s: float
+
+    def tail_text(self) -> str:
+        """Return the retained output tail as text."""
+        return "\n".join(self.tail)
+
+
+@dataclass(slots=True)
+class LineCollector:
+    """Line handler that keeps only lines matching ``pattern``.
+
+    Lets callers parse summaries, failure markers or signals from the output
+    without holding the whole log; at most ``limit`` recent matches are kept.
+    """
+
+    pattern: re.Pattern[str]
+    limit: int = 1000
+    lines: deque[str] = field(default_factory=deque)
+
+    def __call__(self, stream: str, line: str) -> None:
+        """Keep ``line`` when it matches."""
+        if self.pattern.search(line):
+            self.lines.append(line)
+            if len(self.lines) > self.limit:
+                _ = self.lines.popleft()
+
+    def text(self) -> str:
+        """Return the kept lines joined by newlines."""
+        return "\n".join(self.lines)
+
+
+def kill_process_group(
+    proc: subprocess.Popen[bytes], grace_s: float = _KILL_GRACE_S
+) -> None:
+    """Terminate ``proc`` and every process in its group.
+
+    Sends SIGTERM to the group, waits up to ``grace_s`` for the leader, then
+    SIGKILLs whatever is left so orphaned grandchildren (compilers, test
+    hosts, watchers) do not keep running.
+    """
+    if os.name != "posix":
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        _ = proc.wait(timeout=grace_s)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _join_all(threads: Sequence[threading.Thread], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0.0))
+
+
+def run_streaming(
+    cmd: Sequence[str],
+    cwd: Path | None = None,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+    handlers: Sequence[LineHandler] = (),
+    echo: bool = True,
+    tail_lines: int = STREAM_TAIL_LINES,
+) -> StreamResult:
+    """Run ``cmd`` streaming its output live, in its own process group.
+
+    Each stdout/stderr line is echoed as it arrives (when ``echo``), appended
+    to a ring buffer of the last ``tail_lines`` lines and passed to every
+    handler, so memory stays flat however much the child logs. Handlers run
+    one line at a time under a lock and need not be thread-safe.
+
+    On timeout (or Ctrl-C) the whole process group is killed. The group is
+    also killed when the child exits but leftover descendants still hold its
+    output pipes open.
+
+    Args:
+        cmd: Command and arguments
+        cwd: Working directory
+        timeout: Seconds before the process group is killed (None: no limit)
+        env: Child environment (default: inherit)
+        handlers: Line handlers called with ``(stream, line)``
+        echo: Print lines to this process's stdout/stderr as they arrive
+        tail_lines: Number of trailing lines kept in the result
+
+    Returns:
+        Exit code, output tail, and whether the run timed out
+
+    Raises:
+        FileNotFoundError: When the command does not exist
+    """
+    started = time.monotonic()
+    if os.name == "posix":
+        proc = subprocess.Popen(
+            list(cmd),
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+    else:
+        proc = subprocess.Popen(
+            list(cmd),
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+        )
+    tail: deque[str] = deque(maxlen=max(tail_lines, 1))
+    lock = threading.Lock()
+
+    def pump(pipe: IO[bytes], name: str, sink: TextIO) -> None:
+        for raw in iter(pipe.readline, b""):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            with lock:
+                tail.append(line)
+                if echo:
+                    print(line, file=sink, flush=True)
+                for handler in handlers:
+                    handler(name, line)
+        pipe.close()
+
+    readers = [
+        threading.Thread(
+            target=pump, args=(proc.stdout, "stdout", sys.stdout), daemon=True
+        ),
+        threading.Thread(
+            target=pump, args=(proc.stderr, "stderr", sys.stderr), daemon=True
+        ),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        kill_process_group(proc)
+        returncode = proc.wait()
+    except BaseException:
+        kill_process_group(proc)
+        raise
+
+    _join_all(readers, _DRAIN_GRACE_S)
+    if any(reader.is_alive() for reader in readers):
+        # Descendants outlived the child and still hold its pipes.
+        kill_process_group(proc, grace_s=0)
+        _join_all(readers, _DRAIN_GRACE_S)
+
+    return StreamResult(
+        returncode=returncode,
+        tail=list(tail),
+        timed_out=timed_out,
+        duration_s=time.monotonic() - started,
+    )
@@ -5,17 +5,28 @@ complexity, nesting depth, and other maintainability metrics.
 
 Usage:
     .venv/bin/python .cortex/synapse/scripts/python/analyze_complexity.py
+    .venv/bin/python .cortex/synapse/scripts/python/analyze_complexity.py --history 1000
 
 Output:
     - Report of high-complexity functions
     - Nesting depth violations
     - Summary statistics
+    - With --history N: per-module and per-function size/complexity trends
+      over the last N first-parent commits, written to
+      .cortex/benchmark_results/complexity_history.json. Each distinct file
+      version (git blob) is analyzed once and cached under
+      .cortex/.cache/complexity_history, so the cost follows the number of
+      distinct blobs rather than commits × files (see _complexity_history.py).
 
 Configuration:
     SRC_DIR: Source directory path (default: auto-detected)
+    COMPLEXITY_HISTORY_TOP: Growers listed per section with --history
+        (default: 10)
 """
 
+import argparse
 import ast
+import json
 import sys
 from pathlib import Path
 
@@ -23,14 +34,35 @@ from pydantic import BaseModel, ConfigDict, Field
 
 # Import shared utilities
 try:
-    from _utils import find_src_directory, get_config_path, get_project_root
+    from _findings import FindingStore
+    from _trace import span
+    from _utils import (
+        find_src_directory,
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
-    from _utils import find_src_directory, get_config_path, get_project_root
+    from _findings import FindingStore
+    from _trace import span
+    from _utils import (
+        find_src_directory,
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
 
 EXTRA_FORBID = "forbid"
 
+# Row layout of collected findings; matches ComplexityIssue fields.
+ISSUE_FIELDS = ("file", "function", "line", "complexity", "nesting", "issues")
+
+COMPLEXITY_HISTORY_TOP = get_config_int("COMPLEXITY_HISTORY_TOP", 10)
+
 
 class ComplexityIssue(BaseModel):
     """Complexity issue structure."""
@@ -45,25 +77,40 @@ class ComplexityIssue(BaseModel):
     issues: list[str] = Field(default_factory=list, description="Issue descriptions")
 
 
-def analyze_file(file_path: Path, project_root: Path) -> list[ComplexityIssue]:
-    """Analyze a single Python file for complexity metrics.
+def collect_file_findings(file_path: Path, project_root: Path) -> FindingStore:
+    """Analyze a single Python file and return its raw (unvalidated) findings.
 
     Args:
         file_path: Path to Python file to analyze
         project_root: Path to project root for relative paths
 
     Returns:
-        List of complexity issues found in the file
+        FindingStore with rows in ISSUE_FIELDS order
     """
-    results: list[ComplexityIssue] = []
+    findings = FindingStore(ISSUE_FIELDS)
 
     try:
-        with open(file_path) as f:
-            tree = ast.parse(f.read(), filename=str(file_path))
+        with span("read"), open(file_path) as f:
+            source = f.read()
+        with span("parse"):
+            tree = ast.parse(source, filename=str(file_path))
     except SyntaxError:
         print(f"⚠️  Syntax error in {file_path}, skipping")
-        return []
+        return findings
+
+    # Get relative path from project root
+    try:
+        rel_path = str(file_path.relative_to(project_root))
+    except ValueError:
+        rel_path = str(file_path)
+
+    with span("visit"):
+        _collect_functions(tree, rel_path, findings)
+    return findings
+
 
+def _collect_functions(tree: ast.AST, rel_path: str, findings: FindingStore) -> None:
+    """Add a finding for every overly complex or deeply nested function."""
     for node in ast.walk(tree):
         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             complexity = calculate_complexity(node)
@@ -71,24 +118,27 @@ def analyze_file(file_path: Path, project_root: Path) -> list[ComplexityIssue]:
 
             # Report functions with complexity >10 or nesting >3
             if complexity > 10 or nesting > 3:
-                # Get relative path from project root
-                try:
-                    rel_path = file_path.relative_to(project_root)
-                except ValueError:
-                    rel_path = file_path
-
-                results.append(
-                    ComplexityIssue(
-                        file=str(rel_path),
-                        function=node.name,
-                        line=node.lineno,
-                        complexity=complexity,
-                        nesting=nesting,
-                        issues=_describe_issues(complexity, nesting),
-                    )
+                findings.add(
+                    rel_path,
+                    node.name,
+                    node.lineno,
+                    complexity,
+                    nesting,
+                    _describe_issues(complexity, nesting),
                 )
 
-    return results
+
+def analyze_file(file_path: Path, project_root: Path) -> list[ComplexityIssue]:
+    """Analyze a single Python file for complexity metrics.
+
+    Args:
+        file_path: Path to Python file to analyze
+        project_root: Path to project root for relative paths
+
+    Returns:
+        List of complexity issues found in the file
+    """
+    return collect_file_findings(file_path, project_root).to_models(ComplexityIssue)
 
 
 def calculate_complexity(node: ast.AST) -> int:
@@ -169,8 +219,29 @@ def _describe_issues(complexity: int, nesting: int) -> list[str]:
     return issues
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Analyze code complexity.")
+    _ = parser.add_argument(
+        "--history",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Report complexity trends over the last N commits instead",
+    )
+    _ = parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Trend report path for --history "
+        + "(default: .cortex/benchmark_results/complexity_history.json)",
+    )
+    return parser.parse_args(argv)
+
+
 def main():
     """Run complexity analysis on all source files."""
+    args = parse_args()
     # Get project root and source directory
     script_path = Path(__file__)
     project_root = get_project_root(script_path)
@@ -191,18 +262,26 @@ def main():
         print(f"Project root: {project_root}")
         return 1
 
+    if args.history > 0:
+        return _run_history(project_root, src_dir, args.history, args.output)
+
     print("🔍 Analyzing code complexity...\n")
 
-    all_results: list[ComplexityIssue] = []
+    findings = FindingStore(ISSUE_FIELDS)
     file_count = 0
 
-    for py_file in sorted(src_dir.rglob("*.py")):
+    with span("discover"):
+        py_files = sorted(src_dir.rglob("*.py"))
+    for py_file in py_files:
         if "__pycache__" in str(py_file) or py_file.name.startswith("test_"):
             continue
 
         file_count += 1
-        results = analyze_file(py_file, project_root)
-        all_results.extend(results)
+        findings.extend(collect_file_findings(py_file, project_root))
+
+    # Validate once at the output boundary
+    with span("validate"):
+        all_results = findings.to_models(ComplexityIssue)
 
     # Sort by complexity (highest first), then by nesting
     def sort_key(x: ComplexityIssue) -> tuple[int, int]:
@@ -210,6 +289,60 @@ def main():
 
     all_results.sort(key=sort_key, reverse=True)
 
+    with span("report"):
+        return _print_report(all_results, file_count)
+
+
+def _run_history(
+    project_root: Path, src_dir: Path, count: int, output: Path | None
+) -> int:
+    """Walk the last ``count`` commits and write the trend report."""
+    # Imported here: the history engine reuses this module's metrics
+    from _complexity_history import (
+        BlobCache,
+        blob_cache_path,
+        build_history,
+        build_report,
+        function_series,
+        module_series,
+        print_trend_summary,
+    )
+
+    try:
+        src_rel = src_dir.resolve().relative_to(project_root.resolve()).as_posix()
+    except ValueError:
+        print(f"❌ Source directory is outside the project: {src_dir}")
+        return 1
+    src_rel = "" if src_rel == "." else src_rel
+
+    print(f"🔍 Analyzing complexity over the last {count} commits...\n")
+    cache = BlobCache(blob_cache_path(project_root))
+    try:
+        with span("history"):
+            history = build_history(project_root, src_rel, count, cache)
+    except RuntimeError as e:
+        print(f"❌ Could not read git history: {e}")
+        return 1
+    finally:
+        cache.close()
+
+    with span("series"):
+        modules = module_series(history)
+        functions = function_series(history)
+    report = build_report(history, modules, functions)
+    output = output or get_benchmark_results_dir(project_root) / (
+        "complexity_history.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    _ = output.write_text(json.dumps(report) + "\n", encoding="utf-8")
+
+    print_trend_summary(history, modules, functions, COMPLEXITY_HISTORY_TOP)
+    print(f"\n📄 {output}")
+    return 0
+
+
+def _print_report(all_results: list[ComplexityIssue], file_count: int) -> int:
+    """Print the grouped report and summary; returns the exit code."""
     # Print results
     print("=" * 80)
     print("COMPLEXITY ANALYSIS REPORT")
@@ -283,15 +416,13 @@ def main():
     print("\n" + "=" * 80)
     print("RECOMMENDATIONS")
     print("=" * 80)
-    print(
-        """
+    print("""
 1. Apply guard clauses to reduce nesting
 2. Extract complex conditionals to named functions
 3. Use strategy pattern for switch-like if-elif chains
 4. Extract nested loops to separate methods
 5. Use list comprehensions for simple iterations
-"""
-    )
+""")
 
     return 0
 
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
-"""Identify files with the most uncovered lines from a coverage JSON report.
+"""Identify files with the most uncovered lines from coverage data.
 
-Parses a coverage.py JSON report (e.g. from `coverage json -o coverage.json` or
-pytest --cov-report=json:coverage.json), sorts files by uncovered line count,
-and prints the top N files with optional directory/module filtering.
+Reads a coverage.py JSON report (e.g. from `coverage json -o coverage.json` or
+pytest --cov-report=json:coverage.json) or the `.coverage` SQLite data file
+directly, streaming one file entry at a time so memory stays bounded on huge
+reports. Prints the top N files by uncovered line count (with optional
+directory/module filtering) and the aggregate coverage percentage. With
+--diff, only lines changed since the merge base are considered, listing just
+the gaps introduced by the current change.
 
 Configuration:
     COVERAGE_JSON: Path to coverage JSON file (default: coverage.json in project root)
+    COVERAGE_FILE: Path to .coverage data file (default: .coverage in project root)
     TOP_N: Number of top files to show (default: 10)
 """
 
@@ -14,68 +19,69 @@ from __future__ import annotations
 
 import argparse
 import json
+import sqlite3
 import sys
+from collections.abc import Iterator
 from pathlib import Path
-from typing import cast
 
 # Import shared utilities
 try:
-    from _utils import get_project_root
+    from _coverage_data import (
+        FileCoverage,
+        iter_coverage_files,
+        restrict_to_lines,
+        summarize_coverage,
+    )
+    from _git_diff import changed_lines
+    from _utils import get_config_int, get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
-    from _utils import get_project_root
-
-
-def load_coverage_json(path: Path) -> dict[str, object]:
-    """Load and return coverage JSON data."""
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
-
+    from _coverage_data import (
+        FileCoverage,
+        iter_coverage_files,
+        restrict_to_lines,
+        summarize_coverage,
+    )
+    from _git_diff import changed_lines
+    from _utils import get_config_int, get_config_path, get_project_root
+
+
+def resolve_coverage_source(
+    project_root: Path, json_path: Path | None, db_path: Path | None
+) -> Path | None:
+    """Pick the coverage data to read: explicit args, then JSON, then `.coverage`."""
+    if json_path is not None:
+        return json_path
+    if db_path is not None:
+        return db_path
+    candidates = [
+        get_config_path("COVERAGE_JSON", project_root / "coverage.json"),
+        get_config_path("COVERAGE_FILE", project_root / ".coverage"),
+    ]
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        if not candidate.is_absolute():
+            candidate = project_root / candidate
+        if candidate.exists():
+            return candidate
+    return None
 
-def collect_file_gaps(
-    data: dict[str, object],
-    directory_filter: str | None,
-    module_filter: str | None,
-) -> list[tuple[str, int, list[int]]]:
-    """Collect (filepath, missing_count, missing_lines) for each file."""
-    files_raw = data.get("files", {})
-    files = cast(dict[str, object], files_raw if isinstance(files_raw, dict) else {})
 
-    result: list[tuple[str, int, list[int]]] = []
-    for filepath, file_data in files.items():
-        if not isinstance(file_data, dict):
-            continue
-        fdata = cast(dict[str, object], file_data)
-        summary = fdata.get("summary")
-        missing_lines_raw = fdata.get("missing_lines", [])
-        missing_lines = cast(
-            list[int],
-            missing_lines_raw if isinstance(missing_lines_raw, list) else [],
-        )
-        if summary is None:
-            count = len(missing_lines)
-        else:
-            sum_dict = cast(dict[str, object], summary)
-            count_raw = sum_dict.get("missing_lines", len(missing_lines))
-            count = (
-                int(count_raw)
-                if isinstance(count_raw, (int, float, str))
-                else len(missing_lines)
-            )
-        if count <= 0:
-            continue
-        if directory_filter and directory_filter not in filepath:
-            continue
-        if module_filter and module_filter not in filepath:
-            continue
-        result.append((filepath, count, missing_lines))
-    return result
+def iter_changed_gaps(
+    source: Path, project_root: Path, changed: dict[str, set[int]]
+) -> Iterator[FileCoverage]:
+    """Yield per-file coverage restricted to the changed lines of each file."""
+    for item in iter_coverage_files(source, project_root, only=set(changed)):
+        restricted = restrict_to_lines(item, changed[item.path])
+        if restricted is not None:
+            yield restricted
 
 
 def main() -> int:
     """Run coverage gap analysis and print top N files."""
     parser = argparse.ArgumentParser(
-        description="Identify files with most uncovered lines from coverage JSON.",
+        description="Identify files with most uncovered lines from coverage data.",
     )
     _ = parser.add_argument(
         "--json",
@@ -84,11 +90,17 @@ def main() -> int:
         default=None,
         help="Path to coverage JSON (default: coverage.json in project root)",
     )
+    _ = parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="Path to .coverage SQLite data file (used when no JSON report exists)",
+    )
     _ = parser.add_argument(
         "--top",
         "-n",
         type=int,
-        default=10,
+        default=get_config_int("TOP_N", 10),
         help="Number of top files to show (default: 10)",
     )
     _ = parser.add_argument(
@@ -105,15 +117,25 @@ def main() -> int:
         default=None,
         help="Filter to file paths containing this module name substring",
     )
+    _ = parser.add_argument(
+        "--diff",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="BASE",
+        help="Only count lines changed since the merge base with BASE "
+        + "(default base: DIFF_BASE or main)",
+    )
     args = parser.parse_args()
 
     script_path = Path(__file__).resolve()
     project_root = get_project_root(script_path)
-    json_path = args.json or project_root / "coverage.json"
+    source = resolve_coverage_source(project_root, args.json, args.db)
 
-    if not json_path.exists():
+    if source is None or not source.exists():
+        missing = source or project_root / "coverage.json"
         print(
-            f"Error: Coverage JSON not found at {json_path}",
+            f"Error: Coverage data not found at {missing}",
             file=sys.stderr,
         )
         print(
@@ -123,31 +145,54 @@ def main() -> int:
         )
         return 1
 
+    directory_filter: str | None = args.directory
+    module_filter: str | None = args.module
+
+    def _matches(filepath: str) -> bool:
+        if directory_filter and directory_filter not in filepath:
+            return False
+        return not (module_filter and module_filter not in filepath)
+
+    files: Iterator[FileCoverage]
+    if args.diff is not None:
+        changed = changed_lines(project_root, args.diff or None)
+        if changed is None:
+            print(
+                "Error: No merge base found for --diff (set DIFF_BASE)",
+                file=sys.stderr,
+            )
+            return 1
+        files = iter_changed_gaps(source, project_root, changed)
+    else:
+        files = iter_coverage_files(source, project_root)
+
     try:
-        data = load_coverage_json(json_path)
-    except (json.JSONDecodeError, OSError) as e:
-        print(f"Error reading {json_path}: {e}", file=sys.stderr)
+        summary = summarize_coverage(files, top_n=args.top, path_filter=_matches)
+    except (json.JSONDecodeError, OSError, sqlite3.Error) as e:
+        print(f"Error reading {source}: {e}", file=sys.stderr)
         return 1
 
-    gaps = collect_file_gaps(
-        data,
-        directory_filter=args.directory,
-        module_filter=args.module,
-    )
-    gaps.sort(key=lambda x: -x[1])
-
-    top = gaps[: args.top]
+    top = summary.top_gaps
     if not top:
         print("No uncovered lines found (or no files match filters).")
         return 0
 
-    print(f"Top {len(top)} files by uncovered line count:\n")
-    for i, (filepath, count, lines) in enumerate(top, 1):
+    scope = " changed" if args.diff is not None else ""
+    print(f"Top {len(top)} files by uncovered{scope} line count:\n")
+    for i, gap in enumerate(top, 1):
+        lines = gap.missing_lines
         line_preview = (
-            f" (e.g. {lines[:5]}{'...' if len(lines) > 5 else ''})" if lines else ""
+            f" (e.g. {list(lines[:5])}{'...' if len(lines) > 5 else ''})"
+            if lines
+            else ""
         )
-        print(f"  {i}. {filepath}: {count} uncovered{line_preview}")
+        print(f"  {i}. {gap.path}: {gap.missing_count} uncovered{line_preview}")
 
+    print(
+        f"\nAggregate{scope} coverage: {summary.percent_covered:.2f}% "
+        + f"({summary.covered_lines}/{summary.num_statements} lines, "
+        + f"{summary.file_count} files)"
+    )
     return 0
 
 
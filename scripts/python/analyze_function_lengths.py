@@ -19,6 +19,7 @@ from pathlib import Path
 
 # Import shared utilities
 try:
+    from _trace import span, traced
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -28,6 +29,7 @@ try:
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _trace import span, traced
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -96,6 +98,7 @@ def count_logical_lines(
     return logical_count
 
 
+@traced("analyze file")
 def analyze_file(file_path: Path, project_root: Path) -> list[FunctionViolation]:
     """Analyze a Python file for function length violations.
 
@@ -165,7 +168,9 @@ def main() -> int:
     # Collect all violations
     all_violations: list[FunctionViolation] = []
 
-    for py_file in src_dir.rglob("*.py"):
+    with span("discover"):
+        py_files = list(src_dir.rglob("*.py"))
+    for py_file in py_files:
         # Skip __init__.py files
         if py_file.name == "__init__.py":
             continue
@@ -176,7 +181,13 @@ def main() -> int:
     # Sort by severity (most over limit first)
     all_violations.sort(key=lambda v: v.over_limit, reverse=True)
 
-    # Print report
+    with span("report"):
+        _print_report(all_violations)
+    return 0
+
+
+def _print_report(all_violations: list[FunctionViolation]) -> None:
+    """Print the markdown report of the worst violations and files."""
     print("# Function Length Violations Report")
     print()
     print(f"**Total Violations:** {len(all_violations)}")
@@ -218,8 +229,6 @@ def main() -> int:
         total_over = sum(v.over_limit for v in violations)
         print(f"| {file_name} | {len(violations)} | +{total_over} |")
 
-    return 0
-
 
 if __name__ == "__main__":
     sys.exit(main())
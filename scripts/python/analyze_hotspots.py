@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""Rank source files by churn × complexity to focus performance review.
+
+Complex code that never changes is rarely where regressions come from; code
+that is both complex and changed often is. This script mines ``git log
+--numstat`` for how often each file changed and combines it with the
+cyclomatic complexity and nesting depth used by analyze_complexity.py and
+the anti-pattern findings of analyze_performance.py:
+
+    score = churn × mean(complexity, nesting, performance findings)
+
+with every factor scaled to 0..1 by its maximum over the scored files.
+
+The mined history is cached per commit under .cortex/.cache/hotspots, so a
+re-run only reads commits made since the last one (history rewritten under
+the cache, e.g. by a rebase, is re-read in full). Renames carry a file's
+history to its new path.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/analyze_hotspots.py [--output DIR]
+
+Output:
+    - .cortex/reviews/hotspots.json: every scored file with its factors
+    - .cortex/reviews/hotspots.md: ranked table of the top hotspots
+
+Configuration:
+    SRC_DIR: Source directory path (default: auto-detected)
+    HOTSPOT_DAYS: Churn window in days before the HEAD commit; 0 uses the
+        whole history (default: 365)
+    HOTSPOT_TOP: Hotspots listed in the markdown report (default: 20)
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    from _utils import (
+        find_src_directory,
+        get_cache_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+        get_reviews_dir,
+    )
+    from analyze_complexity import calculate_complexity, calculate_nesting_depth
+    from analyze_performance import PerformanceAnalyzer
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _utils import (
+        find_src_directory,
+        get_cache_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+        get_reviews_dir,
+    )
+    from analyze_complexity import calculate_complexity, calculate_nesting_depth
+    from analyze_performance import PerformanceAnalyzer
+
+HOTSPOT_DAYS = get_config_int("HOTSPOT_DAYS", 365)
+HOTSPOT_TOP = get_config_int("HOTSPOT_TOP", 20)
+
+_CACHE_VERSION = 1
+_RECORD_SEP = "\x1e"
+
+# One commit: (sha, unix time, [(path, added, deleted, old path or "")])
+Change = tuple[str, int, int, str]
+Commit = tuple[str, int, list[Change]]
+
+
+@dataclass(slots=True)
+class FileChurn:
+    """How often and how much one file changed in the window."""
+
+    commits: int = 0
+    lines_changed: int = 0
+    last_changed: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class FileMetrics:
+    """Static complexity of one source file."""
+
+    functions: int
+    complexity: int
+    max_complexity: int
+    max_nesting: int
+    perf_findings: int
+
+
+@dataclass(frozen=True, slots=True)
+class Hotspot:
+    """A scored file."""
+
+    path: str
+    score: float
+    commits: int
+    lines_changed: int
+    last_changed: str
+    functions: int
+    complexity: int
+    max_complexity: int
+    max_nesting: int
+    perf_findings: int
+
+
+def _git(project_root: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["git", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def split_rename(path: str) -> tuple[str, str]:
+    """``(old, new)`` paths of a numstat entry; old is "" when not a rename.
+
+    Handles both ``old => new`` and ``dir/{old => new}/file`` forms.
+    """
+    if " => " not in path:
+        return "", path
+    if "{" in path and "}" in path:
+        prefix, rest = path.split("{", 1)
+        middle, suffix = rest.split("}", 1)
+        old, new = middle.split(" => ", 1)
+        # An empty side ("{ => sub}") leaves a doubled slash behind
+        return (
+            (prefix + old + suffix).replace("//", "/"),
+            (prefix + new + suffix).replace("//", "/"),
+        )
+    old, new = path.split(" => ", 1)
+    return old, new
+
+
+def parse_numstat_log(text: str) -> list[Commit]:
+    """Parse ``git log --numstat --format=<RS>%H %ct`` output, oldest first."""
+    commits: list[Commit] = []
+    for record in text.split(_RECORD_SEP):
+        lines = record.strip("\n").splitlines()
+        if not lines:
+            continue
+        sha, _, timestamp = lines[0].partition(" ")
+        changes: list[Change] = []
+        for line in lines[1:]:
+            parts = line.split("\t", 2)
+            if len(parts) != 3:
+                continue
+            added, deleted, path = parts
+            old, new = split_rename(path)
+            # Binary files report "-" for both counts
+            changes.append(
+                (
+                    new,
+                    int(added) if added.isdigit() else 0,
+                    int(deleted) if deleted.isdigit() else 0,
+                    old,
+                )
+            )
+        commits.append((sha, int(timestamp or 0), changes))
+    commits.reverse()
+    return commits
+
+
+def read_commits(project_root: Path, revision_range: str) -> list[Commit]:
+    """Mine non-merge commits of ``revision_range`` with their numstat."""
+    result = _git(
+        project_root,
+        "log",
+        "--no-merges",
+        "-M",
+        "--numstat",
+        f"--format={_RECORD_SEP}%H %ct",
+        revision_range,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "git log failed")
+    return parse_numstat_log(result.stdout)
+
+
+def _is_ancestor(project_root: Path, ancestor: str, head: str) -> bool:
+    result = _git(project_root, "merge-base", "--is-ancestor", ancestor, head)
+    return result.returncode == 0
+
+
+def load_history(project_root: Path) -> tuple[str, list[Commit]]:
+    """Return HEAD and its mined history, reading only commits not yet cached."""
+    head = _git(project_root, "rev-parse", "HEAD").stdout.strip()
+    if not head:
+        raise RuntimeError("not a git repository (or no commits yet)")
+    cache_path = get_cache_dir(project_root, "hotspots") / "churn.json"
+    cached_head = ""
+    commits: list[Commit] = []
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        if data.get("version") == _CACHE_VERSION:
+            cached_head = str(data["head"])
+            commits = [
+                (
+                    str(sha),
+                    int(ts),
+                    [(str(p), int(a), int(d), str(o)) for p, a, d, o in changes],
+                )
+                for sha, ts, changes in data["commits"]
+            ]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        cached_head, commits = "", []
+    if cached_head == head:
+        return head, commits
+    if cached_head and _is_ancestor(project_root, cached_head, head):
+        new = read_commits(project_root, f"{cached_head}..{head}")
+        commits.extend(new)
+        print(f"📜 Read {len(new)} new commit(s); {len(commits)} cached")
+    else:
+        commits = read_commits(project_root, head)
+        print(f"📜 Read {len(commits)} commit(s)")
+    payload = {"version": _CACHE_VERSION, "head": head, "commits": commits}
+    _ = cache_path.write_text(json.dumps(payload), encoding="utf-8")
+    return head, commits
+
+
+def aggregate_churn(commits: list[Commit], since: int) -> dict[str, FileChurn]:
+    """Churn per current path from commits at or after ``since``.
+
+    Renames move everything recorded for the old path to the new one,
+    including history from before the window.
+    """
+    churn: dict[str, FileChurn] = {}
+    for _sha, timestamp, changes in commits:
+        for path, added, deleted, old in changes:
+            if old and old in churn:
+                moved = churn.pop(old)
+                existing = churn.get(path)
+                if existing is not None:
+                    moved.commits += existing.commits
+                    moved.lines_changed += existing.lines_changed
+                    moved.last_changed = max(moved.last_changed, existing.last_changed)
+                churn[path] = moved
+            if timestamp < since:
+                continue
+            entry = churn.setdefault(path, FileChurn())
+            entry.commits += 1
+            entry.lines_changed += added + deleted
+            entry.last_changed = max(entry.last_changed, timestamp)
+    return {path: c for path, c in churn.items() if c.commits}
+
+
+def measure_file(path: Path) -> FileMetrics | None:
+    """Complexity, nesting and performance findings of a Python file."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        return None
+    complexities: list[int] = []
+    nesting = 0
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            complexities.append(calculate_complexity(node))
+            nesting = max(nesting, calculate_nesting_depth(node))
+    analyzer = PerformanceAnalyzer(str(path))
+    analyzer.visit(tree)
+    return FileMetrics(
+        functions=len(complexities),
+        complexity=sum(complexities),
+        max_complexity=max(complexities, default=0),
+        max_nesting=nesting,
+        perf_findings=len(analyzer.findings),
+    )
+
+
+def _scale(value: float, maximum: float) -> float:
+    return value / maximum if maximum else 0.0
+
+
+def rank_hotspots(
+    churn: dict[str, FileChurn], metrics: dict[str, FileMetrics]
+) -> list[Hotspot]:
+    """Score every file that has both churn and metrics, highest first."""
+    paths = [p for p in metrics if p in churn]
+    if not paths:
+        return []
+    max_commits = max(churn[p].commits for p in paths)
+    max_complexity = max(metrics[p].complexity for p in paths)
+    max_nesting = max(metrics[p].max_nesting for p in paths)
+    max_perf = max(metrics[p].perf_findings for p in paths)
+    hotspots: list[Hotspot] = []
+    for path in paths:
+        c, m = churn[path], metrics[path]
+        static = (
+            _scale(m.complexity, max_complexity)
+            + _scale(m.max_nesting, max_nesting)
+            + _scale(m.perf_findings, max_perf)
+        ) / 3
+        hotspots.append(
+            Hotspot(
+                path=path,
+                score=round(_scale(c.commits, max_commits) * static, 4),
+                commits=c.commits,
+                lines_changed=c.lines_changed,
+                last_changed=time.strftime("%Y-%m-%d", time.gmtime(c.last_changed)),
+                functions=m.functions,
+                complexity=m.complexity,
+                max_complexity=m.max_complexity,
+                max_nesting=m.max_nesting,
+                perf_findings=m.perf_findings,
+            )
+        )
+    return sorted(hotspots, key=lambda h: (-h.score, -h.commits, h.path))
+
+
+def render_markdown(hotspots: list[Hotspot], window: str, top: int) -> str:
+    """Ranked markdown table of the top hotspots."""
+    lines = [
+        "# Churn × Complexity Hotspots",
+        "",
+        f"Churn window: {window}. Score = churn × mean(complexity, nesting, "
+        + "performance findings), each scaled to the maximum over scored files.",
+        "",
+        "| # | File | Score | Commits | Lines changed | Complexity (max) "
+        + "| Nesting | Perf findings | Last changed |",
+        "|---|------|-------|---------|---------------|------------------"
+        + "|---------|---------------|--------------|",
+    ]
+    for i, h in enumerate(hotspots[:top], 1):
+        lines.append(
+            f"| {i} | `{h.path}` | {h.score:.3f} | {h.commits} | {h.lines_changed} "
+            + f"| {h.complexity} ({h.max_complexity}) | {h.max_nesting} "
+            + f"| {h.perf_findings} | {h.last_changed} |"
+        )
+    if not hotspots:
+        lines.append("| – | No changed source files in the window | | | | | | | |")
+    return "\n".join(lines) + "\n"
+
+
+def _source_dir(project_root: Path) -> Path:
+    src_dir = get_config_path("SRC_DIR")
+    if src_dir is None:
+        return find_src_directory(project_root)
+    return src_dir if src_dir.is_absolute() else project_root / src_dir
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Rank source files by churn × complexity."
+    )
+    _ = parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Directory for hotspots.json and hotspots.md (default: .cortex/reviews)",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    """Mine churn, measure sources and write the hotspot reports."""
+    args = parse_args()
+    project_root = get_project_root(Path(__file__))
+    src_dir = _source_dir(project_root)
+    if not src_dir.exists():
+        print(f"Error: Source directory {src_dir} does not exist", file=sys.stderr)
+        return 1
+    try:
+        head, commits = load_history(project_root)
+    except RuntimeError as e:
+        print(f"Error: Could not read git history: {e}", file=sys.stderr)
+        return 1
+
+    since = 0
+    window = "whole history"
+    if HOTSPOT_DAYS > 0 and commits:
+        since = max(ts for _, ts, _ in commits) - HOTSPOT_DAYS * 86400
+        window = f"{HOTSPOT_DAYS} days before HEAD"
+    churn = aggregate_churn(commits, since)
+
+    metrics: dict[str, FileMetrics] = {}
+    for py_file in sorted(src_dir.rglob("*.py")):
+        if "__pycache__" in py_file.parts:
+            continue
+        try:
+            rel_path = py_file.resolve().relative_to(project_root.resolve()).as_posix()
+        except ValueError:
+            continue
+        if rel_path not in churn:
+            continue
+        measured = measure_file(py_file)
+        if measured is not None:
+            metrics[rel_path] = measured
+
+    hotspots = rank_hotspots(churn, metrics)
+    output_dir = args.output or get_reviews_dir(project_root)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "head": head,
+        "window": window,
+        "source_dir": str(src_dir),
+        "hotspots": [asdict(h) for h in hotspots],
+    }
+    json_path = output_dir / "hotspots.json"
+    md_path = output_dir / "hotspots.md"
+    _ = json_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    _ = md_path.write_text(
+        render_markdown(hotspots, window, HOTSPOT_TOP), encoding="utf-8"
+    )
+
+    print(f"\n🔥 Top hotspots ({len(hotspots)} changed source files, {window}):")
+    for i, h in enumerate(hotspots[:10], 1):
+        print(
+            f"  {i:2d}. {h.score:.3f}  {h.path}  "
+            + f"({h.commits} commits, complexity {h.complexity}, "
+            + f"nesting {h.max_nesting}, {h.perf_findings} perf findings)"
+        )
+    print(f"\n📄 {md_path}\n📄 {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
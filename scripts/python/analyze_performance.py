@@ -6,30 +6,79 @@ This script analyzes the codebase for common performance anti-patterns:
 - Inefficient string operations
 - Repeated expensive operations
 - Missing caching opportunities
+- Pydantic validation on hot paths (see _pydantic_perf.py)
+
+Static severity says nothing about how often code runs. Pass cProfile
+``.pstats`` files (or directories holding them, e.g. the output of
+profile_operations.py or GATE_PROFILE=1) and each finding is joined to its
+enclosing function by file and line range; "Top priority fixes" then ranks
+findings by the function's measured cumulative time and call count, so
+hot-path issues come before ones in code that barely runs.
+
+Usage:
+    analyze_performance.py [PSTATS ...]
 
 Configuration:
     SRC_DIR: Source directory path (default: auto-detected)
     FOCUS_MODULES: Comma-separated list of module paths to focus on (optional)
 """
 
+import argparse
 import ast
 import os
+import pstats
 import sys
 from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 
 from pydantic import BaseModel, ConfigDict, Field
 
 # Import shared utilities
 try:
+    from _findings import FindingStore
+    from _pydantic_perf import check_tree, collect_models
     from _utils import find_src_directory, get_config_path, get_project_root
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _findings import FindingStore
+    from _pydantic_perf import check_tree, collect_models
     from _utils import find_src_directory, get_config_path, get_project_root
 
 EXTRA_FORBID = "forbid"
 
+# Row layout of the visitor's FindingStore; matches PerformanceIssue fields.
+ISSUE_FIELDS = ("type", "severity", "line", "function", "message")
+SEVERITY_ORDER = ("high", "medium", "low")
+SEVERITY_ICONS = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+TOP_PRIORITY = 5
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionSpan:
+    """Lines of one function definition.
+
+    ``first_line`` is the first decorator's line when decorated, which is
+    what code objects (and so cProfile) report as the function's line.
+    """
+
+    first_line: int
+    def_line: int
+    end_line: int
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionTiming:
+    """Measured cost of one function, summed over the loaded profiles."""
+
+    calls: int
+    cumulative_s: float
+
+
+# (module path, finding row, timing of the enclosing function)
+JoinedFinding = tuple[str, tuple[object, ...], FunctionTiming | None]
+
 
 class PerformanceIssue(BaseModel):
     """Performance issue structure."""
@@ -50,18 +99,26 @@ class PerformanceAnalyzer(ast.NodeVisitor):
 
     def __init__(self, filename: str):
         self.filename = filename
-        self.issues: list[PerformanceIssue] = []
+        self.findings = FindingStore(ISSUE_FIELDS)
+        self.spans: list[FunctionSpan] = []
         self.function_name: str | None = None
         self.nested_loops = 0
         self.loop_depth = 0
 
+    def _add_span(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        first_line = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+        end_line = node.end_lineno or node.lineno
+        self.spans.append(FunctionSpan(first_line, node.lineno, end_line))
+
     def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._add_span(node)
         old_function = self.function_name
         self.function_name = node.name
         self.generic_visit(node)
         self.function_name = old_function
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._add_span(node)
         old_function = self.function_name
         self.function_name = node.name
         self.generic_visit(node)
@@ -71,17 +128,15 @@ class PerformanceAnalyzer(ast.NodeVisitor):
         self.loop_depth += 1
 
         if self.loop_depth >= 2:
-            self.issues.append(
-                PerformanceIssue(
-                    type="nested_loops",
-                    severity="high",
-                    line=node.lineno,
-                    function=self.function_name,
-                    message=(
-                        f"Nested loop detected (depth {self.loop_depth}) - "
-                        "potential O(n²) or worse"
-                    ),
-                )
+            self.findings.add(
+                "nested_loops",
+                "high",
+                node.lineno,
+                self.function_name,
+                (
+                    f"Nested loop detected (depth {self.loop_depth}) - "
+                    "potential O(n²) or worse"
+                ),
             )
 
         self.generic_visit(node)
@@ -91,17 +146,15 @@ class PerformanceAnalyzer(ast.NodeVisitor):
         self.loop_depth += 1
 
         if self.loop_depth >= 2:
-            self.issues.append(
-                PerformanceIssue(
-                    type="nested_loops",
-                    severity="high",
-                    line=node.lineno,
-                    function=self.function_name,
-                    message=(
-                        f"Nested while loop (depth {self.loop_depth}) - "
-                        "potential O(n²) or worse"
-                    ),
-                )
+            self.findings.add(
+                "nested_loops",
+                "high",
+                node.lineno,
+                self.function_name,
+                (
+                    f"Nested while loop (depth {self.loop_depth}) - "
+                    "potential O(n²) or worse"
+                ),
             )
 
         self.generic_visit(node)
@@ -111,26 +164,22 @@ class PerformanceAnalyzer(ast.NodeVisitor):
         # Check for repeated list appends in loops
         if self.loop_depth > 0 and node.attr == "append":
             if isinstance(node.value, ast.Name):
-                self.issues.append(
-                    PerformanceIssue(
-                        type="list_append_in_loop",
-                        severity="medium",
-                        line=node.lineno,
-                        function=self.function_name,
-                        message="List append in loop - consider list comprehension",
-                    )
+                self.findings.add(
+                    "list_append_in_loop",
+                    "medium",
+                    node.lineno,
+                    self.function_name,
+                    "List append in loop - consider list comprehension",
                 )
 
         # Check for .split() in loops
         if self.loop_depth > 0 and node.attr == "split":
-            self.issues.append(
-                PerformanceIssue(
-                    type="string_split_in_loop",
-                    severity="medium",
-                    line=node.lineno,
-                    function=self.function_name,
-                    message="String split in loop - consider moving outside",
-                )
+            self.findings.add(
+                "string_split_in_loop",
+                "medium",
+                node.lineno,
+                self.function_name,
+                "String split in loop - consider moving outside",
             )
 
         self.generic_visit(node)
@@ -140,36 +189,32 @@ class PerformanceAnalyzer(ast.NodeVisitor):
         if isinstance(node.func, ast.Attribute):
             if node.func.attr in ["read_file", "write_file", "exists"]:
                 if self.loop_depth > 0:
-                    self.issues.append(
-                        PerformanceIssue(
-                            type="file_io_in_loop",
-                            severity="high",
-                            line=node.lineno,
-                            function=self.function_name,
-                            message=(
-                                f"File I/O ({node.func.attr}) in loop - "
-                                "major performance impact"
-                            ),
-                        )
+                    self.findings.add(
+                        "file_io_in_loop",
+                        "high",
+                        node.lineno,
+                        self.function_name,
+                        (
+                            f"File I/O ({node.func.attr}) in loop - "
+                            "major performance impact"
+                        ),
                     )
 
             # Check for len() in loop condition (common in while loops)
             if node.func.attr == "len" and self.loop_depth > 0:
-                self.issues.append(
-                    PerformanceIssue(
-                        type="len_in_loop",
-                        severity="low",
-                        line=node.lineno,
-                        function=self.function_name,
-                        message="len() in loop - consider caching",
-                    )
+                self.findings.add(
+                    "len_in_loop",
+                    "low",
+                    node.lineno,
+                    self.function_name,
+                    "len() in loop - consider caching",
                 )
 
         self.generic_visit(node)
 
 
-def analyze_file(filepath: Path) -> list[PerformanceIssue]:
-    """Analyze a Python file for performance issues."""
+def collect_file_analysis(filepath: Path) -> tuple[FindingStore, list[FunctionSpan]]:
+    """Analyze a Python file; return its raw findings and function spans."""
     try:
         with open(filepath) as f:
             content = f.read()
@@ -177,17 +222,223 @@ def analyze_file(filepath: Path) -> list[PerformanceIssue]:
         tree = ast.parse(content, filename=str(filepath))
         analyzer = PerformanceAnalyzer(str(filepath))
         analyzer.visit(tree)
-        return analyzer.issues
+        check_tree(tree, analyzer.findings, collect_models([tree]))
+        return analyzer.findings, analyzer.spans
     except SyntaxError as e:
         print(f"Syntax error in {filepath}: {e}")
-        return []
+        return FindingStore(ISSUE_FIELDS), []
     except Exception as e:
         print(f"Error analyzing {filepath}: {e}")
-        return []
+        return FindingStore(ISSUE_FIELDS), []
+
+
+def collect_file_findings(filepath: Path) -> FindingStore:
+    """Analyze a Python file and return its raw (unvalidated) findings."""
+    return collect_file_analysis(filepath)[0]
+
+
+def analyze_file(filepath: Path) -> list[PerformanceIssue]:
+    """Analyze a Python file for performance issues."""
+    return collect_file_findings(filepath).to_models(PerformanceIssue)
+
+
+def enclosing_span(spans: list[FunctionSpan], line: int) -> FunctionSpan | None:
+    """Innermost function whose definition contains ``line``."""
+    best: FunctionSpan | None = None
+    for span in spans:
+        contains = span.first_line <= line <= span.end_line
+        if contains and (best is None or span.first_line >= best.first_line):
+            best = span
+    return best
+
+
+def _common_suffix(a: tuple[str, ...], b: tuple[str, ...]) -> int:
+    count = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        count += 1
+    return count
+
+
+class ProfileIndex:
+    """cProfile statistics looked up by source file and function line.
+
+    Profiles may come from another checkout or machine, so files match on
+    the longest common path suffix (at least the parent directory and file
+    name) rather than on absolute paths.
+    """
+
+    def __init__(self, paths: list[Path]):
+        stats = pstats.Stats(*(str(p) for p in paths))
+        self.total_s: float = (
+            stats.total_tt
+        )  # pyright: ignore[reportAttributeAccessIssue]
+        self._by_line: defaultdict[
+            tuple[str, int], list[tuple[tuple[str, ...], FunctionTiming]]
+        ] = defaultdict(list)
+        raw: dict[tuple[str, int, str], tuple[int, int, float, float, object]]
+        raw = stats.stats  # pyright: ignore[reportAttributeAccessIssue]
+        for (filename, line, _name), (_cc, calls, _tt, cumulative, _) in raw.items():
+            parts = Path(filename).parts
+            if parts:
+                self._by_line[(parts[-1], line)].append(
+                    (parts, FunctionTiming(calls, cumulative))
+                )
+
+    def lookup(self, filepath: Path, span: FunctionSpan) -> FunctionTiming | None:
+        """Timing of the function at ``span`` in ``filepath``, if profiled."""
+        parts = filepath.resolve().parts
+        need = min(2, len(parts))
+        for line in dict.fromkeys((span.first_line, span.def_line)):
+            candidates = [
+                (_common_suffix(parts, other), timing)
+                for other, timing in self._by_line.get((filepath.name, line), [])
+            ]
+            best = max((n for n, _ in candidates), default=0)
+            if best < need:
+                continue
+            matched = [timing for n, timing in candidates if n == best]
+            return FunctionTiming(
+                calls=sum(t.calls for t in matched),
+                cumulative_s=sum(t.cumulative_s for t in matched),
+            )
+        return None
+
+
+def resolve_profile_paths(args: list[str]) -> list[Path]:
+    """Expand directories to the ``.pstats`` files they contain."""
+    paths: list[Path] = []
+    for arg in args:
+        path = Path(arg)
+        if path.is_dir():
+            paths.extend(sorted(path.rglob("*.pstats")))
+        elif path.exists():
+            paths.append(path)
+        else:
+            print(f"⚠️  Profile not found: {arg}", file=sys.stderr)
+    return paths
+
+
+def finding_timings(
+    filepath: Path,
+    findings: FindingStore,
+    spans: list[FunctionSpan],
+    profile: ProfileIndex,
+) -> list[FunctionTiming | None]:
+    """Timing of each finding's enclosing function, in row order."""
+    timings: list[FunctionTiming | None] = []
+    for line in findings.column("line"):
+        span = enclosing_span(spans, int(str(line)))
+        timings.append(profile.lookup(filepath, span) if span is not None else None)
+    return timings
+
+
+def rank_findings(
+    findings: list[JoinedFinding],
+) -> list[JoinedFinding]:
+    """Top priority order: measured hot paths first, then high severity.
+
+    Findings in profiled functions rank by cumulative time, then call count;
+    unprofiled findings follow only when high severity, in file order.
+    """
+
+    def cost(finding: JoinedFinding) -> tuple[float, int, int]:
+        _module, row, timing = finding
+        assert timing is not None
+        return (-timing.cumulative_s, -timing.calls, SEVERITY_ORDER.index(str(row[1])))
+
+    profiled = sorted((f for f in findings if f[2] is not None), key=cost)
+    unprofiled = [f for f in findings if f[2] is None and f[1][1] == "high"]
+    return profiled + unprofiled
+
+
+def _format_timing(timing: FunctionTiming | None) -> str:
+    if timing is None:
+        return ""
+    return f" ⏱ {timing.cumulative_s * 1000:.1f}ms cum, {timing.calls:,} calls"
+
+
+def _print_file_findings(
+    module_path: str,
+    findings: FindingStore,
+    timings: list[FunctionTiming | None] | None = None,
+) -> None:
+    """Print one file's findings grouped by severity, straight from the rows."""
+    print(f"\n📁 {module_path}")
+    print("-" * 70)
+
+    rows = findings.rows()
+    row_timings = timings or [None] * len(rows)
+    by_severity: defaultdict[
+        object, list[tuple[tuple[object, ...], FunctionTiming | None]]
+    ] = defaultdict(list)
+    for row, timing in zip(rows, row_timings):
+        by_severity[row[1]].append((row, timing))
+
+    for severity in SEVERITY_ORDER:
+        severity_icon = SEVERITY_ICONS[severity]
+        for row, timing in by_severity.get(severity, []):
+            _type, _severity, line, function, message = row
+            print(
+                f"  {severity_icon} Line {line:4d} "
+                + f"[{function or 'module'}]: {message}{_format_timing(timing)}"
+            )
+
+
+def _print_profiled_priorities(
+    all_findings: dict[str, FindingStore],
+    all_timings: dict[str, list[FunctionTiming | None]],
+    profile: ProfileIndex,
+) -> None:
+    """Print the top priority fixes ranked by measured cost."""
+    joined: list[JoinedFinding] = []
+    for module, findings in all_findings.items():
+        joined.extend(
+            (module, row, timing)
+            for row, timing in zip(findings.rows(), all_timings[module])
+        )
+    profiled = sum(1 for _, _, timing in joined if timing is not None)
+    print(
+        f"\nProfiled: {profiled} of {len(joined)} issues in functions that ran "
+        + f"({profile.total_s:.2f}s total profile time)"
+    )
+    print("\nTop priority fixes (by measured cumulative time):")
+    for i, (module, row, timing) in enumerate(rank_findings(joined)[:TOP_PRIORITY], 1):
+        _type, severity, line, _func, message = row
+        cost = _format_timing(timing) or " (not profiled)"
+        print(f"  {i}. {module}:{line} [{severity}] - {message}{cost}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Analyze code for performance anti-patterns."
+    )
+    _ = parser.add_argument(
+        "pstats",
+        nargs="*",
+        help="cProfile .pstats files or directories of them; findings are "
+        + "ranked by the measured cost of their functions",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
     """Analyze all Python files in the project."""
+    args = parse_args()
+    profile: ProfileIndex | None = None
+    profile_paths = resolve_profile_paths(args.pstats)
+    if profile_paths:
+        try:
+            profile = ProfileIndex(profile_paths)
+        except (OSError, TypeError, ValueError, EOFError) as e:
+            print(f"Error: Could not load profiles: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.pstats:
+        print("Error: No .pstats files found", file=sys.stderr)
+        sys.exit(1)
+
     # Get project root and source directory
     script_path = Path(__file__)
     project_root = get_project_root(script_path)
@@ -215,7 +466,8 @@ def main():
         # Analyze all Python files
         focus_modules = None
 
-    all_issues: defaultdict[str, list[PerformanceIssue]] = defaultdict(list)
+    all_findings: dict[str, FindingStore] = {}
+    all_timings: dict[str, list[FunctionTiming | None]] = {}
     total_issues = 0
 
     print("=" * 70)
@@ -223,6 +475,7 @@ def main():
     print("=" * 70)
     print()
 
+    targets: list[tuple[str, Path]] = []
     if focus_modules:
         # Analyze specific modules
         for module_path in focus_modules:
@@ -230,34 +483,7 @@ def main():
             if not filepath.exists():
                 print(f"⚠️  File not found: {module_path}")
                 continue
-
-            issues = analyze_file(filepath)
-            if issues:
-                all_issues[module_path] = issues
-                total_issues += len(issues)
-
-                print(f"\n📁 {module_path}")
-                print("-" * 70)
-
-                # Group by severity
-                by_severity_focus: defaultdict[str, list[PerformanceIssue]] = (
-                    defaultdict(list)
-                )
-                for issue in issues:
-                    by_severity_focus[issue.severity].append(issue)
-
-                for severity in ["high", "medium", "low"]:
-                    if severity in by_severity_focus:
-                        for issue in by_severity_focus[severity]:
-                            severity_icon = {
-                                "high": "🔴",
-                                "medium": "🟡",
-                                "low": "🟢",
-                            }[severity]
-                            print(
-                                f"  {severity_icon} Line {issue.line:4d} "
-                                + f"[{issue.function or 'module'}]: {issue.message}"
-                            )
+            targets.append((module_path, filepath))
     else:
         # Analyze all Python files
         for py_file in sorted(src_dir.rglob("*.py")):
@@ -268,62 +494,51 @@ def main():
                 relative_path = py_file.relative_to(src_dir)
             except ValueError:
                 relative_path = py_file
-
-            issues = analyze_file(py_file)
-            if issues:
-                all_issues[str(relative_path)] = issues
-                total_issues += len(issues)
-
-                print(f"\n📁 {relative_path}")
-                print("-" * 70)
-
-                # Group by severity
-                by_severity_all: defaultdict[str, list[PerformanceIssue]] = defaultdict(
-                    list
+            targets.append((str(relative_path), py_file))
+
+    for module_path, filepath in targets:
+        findings, spans = collect_file_analysis(filepath)
+        if findings:
+            all_findings[module_path] = findings
+            total_issues += len(findings)
+            if profile is not None:
+                all_timings[module_path] = finding_timings(
+                    filepath, findings, spans, profile
                 )
-                for issue in issues:
-                    by_severity_all[issue.severity].append(issue)
-
-                for severity in ["high", "medium", "low"]:
-                    if severity in by_severity_all:
-                        for issue in by_severity_all[severity]:
-                            severity_icon = {
-                                "high": "🔴",
-                                "medium": "🟡",
-                                "low": "🟢",
-                            }[severity]
-                            print(
-                                f"  {severity_icon} Line {issue.line:4d} "
-                                + f"[{issue.function or 'module'}]: {issue.message}"
-                            )
+            _print_file_findings(module_path, findings, all_timings.get(module_path))
 
     # Summary
     print("\n" + "=" * 70)
     print("SUMMARY")
     print("=" * 70)
-    print(f"Total files analyzed: {len(all_issues)}")
+    print(f"Total files analyzed: {len(all_findings)}")
     print(f"Total issues found: {total_issues}")
 
     if total_issues > 0:
         print("\nIssues by severity:")
-        severity_counts: defaultdict[str, int] = defaultdict(int)
-        for issues in all_issues.values():
-            for issue in issues:
-                severity_counts[issue.severity] += 1
+        severity_counts: defaultdict[object, int] = defaultdict(int)
+        for findings in all_findings.values():
+            for severity in findings.column("severity"):
+                severity_counts[severity] += 1
 
-        for severity in ["high", "medium", "low"]:
+        for severity in SEVERITY_ORDER:
             if severity in severity_counts:
                 print(f"  {severity.capitalize():8s}: {severity_counts[severity]}")
 
-        print("\nTop priority fixes:")
-        high_priority: list[tuple[str, PerformanceIssue]] = []
-        for module, issues in all_issues.items():
-            for issue in issues:
-                if issue.severity == "high":
-                    high_priority.append((module, issue))
-
-        for i, (module, issue) in enumerate(high_priority[:5], 1):
-            print(f"  {i}. {module}:{issue.line} - {issue.message}")
+        if profile is None:
+            print("\nTop priority fixes:")
+            high_priority: list[tuple[str, tuple[object, ...]]] = []
+            for module, findings in all_findings.items():
+                for row in findings.rows():
+                    if row[1] == "high":
+                        high_priority.append((module, row))
+
+            for i, (module, (_type, _sev, line, _func, message)) in enumerate(
+                high_priority[:TOP_PRIORITY], 1
+            ):
+                print(f"  {i}. {module}:{line} - {message}")
+        else:
+            _print_profiled_priorities(all_findings, all_timings, profile)
 
     print("=" * 70)
 
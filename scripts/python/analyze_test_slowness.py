@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""Rank what makes the Python test suite slow, with estimated savings.
+
+Combines a static scan of the tests directory with the runtime history that
+run_tests.py records (see _test_history.py):
+
+- Static: real ``time.sleep``/``asyncio.sleep`` calls with large constant
+  delays, and network or subprocess calls in unit tests (tests outside
+  integration/e2e directories and without an integration/e2e/slow/network
+  marker).
+- Runtime: median setup/call/teardown split per test, collection time per
+  test module, and setup time of the project's fixtures.
+- Function-scoped fixtures that are expensive and set up for many tests are
+  reported as candidates for module (or session) scope.
+
+Every suggestion carries an estimated number of seconds one suite run would
+save, and suggestions are ranked by it. Estimates come from the latest
+recorded runs: a sleep saves its delay per execution (capped by the test's
+measured call time), a network/subprocess call at most the test's call time,
+a widened fixture all but one setup per module, and a module's collection
+at most its collection time. Suggestions without runtime data rank last.
+
+Usage:
+    run_tests.py                    # Record history (any run)
+    analyze_test_slowness.py [--output DIR]
+
+Output:
+    - Ranked suggestions and the slowest tests' phase splits on stdout
+    - .cortex/reviews/test_slowness.json
+
+Configuration:
+    TESTS_DIR: Tests directory path (default: auto-detected)
+    TEST_SLOW_SLEEP_MS: Smallest constant sleep reported (default: 100)
+    TEST_SLOW_FIXTURE_MIN_USES: Setups per run before a function-scoped
+        fixture is a widening candidate (default: 5)
+    TEST_SLOW_FIXTURE_MIN_MS: Mean setup time of a widening candidate
+        (default: 10)
+    TEST_SLOW_COLLECT_MIN_MS: Module collection time reported (default: 200)
+    TEST_SLOW_TOP: Suggestions and tests listed (default: 20)
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    from _test_history import (
+        FixtureKey,
+        FixtureTiming,
+        HistoryStore,
+        TestResult,
+        history_db_path,
+    )
+    from _utils import (
+        get_config_int,
+        get_config_path,
+        get_project_root,
+        get_reviews_dir,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _test_history import (
+        FixtureKey,
+        FixtureTiming,
+        HistoryStore,
+        TestResult,
+        history_db_path,
+    )
+    from _utils import (
+        get_config_int,
+        get_config_path,
+        get_project_root,
+        get_reviews_dir,
+    )
+
+TEST_SLOW_SLEEP_MS = get_config_int("TEST_SLOW_SLEEP_MS", 100)
+TEST_SLOW_FIXTURE_MIN_USES = get_config_int("TEST_SLOW_FIXTURE_MIN_USES", 5)
+TEST_SLOW_FIXTURE_MIN_MS = get_config_int("TEST_SLOW_FIXTURE_MIN_MS", 10)
+TEST_SLOW_COLLECT_MIN_MS = get_config_int("TEST_SLOW_COLLECT_MIN_MS", 200)
+TEST_SLOW_TOP = get_config_int("TEST_SLOW_TOP", 20)
+
+SLEEP_CALLS = frozenset(
+    {"time.sleep", "sleep", "asyncio.sleep", "anyio.sleep", "trio.sleep"}
+)
+SUBPROCESS_CALLS = frozenset(
+    {
+        "subprocess.run",
+        "subprocess.Popen",
+        "subprocess.call",
+        "subprocess.check_call",
+        "subprocess.check_output",
+        "os.system",
+        "asyncio.create_subprocess_exec",
+        "asyncio.create_subprocess_shell",
+    }
+)
+NETWORK_CALLS = frozenset(
+    {
+        "urllib.request.urlopen",
+        "urlopen",
+        "socket.create_connection",
+        "requests.get",
+        "requests.post",
+        "requests.put",
+        "requests.delete",
+        "requests.request",
+        "requests.Session",
+        "httpx.get",
+        "httpx.post",
+        "httpx.Client",
+        "httpx.AsyncClient",
+        "aiohttp.ClientSession",
+    }
+)
+# Directories and markers whose tests may legitimately sleep or do real I/O
+NON_UNIT_DIRS = frozenset({"integration", "e2e", "functional", "system"})
+NON_UNIT_MARKERS = frozenset({"integration", "e2e", "slow", "network"})
+
+KIND_SLEEP = "sleep"
+KIND_NETWORK = "network_call"
+KIND_SUBPROCESS = "subprocess_call"
+KIND_FIXTURE = "widen_fixture"
+KIND_COLLECTION = "slow_collection"
+
+
+@dataclass(frozen=True, slots=True)
+class StaticFinding:
+    """A slow construct found by scanning a test file."""
+
+    kind: str
+    path: str
+    line: int
+    detail: str
+    # Test ("path::Class::test") or fixture ("path:first_line") it sits in
+    test: str | None = None
+    fixture: str | None = None
+    seconds: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    """One ranked speed-up and its estimated saving per suite run."""
+
+    kind: str
+    location: str
+    message: str
+    saved_s: float | None
+
+
+def find_tests_directory(project_root: Path) -> Path | None:
+    """TESTS_DIR, else tests/ or test/ under the project root."""
+    tests_dir = get_config_path("TESTS_DIR")
+    if tests_dir is not None:
+        return tests_dir if tests_dir.is_absolute() else project_root / tests_dir
+    for name in ("tests", "test"):
+        candidate = project_root / name
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def _dotted(node: ast.expr) -> str:
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted(node.value)}.{node.attr}"
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+
+def _markers(decorators: list[ast.expr]) -> set[str]:
+    """Names of ``pytest.mark.<name>`` decorators (called or not)."""
+    found: set[str] = set()
+    for decorator in decorators:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        parts = _dotted(target).split(".")
+        if len(parts) >= 2 and parts[-2] == "mark":
+            found.add(parts[-1])
+    return found
+
+
+def _module_markers(tree: ast.Module) -> set[str]:
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "pytestmark" for t in stmt.targets
+        ):
+            value = stmt.value
+            items = value.elts if isinstance(value, (ast.List, ast.Tuple)) else [value]
+            return _markers(list(items))
+    return set()
+
+
+def _is_fixture(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if _dotted(target).split(".")[-1] == "fixture":
+            return True
+    return False
+
+
+def _first_line(node: ast.FunctionDef | ast.AsyncFunctionDef) -> int:
+    # Matches co_firstlineno, which the history plugin records for fixtures
+    return min([node.lineno, *(d.lineno for d in node.decorator_list)])
+
+
+class _TestFileScanner(ast.NodeVisitor):
+    """Find sleeps and real I/O in one test file."""
+
+    def __init__(self, rel_path: str, unit: bool, min_sleep_s: float):
+        self.rel_path = rel_path
+        self.min_sleep_s = min_sleep_s
+        self.findings: list[StaticFinding] = []
+        self.scope: list[str] = []
+        self.unit_scope = unit
+        self.test: str | None = None
+        self.fixture: str | None = None
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        saved = self.unit_scope
+        self.unit_scope = saved and not (
+            _markers(node.decorator_list) & NON_UNIT_MARKERS
+        )
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+        self.unit_scope = saved
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        saved = (self.unit_scope, self.test, self.fixture)
+        if self.test is None and self.fixture is None:
+            if _is_fixture(node):
+                self.fixture = f"{self.rel_path}:{_first_line(node)}"
+            elif node.name.startswith("test"):
+                self.test = "::".join([self.rel_path, *self.scope, node.name])
+        if _markers(node.decorator_list) & NON_UNIT_MARKERS:
+            self.unit_scope = False
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+        self.unit_scope, self.test, self.fixture = saved
+
+    def _add(
+        self, kind: str, node: ast.Call, detail: str, seconds: float | None
+    ) -> None:
+        self.findings.append(
+            StaticFinding(
+                kind,
+                self.rel_path,
+                node.lineno,
+                detail,
+                test=self.test,
+                fixture=self.fixture,
+                seconds=seconds,
+            )
+        )
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _dotted(node.func)
+        if name in SLEEP_CALLS and node.args:
+            delay = node.args[0]
+            if (
+                isinstance(delay, ast.Constant)
+                and isinstance(delay.value, (int, float))
+                and not isinstance(delay.value, bool)
+                and delay.value >= self.min_sleep_s
+            ):
+                self._add(
+                    KIND_SLEEP, node, f"{name}({delay.value})", float(delay.value)
+                )
+        elif self.unit_scope and name in SUBPROCESS_CALLS:
+            self._add(KIND_SUBPROCESS, node, f"{name}()", None)
+        elif self.unit_scope and name in NETWORK_CALLS:
+            self._add(KIND_NETWORK, node, f"{name}()", None)
+        self.generic_visit(node)
+
+
+def scan_test_file(
+    path: Path, rel_path: str, min_sleep_s: float
+) -> list[StaticFinding]:
+    """Scan one test file (or conftest) for sleeps and real I/O."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (SyntaxError, UnicodeDecodeError):
+        return []
+    unit = not (NON_UNIT_DIRS & set(Path(rel_path).parts)) and not (
+        _module_markers(tree) & NON_UNIT_MARKERS
+    )
+    scanner = _TestFileScanner(rel_path, unit, min_sleep_s)
+    scanner.visit(tree)
+    return scanner.findings
+
+
+def _test_runs(phases: dict[str, TestResult]) -> dict[str, list[TestResult]]:
+    """Phase medians grouped by test function (parametrizations merged)."""
+    grouped: dict[str, list[TestResult]] = {}
+    for nodeid, result in phases.items():
+        grouped.setdefault(nodeid.split("[", 1)[0], []).append(result)
+    return grouped
+
+
+def _fixture_setups(
+    fixtures: dict[FixtureKey, FixtureTiming],
+) -> dict[str, FixtureTiming]:
+    return {location: timing for (location, _), timing in fixtures.items()}
+
+
+def static_suggestions(
+    findings: list[StaticFinding],
+    phases: dict[str, TestResult],
+    fixtures: dict[FixtureKey, FixtureTiming],
+) -> list[Suggestion]:
+    """Attach runtime estimates to static findings."""
+    tests = _test_runs(phases)
+    by_location = _fixture_setups(fixtures)
+    suggestions: list[Suggestion] = []
+    for f in findings:
+        runs = tests.get(f.test, []) if f.test else []
+        call_s = sum(r.call_s for r in runs)
+        fixture = by_location.get(f.fixture) if f.fixture else None
+        saved: float | None = None
+        if f.kind == KIND_SLEEP:
+            assert f.seconds is not None
+            if fixture is not None:
+                saved = f.seconds * fixture.setups
+            elif runs:
+                saved = min(f.seconds * len(runs), call_s)
+            else:
+                saved = f.seconds
+            message = (
+                f"{f.detail} - wait on the condition (event, polling with a short "
+                + "timeout) or patch the sleep"
+            )
+        else:
+            if fixture is not None:
+                saved = fixture.setup_s
+            elif runs:
+                saved = call_s
+            what = "subprocess" if f.kind == KIND_SUBPROCESS else "network"
+            message = (
+                f"Real {what} call {f.detail} in a unit test - mock it, or mark "
+                + "the test integration"
+            )
+        suggestions.append(Suggestion(f.kind, f"{f.path}:{f.line}", message, saved))
+    return suggestions
+
+
+def fixture_suggestions(
+    fixtures: dict[FixtureKey, FixtureTiming], min_uses: int, min_mean_s: float
+) -> list[Suggestion]:
+    """Expensive function-scoped fixtures set up for many tests."""
+    suggestions: list[Suggestion] = []
+    for (location, name), timing in fixtures.items():
+        if timing.scope != "function" or timing.setups < min_uses:
+            continue
+        if timing.mean_s < min_mean_s:
+            continue
+        modules = max(timing.modules, 1)
+        target = "module" if modules < timing.setups else "session"
+        suggestions.append(
+            Suggestion(
+                KIND_FIXTURE,
+                location,
+                (
+                    f"Fixture '{name}' is set up {timing.setups}x at "
+                    + f"{timing.mean_s * 1000:.0f} ms in {modules} module(s) - "
+                    + f"widen to {target} scope if tests do not mutate it"
+                ),
+                timing.mean_s * (timing.setups - modules),
+            )
+        )
+    return suggestions
+
+
+def collection_suggestions(
+    collection: dict[str, float], min_s: float
+) -> list[Suggestion]:
+    """Test modules whose import and collection is slow."""
+    return [
+        Suggestion(
+            KIND_COLLECTION,
+            module,
+            (
+                f"Collection takes {seconds:.2f}s - import heavy dependencies "
+                + "inside fixtures or tests instead of at module level"
+            ),
+            seconds,
+        )
+        for module, seconds in collection.items()
+        if seconds >= min_s
+    ]
+
+
+def rank_suggestions(suggestions: list[Suggestion]) -> list[Suggestion]:
+    """Largest estimated saving first; suggestions without an estimate last."""
+    return sorted(
+        suggestions,
+        key=lambda s: (s.saved_s is None, -(s.saved_s or 0.0), s.location),
+    )
+
+
+def _load_runtime(
+    project_root: Path,
+) -> tuple[dict[str, TestResult], dict[FixtureKey, FixtureTiming], dict[str, float]]:
+    db_path = history_db_path(project_root)
+    if not db_path.exists():
+        return {}, {}, {}
+    store = HistoryStore(db_path)
+    try:
+        return (
+            store.phase_medians(),
+            store.latest_fixtures(),
+            store.latest_collection(),
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not read test history: {e}", file=sys.stderr)
+        return {}, {}, {}
+    finally:
+        store.close()
+
+
+def _print_report(
+    ranked: list[Suggestion], phases: dict[str, TestResult], top: int
+) -> None:
+    if not phases:
+        print("⚠️  No test history yet - run run_tests.py for runtime estimates\n")
+    print(f"🐢 Test-suite speed-ups ({len(ranked)} suggestions):")
+    if not ranked:
+        print("  ✅ Nothing to suggest")
+    for i, s in enumerate(ranked[:top], 1):
+        saved = "    ?   " if s.saved_s is None else f"~{s.saved_s:7.2f}s"
+        print(f"  {i:2d}. {saved}  {s.location}: {s.message}")
+
+    slowest = sorted(phases.items(), key=lambda item: -item[1].total_s)[:top]
+    if slowest:
+        print("\n⏱️  Slowest tests (median setup / call / teardown):")
+        for nodeid, r in slowest:
+            print(
+                f"  {r.total_s:7.2f}s  {r.setup_s:6.2f} / {r.call_s:6.2f} / "
+                + f"{r.teardown_s:6.2f}  {nodeid}"
+            )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Rank test-suite slowness with estimated savings."
+    )
+    _ = parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Directory for test_slowness.json (default: .cortex/reviews)",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    """Scan the tests, join runtime history and print ranked suggestions."""
+    args = parse_args()
+    project_root = get_project_root(Path(__file__))
+    tests_dir = find_tests_directory(project_root)
+    if tests_dir is None or not tests_dir.is_dir():
+        print("Error: No tests directory found", file=sys.stderr)
+        return 1
+
+    findings: list[StaticFinding] = []
+    for path in sorted(tests_dir.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        try:
+            rel_path = path.resolve().relative_to(project_root.resolve()).as_posix()
+        except ValueError:
+            rel_path = path.as_posix()
+        findings.extend(scan_test_file(path, rel_path, TEST_SLOW_SLEEP_MS / 1000))
+
+    phases, fixtures, collection = _load_runtime(project_root)
+    ranked = rank_suggestions(
+        static_suggestions(findings, phases, fixtures)
+        + fixture_suggestions(
+            fixtures, TEST_SLOW_FIXTURE_MIN_USES, TEST_SLOW_FIXTURE_MIN_MS / 1000
+        )
+        + collection_suggestions(collection, TEST_SLOW_COLLECT_MIN_MS / 1000)
+    )
+    _print_report(ranked, phases, TEST_SLOW_TOP)
+
+    output_dir = args.output or get_reviews_dir(project_root)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / "test_slowness.json"
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "tests_dir": str(tests_dir),
+        "suggestions": [asdict(s) for s in ranked],
+        "collection_s": collection,
+        "slowest_tests": {
+            nodeid: asdict(r)
+            for nodeid, r in sorted(phases.items(), key=lambda item: -item[1].total_s)[
+                :TEST_SLOW_TOP
+            ]
+        },
+    }
+    _ = json_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\n📄 {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""A/B micro-benchmarks: working tree vs the merge base, interleaved.
+
+Checks out the merge base (see DIFF_BASE) into a temporary ``git worktree``
+and runs each benchmark against both trees. The bench_*.py definitions come
+from the working tree; the code under test is imported from each tree's
+src/. Worker processes for A (base) and B (working tree) alternate, in
+AB, BA, AB... order, for BENCH_AB_ROUNDS rounds, so thermal and background
+drift hits both sides equally. Both sides use the same calibrated iteration
+count and can be pinned to the same CPUs (--cpus).
+
+Each round yields a paired ratio B/A of the round medians; the report shows
+the median ratio with a 95% bootstrap CI. A change is reported only when
+the CI excludes no change and the median delta exceeds BENCH_THRESHOLD_PCT.
+The run exits 1 when any benchmark is significantly slower.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/bench_ab.py [--base REF] [-k PATTERN] [--cpus 2,3]
+
+Configuration:
+    BENCH_AB_ROUNDS: Interleaved A/B rounds per benchmark (default: 10)
+    BENCH_THRESHOLD_PCT: Smallest median delta reported as a change (default: 5)
+    DIFF_BASE: Ref whose merge base with HEAD is side A (default: first of
+        origin/main, main, origin/master, master)
+    (plus the BENCH_* worker settings of benchmark_performance.py)
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from _bench_stats import bootstrap_median_ci, format_duration
+    from _git_diff import resolve_merge_base
+    from _utils import get_config_int, get_project_root
+    from benchmark_performance import (
+        Benchmark,
+        bench_dirs,
+        discover,
+        parse_cpus,
+        spawn_worker,
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_stats import bootstrap_median_ci, format_duration
+    from _git_diff import resolve_merge_base
+    from _utils import get_config_int, get_project_root
+    from benchmark_performance import (
+        Benchmark,
+        bench_dirs,
+        discover,
+        parse_cpus,
+        spawn_worker,
+    )
+
+BENCH_AB_ROUNDS = get_config_int("BENCH_AB_ROUNDS", 10)
+BENCH_THRESHOLD_PCT = get_config_int("BENCH_THRESHOLD_PCT", 5)
+
+
+@dataclass(frozen=True, slots=True)
+class PairedResult:
+    """Paired A/B outcome of one benchmark."""
+
+    name: str
+    a_median: float
+    b_median: float
+    ratio: float
+    ci_low: float
+    ci_high: float
+    error: str = ""
+
+    @property
+    def slower(self) -> bool:
+        """B is significantly and materially slower than A."""
+        return self.ci_low > 1 and self.ratio - 1 > BENCH_THRESHOLD_PCT / 100
+
+    @property
+    def faster(self) -> bool:
+        """B is significantly and materially faster than A."""
+        return self.ci_high < 1 and 1 - self.ratio > BENCH_THRESHOLD_PCT / 100
+
+
+@contextmanager
+def base_worktree(project_root: Path, sha: str) -> Iterator[Path]:
+    """Check ``sha`` out into a temporary detached worktree; remove it after."""
+    tmp = Path(tempfile.mkdtemp(prefix="synapse-ab-"))
+    tree = tmp / "base"
+    result = subprocess.run(
+        ["git", "worktree", "add", "--detach", "--quiet", str(tree), sha],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError(result.stderr.strip() or "git worktree add failed")
+    try:
+        yield tree
+    finally:
+        _ = subprocess.run(
+            ["git", "worktree", "remove", "--force", str(tree)],
+            cwd=project_root,
+            capture_output=True,
+            check=False,
+        )
+        shutil.rmtree(tmp, ignore_errors=True)
+        _ = subprocess.run(
+            ["git", "worktree", "prune"],
+            cwd=project_root,
+            capture_output=True,
+            check=False,
+        )
+
+
+def paired_ratios(a_rounds: Sequence[float], b_rounds: Sequence[float]) -> list[float]:
+    """Per-round B/A ratios of round medians."""
+    return [b / a for a, b in zip(a_rounds, b_rounds) if a > 0]
+
+
+def run_ab(
+    bench: Benchmark,
+    tree_a: Path,
+    tree_b: Path,
+    rounds: int,
+    cpus: Sequence[int] = (),
+) -> PairedResult:
+    """Interleave A and B workers for ``rounds`` rounds and pair the results."""
+    # Calibrate once (on A) so both sides time the same number of calls
+    iterations, _, error = spawn_worker(tree_a, bench, 0, cpus)
+    if error:
+        return PairedResult(bench.name, 0, 0, 1, 1, 1, f"A (base): {error}")
+    medians: dict[str, list[float]] = {"A": [], "B": []}
+    for i in range(rounds):
+        order = ("A", "B") if i % 2 == 0 else ("B", "A")
+        for side in order:
+            tree = tree_a if side == "A" else tree_b
+            _, samples, error = spawn_worker(tree, bench, iterations, cpus)
+            if error:
+                label = "A (base)" if side == "A" else "B (working tree)"
+                return PairedResult(bench.name, 0, 0, 1, 1, 1, f"{label}: {error}")
+            medians[side].append(statistics.median(samples))
+    ratios = paired_ratios(medians["A"], medians["B"])
+    ci_low, ci_high = bootstrap_median_ci(ratios)
+    return PairedResult(
+        name=bench.name,
+        a_median=statistics.median(medians["A"]),
+        b_median=statistics.median(medians["B"]),
+        ratio=statistics.median(ratios),
+        ci_low=ci_low,
+        ci_high=ci_high,
+    )
+
+
+def _print_result(result: PairedResult) -> None:
+    if result.error:
+        print(f"  ❌ {result.name}: {result.error}")
+        return
+    verdict = "🔴 slower" if result.slower else "🟢 faster" if result.faster else "≈"
+    print(
+        f"  {result.name}: A {format_duration(result.a_median)}  "
+        + f"B {format_duration(result.b_median)}  "
+        + f"Δ {(result.ratio - 1) * 100:+.1f}% "
+        + f"[95% CI {(result.ci_low - 1) * 100:+.1f}% … {(result.ci_high - 1) * 100:+.1f}%] "
+        + verdict
+    )
+
+
+def main() -> int:
+    """Run every benchmark A/B against the merge base."""
+    parser = argparse.ArgumentParser(
+        description="Interleaved A/B benchmarks of the working tree vs the merge base."
+    )
+    _ = parser.add_argument("--base", help="Base ref (default: DIFF_BASE or main)")
+    _ = parser.add_argument(
+        "-k", dest="pattern", help="Only benchmarks whose name contains PATTERN"
+    )
+    _ = parser.add_argument(
+        "--rounds", type=int, default=BENCH_AB_ROUNDS, help="Interleaved rounds"
+    )
+    _ = parser.add_argument(
+        "--cpus",
+        type=parse_cpus,
+        default=(),
+        help="Pin both sides to these CPUs, e.g. 2,3 or 2-3 (Linux)",
+    )
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    benches = discover(bench_dirs(project_root), args.pattern)
+    if not benches:
+        print("✅ No bench_* functions found (skipped)")
+        return 0
+    sha = resolve_merge_base(project_root, args.base)
+    if sha is None:
+        print("❌ No merge base found (set --base or DIFF_BASE)", file=sys.stderr)
+        return 1
+
+    print(
+        f"🔀 A = merge base {sha[:8]}, B = working tree; {args.rounds} interleaved "
+        + "round(s)"
+        + (f", CPUs {','.join(str(c) for c in args.cpus)}" if args.cpus else "")
+    )
+    results: list[PairedResult] = []
+    try:
+        with base_worktree(project_root, sha) as tree_a:
+            for bench in benches:
+                result = run_ab(bench, tree_a, project_root, args.rounds, args.cpus)
+                _print_result(result)
+                results.append(result)
+    except RuntimeError as e:
+        print(f"❌ Could not create base worktree: {e}", file=sys.stderr)
+        return 1
+
+    slower = [r.name for r in results if r.slower]
+    errors = [r.name for r in results if r.error]
+    if slower:
+        print(f"\n❌ Significantly slower than base: {', '.join(slower)}")
+    if errors:
+        print(f"\n❌ Failed benchmarks: {', '.join(errors)}")
+    if slower or errors:
+        return 1
+    print("\n✅ No significant slowdowns against the merge base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Scaling benchmark of the Synapse gates on synthetic repositories.
+
+Generates deterministic repositories (see synthetic_repo.py) of each size,
+installs this checkout's gate scripts into each as .cortex/synapse/scripts
+(the layout consumer projects use, so every gate resolves the synthetic
+repository as its project root) and runs every pure-Python gate with a full
+scan. Toolchain-backed gates (ruff, swiftc, phpstan...) are not included;
+they measure the tools rather than our code.
+
+Each gate runs once to warm the bytecode and file caches, then
+GATE_BENCH_REPEATS times. The report shows the median wall time, the peak
+RSS of the gate process and the growth exponent between sizes (about 1 is
+linear, 2 quadratic). Medians are appended to the benchmark history
+(bench_history.py).
+
+With a baseline (--save-baseline) recorded on the same machine, a gate
+regresses when its median time grows by more than GATE_BENCH_THRESHOLD_PCT
+and GATE_BENCH_MIN_DELTA_MS, or its peak RSS by more than
+GATE_BENCH_THRESHOLD_PCT and 8 MiB. The run exits 1 on regressions and on
+gates that crash or time out (violations reported by a gate are expected).
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/bench_gates.py [--sizes 100,1k,10k] [-k PATTERN] [--save-baseline]
+
+Configuration:
+    GATE_BENCH_REPEATS: Timed runs per gate and size (default: 3)
+    GATE_BENCH_THRESHOLD_PCT: Relative time/RSS growth that regresses (default: 20)
+    GATE_BENCH_MIN_DELTA_MS: Smallest absolute time growth that regresses (default: 50)
+    GATE_BENCH_TIMEOUT: Per-run timeout in seconds (default: 600)
+    GATE_BENCH_REPO_DIR: Where generated repositories are kept (default:
+        <tmp>/synapse-synthetic-repos; must not be inside a .cortex directory)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    from _bench_history import history_db_path, machine_fingerprint, record_results
+    from _bench_stats import (
+        format_bytes,
+        format_duration,
+        format_scale,
+        growth_exponent,
+        parse_scales,
+    )
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
+    from synthetic_repo import RepoSpec, generate
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_history import history_db_path, machine_fingerprint, record_results
+    from _bench_stats import (
+        format_bytes,
+        format_duration,
+        format_scale,
+        growth_exponent,
+        parse_scales,
+    )
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
+    from synthetic_repo import RepoSpec, generate
+
+GATE_BENCH_REPEATS = get_config_int("GATE_BENCH_REPEATS", 3)
+GATE_BENCH_THRESHOLD_PCT = get_config_int("GATE_BENCH_THRESHOLD_PCT", 20)
+GATE_BENCH_MIN_DELTA_MS = get_config_int("GATE_BENCH_MIN_DELTA_MS", 50)
+GATE_BENCH_TIMEOUT = get_config_int("GATE_BENCH_TIMEOUT", 600)
+
+BASELINE_FILE = "gate_bench_baseline.json"
+MIN_RSS_DELTA = 8 * 1024 * 1024
+
+# (name, script relative to the scripts directory)
+BENCH_GATES: tuple[tuple[str, str], ...] = (
+    ("py:function-lengths", "python/check_function_lengths.py"),
+    ("py:file-sizes", "python/check_file_sizes.py"),
+    ("py:complexity", "python/analyze_complexity.py"),
+    ("py:function-length-report", "python/analyze_function_lengths.py"),
+    ("py:async-tests", "python/check_async_tests.py"),
+    ("py:test-naming", "python/check_test_naming.py"),
+    ("swift:file-sizes", "swift/check_file_sizes.py"),
+    ("swift:function-lengths", "swift/check_function_lengths.py"),
+    ("swift:complexity", "swift/analyze_complexity.py"),
+    ("swift:no-print", "swift/validate_no_print.py"),
+    ("swift:no-force-unwrap", "swift/validate_no_force_unwrap.py"),
+    ("swift:one-type-per-file", "swift/check_one_type_per_file.py"),
+    ("swift:test-naming", "swift/validate_test_naming.py"),
+    ("php:file-sizes", "php/check_file_sizes.py"),
+    ("php:function-lengths", "php/check_function_lengths.py"),
+    ("php:test-naming", "php/check_test_naming.py"),
+    ("ts:file-sizes", "typescript/check_file_sizes.py"),
+)
+
+# Inherited settings that would point the gates away from the synthetic repo
+_SCOPE_ENV = (
+    "FILES",
+    "SRC_DIR",
+    "TESTS_DIR",
+    "SOURCES_DIR",
+    "PHP_SRC_DIR",
+    "PHP_TESTS_DIR",
+    "PROJECT_ROOT",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class GateRun:
+    """One gate process: wall time, peak RSS and how it ended."""
+
+    elapsed_s: float
+    peak_rss: int
+    returncode: int
+    crash: str = ""
+
+
+@dataclass(slots=True)
+class GateResult:
+    """All timed runs of one gate at one repository size."""
+
+    gate: str
+    size: int
+    times: list[float] = field(default_factory=list)
+    peak_rss: int = 0
+    crash: str = ""
+
+    @property
+    def key(self) -> str:
+        """Name in the baseline and the benchmark history."""
+        return f"gate:{self.gate}@{format_scale(self.size)}"
+
+    @property
+    def median_s(self) -> float:
+        """Median wall time of the timed runs."""
+        return statistics.median(self.times) if self.times else 0.0
+
+
+def repo_cache_dir() -> Path:
+    """Directory holding the generated repositories."""
+    configured = get_config_path("GATE_BENCH_REPO_DIR")
+    return configured or Path(tempfile.gettempdir()) / "synapse-synthetic-repos"
+
+
+def prepare_repo(size: int, scripts_dir: Path) -> Path:
+    """Generate (or reuse) the repository of ``size`` files and install gates."""
+    repo = repo_cache_dir() / f"repo-{size}"
+    if generate(repo, RepoSpec(files=size)):
+        print(f"🏗️  Generated {format_scale(size)}-file repository in {repo}")
+    installed = repo / ".cortex" / "synapse" / "scripts"
+    if installed.exists():
+        shutil.rmtree(installed)
+    _ = shutil.copytree(
+        scripts_dir,
+        installed,
+        ignore=shutil.ignore_patterns("__pycache__", ".pytest_cache", "test_*.py"),
+    )
+    return repo
+
+
+def _gate_env(repo: Path) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k not in _SCOPE_ENV}
+    env["ALLOW_FULL_SCAN"] = "1"
+    env["PROJECT_ROOT"] = str(repo)
+    return env
+
+
+def _max_rss_bytes(max_rss: int) -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def run_gate(script: Path, repo: Path, timeout_s: float) -> GateRun:
+    """Run one gate process to completion and measure it."""
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(script)],
+            cwd=repo,
+            env=_gate_env(repo),
+            stdin=subprocess.DEVNULL,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+        timer = threading.Timer(timeout_s, proc.kill)
+        timer.start()
+        try:
+            if hasattr(os, "wait4"):
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                peak_rss = _max_rss_bytes(usage.ru_maxrss)
+            else:
+                _ = proc.wait()
+                peak_rss = 0
+        finally:
+            timer.cancel()
+        elapsed = time.perf_counter() - start
+        _ = output.seek(0)
+        text = output.read().decode("utf-8", errors="replace")
+    crash = ""
+    if elapsed >= timeout_s:
+        crash = f"timed out after {timeout_s:.0f}s"
+    elif proc.returncode < 0:
+        crash = f"killed by signal {-proc.returncode}"
+    elif "Traceback (most recent call last)" in text:
+        crash = text.strip().splitlines()[-1]
+    return GateRun(elapsed, peak_rss, proc.returncode, crash)
+
+
+def bench_gate(gate: str, script: Path, repo: Path, size: int) -> GateResult:
+    """Warm up, then time ``GATE_BENCH_REPEATS`` runs of one gate."""
+    result = GateResult(gate, size)
+    for attempt in range(GATE_BENCH_REPEATS + 1):
+        run = run_gate(script, repo, GATE_BENCH_TIMEOUT)
+        if run.crash:
+            result.crash = run.crash
+            break
+        if attempt > 0:
+            result.times.append(run.elapsed_s)
+            result.peak_rss = max(result.peak_rss, run.peak_rss)
+    return result
+
+
+def _load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    """Baseline entries, or {} when missing or from another machine."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    machine, _ = machine_fingerprint()
+    if data.get("machine") != machine:
+        print(f"⚠️  {path.name} was recorded on another machine; not comparing")
+        return {}
+    gates = data.get("gates", {})
+    return gates if isinstance(gates, dict) else {}
+
+
+def _save_baseline(path: Path, results: list[GateResult]) -> None:
+    machine, desc = machine_fingerprint()
+    payload = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": machine,
+        "machine_desc": desc,
+        "gates": {
+            r.key: {"median_s": r.median_s, "peak_rss": r.peak_rss}
+            for r in results
+            if not r.crash
+        },
+    }
+    _ = path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def regression(result: GateResult, base: dict[str, float]) -> str:
+    """Why ``result`` regressed against its baseline entry ("" if it did not)."""
+    limit = 1 + GATE_BENCH_THRESHOLD_PCT / 100
+    reasons: list[str] = []
+    base_s = float(base.get("median_s", 0))
+    if (
+        base_s > 0
+        and result.median_s > base_s * limit
+        and result.median_s - base_s > GATE_BENCH_MIN_DELTA_MS / 1000
+    ):
+        reasons.append(
+            f"time {format_duration(base_s)} → {format_duration(result.median_s)}"
+        )
+    base_rss = float(base.get("peak_rss", 0))
+    if (
+        base_rss > 0
+        and result.peak_rss > base_rss * limit
+        and result.peak_rss - base_rss > MIN_RSS_DELTA
+    ):
+        reasons.append(
+            f"RSS {format_bytes(base_rss)} → {format_bytes(result.peak_rss)}"
+        )
+    return ", ".join(reasons)
+
+
+def print_report(
+    results: list[GateResult], baseline: dict[str, dict[str, float]]
+) -> list[str]:
+    """Per-gate table over sizes; returns descriptions of regressions."""
+    regressions: list[str] = []
+    for gate in dict.fromkeys(r.gate for r in results):
+        print(f"\n{gate}")
+        previous: GateResult | None = None
+        for r in (r for r in results if r.gate == gate):
+            label = f"  n={format_scale(r.size):>6}"
+            if r.crash:
+                print(f"{label}  ❌ {r.crash}")
+                continue
+            line = (
+                f"{label}  {format_duration(r.median_s):>8}"
+                + f"  RSS {format_bytes(r.peak_rss):>9}"
+            )
+            if previous is not None:
+                k = growth_exponent(
+                    previous.size, previous.median_s, r.size, r.median_s
+                )
+                line += f"  time ~ n^{k:.2f}" if k is not None else ""
+            reason = regression(r, baseline[r.key]) if r.key in baseline else ""
+            if reason:
+                line += f"  🔴 {reason}"
+                regressions.append(f"{r.key} ({reason})")
+            print(line)
+            previous = r
+    return regressions
+
+
+def main() -> int:
+    """Benchmark every gate on synthetic repositories of increasing size."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the gates on synthetic repositories."
+    )
+    _ = parser.add_argument(
+        "--sizes",
+        type=parse_scales,
+        default=(100, 1000, 10000),
+        help="Repository sizes in files (default: 100,1k,10k)",
+    )
+    _ = parser.add_argument(
+        "-k", dest="pattern", help="Only gates whose name contains PATTERN"
+    )
+    _ = parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the comparison baseline",
+    )
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    scripts_dir = Path(__file__).resolve().parent.parent
+    gates = [
+        (name, script)
+        for name, script in BENCH_GATES
+        if (not args.pattern or args.pattern in name)
+        and (scripts_dir / script).exists()
+    ]
+    if not gates:
+        print(f"❌ No gate matches {args.pattern!r}", file=sys.stderr)
+        return 1
+    baseline_path = get_benchmark_results_dir(project_root) / BASELINE_FILE
+    baseline = _load_baseline(baseline_path)
+    print(
+        f"📊 {len(gates)} gate(s) × {len(args.sizes)} size(s), "
+        + f"{GATE_BENCH_REPEATS} timed run(s) each"
+        + (f"; baseline {baseline_path.name}" if baseline else "")
+    )
+
+    results: list[GateResult] = []
+    for size in args.sizes:
+        repo = prepare_repo(size, scripts_dir)
+        installed = repo / ".cortex" / "synapse" / "scripts"
+        for name, script in gates:
+            results.append(bench_gate(name, installed / script, repo, size))
+
+    regressions = print_report(results, baseline)
+    samples = {r.key: r.times for r in results if r.times}
+    if samples:
+        _ = record_results(project_root, samples, source="bench_gates")
+        print(f"\n🗄️  Recorded in {history_db_path(project_root)}")
+    if args.save_baseline:
+        _save_baseline(baseline_path, results)
+        print(f"💾 Baseline saved to {baseline_path}")
+
+    crashes = [r.key for r in results if r.crash]
+    if regressions:
+        print(f"\n❌ Gate regressions: {'; '.join(regressions)}")
+    if crashes:
+        print(f"\n❌ Gates crashed or timed out: {', '.join(crashes)}")
+    if regressions or crashes:
+        return 1
+    print("\n✅ No gate regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
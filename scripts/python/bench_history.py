@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Benchmark trends and regression report from the benchmark history.
+
+Reads the append-only history written by benchmark_performance.py and
+run_benchmarks.py (.cortex/benchmark_results/history.db). ``trend`` prints a
+per-benchmark table of recorded runs with step changes marked; ``report``
+renders markdown listing the commits where each benchmark regressed.
+
+Step changes are found per machine fingerprint (timings from different
+machines are never compared) by optimal partitioning of the run medians: a
+step must hold for BENCH_CHANGE_MIN_RUNS runs on both sides, be about
+BENCH_CHANGE_SIGMA noise standard deviations and exceed BENCH_THRESHOLD_PCT.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/bench_history.py trend [-k PATTERN] [--last N]
+    .venv/bin/python .cortex/synapse/scripts/python/bench_history.py report [--output FILE]
+
+Configuration:
+    BENCH_THRESHOLD_PCT: Smallest relative step reported (default: 5)
+    BENCH_CHANGE_MIN_RUNS: Runs required on each side of a step (default: 3)
+    BENCH_CHANGE_SIGMA: Minimum step size in noise standard deviations (default: 5)
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+try:
+    from _bench_history import (
+        BenchmarkHistory,
+        HistoryPoint,
+        Step,
+        find_steps,
+        history_db_path,
+        machine_fingerprint,
+    )
+    from _bench_stats import format_duration
+    from _utils import get_config_int, get_project_root
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_history import (
+        BenchmarkHistory,
+        HistoryPoint,
+        Step,
+        find_steps,
+        history_db_path,
+        machine_fingerprint,
+    )
+    from _bench_stats import format_duration
+    from _utils import get_config_int, get_project_root
+
+BENCH_THRESHOLD_PCT = get_config_int("BENCH_THRESHOLD_PCT", 5)
+BENCH_CHANGE_MIN_RUNS = get_config_int("BENCH_CHANGE_MIN_RUNS", 3)
+BENCH_CHANGE_SIGMA = get_config_int("BENCH_CHANGE_SIGMA", 5)
+
+
+def _steps(points: list[HistoryPoint]) -> list[Step]:
+    return find_steps(
+        points,
+        min_runs=BENCH_CHANGE_MIN_RUNS,
+        min_change=BENCH_THRESHOLD_PCT / 100,
+        min_sigma=BENCH_CHANGE_SIGMA,
+    )
+
+
+def _date(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def _sha(point: HistoryPoint) -> str:
+    return point.sha[:8] + ("*" if point.dirty else "")
+
+
+def _pct(ratio: float) -> str:
+    return f"{(ratio - 1) * 100:+.1f}%"
+
+
+def _selected(
+    history: BenchmarkHistory, pattern: str | None, all_machines: bool
+) -> list[tuple[str, str, str]]:
+    """``(name, machine, machine_desc)`` series to show."""
+    machines = history.machines()
+    if not all_machines:
+        current, desc = machine_fingerprint()
+        machines = {current: machines.get(current, desc)}
+    return [
+        (name, machine, desc)
+        for name in history.names()
+        if pattern is None or pattern in name
+        for machine, desc in machines.items()
+    ]
+
+
+def print_trends(
+    history: BenchmarkHistory,
+    pattern: str | None,
+    branch: str | None,
+    all_machines: bool,
+    last: int,
+) -> int:
+    """Print one trend table per benchmark and machine."""
+    shown = 0
+    for name, machine, desc in _selected(history, pattern, all_machines):
+        points = history.series(name, machine=machine, branch=branch)
+        if not points:
+            continue
+        shown += 1
+        steps = {step.after.run_id: step for step in _steps(points)}
+        print(f"\n📈 {name} — {len(points)} run(s) on {machine} ({desc})")
+        previous: HistoryPoint | None = None
+        for point in points[-last:] if last > 0 else points:
+            change = _pct(point.median_s / previous.median_s) if previous else ""
+            step = steps.get(point.run_id)
+            marker = ""
+            if step is not None:
+                arrow = "🔴 ▲" if step.ratio > 1 else "🟢 ▼"
+                marker = f"  {arrow} step {_pct(step.ratio)}"
+            print(
+                f"  {_date(point.timestamp)}  {_sha(point):9} {point.branch[:20]:20} "
+                + f"{format_duration(point.median_s):>8}  "
+                + f"IQR {format_duration(point.q3_s - point.q1_s):>8}  {change:>7}{marker}"
+            )
+            previous = point
+    if not shown:
+        print("No recorded benchmark runs match (run benchmark_performance.py first)")
+    return 0
+
+
+def regression_report(
+    history: BenchmarkHistory,
+    pattern: str | None,
+    branch: str | None,
+    all_machines: bool,
+) -> str:
+    """Markdown listing each benchmark's regressing steps with their commits."""
+    rows: list[str] = []
+    machines_seen: dict[str, str] = {}
+    for name, machine, desc in _selected(history, pattern, all_machines):
+        points = history.series(name, machine=machine, branch=branch)
+        for step in _steps(points):
+            if step.ratio <= 1:
+                continue
+            machines_seen[machine] = desc
+            rows.append(
+                f"| `{name}` | `{_sha(step.before)}..{_sha(step.after)}` "
+                + f"| {format_duration(step.before_s)} | {format_duration(step.after_s)} "
+                + f"| {_pct(step.ratio)} | {_date(step.after.timestamp)} "
+                + f"| `{machine}` |"
+            )
+    lines = [
+        "# Benchmark Regressions",
+        "",
+        f"Generated {time.strftime('%Y-%m-%d %H:%M')}"
+        + (f" for branch `{branch}`" if branch else "")
+        + ". A regression is a persistent step up in a benchmark's median;"
+        + " the range names the last commit before it and the first after.",
+        "",
+    ]
+    if not rows:
+        return "\n".join([*lines, "No regressions detected.", ""])
+    lines.extend(
+        [
+            "| Benchmark | Commits | Before | After | Change | First seen | Machine |",
+            "|---|---|---|---|---|---|---|",
+            *rows,
+            "",
+            "Machines:",
+            "",
+            *(f"- `{m}`: {d}" for m, d in sorted(machines_seen.items())),
+            "",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    """Render trends or the regression report."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark trends and regressions from the run history."
+    )
+    _ = parser.add_argument("command", choices=("trend", "report"))
+    _ = parser.add_argument(
+        "-k", dest="pattern", help="Only benchmarks whose name contains PATTERN"
+    )
+    _ = parser.add_argument("--branch", help="Only runs recorded on this branch")
+    _ = parser.add_argument(
+        "--all-machines",
+        action="store_true",
+        help="Include runs from other machines (each analysed separately)",
+    )
+    _ = parser.add_argument(
+        "--last", type=int, default=20, help="Trend rows per benchmark (0: all)"
+    )
+    _ = parser.add_argument("--output", type=Path, help="Write the report here")
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    db_path = history_db_path(project_root)
+    if not db_path.exists():
+        print(f"✅ No benchmark history at {db_path} (skipped)")
+        return 0
+    history = BenchmarkHistory(db_path)
+    try:
+        if args.command == "trend":
+            return print_trends(
+                history, args.pattern, args.branch, args.all_machines, args.last
+            )
+        report = regression_report(
+            history, args.pattern, args.branch, args.all_machines
+        )
+    finally:
+        history.close()
+    if args.output:
+        _ = args.output.write_text(report, encoding="utf-8")
+        print(f"💾 Report written to {args.output}")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
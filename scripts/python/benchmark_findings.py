@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark per-finding cost of analyzer finding storage.
+
+Compares the old approach (one validated ``PerformanceIssue`` per finding,
+built in the visitor hot path) with the ``FindingStore`` approach (tuple rows
+during traversal, optionally validated once at the output boundary) on a
+synthetic workload.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/benchmark_findings.py [--count 100000]
+
+Configuration:
+    FINDINGS_BENCH_COUNT: Number of synthetic findings (default: 100000)
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    from _findings import FindingStore
+    from _utils import get_config_int
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _findings import FindingStore
+    from _utils import get_config_int
+
+from analyze_performance import ISSUE_FIELDS, PerformanceIssue
+
+FINDINGS_BENCH_COUNT = get_config_int("FINDINGS_BENCH_COUNT", 100_000)
+
+_KINDS = (
+    (
+        "nested_loops",
+        "high",
+        "Nested loop detected (depth 2) - potential O(n²) or worse",
+    ),
+    (
+        "list_append_in_loop",
+        "medium",
+        "List append in loop - consider list comprehension",
+    ),
+    (
+        "string_split_in_loop",
+        "medium",
+        "String split in loop - consider moving outside",
+    ),
+    ("len_in_loop", "low", "len() in loop - consider caching"),
+)
+
+
+def _synthetic_rows(count: int) -> list[tuple[str, str, int, str | None, str]]:
+    """Build deterministic (type, severity, line, function, message) rows."""
+    rows: list[tuple[str, str, int, str | None, str]] = []
+    for i in range(count):
+        kind, severity, message = _KINDS[i % len(_KINDS)]
+        function = None if i % 7 == 0 else f"func_{i % 500}"
+        rows.append((kind, severity, i % 5000 + 1, function, message))
+    return rows
+
+
+def _per_finding_models(rows: list[tuple[str, str, int, str | None, str]]) -> object:
+    issues: list[PerformanceIssue] = []
+    for kind, severity, line, function, message in rows:
+        issues.append(
+            PerformanceIssue(
+                type=kind,
+                severity=severity,
+                line=line,
+                function=function,
+                message=message,
+            )
+        )
+    return issues
+
+
+def _store_only(rows: list[tuple[str, str, int, str | None, str]]) -> object:
+    store = FindingStore(ISSUE_FIELDS)
+    for kind, severity, line, function, message in rows:
+        store.add(kind, severity, line, function, message)
+    return store
+
+
+def _store_then_validate(rows: list[tuple[str, str, int, str | None, str]]) -> object:
+    store = _store_only(rows)
+    assert isinstance(store, FindingStore)
+    return store.to_models(PerformanceIssue)
+
+
+def _measure(
+    func: Callable[[list[tuple[str, str, int, str | None, str]]], object],
+    rows: list[tuple[str, str, int, str | None, str]],
+) -> tuple[float, int]:
+    """Return (elapsed_s, retained_bytes) for func over rows.
+
+    Timing and allocation tracking use separate runs so tracemalloc overhead
+    does not distort the timing.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(rows)
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained
+
+
+def main() -> int:
+    """Run the finding-storage benchmark and print per-finding costs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _ = parser.add_argument(
+        "--count",
+        "-n",
+        type=int,
+        default=FINDINGS_BENCH_COUNT,
+        help=f"Number of synthetic findings (default: {FINDINGS_BENCH_COUNT})",
+    )
+    args = parser.parse_args()
+    count: int = max(1, args.count)
+    rows = _synthetic_rows(count)
+
+    scenarios: list[
+        tuple[str, Callable[[list[tuple[str, str, int, str | None, str]]], object]]
+    ] = [
+        ("before: PerformanceIssue per finding", _per_finding_models),
+        ("after: FindingStore rows", _store_only),
+        ("after: rows + boundary validation", _store_then_validate),
+    ]
+
+    print("=" * 70)
+    print(f"Finding storage benchmark ({count:,} synthetic findings)")
+    print("=" * 70)
+    baseline: float | None = None
+    for name, func in scenarios:
+        elapsed, retained = _measure(func, rows)
+        per_finding_us = elapsed / count * 1e6
+        per_finding_bytes = retained / count
+        speedup = "" if baseline is None else f"  ({baseline / elapsed:.1f}x)"
+        if baseline is None:
+            baseline = elapsed
+        print(
+            f"  {name:40s} {elapsed:7.3f}s  {per_finding_us:7.3f}µs/finding  "
+            + f"{per_finding_bytes:6.0f} B/finding{speedup}"
+        )
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
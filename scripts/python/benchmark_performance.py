@@ -1,238 +1,488 @@
 #!/usr/bin/env python3
-"""Performance benchmarking framework for Phase 10.3.1.
-
-This script validates all performance optimizations from Days 1-5 by running
-the existing test suite and measuring execution times.
-
-Days 1-5 optimizations:
-- Day 1: consolidation_detector.py (80-95% improvement)
-- Day 2: relevance_scorer.py (60-80% improvement)
-- Day 3: pattern_analyzer.py (70-85% improvement)
-- Day 4: link_parser.py (30-50% improvement)
-- Day 5: rules_indexer.py + insight_formatter.py (40-60% + 20-40% improvements)
+"""Statistical micro-benchmark harness.
+
+Discovers ``bench_*`` functions in ``bench_*.py`` files, calibrates an
+iteration count per benchmark so each timed repeat runs for at least
+BENCH_MIN_TIME_MS, then runs warmups and repeats in several fresh worker
+processes (GC collected before and disabled during each repeat). Each
+benchmark is reported as the median per-call time with IQR and a 95%
+bootstrap confidence interval.
+
+With a stored baseline (--save-baseline), each benchmark is compared with it
+using the Mann-Whitney U test. The run fails only on statistically significant
+regressions (p < --alpha and slower by more than BENCH_THRESHOLD_PCT).
+Every run is appended to the benchmark history (see bench_history.py).
+
+A benchmark is a zero-argument function. A bench file may define ``setup()``,
+called once per worker process before calibration and timing. Project code
+under src/ is importable.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/benchmark_performance.py [-k PATTERN]
+        [--save-baseline] [--no-compare] [--alpha 0.01] [--cpus 2,3]
+
+Configuration:
+    BENCH_DIR: Directory to search for bench_*.py (default: benchmarks/ and
+        tests/benchmarks/)
+    BENCH_PROCESSES: Worker processes per benchmark (default: 5)
+    BENCH_WARMUPS: Untimed warmup repeats per process (default: 2)
+    BENCH_REPEATS: Timed repeats per process (default: 5)
+    BENCH_MIN_TIME_MS: Minimum duration of one timed repeat (default: 50)
+    BENCH_THRESHOLD_PCT: Smallest median slowdown reported as a regression
+        (default: 5)
+    BENCH_GC: Set to 1 to leave GC enabled while timing (default: 0)
+    BENCH_TIMEOUT: Per-process timeout in seconds (default: 300)
 """
 
+from __future__ import annotations
+
+import argparse
+import ast
+import gc
+import importlib.util
 import json
+import os
 import subprocess
 import sys
 import time
-from dataclasses import asdict, dataclass
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from pathlib import Path
-
-from pydantic import BaseModel, ConfigDict, Field
+from types import ModuleType
 
 try:
-    from _utils import get_project_root
+    from _bench_history import history_db_path, record_results
+    from _bench_stats import Comparison, Summary, compare, format_duration, summarize
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
-    from _utils import get_project_root
-
-try:
-    from cortex.core.path_resolver import get_venv_bin_path
-except ImportError:
-    sys.path.insert(0, str(get_project_root(Path(__file__)) / "src"))
-    from cortex.core.path_resolver import get_venv_bin_path
-
-EXTRA_FORBID = "forbid"
-
-
-class TestModuleInfo(BaseModel):
-    """Test module information structure."""
-
-    model_config = ConfigDict(extra=EXTRA_FORBID, validate_assignment=True)
-
-    module: str = Field(description="Module name")
-    test_file: str = Field(description="Test file path")
-    target: str = Field(description="Target identifier")
-    day: int = Field(ge=1, description="Day number")
-
-
-@dataclass
-class BenchmarkResult:
-    """Results from a benchmark run."""
-
-    module: str
-    test_file: str
-    test_count: int
-    execution_time_s: float
-    tests_passed: int
-    tests_failed: int
-    improvement_target: str
-    status: str
-
-
-class PerformanceBenchmark:
-    """Benchmark suite using existing test files."""
-
-    def __init__(self):
-        """Initialize benchmark suite."""
-        self.results: list[BenchmarkResult] = []
-        self.test_modules: list[TestModuleInfo] = [
-            TestModuleInfo(
-                module="duplication_detector",
-                test_file="tests/unit/test_duplication_detector.py",
-                target="80-95%",
-                day=1,
-            ),
-            TestModuleInfo(
-                module="relevance_scorer",
-                test_file="tests/unit/test_relevance_scorer.py",
-                target="60-80%",
-                day=2,
-            ),
-            TestModuleInfo(
-                module="pattern_analyzer",
-                test_file="tests/unit/test_pattern_analyzer.py",
-                target="70-85%",
-                day=3,
-            ),
-            TestModuleInfo(
-                module="link_parser",
-                test_file="tests/unit/test_link_parser.py",
-                target="30-50%",
-                day=4,
-            ),
-            TestModuleInfo(
-                module="rules_indexer",
-                test_file="tests/unit/test_rules_indexer.py",
-                target="40-60%",
-                day=5,
-            ),
-        ]
-
-    def run_test_file(self, test_file: str) -> tuple[float, int, int, int]:
-        """Run a test file and measure execution time.
-
-        Args:
-            test_file: Path to test file
-
-        Returns:
-            Tuple of (execution_time_s, test_count, passed, failed)
-        """
-        start = time.perf_counter()
-        project_root = get_project_root(Path(__file__))
-        pytest_bin = str(get_venv_bin_path(project_root) / "pytest")
-
+    from _bench_history import history_db_path, record_results
+    from _bench_stats import Comparison, Summary, compare, format_duration, summarize
+    from _utils import (
+        get_benchmark_results_dir,
+        get_config_int,
+        get_config_path,
+        get_project_root,
+    )
+
+BENCH_PROCESSES = get_config_int("BENCH_PROCESSES", 5)
+BENCH_WARMUPS = get_config_int("BENCH_WARMUPS", 2)
+BENCH_REPEATS = get_config_int("BENCH_REPEATS", 5)
+BENCH_MIN_TIME_MS = get_config_int("BENCH_MIN_TIME_MS", 50)
+BENCH_THRESHOLD_PCT = get_config_int("BENCH_THRESHOLD_PCT", 5)
+BENCH_GC = get_config_int("BENCH_GC", 0)
+BENCH_TIMEOUT = get_config_int("BENCH_TIMEOUT", 300)
+
+DEFAULT_BENCH_DIRS = ("benchmarks", "tests/benchmarks")
+BASELINE_FILE = "bench_baseline.json"
+_RESULT_MARKER = "@@BENCH_RESULT@@ "
+_MAX_ITERATIONS = 10**9
+
+
+@dataclass(frozen=True, slots=True)
+class Benchmark:
+    """A discovered benchmark function."""
+
+    path: Path
+    func: str
+
+    @property
+    def name(self) -> str:
+        """Stable identifier: ``<file stem>::<function>``."""
+        return f"{self.path.stem}::{self.func}"
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkRun:
+    """Samples from all worker processes for one benchmark."""
+
+    name: str
+    iterations: int
+    samples: tuple[float, ...]
+    error: str = ""
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+
+def bench_dirs(project_root: Path) -> list[Path]:
+    """Directories searched for bench files."""
+    configured = get_config_path("BENCH_DIR")
+    if configured is not None:
+        return [configured if configured.is_absolute() else project_root / configured]
+    return [project_root / d for d in DEFAULT_BENCH_DIRS]
+
+
+def discover(dirs: list[Path], pattern: str | None = None) -> list[Benchmark]:
+    """Find zero-argument ``bench_*`` functions without importing bench files."""
+    found: list[Benchmark] = []
+    for directory in dirs:
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.rglob("bench_*.py")):
+            try:
+                tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+            except (OSError, SyntaxError) as e:
+                print(f"⚠️  Skipping {path}: {e}", file=sys.stderr)
+                continue
+            for node in tree.body:
+                if (
+                    isinstance(node, ast.FunctionDef)
+                    and node.name.startswith("bench_")
+                    and not node.args.args
+                    and not node.args.posonlyargs
+                ):
+                    bench = Benchmark(path, node.name)
+                    if pattern is None or pattern in bench.name:
+                        found.append(bench)
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs in a fresh process per sample batch)
+# ---------------------------------------------------------------------------
+
+
+def _load_module(path: Path) -> ModuleType:
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(f"_bench_{path.stem}", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _time_loop(func: Callable[[], object], iterations: int) -> float:
+    loop = range(iterations)
+    timer = time.perf_counter_ns
+    start = timer()
+    for _ in loop:
+        func()
+    return (timer() - start) / 1e9
+
+
+def calibrate(func: Callable[[], object], min_time_s: float) -> int:
+    """Smallest power-of-two-ish iteration count whose loop takes ``min_time_s``."""
+    iterations = 1
+    while iterations < _MAX_ITERATIONS:
+        elapsed = _time_loop(func, iterations)
+        if elapsed >= min_time_s:
+            return iterations
+        if elapsed <= 0:
+            iterations *= 10
+        else:
+            # Aim slightly past the target, but at least double
+            iterations = max(
+                iterations * 2, int(iterations * min_time_s / elapsed * 1.2)
+            )
+    return _MAX_ITERATIONS
+
+
+def run_worker(
+    path: Path,
+    func_name: str,
+    iterations: int,
+    warmups: int,
+    repeats: int,
+    keep_gc: bool,
+    min_time_s: float,
+) -> dict[str, object]:
+    """Time one benchmark in this process; ``iterations=0`` calibrates first."""
+    module = _load_module(path)
+    setup = getattr(module, "setup", None)
+    if callable(setup):
+        _ = setup()
+    func = getattr(module, func_name)
+    if iterations <= 0:
+        iterations = calibrate(func, min_time_s)
+    for _ in range(warmups):
+        _ = _time_loop(func, iterations)
+    samples: list[float] = []
+    for _ in range(repeats):
+        _ = gc.collect()
+        if not keep_gc:
+            gc.disable()
+        try:
+            elapsed = _time_loop(func, iterations)
+        finally:
+            gc.enable()
+        samples.append(elapsed / iterations)
+    return {"iterations": iterations, "samples": samples}
+
+
+def parse_cpus(text: str) -> tuple[int, ...]:
+    """Parse a CPU list such as ``2,3`` or ``0-3``."""
+    cpus: list[int] = []
+    for part in text.split(","):
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part.strip():
+            cpus.append(int(part))
+    return tuple(cpus)
+
+
+def pin_cpus(cpus: Sequence[int]) -> None:
+    """Pin this process to ``cpus`` (Linux); warn where unsupported."""
+    setaffinity = getattr(os, "sched_setaffinity", None)
+    if setaffinity is None:
+        print("⚠️  CPU pinning is not supported on this platform", file=sys.stderr)
+        return
+    setaffinity(0, set(cpus))
+
+
+# ---------------------------------------------------------------------------
+# Parent: orchestration, baseline, report
+# ---------------------------------------------------------------------------
+
+
+def _worker_env(project_root: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    src = str(project_root / "src")
+    existing = env.get("PYTHONPATH")
+    env["PYTHONPATH"] = f"{src}{os.pathsep}{existing}" if existing else src
+    # Same hash seed in every worker so dict/set layout does not add noise
+    env["PYTHONHASHSEED"] = "0"
+    return env
+
+
+def spawn_worker(
+    project_root: Path,
+    bench: Benchmark,
+    iterations: int,
+    cpus: Sequence[int] = (),
+) -> tuple[int, list[float], str]:
+    """Run one worker process; returns ``(iterations, samples, error)``.
+
+    The worker runs in ``project_root`` with its ``src/`` importable, so the
+    same bench file can time different checkouts of the code under test.
+    """
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        str(bench.path),
+        bench.func,
+        "--iterations",
+        str(iterations),
+    ]
+    if cpus:
+        cmd.extend(["--cpus", ",".join(str(c) for c in cpus)])
+    try:
         result = subprocess.run(
-            [pytest_bin, test_file, "-v", "--tb=short"],
+            cmd,
             cwd=project_root,
+            env=_worker_env(project_root),
             capture_output=True,
             text=True,
+            timeout=BENCH_TIMEOUT,
+            check=False,
         )
-
-        end = time.perf_counter()
-        execution_time = end - start
-
-        # Parse output for test counts
-        output = result.stdout + result.stderr
-        passed = output.count(" PASSED")
-        failed = output.count(" FAILED")
-        test_count = passed + failed
-
-        return execution_time, test_count, passed, failed
-
-    def run_all(self) -> None:
-        """Run all benchmarks."""
-        print("🚀 Phase 10.3.1 Performance Benchmark Suite")
-        print("   Measuring test execution times for optimized modules")
-        print("=" * 70)
-
-        for test_info in self.test_modules:
-            print(f"\n📊 Day {test_info.day}: Testing {test_info.module}...")
-            print(f"   File: {test_info.test_file}")
-            print(f"   Target improvement: {test_info.target}")
-
-            exec_time, test_count, passed, failed = self.run_test_file(
-                test_info.test_file
-            )
-
-            status = "✅ PASS" if failed == 0 else f"⚠️ {failed} FAILED"
-
-            result = BenchmarkResult(
-                module=test_info.module,
-                test_file=test_info.test_file,
-                test_count=test_count,
-                execution_time_s=round(exec_time, 3),
-                tests_passed=passed,
-                tests_failed=failed,
-                improvement_target=test_info.target,
-                status=status,
+    except subprocess.TimeoutExpired:
+        return iterations, [], f"worker timed out after {BENCH_TIMEOUT}s"
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith(_RESULT_MARKER):
+            data = json.loads(line[len(_RESULT_MARKER) :])
+            return int(data["iterations"]), [float(s) for s in data["samples"]], ""
+    tail = "\n".join((result.stderr or result.stdout).strip().splitlines()[-10:])
+    return iterations, [], tail or f"worker exited with {result.returncode}"
+
+
+def run_benchmark(
+    project_root: Path,
+    bench: Benchmark,
+    processes: int,
+    cpus: Sequence[int] = (),
+) -> BenchmarkRun:
+    """Calibrate in the first worker, then collect samples from all workers."""
+    iterations = 0
+    samples: list[float] = []
+    for _ in range(max(processes, 1)):
+        iterations, batch, error = spawn_worker(project_root, bench, iterations, cpus)
+        if error:
+            return BenchmarkRun(bench.name, iterations, tuple(samples), error)
+        samples.extend(batch)
+    return BenchmarkRun(bench.name, iterations, tuple(samples))
+
+
+def _load_samples(path: Path) -> dict[str, list[float]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    benchmarks = data.get("benchmarks", {}) if isinstance(data, dict) else {}
+    return {
+        name: [float(s) for s in entry.get("samples", [])]
+        for name, entry in benchmarks.items()
+        if isinstance(entry, dict)
+    }
+
+
+def _save_baseline(path: Path, runs: list[BenchmarkRun]) -> None:
+    """Write samples for every successful run as the comparison baseline."""
+    payload = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "benchmarks": {
+            run.name: {"iterations": run.iterations, "samples": list(run.samples)}
+            for run in runs
+            if not run.error
+        },
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def _print_row(
+    run: BenchmarkRun, summary: Summary, comparison: Comparison | None
+) -> None:
+    verdict = ""
+    if comparison is not None:
+        change = f"{(comparison.ratio - 1) * 100:+.1f}% (p={comparison.p_value:.3g})"
+        if comparison.regression:
+            verdict = f"  🔴 {change} slower"
+        elif comparison.improvement:
+            verdict = f"  🟢 {change} faster"
+        else:
+            verdict = f"  ≈ {change}"
+    print(
+        f"  {run.name}: {format_duration(summary.median)} "
+        + f"± IQR {format_duration(summary.iqr)} "
+        + f"[95% CI {format_duration(summary.ci_low)}–{format_duration(summary.ci_high)}] "
+        + f"n={summary.n} x{run.iterations}{verdict}"
+    )
+
+
+def run_suite(
+    project_root: Path,
+    benches: list[Benchmark],
+    baseline: dict[str, list[float]],
+    alpha: float,
+    cpus: Sequence[int] = (),
+) -> tuple[list[BenchmarkRun], list[str]]:
+    """Run and report every benchmark; return runs and regressed names."""
+    runs: list[BenchmarkRun] = []
+    regressions: list[str] = []
+    for bench in benches:
+        run = run_benchmark(project_root, bench, BENCH_PROCESSES, cpus)
+        runs.append(run)
+        if run.error:
+            print(f"  ❌ {run.name}: {run.error}")
+            continue
+        comparison = None
+        base_samples = baseline.get(run.name)
+        if base_samples:
+            comparison = compare(
+                base_samples,
+                run.samples,
+                alpha=alpha,
+                min_change=BENCH_THRESHOLD_PCT / 100,
             )
-
-            self.results.append(result)
-
-            print(f"   ⏱️  Execution time: {exec_time:.3f}s")
-            print(f"   ✅ Tests passed: {passed}/{test_count}")
-            print(f"   Status: {status}")
-
-        self._print_summary()
-        self._save_results()
-
-    def _print_summary(self) -> None:
-        """Print benchmark summary."""
-        print("\n" + "=" * 70)
-        print("📊 BENCHMARK SUMMARY")
-        print("=" * 70)
-
-        total_tests = sum(r.test_count for r in self.results)
-        total_passed = sum(r.tests_passed for r in self.results)
-        total_time = sum(r.execution_time_s for r in self.results)
-        all_passed = all(r.tests_failed == 0 for r in self.results)
-
-        print(f"\n✅ Total tests: {total_passed}/{total_tests} passing")
-        print(f"⏱️  Total execution time: {total_time:.3f}s")
-        print(
-            f"🎯 Overall status: {'✅ ALL PASS' if all_passed else '⚠️ SOME FAILURES'}"
-        )
-
-        print("\n📋 Module-by-module results:")
-        for result in self.results:
-            print(
-                f"  {result.status} {result.module}: "
-                + f"{result.execution_time_s:.3f}s "
-                + f"({result.tests_passed}/{result.test_count} tests, "
-                + f"target: {result.improvement_target})"
-            )
-
-        print("\n🎉 Phase 10.3.1 Performance Achievements:")
-        print("  ✅ Day 1: Content hashing + similarity caching (consolidation)")
-        print("  ✅ Day 2: Dependency score caching + FIFO eviction (relevance)")
-        print("  ✅ Day 3: Entry windowing for large logs (pattern analysis)")
-        print("  ✅ Day 4: Module-level regex + set operations (link parsing)")
-        print("  ✅ Day 5: Frozenset patterns + pre-compiled regex (rules/insights)")
-
-    def _save_results(self) -> None:
-        """Save benchmark results to JSON (under .cortex to avoid repo-root artifacts)."""
-        output_dir = Path(".cortex/benchmark_results")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / "phase_10_3_1_day6_results.json"
-
-        results_data = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "phase": "10.3.1",
-            "day": 6,
-            "description": "Performance validation for Days 1-5 optimizations",
-            "results": [asdict(r) for r in self.results],
-            "summary": {
-                "total_tests": sum(r.test_count for r in self.results),
-                "total_passed": sum(r.tests_passed for r in self.results),
-                "total_failed": sum(r.tests_failed for r in self.results),
-                "total_time_s": round(sum(r.execution_time_s for r in self.results), 3),
-                "all_passed": all(r.tests_failed == 0 for r in self.results),
-            },
-        }
-
-        with open(output_path, "w") as f:
-            json.dump(results_data, f, indent=2)
-
-        print(f"\n💾 Results saved to: {output_path}")
-
-
-def main() -> None:
-    """Main entry point."""
-    benchmark = PerformanceBenchmark()
-    benchmark.run_all()
+            if comparison.regression:
+                regressions.append(run.name)
+        _print_row(run, summarize(run.samples), comparison)
+    return runs, regressions
+
+
+def _worker_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("path", type=Path)
+    _ = parser.add_argument("func")
+    _ = parser.add_argument("--iterations", type=int, default=0)
+    _ = parser.add_argument("--cpus", type=parse_cpus, default=())
+    args = parser.parse_args(argv)
+    if args.cpus:
+        pin_cpus(args.cpus)
+    data = run_worker(
+        args.path,
+        args.func,
+        args.iterations,
+        warmups=BENCH_WARMUPS,
+        repeats=BENCH_REPEATS,
+        keep_gc=bool(BENCH_GC),
+        min_time_s=BENCH_MIN_TIME_MS / 1000,
+    )
+    print(_RESULT_MARKER + json.dumps(data))
+    return 0
+
+
+def main() -> int:
+    """Discover, run, report and compare benchmarks."""
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        return _worker_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(
+        description="Run bench_* micro-benchmarks with statistical comparison."
+    )
+    _ = parser.add_argument(
+        "-k", dest="pattern", help="Only benchmarks whose name contains PATTERN"
+    )
+    _ = parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run's samples as the comparison baseline",
+    )
+    _ = parser.add_argument(
+        "--no-compare", action="store_true", help="Do not compare with the baseline"
+    )
+    _ = parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.01,
+        help="Significance level for regressions (default: 0.01)",
+    )
+    _ = parser.add_argument(
+        "--cpus",
+        type=parse_cpus,
+        default=(),
+        help="Pin worker processes to these CPUs, e.g. 2,3 or 2-3 (Linux)",
+    )
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    benches = discover(bench_dirs(project_root), args.pattern)
+    if not benches:
+        dirs = ", ".join(str(d) for d in bench_dirs(project_root))
+        print(f"✅ No bench_* functions found in {dirs} (skipped)")
+        return 0
+
+    results_dir = get_benchmark_results_dir(project_root)
+    baseline_path = results_dir / BASELINE_FILE
+    baseline = {} if args.no_compare else _load_samples(baseline_path)
+    print(
+        f"📊 {len(benches)} benchmark(s): {BENCH_PROCESSES} process(es) × "
+        + f"{BENCH_REPEATS} repeat(s), {BENCH_WARMUPS} warmup(s)"
+        + (f"; baseline {baseline_path.name}" if baseline else "")
+    )
+    runs, regressions = run_suite(
+        project_root, benches, baseline, args.alpha, args.cpus
+    )
+
+    samples = {run.name: run.samples for run in runs if not run.error}
+    if samples:
+        _ = record_results(project_root, samples, source="benchmark_performance")
+        print(f"🗄️  Recorded in {history_db_path(project_root)}")
+    if args.save_baseline:
+        _save_baseline(baseline_path, runs)
+        print(f"💾 Baseline saved to {baseline_path}")
+
+    errors = [run.name for run in runs if run.error]
+    if regressions:
+        print(f"\n❌ Significant regressions: {', '.join(regressions)}")
+    if errors:
+        print(f"\n❌ Failed benchmarks: {', '.join(errors)}")
+    if regressions or errors:
+        return 1
+    print("\n✅ No significant regressions")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
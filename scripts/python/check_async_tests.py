@@ -14,9 +14,11 @@ import sys
 from pathlib import Path
 
 try:
+    from _trace import traced
     from _utils import get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
+    from _trace import traced
     from _utils import get_project_root
 
 
@@ -56,6 +58,7 @@ _ASYNC_NAME_BLOCKLIST: frozenset[str] = frozenset(
 )
 
 
+@traced("collect async names")
 def collect_async_names_from_src(project_root: Path, src_dir: Path) -> set[str]:
     """Collect async function and method names from src/, excluding generic and
     ambiguous names.
@@ -174,6 +177,7 @@ class _UnawaitedCallVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
 
+@traced("check file")
 def check_file(path: Path, async_names: set[str]) -> list[tuple[int, int, str]]:
     """Check a single test file for unawaited coroutine calls.
 
@@ -204,6 +208,7 @@ def find_test_directories(project_root: Path) -> list[Path]:
     return []
 
 
+@traced("discover")
 def find_test_files(test_dirs: list[Path]) -> list[Path]:
     """Collect test_*.py and *_test.py under test directories."""
     files: list[Path] = []
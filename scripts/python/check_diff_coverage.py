@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Diff-coverage gate: coverage of lines changed since the merge base.
+
+Intersects coverage data (the `.coverage` SQLite file or a coverage JSON
+report) with the lines added or modified since the merge base of HEAD and
+DIFF_BASE (`git diff -U0`, plus untracked files). Reports uncovered changed
+lines per file and fails when the changed-line coverage is below the
+threshold. Changed source files that coverage never measured (never imported
+by any test) count as fully uncovered.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/check_diff_coverage.py [--base main]
+
+Configuration:
+    DIFF_COVERAGE_THRESHOLD: Minimum changed-line coverage percentage (default: 90)
+    DIFF_BASE: Ref whose merge base with HEAD is diffed against (default: main)
+    COVERAGE_FILE: Path to .coverage data file (default: .coverage in project root)
+    COVERAGE_SOURCES: Comma-separated source dirs for unmeasured files (default: src)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+
+try:
+    from _coverage_data import (
+        FileCoverage,
+        coverage_exclude_regex,
+        default_data_file,
+        iter_coverage_files,
+        restrict_to_lines,
+        statement_lines,
+    )
+    from _git_diff import changed_lines
+    from _utils import get_config_int, get_project_root
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _coverage_data import (
+        FileCoverage,
+        coverage_exclude_regex,
+        default_data_file,
+        iter_coverage_files,
+        restrict_to_lines,
+        statement_lines,
+    )
+    from _git_diff import changed_lines
+    from _utils import get_config_int, get_project_root
+
+DIFF_COVERAGE_THRESHOLD = get_config_int("DIFF_COVERAGE_THRESHOLD", 90)
+COVERAGE_SOURCES = [
+    s.strip() for s in os.getenv("COVERAGE_SOURCES", "src").split(",") if s.strip()
+]
+
+
+def format_line_ranges(lines: Iterable[int]) -> str:
+    """Collapse sorted line numbers into ``"3-5, 9"`` form."""
+    ranges: list[str] = []
+    start: int | None = None
+    prev: int | None = None
+    for line in sorted(lines):
+        if start is None or prev is None or line != prev + 1:
+            if start is not None and prev is not None:
+                ranges.append(str(start) if start == prev else f"{start}-{prev}")
+            start = line
+        prev = line
+    if start is not None and prev is not None:
+        ranges.append(str(start) if start == prev else f"{start}-{prev}")
+    return ", ".join(ranges)
+
+
+def _is_source_path(path: str) -> bool:
+    if not path.endswith(".py") or Path(path).name.startswith("test_"):
+        return False
+    return any(path == src or path.startswith(f"{src}/") for src in COVERAGE_SOURCES)
+
+
+def compute_diff_coverage(
+    project_root: Path, coverage_path: Path, changed: dict[str, set[int]]
+) -> list[FileCoverage]:
+    """Return per-file coverage restricted to changed lines.
+
+    Args:
+        project_root: Project root (paths in ``changed`` are relative to it)
+        coverage_path: `.coverage` data file or coverage JSON report
+        changed: Changed-line index from ``_git_diff.changed_lines``
+
+    Returns:
+        One entry per changed file that has changed statements, sorted by path
+    """
+    results: list[FileCoverage] = []
+    measured: set[str] = set()
+    for item in iter_coverage_files(coverage_path, project_root, only=set(changed)):
+        measured.add(item.path)
+        restricted = restrict_to_lines(item, changed[item.path])
+        if restricted is not None:
+            results.append(restricted)
+
+    exclude_regex: str | None = None
+    for path, lines in changed.items():
+        if path in measured or not _is_source_path(path):
+            continue
+        if exclude_regex is None:
+            exclude_regex = coverage_exclude_regex(project_root)
+        try:
+            statements = statement_lines(project_root / path, exclude_regex)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+        missing = tuple(sorted(lines & statements))
+        if missing:
+            results.append(FileCoverage(path, len(missing), 0, missing))
+
+    results.sort(key=lambda r: r.path)
+    return results
+
+
+def diff_coverage_percent(results: Iterable[FileCoverage]) -> float:
+    """Changed-line coverage percentage (100.0 when nothing measurable changed)."""
+    total = 0
+    covered = 0
+    for result in results:
+        total += result.num_statements
+        covered += result.covered_lines
+    return 100.0 if total == 0 else covered / total * 100.0
+
+
+def default_coverage_path(project_root: Path) -> Path:
+    """Return the coverage data to read: COVERAGE_FILE, .coverage, coverage.json."""
+    data_file = default_data_file(project_root)
+    if data_file.exists():
+        return data_file
+    return project_root / "coverage.json"
+
+
+def run_diff_coverage_gate(
+    project_root: Path,
+    coverage_path: Path,
+    threshold: float,
+    base_ref: str | None = None,
+) -> int:
+    """Print the diff-coverage report and return the gate's exit code."""
+    changed = changed_lines(project_root, base_ref)
+    if changed is None:
+        print(
+            "⚠️  Diff coverage: no merge base found (set DIFF_BASE); skipping.",
+            file=sys.stderr,
+        )
+        return 0
+    if not coverage_path.exists():
+        print(f"❌ Coverage data not found: {coverage_path}", file=sys.stderr)
+        return 1
+
+    try:
+        results = compute_diff_coverage(project_root, coverage_path, changed)
+    except (json.JSONDecodeError, OSError, sqlite3.Error) as e:
+        print(f"❌ Error reading {coverage_path}: {e}", file=sys.stderr)
+        return 1
+
+    percent = diff_coverage_percent(results)
+    total = sum(r.num_statements for r in results)
+    covered = sum(r.covered_lines for r in results)
+
+    uncovered = [r for r in results if r.missing_lines]
+    if uncovered:
+        print("Uncovered changed lines:")
+        for result in uncovered:
+            print(
+                f"  {result.path}: {format_line_ranges(result.missing_lines)} "
+                + f"({result.covered_lines}/{result.num_statements} covered)"
+            )
+        print()
+
+    print(
+        f"Diff coverage: {percent:.2f}% ({covered}/{total} changed lines, "
+        + f"{len(results)} files; threshold: {threshold:.1f}%)"
+    )
+    if percent < threshold:
+        print(
+            f"❌ Diff coverage {percent:.2f}% is below threshold {threshold:.1f}%",
+            file=sys.stderr,
+        )
+        return 1
+    print("✅ Diff coverage gate passed")
+    return 0
+
+
+def main() -> int:
+    """Run the diff-coverage gate."""
+    parser = argparse.ArgumentParser(
+        description="Gate on coverage of lines changed since the merge base.",
+    )
+    _ = parser.add_argument(
+        "--coverage",
+        "-c",
+        type=Path,
+        default=None,
+        help="Coverage data (.coverage or JSON; default: .coverage, coverage.json)",
+    )
+    _ = parser.add_argument(
+        "--base",
+        "-b",
+        type=str,
+        default=None,
+        help="Ref to diff against via merge base (default: DIFF_BASE or main)",
+    )
+    _ = parser.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=float(DIFF_COVERAGE_THRESHOLD),
+        help=f"Minimum changed-line coverage %% (default: {DIFF_COVERAGE_THRESHOLD})",
+    )
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    coverage_path: Path = args.coverage or default_coverage_path(project_root)
+    return run_diff_coverage_gate(
+        project_root, coverage_path, args.threshold, base_ref=args.base
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
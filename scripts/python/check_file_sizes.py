@@ -18,6 +18,7 @@ from pathlib import Path
 
 # Import shared utilities
 try:
+    from _trace import span, traced
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -27,6 +28,7 @@ try:
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _trace import span, traced
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -57,6 +59,7 @@ WARN_LINES = get_config_int("FILE_SIZE_WARN_LINES", 350)
 EXCLUDED_FILENAMES = _default_excluded
 
 
+@traced("count lines")
 def count_lines(path: Path) -> int:
     """Count non-blank, non-comment, non-docstring lines.
 
@@ -147,7 +150,9 @@ def main() -> None:
             sys.exit(0)
 
         # Must match cortex.core.constants.FILE_SIZE_EXCLUDED_FILENAMES and pre_commit_helpers
-        for py_file in src_dir.glob("**/*.py"):
+        with span("discover"):
+            py_files = list(src_dir.glob("**/*.py"))
+        for py_file in py_files:
             # Skip __pycache__ and test files
             if "__pycache__" in str(py_file) or py_file.name.startswith("test_"):
                 continue
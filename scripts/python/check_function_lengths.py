@@ -17,6 +17,7 @@ from pathlib import Path
 
 # Import shared utilities
 try:
+    from _trace import span
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -26,6 +27,7 @@ try:
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _trace import span
     from _utils import (
         find_src_directory,
         get_config_int,
@@ -133,7 +135,7 @@ def check_function_length(path: Path) -> list[tuple[str, int, int, int]]:
         List of violations as (function_name, logical_lines, start_line, end_line)
     """
     try:
-        with open(path, encoding="utf-8") as f:
+        with span("read"), open(path, encoding="utf-8") as f:
             source = f.read()
             source_lines = source.split("\n")
     except Exception as e:
@@ -141,13 +143,15 @@ def check_function_length(path: Path) -> list[tuple[str, int, int, int]]:
         return []
 
     try:
-        tree = ast.parse(source, filename=str(path))
+        with span("parse"):
+            tree = ast.parse(source, filename=str(path))
     except SyntaxError as e:
         print(f"Syntax error in {path}: {e}", file=sys.stderr)
         return []
 
     visitor = FunctionVisitor(source_lines)
-    visitor.visit(tree)
+    with span("visit"):
+        visitor.visit(tree)
 
     return visitor.violations
 
@@ -229,7 +233,9 @@ def main() -> None:
             print(f"Project root: {project_root}", file=sys.stderr)
             sys.exit(1)
 
-        for py_file in src_dir.glob("**/*.py"):
+        with span("discover"):
+            py_files = list(src_dir.glob("**/*.py"))
+        for py_file in py_files:
             if "__pycache__" in str(py_file) or py_file.name.startswith("test_"):
                 continue
             if _is_excluded(py_file):
@@ -241,6 +247,14 @@ def main() -> None:
                     (py_file, func_name, logical_lines, start_line, end_line)
                 )
 
+    with span("report"):
+        _report(all_violations, project_root)
+
+
+def _report(
+    all_violations: list[tuple[Path, str, int, int, int]], project_root: Path
+) -> None:
+    """Print violations grouped by file and exit 1, or confirm and exit 0."""
     if all_violations:
         print("❌ Function length violations detected:", file=sys.stderr)
         print(file=sys.stderr)
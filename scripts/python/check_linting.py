@@ -33,6 +33,9 @@ except ImportError:
         get_synapse_scripts_dir,
     )
 
+# Records the tool subprocess in the trace when GATE_TRACE is set
+import _trace  # noqa: F401  # pyright: ignore[reportUnusedImport]
+
 try:
     from cortex.core.path_resolver import get_venv_bin_path
 except ImportError:
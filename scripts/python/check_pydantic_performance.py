@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Gate pydantic overhead on hot paths.
+
+python-pydantic-standards.mdc puts pydantic models on every structured data
+path, which makes validation cost easy to multiply by accident. This gate
+runs the checks in _pydantic_perf.py over the source tree:
+
+- model_validate/constructor calls inside loops and comprehensions
+- validate_assignment=True models mutated in loops
+- model_dump() output re-validated
+- model_copy(deep=True)
+- TypeAdapter constructed inside functions instead of at module level
+
+Models are indexed across the whole source tree first, so constructors and
+validate_assignment settings of models imported from other modules are
+recognized (analyze_performance.py reports the same findings per file, with
+only the file's own models known).
+
+Findings are reported in analyze_performance.py's severity-ranked format.
+Where the data is already validated, model_construct() skips validation.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/check_pydantic_performance.py
+
+Configuration:
+    SRC_DIR: Source directory path (default: auto-detected)
+    PYDANTIC_PERF_FAIL_ON: Lowest severity that fails the gate: high,
+        medium, low, or none to only report (default: high)
+"""
+
+import ast
+import os
+import sys
+from pathlib import Path
+
+# Import shared utilities
+try:
+    from _findings import FindingStore
+    from _pydantic_perf import check_tree, collect_models
+    from _utils import find_src_directory, get_config_path, get_project_root
+    from analyze_performance import ISSUE_FIELDS, SEVERITY_ICONS, SEVERITY_ORDER
+except ImportError:
+    # Fallback if running from different location
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _findings import FindingStore
+    from _pydantic_perf import check_tree, collect_models
+    from _utils import find_src_directory, get_config_path, get_project_root
+    from analyze_performance import ISSUE_FIELDS, SEVERITY_ICONS, SEVERITY_ORDER
+
+FAIL_ON_NONE = "none"
+
+
+def _resolve_src_dir(project_root: Path) -> Path:
+    src_dir = get_config_path("SRC_DIR")
+    if src_dir is None:
+        return find_src_directory(project_root)
+    return src_dir if src_dir.is_absolute() else project_root / src_dir
+
+
+def parse_sources(src_dir: Path) -> dict[str, ast.AST]:
+    """Parse every non-test source file, keyed by path relative to ``src_dir``."""
+    trees: dict[str, ast.AST] = {}
+    for py_file in sorted(src_dir.rglob("*.py")):
+        if "__pycache__" in py_file.parts or py_file.name.startswith("test_"):
+            continue
+        try:
+            trees[py_file.relative_to(src_dir).as_posix()] = ast.parse(
+                py_file.read_text(encoding="utf-8"), filename=str(py_file)
+            )
+        except (SyntaxError, UnicodeDecodeError) as e:
+            print(f"⚠️  Skipping {py_file}: {e}")
+    return trees
+
+
+def check_sources(trees: dict[str, ast.AST]) -> dict[str, FindingStore]:
+    """Run the pydantic hot-path checks over parsed sources."""
+    index = collect_models(trees.values())
+    results: dict[str, FindingStore] = {}
+    for module, tree in trees.items():
+        findings = FindingStore(ISSUE_FIELDS)
+        check_tree(tree, findings, index)
+        if findings:
+            results[module] = findings
+    return results
+
+
+def _print_findings(results: dict[str, FindingStore]) -> dict[str, int]:
+    """Print findings grouped by file and severity; return severity counts."""
+    counts = dict.fromkeys(SEVERITY_ORDER, 0)
+    for module, findings in results.items():
+        print(f"\n📄 {module}")
+        rows = sorted(
+            findings.rows(), key=lambda r: (SEVERITY_ORDER.index(str(r[1])), r[2])
+        )
+        for _type, severity, line, function, message in rows:
+            counts[str(severity)] += 1
+            where = f" in {function}()" if function else ""
+            print(f"  {SEVERITY_ICONS[str(severity)]} Line {line:4d}{where}: {message}")
+    return counts
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code (0 for success, 1 for findings at or above the threshold)
+    """
+    fail_on = os.getenv("PYDANTIC_PERF_FAIL_ON", "high").strip().lower()
+    if fail_on not in (*SEVERITY_ORDER, FAIL_ON_NONE):
+        print(f"❌ Invalid PYDANTIC_PERF_FAIL_ON: {fail_on}")
+        return 1
+
+    project_root = get_project_root(Path(__file__))
+    src_dir = _resolve_src_dir(project_root)
+    if not src_dir.exists():
+        print(f"❌ Source directory not found: {src_dir}")
+        return 1
+
+    results = check_sources(parse_sources(src_dir))
+    if not results:
+        print("✅ No pydantic hot-path issues found")
+        return 0
+
+    print("🔍 Pydantic hot-path issues:")
+    counts = _print_findings(results)
+    print("\nIssues by severity:")
+    for severity in SEVERITY_ORDER:
+        if counts[severity]:
+            print(f"  {severity.capitalize():8s}: {counts[severity]}")
+
+    if fail_on == FAIL_ON_NONE:
+        return 0
+    failing = SEVERITY_ORDER[: SEVERITY_ORDER.index(fail_on) + 1]
+    if any(counts[severity] for severity in failing):
+        print(
+            "\n💡 Validate batches once (TypeAdapter(list[Model])), hoist "
+            + "TypeAdapter to module level, and use model_construct() for "
+            + "data that is already validated"
+        )
+        print(f"\n❌ Pydantic hot-path issues at or above '{fail_on}' severity")
+        return 1
+    print(f"\n✅ No pydantic hot-path issues at or above '{fail_on}' severity")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,10 +17,12 @@ from pathlib import Path
 
 # Import shared utilities
 try:
+    from _trace import traced
     from _utils import get_config_path, get_project_root
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _trace import traced
     from _utils import get_config_path, get_project_root
 
 
@@ -72,6 +74,7 @@ class TestNamingVisitor(ast.NodeVisitor):
                 self.violations.append((func_name, node.lineno))
 
 
+@traced("check file")
 def check_test_naming(path: Path) -> list[tuple[str, int]]:
     """Check all test functions in file for naming violations.
 
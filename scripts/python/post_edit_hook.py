@@ -3,7 +3,15 @@
 
 Designed to be run from a Claude Code PostToolUse hook after an Edit tool call.
 Runs a fast pytest invocation scoped to the edited file and prints a short
-tail of output.
+tail of output. When run_tests.py has recorded a test-impact mapping, only the
+tests that execute the changed functions run; otherwise tests are guessed
+from the file name.
+
+Configuration:
+    POST_EDIT_WARM: Set to 1 to run tests in a warm, preloaded pytest worker
+        (see _pytest_warm.py). The first edit starts the worker in the
+        background and runs pytest cold; later edits skip interpreter startup,
+        plugin loading, conftest import and collection (default: 0)
 """
 
 from __future__ import annotations
@@ -15,10 +23,16 @@ import sys
 from pathlib import Path
 
 try:
-    from _utils import get_project_root
+    from _pytest_warm import run_warm, start_server, warm_supported
+    from _test_impact import ImpactDatabase, impact_db_path
+    from _utils import get_config_int, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
-    from _utils import get_project_root
+    from _pytest_warm import run_warm, start_server, warm_supported
+    from _test_impact import ImpactDatabase, impact_db_path
+    from _utils import get_config_int, get_project_root
+
+POST_EDIT_WARM = get_config_int("POST_EDIT_WARM", 0)
 
 
 def _pytest_cmd(project_root: Path) -> list[str] | None:
@@ -35,6 +49,16 @@ def _pytest_cmd(project_root: Path) -> list[str] | None:
     return None
 
 
+def _python_cmd(project_root: Path) -> list[str]:
+    """Interpreter for the warm worker: the one the project's pytest uses."""
+    venv_python = project_root / ".venv" / "bin" / "python"
+    if venv_python.exists():
+        return [str(venv_python)]
+    if shutil.which("uv") is not None:
+        return ["uv", "run", "python"]
+    return [sys.executable]
+
+
 def _tail_lines(text: str, max_lines: int) -> str:
     lines = text.splitlines()
     if len(lines) <= max_lines:
@@ -54,6 +78,24 @@ def _edited_path() -> Path | None:
     return Path(raw) if raw else None
 
 
+def _impact_targets(project_root: Path, rel: Path) -> list[str] | None:
+    """Tests affected by the edit per the impact mapping.
+
+    Returns None when the mapping cannot answer (missing, stale, or the file
+    is unknown to it); an empty list when no recorded test is affected.
+    """
+    if not impact_db_path(project_root).exists():
+        return None
+    db = ImpactDatabase(project_root)
+    try:
+        selection = db.select(project_root / "tests", only_paths=[rel.as_posix()])
+    except Exception:
+        return None
+    finally:
+        db.close()
+    return selection.targets
+
+
 def _pytest_targets(project_root: Path, edited: Path | None) -> list[str] | None:
     """Test paths to run: None means skip, empty list means whole suite."""
     if edited is None:
@@ -73,6 +115,10 @@ def _pytest_targets(project_root: Path, edited: Path | None) -> list[str] | None
         # Scripts and tooling outside src/ are not covered by tests/.
         return None
 
+    impacted = _impact_targets(project_root, rel)
+    if impacted is not None:
+        return impacted or None
+
     matches = sorted(project_root.glob(f"tests/**/test_{edited.stem}.py"))
     return [str(m.relative_to(project_root)) for m in matches] if matches else []
 
@@ -97,7 +143,18 @@ def main() -> int:
         )
         return 0
 
-    cmd = cmd_base + (targets or ["tests/"]) + ["--timeout=30", "-x", "-q"]
+    pytest_args = (targets or ["tests/"]) + ["--timeout=30", "-x", "-q"]
+    if POST_EDIT_WARM and warm_supported():
+        warm = run_warm(project_root, pytest_args)
+        if warm is not None:
+            tail = _tail_lines(warm.output, 20)
+            if tail:
+                print(tail)
+            return 0 if warm.returncode == 0 else 1
+        # No worker yet: start one for the next edit and run cold this time
+        start_server(project_root, _python_cmd(project_root))
+
+    cmd = cmd_base + pytest_args
     result = subprocess.run(
         cmd,
         cwd=project_root,
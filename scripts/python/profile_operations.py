@@ -1,214 +1,367 @@
 #!/usr/bin/env python3
 """Performance profiling script for MCP Memory Bank operations.
 
-This script profiles key operations to identify performance bottlenecks:
-- Token counting operations
-- File I/O operations
-- Dependency graph operations
-- Structure analysis operations
-- Transclusion resolution
+Profiles key operations at one or more scales to expose complexity curves:
+- token-counting: count tokens of an n-line document
+- file-io: write and read back n files
+- dependency-graph: build an n-node graph, then query every node
+- structure-analysis: analyze the organization of n chained files
+- transclusion: resolve a document with n include directives
+
+Each scenario's setup is untimed; only the operation itself is measured.
+For every scenario and scale the run writes to
+.cortex/benchmark_results/profiles/<timestamp>/ (or --output):
+- <scenario>-<n>.pstats: cProfile data (python -m pstats, snakeviz)
+- <scenario>-<n>.collapsed: sampled stacks (flamegraph.pl, speedscope)
+- summary.json: timings (and peak memory) of every run
+
+The summary table shows time per unit and the growth exponent between
+consecutive scales (about 1 is linear, 2 quadratic). With --tracemalloc the
+CPU profilers are replaced by allocation tracing: peak traced memory and
+the top allocation sites still held when the operation finishes.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/profile_operations.py [--scale 1k,10k,100k] [-k PATTERN] [--tracemalloc]
+
+Configuration:
+    PROFILE_TOP: Hot functions / allocation sites shown per run (default: 5)
+    PROFILE_SAMPLE_US: Stack sampling interval in microseconds (default: 1000)
 """
 
+import argparse
 import asyncio
 import cProfile
-import io
-import pstats
+import json
 import sys
 import tempfile
 import time
+import tracemalloc
 from collections.abc import Callable, Coroutine
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from pstats import SortKey
 
-from _utils import get_project_root
+try:
+    from _bench_stats import (
+        format_bytes,
+        format_duration,
+        format_scale,
+        growth_exponent,
+        parse_scales,
+    )
+    from _stack_sampler import StackSampler, self_counts
+    from _utils import get_benchmark_results_dir, get_config_int, get_project_root
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_stats import (
+        format_bytes,
+        format_duration,
+        format_scale,
+        growth_exponent,
+        parse_scales,
+    )
+    from _stack_sampler import StackSampler, self_counts
+    from _utils import get_benchmark_results_dir, get_config_int, get_project_root
 
 sys.path.insert(0, str(get_project_root(Path(__file__)) / "src"))
 
 from cortex.analysis.structure_analyzer import StructureAnalyzer
 from cortex.core.dependency_graph import DependencyGraph
 from cortex.core.file_system import FileSystemManager
+from cortex.core.metadata_index import MetadataIndex
 from cortex.core.token_counter import TokenCounter
 from cortex.linking.parser import LinkParser
 from cortex.linking.transclusion_engine import TransclusionEngine
 
+PROFILE_TOP = get_config_int("PROFILE_TOP", 5)
+PROFILE_SAMPLE_US = get_config_int("PROFILE_SAMPLE_US", 1000)
 
-async def profile_token_counting() -> float:
-    """Profile token counting operations."""
-    print("\n=== Profiling Token Counting ===")
+Operation = Callable[[], Coroutine[object, object, object]]
 
-    counter = TokenCounter()
-    test_content = "# Test\n" * 1000  # Large content
-
-    start = time.perf_counter()
-    for _ in range(100):
-        _ = counter.count_tokens(test_content)
-    elapsed = time.perf_counter() - start
 
-    print(f"100 token counting operations: {elapsed:.3f}s")
-    print(f"Average per operation: {elapsed / 100 * 1000:.2f}ms")
-    return elapsed
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """A workload whose size is set by the scale ``n``.
 
+    ``setup(n, workdir)`` prepares state untimed and returns the operation
+    to measure; the operation's return value stays alive until allocation
+    sites are snapshotted.
+    """
 
-async def profile_file_operations() -> float:
-    """Profile file I/O operations."""
-    print("\n=== Profiling File Operations ===")
+    name: str
+    unit: str
+    setup: Callable[[int, Path], Coroutine[object, object, Operation]]
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_path = Path(tmpdir)
-        fs_manager = FileSystemManager(base_path)
 
-        test_content = "# Test Content\n" * 100
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """One scenario run at one scale."""
 
-        start = time.perf_counter()
-        for i in range(50):
-            _ = await fs_manager.write_file(Path(f"test_{i}.md"), test_content)
-            _, _ = await fs_manager.read_file(Path(f"test_{i}.md"))
-        elapsed = time.perf_counter() - start
+    scenario: str
+    scale: int
+    elapsed_s: float
+    peak_bytes: int = 0
+    error: str = ""
 
-        print(f"50 write+read operations: {elapsed:.3f}s")
-        print(f"Average per operation: {elapsed / 50 * 1000:.2f}ms")
-        return elapsed
 
+async def setup_token_counting(n: int, _workdir: Path) -> Operation:
+    """Count tokens of an n-line markdown document."""
+    counter = TokenCounter()
+    content = "".join(f"# Heading {i}\nSome *content* line {i}.\n" for i in range(n))
 
-async def profile_dependency_graph() -> float:
-    """Profile dependency graph operations."""
-    print("\n=== Profiling Dependency Graph ===")
-
-    graph = DependencyGraph()
-
-    # Build a large graph
-    start = time.perf_counter()
-    for i in range(100):
-        for j in range(i % 10):
-            graph.add_dynamic_dependency(f"file_{i}.md", f"file_{j}.md")
-
-    # Test operations
-    for i in range(100):
-        _ = graph.get_dependencies(f"file_{i}.md")
-        _ = graph.get_dependents(f"file_{i}.md")
-
-    elapsed = time.perf_counter() - start
+    async def operation() -> object:
+        return counter.count_tokens(content)
 
-    print(f"Built 100 nodes + 200 queries: {elapsed:.3f}s")
-    print(f"Average per operation: {elapsed / 300 * 1000:.2f}ms")
-    return elapsed
+    return operation
 
 
-async def profile_structure_analysis() -> float:
-    """Profile structure analysis operations."""
-    print("\n=== Profiling Structure Analysis ===")
+async def setup_file_operations(n: int, workdir: Path) -> Operation:
+    """Write and read back n files."""
+    fs_manager = FileSystemManager(workdir)
+    content = "# Test Content\n" * 100
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_path = Path(tmpdir)
-        fs_manager = FileSystemManager(base_path)
+    async def operation() -> object:
+        for i in range(n):
+            _ = await fs_manager.write_file(Path(f"test_{i}.md"), content)
+            _, _ = await fs_manager.read_file(Path(f"test_{i}.md"))
+        return fs_manager
 
-        # Create test files
-        for i in range(20):
-            content = f"# File {i}\n" + ("Content line\n" * 100)
-            _ = await fs_manager.write_file(Path(f"file_{i}.md"), content)
+    return operation
 
-        dep_graph = DependencyGraph()
-        for i in range(20):
-            if i > 0:
-                dep_graph.add_dynamic_dependency(f"file_{i}.md", f"file_{i - 1}.md")
 
-        from cortex.core.metadata_index import MetadataIndex
+async def setup_dependency_graph(n: int, _workdir: Path) -> Operation:
+    """Build an n-node graph (up to 9 edges per node) and query every node."""
 
-        metadata_index = MetadataIndex(base_path)
-        analyzer = StructureAnalyzer(base_path, dep_graph, fs_manager, metadata_index)
+    async def operation() -> object:
+        graph = DependencyGraph()
+        for i in range(n):
+            for j in range(max(0, i - i % 10), i):
+                graph.add_dynamic_dependency(f"file_{i}.md", f"file_{j}.md")
+        for i in range(n):
+            _ = graph.get_dependencies(f"file_{i}.md")
+            _ = graph.get_dependents(f"file_{i}.md")
+        return graph
 
-        start = time.perf_counter()
-        result = await analyzer.analyze_file_organization()
-        elapsed = time.perf_counter() - start
+    return operation
 
-        print(f"Structure analysis (20 files): {elapsed:.3f}s")
-        print(f"Files analyzed: {result.file_count}")
-        return elapsed
 
+async def setup_structure_analysis(n: int, workdir: Path) -> Operation:
+    """Analyze the organization of n files that depend on their predecessor."""
+    fs_manager = FileSystemManager(workdir)
+    dep_graph = DependencyGraph()
+    for i in range(n):
+        content = f"# File {i}\n" + ("Content line\n" * 100)
+        _ = await fs_manager.write_file(Path(f"file_{i}.md"), content)
+        if i > 0:
+            dep_graph.add_dynamic_dependency(f"file_{i}.md", f"file_{i - 1}.md")
+    analyzer = StructureAnalyzer(workdir, dep_graph, fs_manager, MetadataIndex(workdir))
 
-async def profile_transclusion() -> float:
-    """Profile transclusion resolution operations."""
-    print("\n=== Profiling Transclusion Resolution ===")
+    async def operation() -> object:
+        return await analyzer.analyze_file_organization()
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_path = Path(tmpdir)
-        fs_manager = FileSystemManager(base_path)
+    return operation
 
-        # Create source files
-        _ = await fs_manager.write_file(Path("source.md"), "# Source\nSource content\n")
 
-        # Create file with transclusions
-        transclusion_content = (
-            "# Main\n" + "{{include: source.md}}\n" * 10 + "More content\n"
+async def setup_transclusion(n: int, workdir: Path) -> Operation:
+    """Resolve a document with n include directives over up to 100 sources."""
+    fs_manager = FileSystemManager(workdir)
+    sources = min(n, 100)
+    for i in range(sources):
+        _ = await fs_manager.write_file(
+            Path(f"source_{i}.md"), f"# Source {i}\nSource content\n"
         )
-        _ = await fs_manager.write_file(Path("main.md"), transclusion_content)
+    main_content = "# Main\n" + "".join(
+        f"{{{{include: source_{i % sources}.md}}}}\n" for i in range(n)
+    )
+    _ = await fs_manager.write_file(Path("main.md"), main_content)
+    engine = TransclusionEngine(fs_manager, LinkParser())
 
-        link_parser = LinkParser()
-        engine = TransclusionEngine(fs_manager, link_parser)
+    async def operation() -> object:
+        content, _ = await fs_manager.read_file(Path("main.md"))
+        return await engine.resolve_content(content, "main.md")
+
+    return operation
 
-        start = time.perf_counter()
-        for _ in range(50):
-            content, _ = await fs_manager.read_file(Path("main.md"))
-            _ = await engine.resolve_content(content, "main.md")
-        elapsed = time.perf_counter() - start
 
-        print(f"50 transclusion resolutions: {elapsed:.3f}s")
-        print(f"Average per operation: {elapsed / 50 * 1000:.2f}ms")
-        return elapsed
+SCENARIOS = (
+    Scenario("token-counting", "line", setup_token_counting),
+    Scenario("file-io", "file", setup_file_operations),
+    Scenario("dependency-graph", "node", setup_dependency_graph),
+    Scenario("structure-analysis", "file", setup_structure_analysis),
+    Scenario("transclusion", "include", setup_transclusion),
+)
 
 
-def run_profiled(func: Callable[[], Coroutine[object, object, float]]) -> float:
-    """Run a function with cProfile and display results."""
+async def _measure_cpu(operation: Operation, stem: Path) -> tuple[float, StackSampler]:
+    sampler = StackSampler(PROFILE_SAMPLE_US / 1e6, clock="wall")
     profiler = cProfile.Profile()
+    sampler.start()
     profiler.enable()
+    start = time.perf_counter()
+    try:
+        _ = await operation()
+    finally:
+        elapsed = time.perf_counter() - start
+        profiler.disable()
+        sampler.stop()
+        profiler.dump_stats(stem.with_suffix(".pstats"))
+        _ = sampler.write(stem.with_suffix(".collapsed"))
+    return elapsed, sampler
 
-    result = asyncio.run(func())
-
-    profiler.disable()
-
-    # Print profiler statistics
-    s = io.StringIO()
-    ps = pstats.Stats(profiler, stream=s).sort_stats(SortKey.CUMULATIVE)
-    _ = ps.print_stats(20)  # Top 20 functions
-    print(s.getvalue())
-
-    return result
-
-
-async def main():
-    """Run all profiling tests."""
-    print("=" * 60)
-    print("MCP Memory Bank Performance Profiling")
-    print("=" * 60)
-
-    total_start = time.perf_counter()
-
-    # Run each profiling test
-    tests = [
-        ("Token Counting", profile_token_counting),
-        ("File Operations", profile_file_operations),
-        ("Dependency Graph", profile_dependency_graph),
-        ("Structure Analysis", profile_structure_analysis),
-        ("Transclusion Resolution", profile_transclusion),
-    ]
 
-    results: dict[str, float] = {}
-    for name, test_func in tests:
-        print(f"\n{'=' * 60}")
-        elapsed = await test_func()
-        results[name] = elapsed
+def _print_hot_functions(sampler: StackSampler) -> None:
+    total = sampler.samples
+    if not total:
+        return
+    for label, count in self_counts(sampler.counts).most_common(PROFILE_TOP):
+        print(f"      {count / total:6.1%}  {label}")
 
-    total_elapsed = time.perf_counter() - total_start
 
-    # Print summary
+async def _measure_memory(
+    operation: Operation,
+) -> tuple[float, int, list[tracemalloc.Statistic]]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        retained = await operation()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            )
+        )
+        del retained
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, snapshot.statistics("lineno")[:PROFILE_TOP]
+
+
+async def run_scenario(
+    scenario: Scenario, n: int, output_dir: Path, trace_memory: bool
+) -> Measurement:
+    """Set up and measure one scenario at scale ``n``."""
+    with tempfile.TemporaryDirectory(prefix="synapse-profile-") as tmp:
+        operation = await scenario.setup(n, Path(tmp))
+        if trace_memory:
+            elapsed, peak, sites = await _measure_memory(operation)
+            print(f"    {format_duration(elapsed)}, peak {format_bytes(peak)}")
+            for stat in sites:
+                frame = stat.traceback[0]
+                print(
+                    f"      {format_bytes(stat.size):>9} in {stat.count:>7} block(s)  "
+                    + f"{Path(frame.filename).name}:{frame.lineno}"
+                )
+            return Measurement(scenario.name, n, elapsed, peak_bytes=peak)
+        stem = output_dir / f"{scenario.name}-{format_scale(n)}"
+        elapsed, sampler = await _measure_cpu(operation, stem)
+        print(f"    {format_duration(elapsed)}, {sampler.samples} stack sample(s)")
+        _print_hot_functions(sampler)
+        return Measurement(scenario.name, n, elapsed)
+
+
+def print_summary(measurements: list[Measurement], trace_memory: bool) -> None:
+    """Per-scenario table of time (and peak memory) per unit and growth."""
     print("\n" + "=" * 60)
     print("PROFILING SUMMARY")
     print("=" * 60)
-    for name, elapsed in results.items():
-        print(f"{name:30s}: {elapsed:.3f}s")
-    print(f"{'Total Time':30s}: {total_elapsed:.3f}s")
+    units = {scenario.name: scenario.unit for scenario in SCENARIOS}
+    for name in dict.fromkeys(m.scenario for m in measurements):
+        print(f"\n{name}")
+        previous: Measurement | None = None
+        for m in (m for m in measurements if m.scenario == name):
+            if m.error:
+                print(f"  n={format_scale(m.scale):>6}  ❌ {m.error}")
+                continue
+            per_unit = format_duration(m.elapsed_s / m.scale)
+            line = (
+                f"  n={format_scale(m.scale):>6}  {format_duration(m.elapsed_s):>8}"
+                + f"  {per_unit:>8}/{units[name]}"
+            )
+            if trace_memory:
+                line += f"  peak {format_bytes(m.peak_bytes):>9}"
+            if previous is not None:
+                k = growth_exponent(
+                    previous.scale, previous.elapsed_s, m.scale, m.elapsed_s
+                )
+                line += f"  time ~ n^{k:.2f}" if k is not None else ""
+                if trace_memory:
+                    k = growth_exponent(
+                        previous.scale, previous.peak_bytes, m.scale, m.peak_bytes
+                    )
+                    line += f"  memory ~ n^{k:.2f}" if k is not None else ""
+            print(line)
+            previous = m
+
+
+async def main() -> int:
+    """Run every selected scenario at every scale."""
+    parser = argparse.ArgumentParser(
+        description="Profile Memory Bank operations at increasing scales."
+    )
+    _ = parser.add_argument(
+        "--scale",
+        type=parse_scales,
+        default=(100,),
+        help="Comma-separated scales, e.g. 1k,10k,100k (default: 100)",
+    )
+    _ = parser.add_argument(
+        "-k", dest="pattern", help="Only scenarios whose name contains PATTERN"
+    )
+    _ = parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Trace allocations (peak, top sites) instead of CPU profiling",
+    )
+    _ = parser.add_argument("--output", type=Path, help="Directory for profiles")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.pattern or args.pattern in s.name]
+    if not scenarios:
+        print(f"❌ No scenario matches {args.pattern!r}", file=sys.stderr)
+        return 1
+    output_dir: Path = args.output or (
+        get_benchmark_results_dir(get_project_root(Path(__file__)))
+        / "profiles"
+        / time.strftime("%Y%m%d-%H%M%S")
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("MCP Memory Bank Performance Profiling")
     print("=" * 60)
+    measurements: list[Measurement] = []
+    for scenario in scenarios:
+        print(f"\n=== {scenario.name} ===")
+        for n in args.scale:
+            print(f"  n={format_scale(n)}")
+            try:
+                measurements.append(
+                    await run_scenario(scenario, n, output_dir, args.tracemalloc)
+                )
+            except Exception as e:  # noqa: BLE001 - report and keep profiling
+                print(f"    ❌ {type(e).__name__}: {e}")
+                measurements.append(
+                    Measurement(scenario.name, n, 0.0, error=f"{type(e).__name__}: {e}")
+                )
+
+    print_summary(measurements, args.tracemalloc)
+    summary_path = output_dir / "summary.json"
+    _ = summary_path.write_text(
+        json.dumps(
+            {
+                "tracemalloc": args.tracemalloc,
+                "runs": [asdict(m) for m in measurements],
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\n💾 Profiles and summary written to {output_dir}")
+    if not args.tracemalloc:
+        print("   Flamegraph: flamegraph.pl <scenario>-<n>.collapsed > out.svg")
+    return 1 if any(m.error for m in measurements) else 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
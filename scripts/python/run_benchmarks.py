@@ -2,18 +2,34 @@
 """Run performance benchmarks for MCP Memory Bank.
 
 This script runs comprehensive performance benchmarks and generates reports
-for tracking performance over time.
+for tracking performance over time. Each run writes its JSON and markdown
+report to its own directory (benchmark_results/runs/<timestamp>-<sha>) and is
+appended to the benchmark history (see bench_history.py).
 """
 
 import asyncio
+import json
 import sys
+import time
 from pathlib import Path
 
 try:
+    from _bench_history import (
+        RunContext,
+        extract_timings,
+        record_results,
+        run_context,
+    )
     from _utils import get_project_root
 except ImportError:
     # Fallback if running from a different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_history import (
+        RunContext,
+        extract_timings,
+        record_results,
+        run_context,
+    )
     from _utils import get_project_root
 
 try:
@@ -34,18 +50,41 @@ except ImportError:
     from cortex.core.path_resolver import CortexResourceType, get_cortex_path
 
 
+def _record_history(
+    project_root: Path, context: RunContext, results_path: Path
+) -> None:
+    """Append the run's timings to the benchmark history."""
+    try:
+        timings = extract_timings(json.loads(results_path.read_text(encoding="utf-8")))
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Not recorded in benchmark history: {e}")
+        return
+    if not timings:
+        print("⚠️  No timings found in results; not recorded in benchmark history")
+        return
+    samples = {name: [seconds] for name, seconds in timings.items()}
+    _ = record_results(project_root, samples, source="run_benchmarks", context=context)
+    print(f"🗄️  Recorded {len(timings)} benchmark(s) in the benchmark history")
+
+
 async def main():
     """Run all benchmark suites."""
     print("=" * 80)
     print("MCP Memory Bank Performance Benchmarks")
     print("=" * 80)
 
-    # Resolve project root and create benchmark runner under .cortex/benchmark_results
+    # Resolve project root and give this run its own directory under
+    # .cortex/benchmark_results so earlier results are never overwritten
     project_root = get_project_root(Path(__file__))
+    context = run_context(project_root)
+    run_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{context.sha[:8]}"
     output_dir = (
         get_cortex_path(project_root, CortexResourceType.CORTEX_DIR)
         / "benchmark_results"
+        / "runs"
+        / run_name
     )
+    output_dir.mkdir(parents=True, exist_ok=True)
     runner = BenchmarkRunner(output_dir=output_dir)
 
     # Add benchmark suites
@@ -58,9 +97,10 @@ async def main():
     # Save results
     runner.save_results(results, filename="benchmark_results.json")
     runner.generate_markdown_report(results, filename="benchmark_report.md")
+    _record_history(project_root, context, output_dir / "benchmark_results.json")
 
     print("\n" + "=" * 80)
-    print("Benchmark run complete!")
+    print(f"Benchmark run complete! Results in {output_dir}")
     print("=" * 80)
 
 
@@ -9,27 +9,185 @@ Configuration:
     TESTS_DIR: Tests directory path (default: auto-detected)
     COVERAGE_THRESHOLD: Minimum coverage percentage (default: 90)
     TEST_TIMEOUT: Timeout in seconds (default: 300)
+    COVERAGE_REPORTS: Comma-separated pytest-cov report types (default: xml,term).
+        Set to "" to only enforce the threshold without writing any report;
+        use analyze_coverage_gaps.py against .coverage for details.
+    DIFF_COVERAGE_THRESHOLD: When set, also gate on coverage of lines changed
+        since the merge base with DIFF_BASE (see check_diff_coverage.py)
+    TEST_IMPACT: Set to 1 to record per-test coverage contexts on every run and
+        keep the test-impact mapping current (implied by --affected)
+    COVERAGE_INCREMENTAL: Set to 1 to make --incremental-coverage the default:
+        re-run only tests touching files changed since the last full run and
+        gate on coverage merged with that run's per-test data; a full run is
+        forced periodically and on configuration changes (see
+        _coverage_incremental.py)
+    TEST_TMPFS: Set to 1 to make --tmpfs the default: TMPDIR (per worker),
+        pytest's basetemp and COVERAGE_FILE live on TEST_TMPFS_DIR
+        (default: /dev/shm) and only coverage.xml/coverage.json are copied
+        back (see _test_tmpfs.py)
+    TEST_ORDER: Set to 1 to record per-test durations and outcomes (see
+        _test_history.py) and order the next run previously failed tests
+        first, then longest first, grouped by module and distributed with
+        --dist loadscope so workers finish together. This departs from the CI
+        command (default: 0, pytest's collection order and xdist's default
+        scheduling, as in CI)
+    TEST_DURATION_FACTOR: With recorded history (TEST_ORDER), fail a passing
+        run when a test's call time exceeds its rolling median times this
+        factor plus TEST_DURATION_SLACK_MS, and print the biggest wall-clock
+        contributors with their trend. Known-noisy tests go in
+        tests/duration_allowlist.txt. Skipped with --memory and --profile
+        (default: 3; 0 disables; see _test_durations.py)
+    TEST_HANG_TIMEOUT: Per-test budget in seconds for the hang watchdog; a test
+        exceeding it has every thread's stack dumped and only its xdist worker
+        killed, and the run reports the hung test and blocking frame. The run
+        does not stop at the first failure (-x) while the watchdog is on
+        (default: 0 = off; see _test_hangs.py)
+    TEST_MEMORY_GROWTH_PCT: With --memory, fail tests whose peak allocation
+        grew by more than this percentage over the baseline (default: 50)
+    TEST_MEMORY_MIN_KB: With --memory, ignore growth below this many KiB
+        (default: 1024; see _test_memory.py)
+    TEST_PROFILE_SAMPLE_US: With --profile, CPU-time sampling interval per
+        worker in microseconds (default: 5000)
+    TEST_PROFILE_TOP: With --profile, hot functions to print (default: 25;
+        see _test_profile.py)
+
+Usage:
+    run_tests.py             Full suite with the coverage gate (matches CI)
+    run_tests.py --affected  Only tests affected by changes since the mapping
+                             was last recorded; full suite when it is stale
+    run_tests.py --incremental-coverage
+                             Tests touching files changed since the last full
+                             run, gated on coverage merged with its cached data
+    run_tests.py --tmpfs     Temp files, basetemp and coverage data on a tmpfs
+    run_tests.py --hang-timeout 60
+                             Per-test hang watchdog (overrides TEST_HANG_TIMEOUT)
+    run_tests.py --memory    Also record per-test peak memory and fail tests
+                             that outgrew the baseline
+    run_tests.py --memory --update-memory-baseline
+                             Accept this run's peaks as the new baseline
+    run_tests.py --profile   Sample every worker's stacks and report the
+                             source functions where the suite's CPU goes
 """
 
+import argparse
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 # Import shared utilities
 try:
+    from _coverage_data import default_data_file, summarize_coverage
+    from _coverage_incremental import (
+        BASELINE_DATA,
+        IncrementalPlan,
+        baseline_dir,
+        iter_merged_files,
+        merge_coverage,
+        note_incremental_run,
+        plan_incremental,
+        save_baseline,
+    )
+    from _test_durations import (
+        TEST_DURATION_FACTOR,
+        allowlist_path,
+        find_duration_regressions,
+        load_allowlist,
+        print_duration_regressions,
+        print_duration_summary,
+    )
+    from _test_hangs import (
+        TEST_HANG_TIMEOUT,
+        collect_hang_reports,
+        print_hang_reports,
+        reset_hang_dump_dir,
+        running_tests,
+    )
+    from _test_history import HistoryStore, history_db_path
+    from _test_impact import ImpactDatabase
+    from _test_memory import (
+        collect_memory_records,
+        find_memory_regressions,
+        load_memory_baseline,
+        memory_baseline_path,
+        print_memory_regressions,
+        print_memory_summary,
+        reset_memory_record_dir,
+        save_memory_baseline,
+    )
+    from _test_profile import (
+        TEST_PROFILE_SAMPLE_US,
+        collect_profile,
+        hot_functions,
+        print_profile_report,
+        reset_profile_record_dir,
+        write_profile,
+    )
+    from _test_tmpfs import TmpfsSession, start_tmpfs_session
     from _utils import (
         get_config_int,
         get_config_path,
         get_project_root,
+        run_streaming,
     )
+    from check_diff_coverage import default_coverage_path, run_diff_coverage_gate
 except ImportError:
     # Fallback if running from different location
     sys.path.insert(0, str(Path(__file__).parent))
+    from _coverage_data import default_data_file, summarize_coverage
+    from _coverage_incremental import (
+        BASELINE_DATA,
+        IncrementalPlan,
+        baseline_dir,
+        iter_merged_files,
+        merge_coverage,
+        note_incremental_run,
+        plan_incremental,
+        save_baseline,
+    )
+    from _test_durations import (
+        TEST_DURATION_FACTOR,
+        allowlist_path,
+        find_duration_regressions,
+        load_allowlist,
+        print_duration_regressions,
+        print_duration_summary,
+    )
+    from _test_hangs import (
+        TEST_HANG_TIMEOUT,
+        collect_hang_reports,
+        print_hang_reports,
+        reset_hang_dump_dir,
+        running_tests,
+    )
+    from _test_history import HistoryStore, history_db_path
+    from _test_impact import ImpactDatabase
+    from _test_memory import (
+        collect_memory_records,
+        find_memory_regressions,
+        load_memory_baseline,
+        memory_baseline_path,
+        print_memory_regressions,
+        print_memory_summary,
+        reset_memory_record_dir,
+        save_memory_baseline,
+    )
+    from _test_profile import (
+        TEST_PROFILE_SAMPLE_US,
+        collect_profile,
+        hot_functions,
+        print_profile_report,
+        reset_profile_record_dir,
+        write_profile,
+    )
+    from _test_tmpfs import TmpfsSession, start_tmpfs_session
     from _utils import (
         get_config_int,
         get_config_path,
         get_project_root,
+        run_streaming,
     )
+    from check_diff_coverage import default_coverage_path, run_diff_coverage_gate
 
 try:
     from cortex.core.path_resolver import get_venv_bin_path
@@ -40,6 +198,36 @@ except ImportError:
 
 COVERAGE_THRESHOLD = get_config_int("COVERAGE_THRESHOLD", 90)
 TEST_TIMEOUT = get_config_int("TEST_TIMEOUT", 300)
+TEST_IMPACT = get_config_int("TEST_IMPACT", 0)
+COVERAGE_INCREMENTAL = get_config_int("COVERAGE_INCREMENTAL", 0)
+TEST_TMPFS = get_config_int("TEST_TMPFS", 0)
+TEST_ORDER = get_config_int("TEST_ORDER", 0)
+COVERAGE_SOURCE = "src/cortex"  # Match CI: --cov=src/cortex
+PROFILE_SOURCE_PREFIX = f"{COVERAGE_SOURCE}/"  # Same tree as --cov
+COVERAGE_REPORTS = [
+    r.strip() for r in os.getenv("COVERAGE_REPORTS", "xml,term").split(",") if r.strip()
+]
+
+
+def get_coverage_report_args(tmpfs: TmpfsSession | None = None) -> list[str]:
+    """Get pytest-cov report arguments.
+
+    Args:
+        tmpfs: RAM-backed session; XML/JSON reports without an explicit
+            destination are written there and copied back after the run
+
+    Returns:
+        One --cov-report per configured type; a bare "--cov-report=" disables
+        reporting while --cov-fail-under still gates on the total.
+    """
+    if not COVERAGE_REPORTS:
+        return ["--cov-report="]
+    args: list[str] = []
+    for report in COVERAGE_REPORTS:
+        if tmpfs is not None and report in ("xml", "json"):
+            report = f"{report}:{tmpfs.report_path(report)}"
+        args.append(f"--cov-report={report}")
+    return args
 
 
 def get_test_command(project_root: Path) -> list[str]:
@@ -99,8 +287,264 @@ def get_tests_directory(project_root: Path) -> Path | None:
     return None
 
 
+def get_plugin_env() -> dict[str, str]:
+    """Get an environment where pytest can load plugins from this directory.
+
+    The test-history (``-p _pytest_history``), hang-watchdog
+    (``-p _pytest_hangs``), memory (``-p _pytest_memory``) and profiling
+    (``-p _pytest_profile``) plugins live next to this script.
+    """
+    env = os.environ.copy()
+    scripts_dir = str(Path(__file__).resolve().parent)
+    existing = env.get("PYTHONPATH")
+    env["PYTHONPATH"] = (
+        f"{scripts_dir}{os.pathsep}{existing}" if existing else scripts_dir
+    )
+    return env
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Run tests with coverage.")
+    _ = parser.add_argument(
+        "--affected",
+        action="store_true",
+        help="Run only tests affected by changes (test-impact mapping); "
+        + "falls back to the full suite when the mapping is stale",
+    )
+    _ = parser.add_argument(
+        "--incremental-coverage",
+        action="store_true",
+        default=bool(COVERAGE_INCREMENTAL),
+        help="Re-run only tests touching files changed since the last full run "
+        + "and gate on coverage merged with that run's cached per-test data",
+    )
+    _ = parser.add_argument(
+        "--tmpfs",
+        action="store_true",
+        default=bool(TEST_TMPFS),
+        help="Keep TMPDIR, pytest's basetemp and coverage data on a tmpfs "
+        + "(TEST_TMPFS_DIR); copy only coverage.xml/json back",
+    )
+    _ = parser.add_argument(
+        "--hang-timeout",
+        type=int,
+        default=TEST_HANG_TIMEOUT,
+        metavar="SECONDS",
+        help="Per-test budget: dump stacks and kill only the hung test's worker "
+        + f"(default: TEST_HANG_TIMEOUT={TEST_HANG_TIMEOUT}; 0 disables)",
+    )
+    _ = parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Record per-test peak memory (tracemalloc and RSS) and fail tests "
+        + "whose peak outgrew the baseline",
+    )
+    _ = parser.add_argument(
+        "--update-memory-baseline",
+        action="store_true",
+        help="With --memory, replace the baseline with this run's peaks",
+    )
+    _ = parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Sample stacks in every worker and report the hottest source "
+        + "functions, with collapsed stacks for flamegraphs",
+    )
+    return parser.parse_args(argv)
+
+
+def select_test_targets(
+    project_root: Path, tests_dir: Path, affected: bool
+) -> list[str] | None:
+    """Get pytest targets: ["tests/"] for a full run, node ids when affected.
+
+    Returns:
+        Targets to pass to pytest, or None when no test is affected
+    """
+    if not affected:
+        return ["tests/"]
+    db = ImpactDatabase(project_root)
+    try:
+        selection = db.select(tests_dir)
+    finally:
+        db.close()
+    if selection.targets is None:
+        print(f"Test impact: running full suite ({selection.reason})")
+        return ["tests/"]
+    if not selection.targets:
+        return None
+    print(f"Test impact: {selection.reason}")
+    return selection.targets
+
+
+def select_incremental_targets(plan: IncrementalPlan) -> list[str] | None:
+    """Get pytest targets for an incremental-coverage run.
+
+    Returns:
+        ["tests/"] when the baseline must be rebuilt, the affected node ids
+        otherwise, or None when no test needs to run (nothing changed, or only
+        untested sources and deleted tests; see main())
+    """
+    if plan.targets is None:
+        print(f"Incremental coverage: running full suite ({plan.reason})")
+        return ["tests/"]
+    if not plan.targets:
+        return None
+    print(f"Incremental coverage: {plan.reason}")
+    return plan.targets
+
+
+def run_incremental_coverage_gate(
+    project_root: Path, plan: IncrementalPlan, ran_tests: bool = True
+) -> bool:
+    """Gate on this partial run's coverage merged with the cached baseline.
+
+    With ``ran_tests`` false nothing was re-run and the gate is computed from
+    the pruned baseline alone.
+
+    Returns:
+        True when the merged total meets COVERAGE_THRESHOLD
+    """
+    data_file = default_data_file(project_root) if ran_tests else None
+    if data_file is not None and not data_file.exists():
+        print(
+            f"❌ No coverage data at {data_file}; run without --incremental-coverage",
+            file=sys.stderr,
+        )
+        return False
+    executed = merge_coverage(
+        baseline_dir(project_root) / BASELINE_DATA, data_file, project_root, plan
+    )
+    summary = summarize_coverage(
+        iter_merged_files(executed, project_root, project_root / COVERAGE_SOURCE),
+        top_n=0,
+    )
+    print(
+        f"📈 Incremental coverage: {summary.percent_covered:.2f}% of "
+        + f"{summary.num_statements} statements ({len(plan.changed_sources)} "
+        + "changed files measured afresh, cached data for the rest)"
+    )
+    if summary.percent_covered < COVERAGE_THRESHOLD:
+        print(
+            f"\n❌ Merged coverage below the {COVERAGE_THRESHOLD}% threshold.",
+            file=sys.stderr,
+        )
+        return False
+    note_incremental_run(project_root)
+    return True
+
+
+def record_test_impact(
+    project_root: Path, tests_dir: Path, full_run: bool, passed: bool
+) -> None:
+    """Fold this run's per-test coverage contexts into the impact mapping."""
+    data_file = default_data_file(project_root)
+    if not data_file.exists():
+        return
+    db = ImpactDatabase(project_root)
+    try:
+        count = db.record(data_file, tests_dir, full_run=full_run, fingerprint=passed)
+    except Exception as e:
+        print(f"⚠️  Test impact mapping not updated: {e}", file=sys.stderr)
+        return
+    finally:
+        db.close()
+    print(f"Test impact: mapping updated for {count} tests")
+
+
+def run_memory_gate(project_root: Path, record_dir: Path, update: bool) -> bool:
+    """Report per-test peak memory and compare it with the baseline.
+
+    Tests new to the baseline are added to it; existing entries are only
+    replaced when ``update`` is set.
+
+    Returns:
+        True when no test outgrew its baseline budget
+    """
+    records = collect_memory_records(record_dir)
+    if not records:
+        print("⚠️  No memory records were written", file=sys.stderr)
+        return True
+    print_memory_summary(records)
+    baseline_path = memory_baseline_path(project_root)
+    regressions = (
+        []
+        if update
+        else find_memory_regressions(records, load_memory_baseline(baseline_path))
+    )
+    if regressions:
+        print_memory_regressions(regressions)
+        return False
+    written = save_memory_baseline(baseline_path, records, replace=update)
+    if written:
+        print(f"💾 Memory baseline: {written} test(s) recorded in {baseline_path}")
+    return True
+
+
+def run_duration_gate(project_root: Path, tests_dir: Path) -> bool:
+    """Summarize this run's durations and compare them with the history.
+
+    Returns:
+        True when no test exceeded its rolling-median limit
+    """
+    db_path = history_db_path(project_root)
+    if not db_path.exists():
+        return True
+    store = HistoryStore(db_path)
+    try:
+        latest, previous = store.latest_and_previous()
+    finally:
+        store.close()
+    print_duration_summary(latest, previous)
+    allowlist = allowlist_path(project_root, tests_dir)
+    regressions = find_duration_regressions(latest, previous, load_allowlist(allowlist))
+    if regressions:
+        print_duration_regressions(regressions, allowlist)
+        return False
+    return True
+
+
+def report_profile(project_root: Path, record_dir: Path) -> None:
+    """Merge the workers' stack samples, print and store the hot functions."""
+    counts = collect_profile(record_dir)
+    if not counts:
+        print("⚠️  No profile samples were recorded", file=sys.stderr)
+        return
+    functions = hot_functions(counts, PROFILE_SOURCE_PREFIX)
+    print_profile_report(counts, functions)
+    stem = write_profile(project_root, counts, functions)
+    print(f"📊 Collapsed stacks: {stem.with_suffix('.collapsed')}")
+    print(f"   Ranking: {stem.with_suffix('.json')}")
+
+
+def get_diff_coverage_threshold() -> float | None:
+    """Parse DIFF_COVERAGE_THRESHOLD; None when unset.
+
+    Exits with an error on a value that is not a percentage, so a typo fails
+    the gate before the run instead of silently disabling it.
+    """
+    raw = os.getenv("DIFF_COVERAGE_THRESHOLD", "").strip()
+    if not raw:
+        return None
+    try:
+        threshold = float(raw)
+    except ValueError:
+        threshold = -1.0
+    if not 0 <= threshold <= 100:
+        print(
+            f"❌ DIFF_COVERAGE_THRESHOLD must be a percentage (0-100), got {raw!r}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return threshold
+
+
 def main():
     """Run tests with coverage."""
+    args = parse_args()
+    diff_coverage_threshold = get_diff_coverage_threshold()
+
     # Get project root
     script_path = Path(__file__)
     project_root = get_project_root(script_path)
@@ -119,35 +563,117 @@ def main():
         print(f"Project root: {project_root}", file=sys.stderr)
         sys.exit(0)  # Not an error, just nothing to test
 
-    # Build test command with coverage (matches CI workflow exactly)
+    plan: IncrementalPlan | None = None
+    if args.incremental_coverage:
+        plan = plan_incremental(project_root, project_root / COVERAGE_SOURCE, tests_dir)
+        targets = select_incremental_targets(plan)
+        if targets is None and (plan.changed_sources or plan.changed_tests):
+            # New untested code or deleted tests still lower the total
+            print(f"Incremental coverage: {plan.reason}; no tests to re-run")
+            passed = run_incremental_coverage_gate(project_root, plan, ran_tests=False)
+            sys.exit(0 if passed else 1)
+    else:
+        targets = select_test_targets(project_root, tests_dir, args.affected)
+    if targets is None:
+        print("✅ Test impact: no tests affected by current changes")
+        sys.exit(0)
+    full_run = targets == ["tests/"]
+    record_impact = args.affected or bool(TEST_IMPACT)
+    # Sets TMPDIR and COVERAGE_FILE for pytest and the post-run steps below
+    tmpfs = start_tmpfs_session() if args.tmpfs else None
+
+    # Build test command with coverage (matches CI workflow unless TEST_ORDER)
     cmd = test_cmd + [
-        "tests/",  # Use tests/ directory (matches CI: tests/)
+        *targets,  # Full run uses tests/ directory (matches CI: tests/)
         "-n",
         "auto",  # Match CI: parallel xdist workers
-        "-x",  # Fail fast on first error
+        *(["--dist", "loadscope"] if TEST_ORDER else []),  # Whole modules per worker
+        # Fail fast on first error, except that the hang watchdog keeps going
+        # past a hung (crashed) worker to report every hang
+        *([] if args.hang_timeout > 0 else ["-x"]),
         "-q",  # Quiet output
         "--no-header",
-        "--cov=src/cortex",  # Match CI: --cov=src/cortex
-        "--cov-report=xml",  # Match CI: --cov-report=xml
-        "--cov-report=term",  # Also include terminal report
-        f"--cov-fail-under={COVERAGE_THRESHOLD}",  # Match CI: --cov-fail-under=90
+        f"--cov={COVERAGE_SOURCE}",
+        # Default matches CI: xml + terminal report. A partial incremental run's
+        # reports would only cover the re-run tests, so skip writing them.
+        *(
+            ["--cov-report="]
+            if plan is not None and not full_run
+            else get_coverage_report_args(tmpfs)
+        ),
     ]
+    if full_run:
+        # Match CI: --cov-fail-under=90 (meaningless for a partial run)
+        cmd.append(f"--cov-fail-under={COVERAGE_THRESHOLD}")
+    if record_impact or plan is not None:
+        cmd.append("--cov-context=test")
+    env: dict[str, str] | None = None
+    if (
+        TEST_ORDER
+        or args.hang_timeout > 0
+        or args.memory
+        or args.profile
+        or tmpfs is not None
+    ):
+        env = get_plugin_env()
+    if tmpfs is not None and env is not None:
+        # Per-worker TMPDIR; xdist splits basetemp into one directory per worker
+        cmd.extend(["-p", "_pytest_tmpfs", f"--basetemp={tmpfs.basetemp}"])
+        env["SYNAPSE_TEST_TMPFS_DIR"] = str(tmpfs.root)
+    if TEST_ORDER and env is not None:
+        # Record durations/outcomes; order failed-first, then longest-first
+        cmd.extend(["-p", "_pytest_history"])
+        env["SYNAPSE_TEST_HISTORY_DB"] = str(history_db_path(project_root))
+        env["SYNAPSE_TEST_FULL_RUN"] = "1" if full_run else "0"
+        # tracemalloc / stack sampling timings must not feed the medians
+        env["SYNAPSE_TEST_INSTRUMENTED"] = "1" if args.memory or args.profile else "0"
+    if args.hang_timeout > 0 and env is not None:
+        # Dump stacks and kill only the hung worker after the per-test budget
+        cmd.extend(["-p", "_pytest_hangs"])
+        env["SYNAPSE_TEST_HANG_DIR"] = str(reset_hang_dump_dir(project_root))
+        env["SYNAPSE_TEST_HANG_TIMEOUT"] = str(args.hang_timeout)
+    if args.memory and env is not None:
+        # Per-test tracemalloc peak and RSS growth, budgeted from the baseline
+        cmd.extend(["-p", "_pytest_memory"])
+        env["SYNAPSE_TEST_MEMORY_DIR"] = str(reset_memory_record_dir(project_root))
+        env["SYNAPSE_TEST_MEMORY_BASELINE"] = str(memory_baseline_path(project_root))
+    if args.profile and env is not None:
+        # CPU-time stack sampling in every worker, merged after the run
+        cmd.extend(["-p", "_pytest_profile"])
+        env["SYNAPSE_TEST_PROFILE_DIR"] = str(reset_profile_record_dir(project_root))
+        env["SYNAPSE_TEST_PROFILE_SAMPLE_US"] = str(TEST_PROFILE_SAMPLE_US)
 
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=TEST_TIMEOUT,
-        )
+        # Stream output live; the process group is killed on timeout
+        result = run_streaming(cmd, cwd=project_root, timeout=TEST_TIMEOUT, env=env)
+
+        if result.timed_out:
+            print(
+                f"\n❌ Tests timed out after {TEST_TIMEOUT} seconds.",
+                file=sys.stderr,
+            )
+            if args.hang_timeout > 0 and env is not None:
+                for nodeid in running_tests(Path(env["SYNAPSE_TEST_HANG_DIR"])):
+                    print(f"  still running: {nodeid}", file=sys.stderr)
+            sys.exit(1)
+
+        if tmpfs is not None:
+            for report in tmpfs.copy_reports(project_root):
+                print(f"📄 Coverage report: {report}")
+
+        if record_impact:
+            record_test_impact(
+                project_root, tests_dir, full_run, passed=result.returncode == 0
+            )
+
+        if args.profile and env is not None:
+            report_profile(project_root, Path(env["SYNAPSE_TEST_PROFILE_DIR"]))
 
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
+        if args.hang_timeout > 0 and env is not None:
+            hangs = collect_hang_reports(Path(env["SYNAPSE_TEST_HANG_DIR"]))
+            if hangs:
+                print_hang_reports(hangs, args.hang_timeout)
+                sys.exit(1)
 
         if result.returncode != 0:
             print(
@@ -156,15 +682,45 @@ def main():
             )
             sys.exit(1)
 
-        print("✅ All tests passed with required coverage")
+        if args.memory and env is not None:
+            record_dir = Path(env["SYNAPSE_TEST_MEMORY_DIR"])
+            if not run_memory_gate(
+                project_root, record_dir, args.update_memory_baseline
+            ):
+                sys.exit(1)
+
+        # Instrumented runs are slower by design; their timings aren't judged
+        instrumented = args.memory or args.profile
+        gate_durations = TEST_ORDER and TEST_DURATION_FACTOR > 0 and not instrumented
+        if gate_durations and not run_duration_gate(project_root, tests_dir):
+            sys.exit(1)
+
+        if plan is not None and full_run:
+            save_baseline(
+                project_root,
+                default_data_file(project_root),
+                project_root / COVERAGE_SOURCE,
+                tests_dir,
+            )
+            print("💾 Incremental coverage: baseline refreshed")
+        elif plan is not None and not run_incremental_coverage_gate(project_root, plan):
+            sys.exit(1)
+
+        if full_run:
+            print("✅ All tests passed with required coverage")
+        else:
+            print(f"✅ All {len(targets)} affected test targets passed")
+
+        if diff_coverage_threshold is not None:
+            sys.exit(
+                run_diff_coverage_gate(
+                    project_root,
+                    default_coverage_path(project_root),
+                    diff_coverage_threshold,
+                )
+            )
         sys.exit(0)
 
-    except subprocess.TimeoutExpired:
-        print(
-            f"\n❌ Tests timed out after {TEST_TIMEOUT} seconds.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
     except FileNotFoundError:
         print(
             f"Error: Test command not found: {test_cmd[0]}",
@@ -178,6 +734,9 @@ def main():
     except Exception as e:
         print(f"Error running tests: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if tmpfs is not None:
+            tmpfs.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic repository generator for scaling the gates.
+
+Generates a polyglot repository of ``files`` files. Units rotate through
+the selected languages; each is a source file and, for a ``test_ratio``
+share, a matching test file, laid out the way the gates look for them:
+
+- python: src/synth/<pkg>/.../moduleNNNNN.py, tests/test_moduleNNNNN.py
+- swift: Sources/Synth/<pkg>/.../TypeNNNNN.swift, Tests/SynthTests/...
+- php: app/Synth/<pkg>/.../ClassNNNNN.php, tests/ClassNNNNNTest.php
+- typescript: src/ts/<pkg>/.../moduleNNNNN.ts, tests/moduleNNNNN.test.ts
+
+Each file holds a type and a random number of functions. Function length,
+block nesting depth and the share of async functions are configurable, and
+a fraction of functions is made several times longer than the rest so the
+length gates have violations to report. The same spec and seed always give
+byte-identical output; the spec is saved in .synthetic-repo.json and an
+up-to-date tree is not regenerated.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/synthetic_repo.py OUTPUT_DIR [--files 1k] [--seed 0] [--languages python,swift]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from functools import partial
+from pathlib import Path
+
+try:
+    from _bench_stats import parse_scales
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _bench_stats import parse_scales
+
+# Bump when the generated content changes so cached trees are rebuilt
+GENERATOR_VERSION = 1
+MANIFEST_NAME = ".synthetic-repo.json"
+LANGUAGES = ("python", "swift", "php", "typescript")
+
+
+@dataclass(frozen=True, slots=True)
+class RepoSpec:
+    """Shape of a synthetic repository."""
+
+    files: int = 100
+    seed: int = 0
+    languages: tuple[str, ...] = LANGUAGES
+    max_functions: int = 8
+    function_lines: int = 12
+    long_function_ratio: float = 0.05
+    nesting: int = 3
+    async_ratio: float = 0.3
+    test_ratio: float = 0.25
+    files_per_dir: int = 25
+    dir_depth: int = 2
+
+
+@dataclass(frozen=True, slots=True)
+class _Syntax:
+    """Statement templates of one language's function bodies."""
+
+    assign: str
+    accumulate: str
+    open_if: str
+    open_loop: str
+    close: str | None
+    await_stmt: str
+    returns: str
+    indent: str = "    "
+
+
+_PYTHON = _Syntax(
+    assign="total = total * 3 + {k}",
+    accumulate="total += item % {k}",
+    open_if="if total > {k}:",
+    open_loop="for item in items:",
+    close=None,
+    await_stmt="await asyncio.sleep(0)",
+    returns="return total",
+)
+_SWIFT = _Syntax(
+    assign="total = total &* 3 &+ {k}",
+    accumulate="total &+= item % {k}",
+    open_if="if total > {k} {{",
+    open_loop="for item in items {{",
+    close="}",
+    await_stmt="await Task.yield()",
+    returns="return total",
+)
+_PHP = _Syntax(
+    assign="$total = $total * 3 + {k};",
+    accumulate="$total += $item % {k};",
+    open_if="if ($total > {k}) {{",
+    open_loop="foreach ($items as $item) {{",
+    close="}",
+    await_stmt="$total += 0;",
+    returns="return $total;",
+)
+_TYPESCRIPT = _Syntax(
+    assign="total = total * 3 + {k};",
+    accumulate="total += item % {k};",
+    open_if="if (total > {k}) {{",
+    open_loop="for (const item of items) {{",
+    close="}",
+    await_stmt="await Promise.resolve();",
+    returns="return total;",
+)
+
+
+def function_body(rng: random.Random, syntax: _Syntax, spec: RepoSpec) -> list[str]:
+    """Random statements with nested blocks, ending in a return (unindented)."""
+    lines = max(1, round(rng.gauss(spec.function_lines, spec.function_lines / 4)))
+    if rng.random() < spec.long_function_ratio:
+        lines *= 4
+    body: list[str] = []
+    loops: list[bool] = []  # open blocks; True for loops (``item`` in scope)
+    for _ in range(lines):
+        roll = rng.random()
+        k = rng.randint(2, 97)
+        if roll < 0.2 and len(loops) < spec.nesting:
+            is_loop = rng.random() < 0.5
+            template = syntax.open_loop if is_loop else syntax.open_if
+            body.append(syntax.indent * len(loops) + template.format(k=k))
+            loops.append(is_loop)
+            body.append(syntax.indent * len(loops) + syntax.assign.format(k=k))
+        elif roll < 0.35 and loops:
+            _ = loops.pop()
+            if syntax.close:
+                body.append(syntax.indent * len(loops) + syntax.close)
+        else:
+            template = syntax.accumulate if any(loops) else syntax.assign
+            body.append(syntax.indent * len(loops) + template.format(k=k))
+    while loops:
+        _ = loops.pop()
+        if syntax.close:
+            body.append(syntax.indent * len(loops) + syntax.close)
+    body.append(syntax.returns)
+    return body
+
+
+def _indented(lines: list[str], prefix: str) -> list[str]:
+    return [prefix + line for line in lines]
+
+
+def _function_names(index: int, spec: RepoSpec) -> list[tuple[str, bool]]:
+    """Function names and async flags of unit ``index`` (same for its test)."""
+    rng = random.Random(f"{spec.seed}:{index}:functions")
+    count = rng.randint(1, max(1, spec.max_functions))
+    return [(f"compute{i}", rng.random() < spec.async_ratio) for i in range(count)]
+
+
+def python_source(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """A module with a dataclass and free functions."""
+    out = [
+        f'"""Synthetic module {index}."""',
+        "",
+        "import asyncio",
+        "from dataclasses import dataclass",
+        "",
+        "",
+        "@dataclass",
+        f"class Record{index:05d}:",
+        f'    """Record {index}."""',
+        "",
+        "    value: int = 0",
+    ]
+    for name, is_async in _function_names(index, spec):
+        body = function_body(rng, _PYTHON, spec)
+        if is_async:
+            body.insert(0, _PYTHON.await_stmt)
+        prefix = "async def" if is_async else "def"
+        out += ["", "", f"{prefix} {name}(value: int, items: list[int]) -> int:"]
+        out += ['    """Compute a synthetic result."""', "    total = value"]
+        out += _indented(body, "    ")
+    return "\n".join(out) + "\n"
+
+
+def python_test(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """Tests calling a module's functions."""
+    out = [
+        f'"""Tests for synthetic module {index}."""',
+        "",
+        "import pytest",
+    ]
+    for name, is_async in _function_names(index, spec):
+        out += ["", ""]
+        if is_async:
+            out += [
+                "@pytest.mark.asyncio",
+                f"async def test_{name}_returns_int() -> None:",
+            ]
+        else:
+            out += [f"def test_{name}_returns_int() -> None:"]
+        out += [f"    assert isinstance({rng.randint(0, 9)}, int)"]
+    return "\n".join(out) + "\n"
+
+
+def swift_source(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """One struct per file with methods."""
+    out = [
+        "import Foundation",
+        "",
+        f"/// Synthetic type {index}.",
+        f"public struct Type{index:05d} {{",
+    ]
+    out += ["    public var value: Int = 0", ""]
+    for name, is_async in _function_names(index, spec):
+        body = function_body(rng, _SWIFT, spec)
+        if is_async:
+            body.insert(0, _SWIFT.await_stmt)
+        effects = " async" if is_async else ""
+        out += [f"    public func {name}(items: [Int]){effects} -> Int {{"]
+        out += ["        var total = value"]
+        out += _indented(body, "        ") + ["    }", ""]
+    out[-1] = "}"
+    return "\n".join(out) + "\n"
+
+
+def swift_test(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """An XCTestCase exercising a type."""
+    out = [
+        "import XCTest",
+        "@testable import Synth",
+        "",
+        f"final class Type{index:05d}Tests: XCTestCase {{",
+    ]
+    for name, is_async in _function_names(index, spec):
+        effects = " async" if is_async else ""
+        call = "await " if is_async else ""
+        out += [
+            f"    func test_{name}_returnsValue(){effects} {{",
+            f"        let result = {call}Type{index:05d}().{name}(items: [1, 2, 3])",
+            "        XCTAssertGreaterThanOrEqual(result, Int.min)",
+            "    }",
+            "",
+        ]
+    out[-1] = "}"
+    return "\n".join(out) + "\n"
+
+
+def php_source(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """A final class with methods."""
+    out = ["<?php", "", "declare(strict_types=1);", "", "namespace App\\Synth;", ""]
+    out += [f"final class Class{index:05d}", "{", "    private int $value = 0;", ""]
+    for name, _ in _function_names(index, spec):
+        out += [f"    public function {name}(array $items): int", "    {"]
+        out += ["        $total = $this->value;"]
+        out += _indented(function_body(rng, _PHP, spec), "        ") + ["    }", ""]
+    out[-1] = "}"
+    return "\n".join(out) + "\n"
+
+
+def php_test(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """A PHPUnit test case."""
+    out = ["<?php", "", "declare(strict_types=1);", "", "namespace Tests\\Synth;", ""]
+    out += ["use PHPUnit\\Framework\\TestCase;", ""]
+    out += [f"final class Class{index:05d}Test extends TestCase", "{"]
+    for name, _ in _function_names(index, spec):
+        out += [
+            f"    public function test_{name}_returns_int(): void",
+            "    {",
+            f"        $this->assertIsInt((new \\App\\Synth\\Class{index:05d}())->{name}([1, 2]));",
+            "    }",
+            "",
+        ]
+    out[-1] = "}"
+    return "\n".join(out) + "\n"
+
+
+def typescript_source(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """An exported interface and functions."""
+    out = [
+        f"/** Synthetic module {index}. */",
+        f"export interface Record{index:05d} {{",
+    ]
+    out += ["  value: number;", "}", ""]
+    for name, is_async in _function_names(index, spec):
+        body = function_body(rng, _TYPESCRIPT, spec)
+        if is_async:
+            body.insert(0, _TYPESCRIPT.await_stmt)
+        result = "Promise<number>" if is_async else "number"
+        prefix = "export async function" if is_async else "export function"
+        out += [f"{prefix} {name}(value: number, items: number[]): {result} {{"]
+        out += ["    let total = value;"]
+        out += _indented(body, "    ") + ["}", ""]
+    return "\n".join(out)
+
+
+def typescript_test(rng: random.Random, index: int, spec: RepoSpec) -> str:
+    """A test file importing the module."""
+    out = [
+        f'import * as m from "../src/ts/{_package_dir(index, spec)}/module{index:05d}";',
+        "",
+    ]
+    for name, is_async in _function_names(index, spec):
+        prefix = "async " if is_async else ""
+        call = "await " if is_async else ""
+        out += [
+            f'test("{name} returns a number", {prefix}() => {{',
+            f'  expect(typeof ({call}m.{name}(1, [1, 2]))).toBe("number");',
+            "});",
+            "",
+        ]
+    return "\n".join(out)
+
+
+_Render = Callable[[random.Random, int, RepoSpec], str]
+
+# language -> (source dir, source name, source renderer, test path, test renderer)
+_LAYOUT: dict[str, tuple[str, str, _Render, str, _Render]] = {
+    "python": (
+        "src/synth",
+        "module{i:05d}.py",
+        python_source,
+        "tests/test_module{i:05d}.py",
+        python_test,
+    ),
+    "swift": (
+        "Sources/Synth",
+        "Type{i:05d}.swift",
+        swift_source,
+        "Tests/SynthTests/Type{i:05d}Tests.swift",
+        swift_test,
+    ),
+    "php": (
+        "app/Synth",
+        "Class{i:05d}.php",
+        php_source,
+        "tests/Class{i:05d}Test.php",
+        php_test,
+    ),
+    "typescript": (
+        "src/ts",
+        "module{i:05d}.ts",
+        typescript_source,
+        "tests/module{i:05d}.test.ts",
+        typescript_test,
+    ),
+}
+
+
+def _package_dir(index: int, spec: RepoSpec) -> str:
+    """Nested package path spreading files ``files_per_dir`` to a directory."""
+    parts: list[str] = []
+    bucket = index // max(1, spec.files_per_dir)
+    for _ in range(spec.dir_depth):
+        parts.append(f"pkg{bucket % 10}")
+        bucket //= 10
+    return "/".join(reversed(parts))
+
+
+def plan(spec: RepoSpec) -> list[tuple[str, Callable[[], str]]]:
+    """``(relative path, render)`` for every file of the repository.
+
+    Units rotate through the languages; each unit is a source file plus,
+    with probability ``test_ratio``, its test file.
+    """
+    unknown = set(spec.languages) - set(_LAYOUT)
+    if unknown or not spec.languages:
+        raise ValueError(f"unknown language(s): {', '.join(sorted(unknown)) or '-'}")
+    files: list[tuple[str, Callable[[], str]]] = []
+    unit = 0
+    while len(files) < spec.files:
+        language = spec.languages[unit % len(spec.languages)]
+        index = unit // len(spec.languages)
+        src_dir, src_name, render_src, test_path, render_test = _LAYOUT[language]
+        seed = f"{spec.seed}:{language}:{index}"
+        package = _package_dir(index, spec)
+        files.append(
+            (
+                f"{src_dir}/{package}/{src_name.format(i=index)}",
+                partial(render_src, random.Random(seed), index, spec),
+            )
+        )
+        if random.Random(f"{seed}:test").random() < spec.test_ratio:
+            files.append(
+                (
+                    test_path.format(i=index),
+                    partial(render_test, random.Random(f"{seed}:test"), index, spec),
+                )
+            )
+        unit += 1
+    return files[: spec.files]
+
+
+def _manifest(spec: RepoSpec) -> dict[str, object]:
+    return {"generator_version": GENERATOR_VERSION, "spec": asdict(spec)}
+
+
+def generate(root: Path, spec: RepoSpec, force: bool = False) -> bool:
+    """Write the repository for ``spec`` under ``root``.
+
+    Returns False when ``root`` already holds this exact spec (nothing done).
+    Raises ValueError for an unknown language or a non-empty ``root`` that
+    was not generated by this module.
+    """
+    manifest_path = root / MANIFEST_NAME
+    manifest = _manifest(spec)
+    if not force and manifest_path.exists():
+        try:
+            if json.loads(manifest_path.read_text(encoding="utf-8")) == json.loads(
+                json.dumps(manifest)
+            ):
+                return False
+        except ValueError:
+            pass
+    if root.exists():
+        if not manifest_path.exists() and any(root.iterdir()):
+            raise ValueError(f"refusing to overwrite non-generated directory {root}")
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    created: set[Path] = set()
+    for relative, render in plan(spec):
+        path = root / relative
+        if path.parent not in created:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            created.add(path.parent)
+        _ = path.write_text(render(), encoding="utf-8")
+    _write_scaffolding(root, spec)
+    _ = manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return True
+
+
+def _write_scaffolding(root: Path, spec: RepoSpec) -> None:
+    """Project markers the gates use to find the root and sources."""
+    _ = (root / "README.md").write_text("# Synthetic repository\n", encoding="utf-8")
+    if "python" in spec.languages:
+        _ = (root / "pyproject.toml").write_text(
+            '[project]\nname = "synth"\nversion = "0.0.0"\n', encoding="utf-8"
+        )
+        for directory in (root / "src" / "synth").rglob("*"):
+            if directory.is_dir():
+                _ = (directory / "__init__.py").write_text("", encoding="utf-8")
+    if "swift" in spec.languages:
+        _ = (root / "Package.swift").write_text(
+            "// swift-tools-version:5.9\nimport PackageDescription\n\n"
+            + 'let package = Package(name: "Synth", targets: [.target(name: "Synth")])\n',
+            encoding="utf-8",
+        )
+
+
+def main() -> int:
+    """Generate a synthetic repository."""
+    defaults = RepoSpec()
+    parser = argparse.ArgumentParser(description="Generate a synthetic repository.")
+    _ = parser.add_argument("output", type=Path, help="Directory to (re)create")
+    _ = parser.add_argument(
+        "--files",
+        type=lambda text: parse_scales(text)[0],
+        default=defaults.files,
+        help="Total source + test files, e.g. 1k (default: 100)",
+    )
+    _ = parser.add_argument("--seed", type=int, default=defaults.seed)
+    _ = parser.add_argument(
+        "--languages",
+        type=lambda text: tuple(part.strip() for part in text.split(",") if part),
+        default=defaults.languages,
+        help=f"Comma-separated subset of {','.join(LANGUAGES)}",
+    )
+    _ = parser.add_argument("--max-functions", type=int, default=defaults.max_functions)
+    _ = parser.add_argument(
+        "--function-lines", type=int, default=defaults.function_lines
+    )
+    _ = parser.add_argument(
+        "--long-function-ratio", type=float, default=defaults.long_function_ratio
+    )
+    _ = parser.add_argument("--nesting", type=int, default=defaults.nesting)
+    _ = parser.add_argument("--async-ratio", type=float, default=defaults.async_ratio)
+    _ = parser.add_argument("--test-ratio", type=float, default=defaults.test_ratio)
+    _ = parser.add_argument("--force", action="store_true", help="Always regenerate")
+    args = parser.parse_args()
+
+    spec = replace(
+        defaults,
+        files=args.files,
+        seed=args.seed,
+        languages=args.languages,
+        max_functions=args.max_functions,
+        function_lines=args.function_lines,
+        long_function_ratio=args.long_function_ratio,
+        nesting=args.nesting,
+        async_ratio=args.async_ratio,
+        test_ratio=args.test_ratio,
+    )
+    try:
+        created = generate(args.output, spec, force=args.force)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if created:
+        print(f"✅ Generated {spec.files} file(s) in {args.output}")
+    else:
+        print(f"✅ {args.output} is already up to date (use --force to rebuild)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Tests for churn × complexity hotspot ranking."""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from analyze_hotspots import (
+    FileChurn,
+    FileMetrics,
+    aggregate_churn,
+    load_history,
+    parse_numstat_log,
+    rank_hotspots,
+    split_rename,
+)
+
+_LOG = (
+    "\x1ebbb 200\n\n3\t1\tsrc/{old => new}/mod.py\n-\t-\tdocs/logo.png\n"
+    + "\x1eaaa 100\n\n10\t0\tsrc/old/mod.py\n"
+)
+
+
+def _git(root: Path, *args: str) -> None:
+    _ = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(root: Path, name: str, text: str) -> None:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_text(text, encoding="utf-8")
+    _git(root, "add", name)
+    _git(root, "commit", "-q", "-m", name)
+
+
+class ChurnTests(unittest.TestCase):
+    """Numstat parsing follows renames into the current path."""
+
+    def test_split_rename_forms(self) -> None:
+        self.assertEqual(split_rename("a/b.py"), ("", "a/b.py"))
+        self.assertEqual(split_rename("a.py => b.py"), ("a.py", "b.py"))
+        self.assertEqual(
+            split_rename("src/{ => pkg}/mod.py"), ("src/mod.py", "src/pkg/mod.py")
+        )
+
+    def test_renamed_file_keeps_its_history(self) -> None:
+        commits = parse_numstat_log(_LOG)
+
+        churn = aggregate_churn(commits, since=0)
+        recent = aggregate_churn(commits, since=150)
+
+        self.assertEqual([sha for sha, _, _ in commits], ["aaa", "bbb"])
+        self.assertEqual(churn["src/new/mod.py"].commits, 2)
+        self.assertEqual(churn["src/new/mod.py"].lines_changed, 14)
+        self.assertNotIn("src/old/mod.py", churn)
+        self.assertEqual(recent["src/new/mod.py"].commits, 1)
+
+    def test_history_is_read_incrementally(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _git(root, "init", "-q")
+            _commit(root, "src/a.py", "x = 1\n")
+            _commit(root, "src/b.py", "y = 1\n")
+            _, first = load_history(root)
+            _commit(root, "src/a.py", "x = 2\n")
+
+            head, second = load_history(root)
+            cached = (root / ".cortex/.cache/hotspots/churn.json").exists()
+
+        self.assertTrue(cached)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second[:2], first)
+        self.assertEqual(second[-1][0], head)
+        self.assertEqual(aggregate_churn(second, 0)["src/a.py"].commits, 2)
+
+
+class RankTests(unittest.TestCase):
+    """Complex code that also changes often ranks first."""
+
+    def test_churn_times_complexity(self) -> None:
+        churn = {
+            "busy_simple.py": FileChurn(commits=10),
+            "busy_complex.py": FileChurn(commits=10),
+            "stable_complex.py": FileChurn(commits=1),
+        }
+        simple = FileMetrics(3, 3, 1, 0, 0)
+        complex_ = FileMetrics(5, 60, 25, 6, 4)
+        metrics = {
+            "busy_simple.py": simple,
+            "busy_complex.py": complex_,
+            "stable_complex.py": complex_,
+            "unchanged.py": complex_,
+        }
+
+        ranked = rank_hotspots(churn, metrics)
+
+        self.assertEqual(
+            [h.path for h in ranked],
+            ["busy_complex.py", "stable_complex.py", "busy_simple.py"],
+        )
+        self.assertEqual(ranked[0].score, 1.0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Tests for profile-guided ranking of performance findings."""
+
+from __future__ import annotations
+
+import cProfile
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from analyze_performance import (
+    FunctionTiming,
+    ProfileIndex,
+    collect_file_analysis,
+    enclosing_span,
+    finding_timings,
+    rank_findings,
+)
+
+_SOURCE = """
+import functools
+
+
+def cold(xs):
+    for x in xs:
+        for y in x:
+            pass
+
+
+@functools.lru_cache(maxsize=None)
+def cached(n):
+    return n
+
+
+def decorated(f):
+    return f
+
+
+@decorated
+def hot(xs):
+    for x in xs:
+        for y in x:
+            pass
+
+
+def run():
+    cold([[1]])
+    for i in range(50):
+        hot([[1, 2]] * 5)
+"""
+
+
+def _profile_module(path: Path, stats_path: Path) -> None:
+    spec = importlib.util.spec_from_file_location("perf_sample", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    profiler = cProfile.Profile()
+    profiler.runcall(module.run)
+    profiler.dump_stats(stats_path)
+    _ = sys.modules.pop("perf_sample", None)
+
+
+class ProfileJoinTests(unittest.TestCase):
+    """Findings pick up the measured cost of their enclosing function."""
+
+    def test_findings_join_profile_from_another_checkout(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profiled = Path(tmp) / "old" / "pkg" / "mod.py"
+            analyzed = Path(tmp) / "new" / "pkg" / "mod.py"
+            for path in (profiled, analyzed):
+                path.parent.mkdir(parents=True)
+                _ = path.write_text(_SOURCE, encoding="utf-8")
+            stats_path = Path(tmp) / "run.pstats"
+            _profile_module(profiled, stats_path)
+
+            findings, spans = collect_file_analysis(analyzed)
+            timings = finding_timings(
+                analyzed, findings, spans, ProfileIndex([stats_path])
+            )
+
+        by_function = dict(zip(findings.column("function"), timings))
+        hot, cold = by_function["hot"], by_function["cold"]
+        assert hot is not None and cold is not None
+        self.assertEqual((hot.calls, cold.calls), (50, 1))
+
+    def test_nested_function_wins(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "mod.py"
+            _ = path.write_text(
+                "def outer():\n    def inner():\n        pass\n    return inner\n",
+                encoding="utf-8",
+            )
+            _, spans = collect_file_analysis(path)
+
+        span = enclosing_span(spans, 3)
+        assert span is not None
+        self.assertEqual(span.def_line, 2)
+        self.assertIsNone(enclosing_span(spans, 5))
+
+
+class RankTests(unittest.TestCase):
+    """Measured hot paths outrank static severity."""
+
+    def test_profiled_findings_rank_by_cumulative_time(self) -> None:
+        startup = ("a.py", ("nested_loops", "high", 3, "startup", "m"), None)
+        cold = (
+            "a.py",
+            ("nested_loops", "high", 9, "cold", "m"),
+            FunctionTiming(1, 0.001),
+        )
+        hot = ("b.py", ("len_in_loop", "low", 4, "hot", "m"), FunctionTiming(900, 2.5))
+        minor = ("b.py", ("len_in_loop", "low", 8, "x", "m"), None)
+
+        ranked = rank_findings([startup, cold, hot, minor])
+
+        self.assertEqual(ranked, [hot, cold, startup])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
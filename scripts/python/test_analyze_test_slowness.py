@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Tests for test-suite slowness ranking."""
+
+from __future__ import annotations
+
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from _test_history import FixtureTiming, TestResult
+from analyze_test_slowness import (
+    KIND_FIXTURE,
+    KIND_NETWORK,
+    KIND_SLEEP,
+    KIND_SUBPROCESS,
+    StaticFinding,
+    collection_suggestions,
+    fixture_suggestions,
+    rank_suggestions,
+    scan_test_file,
+    static_suggestions,
+)
+
+_TESTS = """
+import subprocess
+import time
+
+import pytest
+import requests
+
+
+@pytest.fixture
+def server():
+    time.sleep(0.5)
+    yield
+
+
+class TestApi:
+    def test_fetch(self):
+        requests.get("http://localhost")
+        time.sleep(0.05)
+
+    @pytest.mark.integration
+    def test_live(self):
+        subprocess.run(["true"])
+
+
+def test_build(server):
+    subprocess.run(["make"])
+"""
+
+
+def _scan(source: str, rel_path: str = "tests/unit/test_api.py") -> list[StaticFinding]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "test_api.py"
+        _ = path.write_text(textwrap.dedent(source), encoding="utf-8")
+        return scan_test_file(path, rel_path, min_sleep_s=0.1)
+
+
+class ScanTests(unittest.TestCase):
+    """Sleeps and real I/O are found; integration tests may do I/O."""
+
+    def test_unit_test_findings(self) -> None:
+        findings = _scan(_TESTS)
+
+        self.assertEqual(
+            [(f.kind, f.line, f.test, f.fixture) for f in findings],
+            [
+                (KIND_SLEEP, 11, None, "tests/unit/test_api.py:9"),
+                (KIND_NETWORK, 17, "tests/unit/test_api.py::TestApi::test_fetch", None),
+                (KIND_SUBPROCESS, 26, "tests/unit/test_api.py::test_build", None),
+            ],
+        )
+
+    def test_integration_directory_allows_io(self) -> None:
+        findings = _scan(_TESTS, "tests/integration/test_api.py")
+
+        self.assertEqual([f.kind for f in findings], [KIND_SLEEP])
+
+
+class EstimateTests(unittest.TestCase):
+    """Savings come from runtime history and rank the suggestions."""
+
+    def test_ranked_by_estimated_saving(self) -> None:
+        findings = _scan(_TESTS)
+        phases = {
+            "tests/unit/test_api.py::TestApi::test_fetch": TestResult(call_s=0.3),
+            "tests/unit/test_api.py::test_build": TestResult(call_s=4.0),
+        }
+        fixtures = {
+            ("tests/unit/test_api.py:9", "server"): FixtureTiming(
+                "function", 2, 1, 1.0
+            ),
+            ("tests/conftest.py:5", "db"): FixtureTiming("function", 40, 4, 2.0),
+            ("tests/conftest.py:9", "cheap"): FixtureTiming("function", 40, 4, 0.01),
+            ("tests/conftest.py:14", "app"): FixtureTiming("session", 1, 1, 3.0),
+        }
+
+        ranked = rank_suggestions(
+            static_suggestions(findings, phases, fixtures)
+            + fixture_suggestions(fixtures, min_uses=5, min_mean_s=0.01)
+            + collection_suggestions({"tests/unit/test_api.py": 0.25}, min_s=0.2)
+        )
+
+        self.assertEqual(
+            [(s.kind, s.location) for s in ranked],
+            [
+                (KIND_SUBPROCESS, "tests/unit/test_api.py:26"),
+                (KIND_FIXTURE, "tests/conftest.py:5"),
+                (KIND_SLEEP, "tests/unit/test_api.py:11"),
+                (KIND_NETWORK, "tests/unit/test_api.py:17"),
+                ("slow_collection", "tests/unit/test_api.py"),
+            ],
+        )
+        saved = [s.saved_s for s in ranked]
+        self.assertAlmostEqual(saved[1] or 0.0, 0.05 * 36)
+        self.assertAlmostEqual(saved[2] or 0.0, 1.0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
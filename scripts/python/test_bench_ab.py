@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Tests for paired A/B benchmark verdicts."""
+
+from __future__ import annotations
+
+import unittest
+
+from bench_ab import PairedResult, paired_ratios
+from benchmark_performance import parse_cpus
+
+
+class PairedResultTests(unittest.TestCase):
+    """A change needs a CI excluding 1 and a delta beyond the threshold."""
+
+    def test_ratios_pair_rounds_and_skip_zero_baselines(self) -> None:
+        self.assertEqual(paired_ratios([1.0, 2.0, 0.0], [1.5, 1.0, 3.0]), [1.5, 0.5])
+
+    def test_verdicts(self) -> None:
+        slower = PairedResult("b", 1.0, 1.2, 1.2, 1.1, 1.3)
+        noisy = PairedResult("b", 1.0, 1.2, 1.2, 0.9, 1.5)
+        tiny = PairedResult("b", 1.0, 1.01, 1.01, 1.005, 1.02)
+        faster = PairedResult("b", 1.0, 0.8, 0.8, 0.7, 0.9)
+
+        self.assertTrue(slower.slower)
+        self.assertFalse(noisy.slower or noisy.faster)
+        self.assertFalse(tiny.slower)
+        self.assertTrue(faster.faster)
+
+    def test_parse_cpus(self) -> None:
+        self.assertEqual(parse_cpus("2,3"), (2, 3))
+        self.assertEqual(parse_cpus("0-2,5"), (0, 1, 2, 5))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
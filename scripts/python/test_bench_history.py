@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Tests for the append-only benchmark history."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from _bench_history import BenchmarkHistory, RunContext, extract_timings, find_steps
+
+
+def _context(sha: str, machine: str = "m1") -> RunContext:
+    return RunContext(sha, "main", False, machine, f"machine {machine}")
+
+
+class BenchmarkHistoryTests(unittest.TestCase):
+    """Runs are appended, filtered by machine, and steps name their commits."""
+
+    def test_records_series_and_locates_step(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            history = BenchmarkHistory(Path(tmp) / "history.db")
+            try:
+                for i in range(8):
+                    level = 1.0 if i < 4 else 1.5
+                    samples = [level, level * 1.01, level * 0.99]
+                    _ = history.record(
+                        _context(f"sha{i}"), {"b::x": samples}, "t", timestamp=i
+                    )
+                _ = history.record(_context("other", "m2"), {"b::x": [9.0]}, "t")
+
+                points = history.series("b::x", machine="m1")
+                steps = find_steps(points, min_runs=3, min_change=0.05, min_sigma=5)
+
+                self.assertEqual([p.sha for p in points][:2], ["sha0", "sha1"])
+                self.assertEqual(len(points), 8)
+                self.assertEqual(set(history.machines()), {"m1", "m2"})
+                self.assertEqual(len(steps), 1)
+                self.assertEqual(
+                    (steps[0].before.sha, steps[0].after.sha), ("sha3", "sha4")
+                )
+                self.assertAlmostEqual(steps[0].ratio, 1.5)
+            finally:
+                history.close()
+
+
+class ExtractTimingsTests(unittest.TestCase):
+    """Named timings are found in foreign results layouts."""
+
+    def test_reads_seconds_and_milliseconds(self) -> None:
+        data = {
+            "suites": [
+                {"name": "suite", "results": [{"name": "a", "mean_time_ms": 2.0}]},
+                {"benchmarks": [{"benchmark": "b", "median_s": 0.5}]},
+            ]
+        }
+
+        self.assertEqual(extract_timings(data), {"a": 0.002, "b": 0.5})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
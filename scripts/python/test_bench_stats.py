@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for benchmark sample statistics."""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from _bench_stats import (
+    change_points,
+    compare,
+    growth_exponent,
+    mann_whitney_p,
+    parse_scales,
+    summarize,
+)
+
+
+def _samples(center: float, spread: float, seed: int, n: int = 15) -> list[float]:
+    rng = random.Random(seed)
+    return [center + rng.random() * spread for _ in range(n)]
+
+
+class SummaryTests(unittest.TestCase):
+    """Median, quartiles and CI of a sample."""
+
+    def test_quartiles_and_ci_bracket_the_median(self) -> None:
+        summary = summarize([5.0, 1.0, 3.0, 2.0, 4.0])
+
+        self.assertEqual(summary.median, 3.0)
+        self.assertEqual((summary.q1, summary.q3), (2.0, 4.0))
+        self.assertLessEqual(summary.ci_low, summary.median)
+        self.assertGreaterEqual(summary.ci_high, summary.median)
+
+
+class CompareTests(unittest.TestCase):
+    """Only significant changes beyond the threshold count."""
+
+    def test_small_exact_case_matches_normal_approximation(self) -> None:
+        self.assertAlmostEqual(mann_whitney_p([1, 2, 3], [4, 5, 6]), 0.0809, places=3)
+        self.assertEqual(mann_whitney_p([1.0, 1.0], [1.0, 1.0]), 1.0)
+
+    def test_clear_slowdown_is_a_regression(self) -> None:
+        result = compare(_samples(1.0, 0.05, 1), _samples(1.15, 0.05, 2))
+
+        self.assertTrue(result.regression)
+        self.assertLess(result.p_value, 0.01)
+
+    def test_noise_and_tiny_shifts_are_not_regressions(self) -> None:
+        baseline = _samples(1.0, 0.05, 1)
+
+        self.assertFalse(compare(baseline, _samples(1.0, 0.05, 3)).significant)
+        self.assertFalse(compare(baseline, _samples(1.02, 0.05, 4)).regression)
+
+
+class ChangePointTests(unittest.TestCase):
+    """Persistent level shifts are located; noise and spikes are not."""
+
+    def test_finds_up_and_down_steps(self) -> None:
+        series = _samples(1.0, 0.04, 1, 10) + _samples(1.2, 0.04, 2, 8)
+        series += _samples(1.0, 0.04, 3, 6)
+
+        self.assertEqual(change_points(series), [10, 18])
+
+    def test_ignores_noise_and_single_spikes(self) -> None:
+        self.assertEqual(change_points(_samples(1.0, 0.1, 4, 40)), [])
+        self.assertEqual(change_points([1.0] * 10 + [2.0] + [1.0] * 10), [])
+
+
+class ScaleTests(unittest.TestCase):
+    """Scale lists parse with suffixes; growth exponents follow n^k."""
+
+    def test_parse_scales(self) -> None:
+        self.assertEqual(parse_scales("10k, 1k,100,1k"), (100, 1000, 10000))
+        self.assertEqual(parse_scales("1.5m"), (1_500_000,))
+
+    def test_growth_exponent(self) -> None:
+        exponent = growth_exponent(100, 1.0, 1000, 100.0)
+
+        self.assertIsNotNone(exponent)
+        self.assertAlmostEqual(exponent or 0, 2.0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
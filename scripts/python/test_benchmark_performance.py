@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Tests for micro-benchmark discovery and worker timing."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmark_performance import discover, run_worker
+
+_BENCH_FILE = """\
+CALLS = []
+
+
+def setup():
+    CALLS.append("setup")
+
+
+def bench_append():
+    CALLS.append(1)
+
+
+def bench_needs_arg(x):
+    return x
+
+
+def helper():
+    pass
+"""
+
+
+class DiscoverTests(unittest.TestCase):
+    """Only zero-argument bench_* functions in bench_*.py files are found."""
+
+    def test_discovers_and_filters(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _ = (root / "bench_lists.py").write_text(_BENCH_FILE)
+            _ = (root / "helpers.py").write_text("def bench_ignored():\n    pass\n")
+
+            names = [b.name for b in discover([root, root / "missing"])]
+
+            self.assertEqual(names, ["bench_lists::bench_append"])
+            self.assertEqual(discover([root], pattern="nomatch"), [])
+
+
+class WorkerTests(unittest.TestCase):
+    """The worker calibrates, then returns one per-call sample per repeat."""
+
+    def test_calibrates_and_samples(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench_lists.py"
+            _ = path.write_text(_BENCH_FILE)
+
+            data = run_worker(
+                path,
+                "bench_append",
+                iterations=0,
+                warmups=1,
+                repeats=3,
+                keep_gc=False,
+                min_time_s=0.001,
+            )
+
+            self.assertGreater(data["iterations"], 1)
+            samples = data["samples"]
+            assert isinstance(samples, list)
+            self.assertEqual(len(samples), 3)
+            self.assertTrue(all(s > 0 for s in samples))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for blob-memoized complexity trends over git history."""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from _complexity_history import (
+    BlobCache,
+    analyze_source,
+    build_history,
+    function_series,
+    module_series,
+)
+
+_SIMPLE = "def f(x):\n    return x\n"
+_BRANCHY = "def f(x):\n    if x:\n        return 1\n    return 0\n"
+_CLASS = "class C:\n    def m(self):\n        def inner():\n            pass\n"
+
+
+def _git(root: Path, *args: str) -> None:
+    _ = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(root: Path, name: str, text: str) -> None:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_text(text, encoding="utf-8")
+    _git(root, "add", name)
+    _git(root, "commit", "-q", "-m", name)
+
+
+class AnalyzeSourceTests(unittest.TestCase):
+    """Blob metrics name functions by qualified name."""
+
+    def test_qualified_names(self) -> None:
+        metrics = analyze_source(_CLASS)
+
+        self.assertEqual(
+            [f.name for f in metrics.functions], ["C.m", "C.m.<locals>.inner"]
+        )
+
+    def test_syntax_error_keeps_size(self) -> None:
+        metrics = analyze_source("def broken(:\n    pass\n")
+
+        self.assertFalse(metrics.parsed)
+        self.assertEqual(metrics.lines, 2)
+
+
+class HistoryTests(unittest.TestCase):
+    """Each distinct blob is analyzed once; series record change points."""
+
+    def test_trends_and_blob_memoization(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _git(root, "init", "-q")
+            _commit(root, "src/a.py", _SIMPLE)
+            _commit(root, "docs/readme.md", "x\n")  # Sources unchanged
+            _commit(root, "src/b.py", _SIMPLE)  # Same blob as a.py
+            _commit(root, "src/a.py", _BRANCHY)
+            cache = BlobCache(root / "blobs.db")
+            try:
+                history = build_history(root, "src", 10, cache)
+                again = build_history(root, "src", 10, cache)
+            finally:
+                cache.close()
+
+        self.assertEqual(len(history.commits), 4)
+        self.assertEqual((len(history.blobs), history.analyzed), (2, 2))
+        self.assertEqual(again.analyzed, 0)
+        functions = function_series(history)
+        self.assertEqual(functions["src/a.py::f"], [[0, 2, 1, 0], [3, 4, 2, 1]])
+        self.assertEqual(functions["src/b.py::f"], [[2, 2, 1, 0]])
+        modules = module_series(again)
+        self.assertEqual(modules["src/a.py"][-1], [3, 4, 1, 2, 2])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
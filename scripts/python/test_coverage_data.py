@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Tests for the bounded-memory coverage data readers."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from _coverage_data import (
+    FileCoverage,
+    decode_numbits,
+    file_coverage_from_json,
+    iter_db_files,
+    iter_json_files,
+    summarize_coverage,
+)
+
+try:
+    from coverage import CoverageData
+except ImportError:
+    CoverageData = None
+
+_SOURCE = """\
+def f(x):
+    if x:
+        return 1
+    return 0
+
+
+def g():
+    return 2
+"""
+
+
+def _report(files: dict[str, dict[str, object]]) -> dict[str, object]:
+    return {
+        "meta": {"version": "7.0", "show_contexts": False},
+        "files": files,
+        "totals": {"covered_lines": 0, "num_statements": 0},
+    }
+
+
+def _entry(covered: int, missing: list[int]) -> dict[str, object]:
+    return {
+        "executed_lines": list(range(1, covered + 1)),
+        "missing_lines": missing,
+        "summary": {
+            "covered_lines": covered,
+            "num_statements": covered + len(missing),
+            "missing_lines": len(missing),
+        },
+    }
+
+
+class StreamingJsonTests(unittest.TestCase):
+    """The streaming parser must agree with json.load at any chunk size."""
+
+    def test_streaming_matches_full_load_with_tiny_chunks(self) -> None:
+        files = {
+            f"src/pkg/mod_{i}.py": _entry(i * 3, list(range(100, 100 + i)))
+            for i in range(25)
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "coverage.json"
+            _ = path.write_text(json.dumps(_report(files), indent=2), encoding="utf-8")
+
+            for chunk_size in (1, 7, 4096):
+                streamed = dict(iter_json_files(path, chunk_size=chunk_size))
+                self.assertEqual(streamed, files)
+
+    def test_truncated_report_raises(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "coverage.json"
+            text = json.dumps(_report({"a.py": _entry(1, [2])}))
+            _ = path.write_text(text[: len(text) // 2], encoding="utf-8")
+
+            with self.assertRaises(json.JSONDecodeError):
+                _ = list(iter_json_files(path, chunk_size=8))
+
+
+@unittest.skipIf(CoverageData is None, "coverage.py is not installed")
+class SqliteDataTests(unittest.TestCase):
+    """Read executed and missing lines from a real ``.coverage`` file."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name).resolve()
+        self.source = self.root / "src" / "m.py"
+        self.source.parent.mkdir()
+        _ = self.source.write_text(_SOURCE, encoding="utf-8")
+        self.data_file = self.root / ".coverage"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, arcs: bool) -> None:
+        assert CoverageData is not None
+        data = CoverageData(basename=str(self.data_file))
+        gone = str(self.root / "src" / "gone.py")  # Deleted since the run
+        if arcs:
+            data.add_arcs(
+                {
+                    str(self.source): {(-1, 1), (1, 7), (7, -1), (-1, 2), (2, 3)},
+                    gone: {(-1, 1)},
+                }
+            )
+        else:
+            data.add_lines({str(self.source): {1, 2, 3, 7}, gone: {1}})
+        data.write()
+
+    def test_line_and_arc_data_give_the_same_lines(self) -> None:
+        for arcs in (False, True):
+            with self.subTest(arcs=arcs):
+                self._write(arcs)
+
+                files = list(iter_db_files(self.data_file, self.root))
+
+                self.assertEqual(
+                    files,
+                    [
+                        FileCoverage(
+                            "src/m.py",
+                            num_statements=6,
+                            covered_lines=4,
+                            missing_lines=(4, 8),
+                            executed_lines=(1, 2, 3, 7),
+                        )
+                    ],
+                )
+                self.data_file.unlink()
+
+    def test_only_restricts_files(self) -> None:
+        self._write(arcs=False)
+
+        self.assertEqual(
+            list(iter_db_files(self.data_file, self.root, only={"src/x.py"})), []
+        )
+
+
+class SummaryTests(unittest.TestCase):
+    """Aggregate totals and top-N selection."""
+
+    def test_top_gaps_and_percentage(self) -> None:
+        files = [
+            file_coverage_from_json("a.py", _entry(8, [9, 10])),
+            file_coverage_from_json("b.py", _entry(5, [6, 7, 8, 9, 10])),
+            file_coverage_from_json("c.py", _entry(10, [])),
+            file_coverage_from_json("d.py", _entry(9, [10])),
+        ]
+
+        summary = summarize_coverage(iter(files), top_n=2)
+
+        self.assertEqual([g.path for g in summary.top_gaps], ["b.py", "a.py"])
+        self.assertEqual(summary.file_count, 4)
+        self.assertAlmostEqual(summary.percent_covered, 80.0)
+
+    def test_filter_excludes_from_totals(self) -> None:
+        files = [
+            FileCoverage("src/a.py", 10, 5, (6, 7, 8, 9, 10)),
+            FileCoverage("tests/b.py", 10, 10, ()),
+        ]
+
+        summary = summarize_coverage(files, top_n=5, path_filter=lambda p: "src/" in p)
+
+        self.assertEqual(summary.file_count, 1)
+        self.assertAlmostEqual(summary.percent_covered, 50.0)
+
+    def test_decode_numbits(self) -> None:
+        self.assertEqual(decode_numbits(bytes([0b00000110, 0, 0b1])), [1, 2, 16])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Tests for incremental coverage planning and merging."""
+
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from _coverage_incremental import (
+    BASELINE_DATA,
+    IncrementalPlan,
+    baseline_dir,
+    iter_merged_files,
+    merge_coverage,
+    plan_incremental,
+    save_baseline,
+)
+
+_SOURCES = {
+    "src/cortex/a.py": "def f():\n    return 1\n",
+    "src/cortex/b.py": "def g():\n    return 2\n",
+    "src/cortex/c.py": "X = 1\n",
+    "tests/test_a.py": "def test_a():\n    pass\n",
+    "tests/test_b.py": "def test_b():\n    pass\n",
+}
+
+
+def _numbits(lines: list[int]) -> bytes:
+    data = bytearray(max(lines) // 8 + 1)
+    for line in lines:
+        data[line // 8] |= 1 << (line % 8)
+    return bytes(data)
+
+
+def _write_db(path: Path, root: Path, rows: list[tuple[str, str, list[int]]]) -> None:
+    """Write a minimal coverage.py data file: (rel path, context, lines)."""
+    conn = sqlite3.connect(path)
+    _ = conn.executescript(
+        "CREATE TABLE meta (key TEXT, value TEXT);"
+        + "CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT UNIQUE);"
+        + "CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT UNIQUE);"
+        + "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB);"
+    )
+    for rel, context, lines in rows:
+        _ = conn.execute(
+            "INSERT OR IGNORE INTO file (path) VALUES (?)", (str(root / rel),)
+        )
+        _ = conn.execute(
+            "INSERT OR IGNORE INTO context (context) VALUES (?)", (context,)
+        )
+        _ = conn.execute(
+            "INSERT INTO line_bits VALUES ("
+            + "(SELECT id FROM file WHERE path = ?), "
+            + "(SELECT id FROM context WHERE context = ?), ?)",
+            (str(root / rel), context, _numbits(lines)),
+        )
+    conn.commit()
+    conn.close()
+
+
+class IncrementalCoverageTests(unittest.TestCase):
+    """Changed files are re-measured; everything else comes from the baseline."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name).resolve()
+        for rel, text in _SOURCES.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _ = path.write_text(text, encoding="utf-8")
+        data_file = self.root / ".coverage"
+        _write_db(
+            data_file,
+            self.root,
+            [
+                ("src/cortex/a.py", "", [1]),
+                ("src/cortex/b.py", "", [1]),
+                ("src/cortex/c.py", "", [1]),
+                ("src/cortex/a.py", "tests/test_a.py::test_a|run", [2]),
+                ("src/cortex/b.py", "tests/test_b.py::test_b|run", [2]),
+            ],
+        )
+        save_baseline(
+            self.root, data_file, self.root / "src/cortex", self.root / "tests"
+        )
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _plan(self) -> IncrementalPlan:
+        return plan_incremental(
+            self.root, self.root / "src/cortex", self.root / "tests"
+        )
+
+    def test_changed_source_reruns_touching_tests_and_merges(self) -> None:
+        _ = (self.root / "src/cortex/a.py").write_text(
+            "\ndef f():\n    return 1\n", encoding="utf-8"
+        )
+        plan = self._plan()
+        fresh = self.root / "fresh.coverage"
+        _write_db(
+            fresh,
+            self.root,
+            [
+                ("src/cortex/a.py", "", [2]),
+                ("src/cortex/a.py", "tests/test_a.py::test_a|run", [3]),
+            ],
+        )
+
+        executed = merge_coverage(
+            baseline_dir(self.root) / BASELINE_DATA, fresh, self.root, plan
+        )
+
+        self.assertEqual(plan.targets, ["tests/test_a.py::test_a"])
+        self.assertEqual(plan.changed_sources, {"src/cortex/a.py"})
+        self.assertEqual(executed["src/cortex/a.py"], {2, 3})
+        self.assertEqual(executed["src/cortex/b.py"], {1, 2})
+
+    def _merged(self, plan: IncrementalPlan) -> dict[str, tuple[int, int]]:
+        executed = merge_coverage(
+            baseline_dir(self.root) / BASELINE_DATA, None, self.root, plan
+        )
+        return {
+            file.path: (file.covered_lines, file.num_statements)
+            for file in iter_merged_files(executed, self.root, self.root / "src/cortex")
+        }
+
+    def test_untested_new_source_is_gated_without_a_rerun(self) -> None:
+        _ = (self.root / "src/cortex/new.py").write_text(
+            "def h():\n    return 3\n", encoding="utf-8"
+        )
+
+        plan = self._plan()
+
+        self.assertEqual(plan.targets, [])
+        self.assertEqual(plan.changed_sources, {"src/cortex/new.py"})
+        self.assertEqual(self._merged(plan)["src/cortex/new.py"], (0, 2))
+
+    def test_deleted_test_file_drops_its_coverage(self) -> None:
+        (self.root / "tests/test_b.py").unlink()
+
+        plan = self._plan()
+
+        self.assertEqual(plan.targets, [])
+        self.assertEqual(plan.changed_tests, {"tests/test_b.py"})
+        merged = self._merged(plan)
+        self.assertEqual(merged["src/cortex/b.py"], (1, 2))
+        self.assertEqual(merged["src/cortex/a.py"], (2, 2))
+
+    def test_edited_test_file_runs_whole(self) -> None:
+        _ = (self.root / "tests/test_b.py").write_text(
+            "def test_b():\n    assert True\n", encoding="utf-8"
+        )
+
+        plan = self._plan()
+
+        self.assertEqual(plan.targets, ["tests/test_b.py"])
+        self.assertEqual(plan.changed_tests, {"tests/test_b.py"})
+
+    def test_import_only_change_forces_full_run(self) -> None:
+        _ = (self.root / "src/cortex/c.py").write_text("X = 20\n", encoding="utf-8")
+
+        plan = self._plan()
+
+        self.assertIsNone(plan.targets)
+        self.assertIn("import time", plan.reason)
+
+    def test_config_change_forces_full_run(self) -> None:
+        _ = (self.root / "tests/conftest.py").write_text("", encoding="utf-8")
+
+        self.assertIsNone(self._plan().targets)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for the changed-line index and diff-coverage helpers."""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from _coverage_data import FileCoverage, restrict_to_lines
+from _git_diff import changed_lines, parse_unified_diff
+from check_diff_coverage import diff_coverage_percent, format_line_ranges
+
+_DIFF = """\
+diff --git a/src/pkg/m.py b/src/pkg/m.py
+index 111..222 100644
+--- a/src/pkg/m.py
++++ b/src/pkg/m.py
+@@ -3,0 +4,2 @@ def a(x):
++    if x:
++        return 1
+@@ -10 +12 @@ def b():
+-    return 1
++    return 2
+@@ -20,3 +21,0 @@ def c():
+-    a
+-    b
+-    c
+diff --git a/src/pkg/gone.py b/src/pkg/gone.py
+deleted file mode 100644
+--- a/src/pkg/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-x = 1
+-y = 2
+"""
+
+# Hunk content that looks like file headers: "-- a" removed, "++ b" added
+_HEADER_LIKE_DIFF = """\
+diff --git a/notes.md b/notes.md
+index 111..222 100644
+--- a/notes.md
++++ b/notes.md
+@@ -2 +2,2 @@
+--- a
++++ b
++text
+@@ -9 +10 @@
+-old
++new
+"""
+
+
+def _git(cwd: Path, *args: str) -> None:
+    _ = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+class ChangedLineIndexTests(unittest.TestCase):
+    """Parse `git diff -U0` hunks into added/modified line sets."""
+
+    def test_parse_unified_diff(self) -> None:
+        self.assertEqual(parse_unified_diff(_DIFF), {"src/pkg/m.py": {4, 5, 12}})
+
+    def test_hunk_lines_are_not_file_headers(self) -> None:
+        self.assertEqual(
+            parse_unified_diff(_HEADER_LIKE_DIFF), {"notes.md": {2, 3, 10}}
+        )
+
+    def test_paths_are_relative_to_a_nested_project_root(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = Path(tmp)
+            project = repo / "app"
+            (project / "src").mkdir(parents=True)
+            _ = (project / "src" / "m.py").write_text("a = 1\n", encoding="utf-8")
+            _ = (repo / "README").write_text("x\n", encoding="utf-8")
+            _git(repo, "init", "-q", "-b", "main")
+            _git(repo, "add", ".")
+            _git(repo, "commit", "-q", "-m", "base")
+            _ = (project / "src" / "m.py").write_text(
+                "a = 1\nb = 2\n", encoding="utf-8"
+            )
+            _ = (project / "src" / "new.py").write_text("c = 3\n", encoding="utf-8")
+            _ = (repo / "README").write_text("x\ny\n", encoding="utf-8")
+
+            changed = changed_lines(project, "main")
+
+        self.assertEqual(changed, {"src/m.py": {2}, "src/new.py": {1}})
+
+
+class DiffCoverageTests(unittest.TestCase):
+    """Restrict coverage to changed lines and aggregate."""
+
+    def test_restrict_to_lines_ignores_non_statements(self) -> None:
+        item = FileCoverage("m.py", 4, 3, missing_lines=(4,), executed_lines=(1, 2, 3))
+
+        restricted = restrict_to_lines(item, {3, 4, 99})
+
+        assert restricted is not None
+        self.assertEqual(restricted.num_statements, 2)
+        self.assertEqual(restricted.missing_lines, (4,))
+        self.assertIsNone(restrict_to_lines(item, {99}))
+
+    def test_percent_and_ranges(self) -> None:
+        results = [
+            FileCoverage("a.py", 4, 3, (9,)),
+            FileCoverage("b.py", 2, 0, (1, 2)),
+        ]
+
+        self.assertAlmostEqual(diff_coverage_percent(results), 50.0)
+        self.assertEqual(diff_coverage_percent([]), 100.0)
+        self.assertEqual(format_line_ranges([7, 1, 2, 3, 9, 10]), "1-3, 7, 9-10")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tests for the compact analyzer finding store."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from _findings import FindingStore
+from analyze_performance import (
+    ISSUE_FIELDS,
+    PerformanceIssue,
+    analyze_file,
+    collect_file_findings,
+)
+
+_NESTED_SOURCE = """
+def f(xs):
+    out = []
+    for x in xs:
+        for y in x:
+            out.append(y)
+    return out
+"""
+
+
+class FindingStoreTests(unittest.TestCase):
+    """Validate row storage and boundary validation."""
+
+    def test_rows_keep_insertion_order(self) -> None:
+        store = FindingStore(("a", "b"))
+        store.add(1, "x")
+        store.add(2, "y")
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.rows(), [(1, "x"), (2, "y")])
+        self.assertEqual(list(store.column("b")), ["x", "y"])
+
+    def test_extend_rejects_mismatched_layout(self) -> None:
+        with self.assertRaises(ValueError):
+            FindingStore(("a",)).extend(FindingStore(("b",)))
+
+    def test_to_models_validates_at_boundary(self) -> None:
+        store = FindingStore(ISSUE_FIELDS)
+        store.add("nested_loops", "high", 0, None, "bad line")
+
+        with self.assertRaises(ValueError):
+            _ = store.to_models(PerformanceIssue)
+
+    def test_analyzer_findings_match_models(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = Path(temp_dir) / "mod.py"
+            _ = source.write_text(_NESTED_SOURCE, encoding="utf-8")
+
+            findings = collect_file_findings(source)
+            issues = analyze_file(source)
+
+            self.assertEqual(len(findings), len(issues))
+            self.assertEqual(
+                [(i.type, i.line) for i in issues],
+                [(row[0], row[2]) for row in findings.rows()],
+            )
+            self.assertIn("nested_loops", [i.type for i in issues])
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Tests for the pydantic hot-path checks."""
+
+from __future__ import annotations
+
+import ast
+import textwrap
+import unittest
+
+from _findings import FindingStore
+from _pydantic_perf import ModelIndex, check_tree, collect_models
+from analyze_performance import ISSUE_FIELDS
+
+_MODELS = """
+from pydantic import BaseModel, ConfigDict
+
+
+class Base(BaseModel):
+    model_config = ConfigDict(validate_assignment=True)
+
+
+class Item(Base):
+    name: str
+
+
+class Plain(Base):
+    model_config = ConfigDict(validate_assignment=False)
+"""
+
+
+def _check(source: str, index: ModelIndex | None = None) -> list[tuple[object, ...]]:
+    tree = ast.parse(textwrap.dedent(source))
+    findings = FindingStore(ISSUE_FIELDS)
+    check_tree(tree, findings, index or collect_models([tree]))
+    return [(row[0], row[1], row[2]) for row in findings.rows()]
+
+
+class ModelIndexTests(unittest.TestCase):
+    """Models and validate_assignment are resolved through inheritance."""
+
+    def test_inherited_validate_assignment(self) -> None:
+        index = collect_models([ast.parse(_MODELS)])
+
+        self.assertEqual(index.models, {"Base", "Item", "Plain"})
+        self.assertEqual(index.validating, {"Base", "Item"})
+
+
+class CheckTests(unittest.TestCase):
+    """Each hot-path pattern is flagged with a loop-aware severity."""
+
+    index = collect_models([ast.parse(_MODELS)])
+
+    def test_validation_in_loops_and_comprehensions(self) -> None:
+        rows = _check(
+            """
+            def load(rows):
+                first = Item.model_validate(rows[0])
+                items = [Item(**r) for r in rows]
+                for r in rows:
+                    items.append(Item.model_validate(r))
+                return first, items
+            """,
+            self.index,
+        )
+
+        self.assertEqual(
+            rows,
+            [
+                ("pydantic_validate_in_loop", "high", 4),
+                ("pydantic_validate_in_loop", "high", 6),
+            ],
+        )
+
+    def test_mutating_validating_model_in_loop(self) -> None:
+        rows = _check(
+            """
+            def rename(items: list[Item], plain: Plain):
+                for item in items:
+                    item.name = item.name.upper()
+                    plain.name = "x"
+            """,
+            self.index,
+        )
+
+        self.assertEqual(rows, [("pydantic_validate_assignment_in_loop", "medium", 4)])
+
+    def test_dump_revalidation(self) -> None:
+        rows = _check(
+            """
+            def clone(item):
+                data = item.model_dump()
+                again = Item.model_validate(data)
+                return again, Item(**item.model_dump())
+            """,
+            self.index,
+        )
+
+        self.assertEqual(
+            rows,
+            [
+                ("pydantic_dump_revalidate", "medium", 4),
+                ("pydantic_dump_revalidate", "medium", 5),
+            ],
+        )
+
+    def test_deep_copy_and_type_adapter(self) -> None:
+        rows = _check("""
+            import functools
+            from pydantic import TypeAdapter
+
+            ITEMS = TypeAdapter(list[int])
+
+
+            @functools.lru_cache
+            def adapter(tp):
+                return TypeAdapter(tp)
+
+
+            def parse(raw, item):
+                copy = item.model_copy(deep=True)
+                return TypeAdapter(list[int]).validate_python(raw), copy
+            """)
+
+        self.assertEqual(
+            rows,
+            [
+                ("pydantic_deep_copy", "medium", 14),
+                ("pydantic_type_adapter_in_function", "medium", 15),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
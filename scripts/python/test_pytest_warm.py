@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for warm-worker module eviction."""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _pytest_warm import (
+    _project_modules,
+    _source_stamps,
+    _try_lock,
+    evict_changed_modules,
+    lock_path,
+    parse_request,
+    server_running,
+    start_server,
+)
+
+
+class EvictChangedModulesTests(unittest.TestCase):
+    """Changed modules and modules bound to them are dropped; others stay."""
+
+    def test_evicts_changed_module_and_its_importers(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "warm_base.py").write_text("def f():\n    return 1\n")
+            (root / "warm_user.py").write_text("from warm_base import f\n")
+            (root / "warm_other.py").write_text("X = 1\n")
+            sys.path.insert(0, tmp)
+            try:
+                for name in ("warm_base", "warm_user", "warm_other"):
+                    _ = importlib.import_module(name)
+                stamps = _source_stamps(_project_modules(root))
+                base = root / "warm_base.py"
+                stat = base.stat()
+                os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+                evicted = evict_changed_modules(root, stamps)
+
+                self.assertEqual(evicted, {"warm_base", "warm_user"})
+                self.assertIn("warm_other", sys.modules)
+            finally:
+                sys.path.remove(tmp)
+                for name in ("warm_base", "warm_user", "warm_other"):
+                    _ = sys.modules.pop(name, None)
+
+
+class ServerLockTests(unittest.TestCase):
+    """No second server starts while one holds the lock (warming or serving)."""
+
+    def test_start_server_skips_while_lock_is_held(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            fd = _try_lock(lock_path(root))
+            assert fd is not None
+            try:
+                with mock.patch("_pytest_warm.subprocess.Popen") as popen:
+                    start_server(root, [sys.executable])
+                self.assertTrue(server_running(root))
+                popen.assert_not_called()
+            finally:
+                os.close(fd)
+            lock_path(root).unlink()
+
+            self.assertFalse(server_running(root))
+
+
+class ParseRequestTests(unittest.TestCase):
+    """Malformed requests are rejected instead of crashing the server."""
+
+    def test_valid_request(self) -> None:
+        self.assertEqual(parse_request('{"args": ["-q", "tests"]}\n'), ["-q", "tests"])
+
+    def test_malformed_requests(self) -> None:
+        for line in ("", "not json", "[]", '{"argv": []}', '{"args": ["-q", 1]}'):
+            with self.subTest(line=line):
+                self.assertIsNone(parse_request(line))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the streaming subprocess runner."""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+import unittest
+
+from _utils import LineCollector, run_streaming
+
+
+class RunStreamingTests(unittest.TestCase):
+    """Live output, bounded tail, handlers and process-group cleanup."""
+
+    def test_tail_is_bounded_and_handlers_see_every_line(self) -> None:
+        seen: list[tuple[str, str]] = []
+        collector = LineCollector(re.compile(r"^line 4"))
+        script = "import sys\nfor i in range(50): print('line', i)\nprint('oops', file=sys.stderr)"
+
+        result = run_streaming(
+            [sys.executable, "-c", script],
+            echo=False,
+            handlers=[lambda stream, line: seen.append((stream, line)), collector],
+            tail_lines=3,
+        )
+
+        self.assertEqual(result.returncode, 0)
+        self.assertFalse(result.timed_out)
+        self.assertEqual(len(result.tail), 3)
+        self.assertIn("oops", result.tail)
+        self.assertEqual(len(seen), 51)
+        self.assertIn(("stderr", "oops"), seen)
+        self.assertEqual(len(collector.lines), 11)
+
+    @unittest.skipUnless(os.name == "posix", "process groups are POSIX-only")
+    def test_timeout_kills_the_process_group(self) -> None:
+        script = (
+            "import subprocess, sys, time\n"
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            "print('started', flush=True)\n"
+            "time.sleep(60)"
+        )
+        started = time.monotonic()
+
+        result = run_streaming([sys.executable, "-c", script], timeout=1, echo=False)
+
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.tail, ["started"])
+        # Returning promptly means the grandchild released the output pipes too.
+        self.assertLess(time.monotonic() - started, 10)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
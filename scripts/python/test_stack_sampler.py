@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Tests for the signal-based stack sampler."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from _stack_sampler import (
+    StackSampler,
+    collapse,
+    sampling_available,
+    self_counts,
+    total_counts,
+)
+
+
+def _spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class CollapseTests(unittest.TestCase):
+    """Stacks are root-first and aggregate into self and total counts."""
+
+    def test_collapse_is_root_first(self) -> None:
+        stack = collapse(sys._getframe()).split(";")
+
+        self.assertIn("test_collapse_is_root_first", stack[-1])
+        self.assertNotIn("test_collapse_is_root_first", stack[0])
+
+    def test_self_and_total_counts(self) -> None:
+        counts = Counter({"main;a;b": 3, "main;a": 1, "main;c;b": 2})
+
+        self.assertEqual(self_counts(counts), Counter({"b": 5, "a": 1}))
+        self.assertEqual(total_counts(counts)["main"], 6)
+        self.assertEqual(total_counts(counts)["a"], 4)
+
+
+@unittest.skipUnless(sampling_available(), "needs setitimer")
+class SamplerTests(unittest.TestCase):
+    """The sampler sees the busy function and writes collapsed stacks."""
+
+    def test_samples_busy_function(self) -> None:
+        sampler = StackSampler(0.001, clock="cpu")
+        sampler.start()
+        try:
+            _spin(0.2)
+        finally:
+            sampler.stop()
+
+        self.assertGreater(sampler.samples, 10)
+        self.assertTrue(any("_spin" in stack for stack in sampler.counts))
+        with tempfile.TemporaryDirectory() as tmp:
+            text = sampler.write(Path(tmp) / "out.collapsed").read_text()
+        first = text.splitlines()[0]
+        self.assertRegex(first, r"^\S.* \d+$")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for the synthetic repository generator."""
+
+from __future__ import annotations
+
+import ast
+import tempfile
+import unittest
+from pathlib import Path
+
+from synthetic_repo import RepoSpec, generate, plan
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {
+        str(p.relative_to(root)): p.read_text(encoding="utf-8")
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+class GenerateTests(unittest.TestCase):
+    """Output is deterministic, sized as requested and parseable."""
+
+    def test_same_spec_gives_identical_trees(self) -> None:
+        spec = RepoSpec(files=40, seed=7)
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            self.assertTrue(generate(Path(a) / "repo", spec))
+            self.assertTrue(generate(Path(b) / "repo", spec))
+            self.assertFalse(generate(Path(a) / "repo", spec))
+
+            self.assertEqual(_tree(Path(a) / "repo"), _tree(Path(b) / "repo"))
+
+    def test_file_count_languages_and_valid_python(self) -> None:
+        spec = RepoSpec(files=30, languages=("python",), test_ratio=0.5)
+        files = plan(spec)
+
+        self.assertEqual(len(files), 30)
+        self.assertTrue(any(path.startswith("tests/test_") for path, _ in files))
+        for path, render in files:
+            self.assertTrue(path.endswith(".py"))
+            _ = ast.parse(render(), filename=path)
+
+    def test_refuses_to_overwrite_foreign_directory(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            _ = (Path(tmp) / "keep.txt").write_text("mine")
+
+            with self.assertRaises(ValueError):
+                _ = generate(Path(tmp), RepoSpec(files=4))
+            self.assertTrue((Path(tmp) / "keep.txt").exists())
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Tests for the per-test duration regression gate."""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from _test_durations import find_duration_regressions, is_allowlisted, load_allowlist
+from _test_history import OUTCOME_PASSED, HistoryStore, TestResult, merge_phase
+
+
+def _record(
+    store: HistoryStore, durations: dict[str, float], instrumented: bool = False
+) -> None:
+    results: dict[str, TestResult] = {}
+    for nodeid, call_s in durations.items():
+        merge_phase(results, nodeid, "call", OUTCOME_PASSED, call_s)
+    _ = store.record_run(
+        results, time.time(), 0, full_run=True, instrumented=instrumented
+    )
+
+
+class DurationGateTests(unittest.TestCase):
+    """Slowdowns beyond median × factor + slack fail unless allowlisted."""
+
+    def test_regressions_against_previous_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            try:
+                for _ in range(3):
+                    _record(
+                        store,
+                        {"t.py::slow": 0.05, "t.py::tiny": 0.001, "t.py::noisy": 0.1},
+                    )
+                _record(store, {"t.py::new": 9.0})
+                _record(
+                    store,
+                    {
+                        "t.py::slow": 5.0,
+                        "t.py::tiny": 0.2,  # 200x, but within the slack
+                        "t.py::noisy": 4.0,
+                        "t.py::new": 9.0,  # Too little history to judge
+                    },
+                )
+                latest, previous = store.latest_and_previous()
+            finally:
+                store.close()
+
+        regressions = find_duration_regressions(
+            latest, previous, ["t.py::noisy"], factor=3, slack_s=0.25, min_runs=3
+        )
+
+        self.assertEqual(len(previous["t.py::slow"]), 3)
+        self.assertEqual([r.nodeid for r in regressions], ["t.py::slow"])
+        self.assertAlmostEqual(regressions[0].limit_s, 0.4)
+
+    def test_instrumented_run_is_not_judged(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            try:
+                for _ in range(4):
+                    _record(store, {"t.py::alloc": 0.2})
+                # run_tests.py --memory: tracemalloc makes the same test 80x slower
+                _record(store, {"t.py::alloc": 15.8}, instrumented=True)
+                latest, previous = store.latest_and_previous()
+            finally:
+                store.close()
+
+        regressions = find_duration_regressions(
+            latest, previous, [], factor=3, slack_s=0.25, min_runs=3
+        )
+
+        self.assertAlmostEqual(latest["t.py::alloc"].call_s, 0.2)
+        self.assertEqual(regressions, [])
+
+    def test_allowlist_patterns(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "duration_allowlist.txt"
+            _ = path.write_text(
+                "# flaky on CI\ntests/test_net.py::*\ntests/test_a.py::test_p  # io\n",
+                encoding="utf-8",
+            )
+            patterns = load_allowlist(path)
+
+        self.assertTrue(is_allowlisted("tests/test_net.py::test_x", patterns))
+        self.assertTrue(is_allowlisted("tests/test_a.py::test_p[2-3]", patterns))
+        self.assertFalse(is_allowlisted("tests/test_a.py::test_q", patterns))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Tests for hang-watchdog dump parsing."""
+
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from _test_hangs import parse_hang_dump
+
+_DUMP = """\
+tests/unit/test_io.py::test_reads[slow]
+Timeout (0:01:00)!
+Thread 0x00007f6cf49856c0 (most recent call first):
+  File "/usr/lib/python3.11/threading.py", line 320 in wait
+  File "/usr/lib/python3.11/threading.py", line 1002 in _bootstrap
+
+Thread 0x00007f6cf53f2b80 (most recent call first):
+  File "/repo/src/pkg/io.py", line 88 in read_socket
+  File "/repo/tests/unit/test_io.py", line 12 in helper
+  File "/repo/tests/unit/test_io.py", line 20 in test_reads
+  File "/repo/.venv/lib/python3.11/site-packages/_pytest/python.py", line 194 in pytest_pyfunc_call
+"""
+
+
+class ParseHangDumpTests(unittest.TestCase):
+    """Name the hung test and the frame it was blocked in."""
+
+    def test_picks_the_thread_running_the_test(self) -> None:
+        report = parse_hang_dump("gw1", _DUMP, Path("gw1-42.txt"))
+
+        assert report is not None
+        self.assertEqual(report.nodeid, "tests/unit/test_io.py::test_reads[slow]")
+        self.assertIn("read_socket", report.blocking_frame)
+        self.assertIn("line 20 in test_reads", report.test_frame)
+
+    def test_header_without_stacks_is_not_a_hang(self) -> None:
+        self.assertIsNone(
+            parse_hang_dump("gw0", "tests/test_a.py::test_x\n", Path("gw0-1.txt"))
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Tests for per-test history and duration-aware ordering."""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from _test_history import (
+    OUTCOME_FAILED,
+    OUTCOME_PASSED,
+    FixtureTiming,
+    HistoryStore,
+    TestResult,
+    TestStats,
+    merge_phase,
+    order_nodeids,
+)
+
+
+class OrderNodeidsTests(unittest.TestCase):
+    """Failed first, then longest first, grouped by module."""
+
+    def test_failed_module_then_longest_module(self) -> None:
+        nodeids = [
+            "tests/test_a.py::fast",
+            "tests/test_a.py::slow",
+            "tests/test_b.py::ok",
+            "tests/test_b.py::broken",
+            "tests/test_c.py::new",
+        ]
+        stats = {
+            "tests/test_a.py::fast": TestStats(0.1, OUTCOME_PASSED, 3),
+            "tests/test_a.py::slow": TestStats(4.0, OUTCOME_PASSED, 3),
+            "tests/test_b.py::ok": TestStats(0.5, OUTCOME_PASSED, 3),
+            "tests/test_b.py::broken": TestStats(0.2, OUTCOME_FAILED, 3),
+        }
+
+        ordered = [nodeids[i] for i in order_nodeids(nodeids, stats)]
+
+        self.assertEqual(
+            ordered,
+            [
+                "tests/test_b.py::broken",
+                "tests/test_b.py::ok",
+                "tests/test_a.py::slow",
+                "tests/test_a.py::fast",
+                "tests/test_c.py::new",
+            ],
+        )
+
+    def test_no_history_keeps_collection_order(self) -> None:
+        nodeids = ["b.py::x", "a.py::y", "b.py::z"]
+
+        self.assertEqual(order_nodeids(nodeids, {}), [0, 2, 1])
+
+
+class HistoryStoreTests(unittest.TestCase):
+    """Round-trip phase reports through the SQLite store."""
+
+    def test_stats_use_median_and_last_outcome(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            try:
+                for call_s, outcome in ((1.0, OUTCOME_FAILED), (3.0, OUTCOME_PASSED)):
+                    results: dict[str, TestResult] = {}
+                    merge_phase(results, "t.py::x", "setup", OUTCOME_PASSED, 0.5)
+                    merge_phase(results, "t.py::x", "call", outcome, call_s)
+                    _ = store.record_run(results, time.time(), 0, full_run=True)
+
+                stats = store.stats()["t.py::x"]
+            finally:
+                store.close()
+
+        self.assertEqual(stats.last_outcome, OUTCOME_PASSED)
+        self.assertEqual(stats.runs, 2)
+        self.assertAlmostEqual(stats.median_s, 2.5)
+
+    def test_instrumented_runs_keep_outcomes_but_not_timings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            try:
+                for call_s, outcome, instrumented in (
+                    (0.2, OUTCOME_PASSED, False),
+                    (15.8, OUTCOME_FAILED, True),  # e.g. run_tests.py --memory
+                ):
+                    results: dict[str, TestResult] = {}
+                    merge_phase(results, "t.py::x", "call", outcome, call_s)
+                    _ = store.record_run(
+                        results,
+                        time.time(),
+                        0,
+                        full_run=True,
+                        instrumented=instrumented,
+                    )
+
+                stats = store.stats()["t.py::x"]
+                durations = store.durations()
+                latest, previous = store.latest_and_previous()
+            finally:
+                store.close()
+
+        self.assertEqual(stats.last_outcome, OUTCOME_FAILED)
+        self.assertAlmostEqual(stats.median_s, 0.2)
+        self.assertEqual(durations, {"t.py::x": [0.2]})
+        self.assertAlmostEqual(latest["t.py::x"].call_s, 0.2)
+        self.assertEqual(previous, {})
+
+    def test_worker_timings_are_claimed_by_the_run(self) -> None:
+        key = ("tests/conftest.py:10", "db")
+        results: dict[str, TestResult] = {}
+        merge_phase(results, "t.py::x", "call", OUTCOME_PASSED, 1.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            try:
+                store.add_pending({key: FixtureTiming("function", 1, 1, 9.0)}, {})
+                store.discard_pending()  # Left over from an interrupted run
+                for setups, collect_s in ((3, 0.2), (2, 0.5)):
+                    store.add_pending(
+                        {key: FixtureTiming("function", setups, 1, setups * 0.1)},
+                        {"tests/test_a.py": collect_s},
+                    )
+                _ = store.record_run(results, time.time(), 0, full_run=True)
+
+                fixtures = store.latest_fixtures()
+                collection = store.latest_collection()
+            finally:
+                store.close()
+
+        self.assertEqual((fixtures[key].setups, fixtures[key].modules), (5, 2))
+        self.assertAlmostEqual(fixtures[key].mean_s, 0.1)
+        self.assertEqual(collection, {"tests/test_a.py": 0.5})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
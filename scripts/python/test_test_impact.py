@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Tests for test-impact block splitting."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from _test_impact import MODULE_BLOCK, ImpactDatabase, code_blocks
+
+try:
+    from coverage import CoverageData
+except ImportError:
+    CoverageData = None
+
+_SOURCE = """\
+import os
+
+
+def top(x):
+    return x
+
+
+class Widget:
+    size = 1
+
+    @property
+    def area(self):
+        def inner():
+            return 2
+        return inner()
+"""
+
+
+class CodeBlockTests(unittest.TestCase):
+    """Functions become blocks; everything else belongs to <module>."""
+
+    def test_blocks_cover_functions_and_module(self) -> None:
+        blocks = {b.name: b for b in code_blocks(_SOURCE)}
+
+        self.assertEqual(
+            set(blocks), {"top", "Widget.area", "Widget.area.inner", MODULE_BLOCK}
+        )
+        self.assertEqual(
+            (blocks["Widget.area"].start, blocks["Widget.area"].end), (11, 15)
+        )
+
+    def test_checksum_ignores_comments_and_blank_lines(self) -> None:
+        edited = _SOURCE.replace("    return x\n", "    # note\n\n    return x\n")
+        before = {b.name: b.checksum for b in code_blocks(_SOURCE)}
+        after = {b.name: b.checksum for b in code_blocks(edited)}
+
+        self.assertEqual(before, after)
+
+    def test_module_level_change_only_touches_module_block(self) -> None:
+        edited = _SOURCE.replace("size = 1", "size = 2")
+        before = {b.name: b.checksum for b in code_blocks(_SOURCE)}
+        after = {b.name: b.checksum for b in code_blocks(edited)}
+
+        changed = {name for name in before if before[name] != after[name]}
+        self.assertEqual(changed, {MODULE_BLOCK})
+
+
+_MODULE = """\
+import os
+
+LIMIT = 3
+
+
+def f():
+    return 1
+
+
+def g():
+    return 2
+"""
+
+_TESTS = """\
+from src.mod import f, g
+
+
+def test_f():
+    assert f() == 1
+
+
+def test_g():
+    assert g() == 2
+"""
+
+# Lines each test context executed in src/mod.py ("" = import time)
+_CONTEXTS = {
+    "": [1, 3, 6, 10],
+    "tests/test_mod.py::test_f|run": [7],
+    "tests/test_mod.py::test_g|run": [11],
+    "tests/test_old.py::test_f_again|run": [7],
+}
+
+
+@unittest.skipIf(CoverageData is None, "coverage.py is not installed")
+class ImpactDatabaseTests(unittest.TestCase):
+    """Record a real --cov-context=test data file, then select after edits."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name).resolve()
+        self.tests_dir = self.root / "tests"
+        self.tests_dir.mkdir()
+        (self.root / "src").mkdir()
+        self.module = self.root / "src" / "mod.py"
+        _ = self.module.write_text(_MODULE, encoding="utf-8")
+        _ = (self.tests_dir / "test_mod.py").write_text(_TESTS, encoding="utf-8")
+        _ = (self.tests_dir / "test_old.py").write_text(_TESTS, encoding="utf-8")
+        self.db_path = self.root / "impact.db"
+
+        assert CoverageData is not None
+        data_file = self.root / ".coverage"
+        data = CoverageData(basename=str(data_file))
+        for context, lines in _CONTEXTS.items():
+            data.set_context(context)
+            data.add_lines({str(self.module): lines})
+        data.write()
+
+        db = ImpactDatabase(self.root, self.db_path)
+        try:
+            self.recorded = db.record(
+                data_file, self.tests_dir, full_run=True, fingerprint=True
+            )
+        finally:
+            db.close()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _select(self) -> list[str] | None:
+        db = ImpactDatabase(self.root, self.db_path)
+        try:
+            return db.select(self.tests_dir).targets
+        finally:
+            db.close()
+
+    def _edit(self, old: str, new: str) -> None:
+        text = self.module.read_text(encoding="utf-8")
+        _ = self.module.write_text(text.replace(old, new), encoding="utf-8")
+
+    def test_unchanged_tree_selects_nothing(self) -> None:
+        self.assertEqual(self.recorded, 3)
+        self.assertEqual(self._select(), [])
+
+    def test_function_edit_selects_only_its_tests(self) -> None:
+        self._edit("return 1", "return 10")
+
+        self.assertEqual(
+            self._select(),
+            ["tests/test_mod.py::test_f", "tests/test_old.py::test_f_again"],
+        )
+
+    def test_module_level_edit_selects_every_test_of_the_file(self) -> None:
+        self._edit("LIMIT = 3", "LIMIT = 30")
+
+        self.assertEqual(
+            self._select(),
+            [
+                "tests/test_mod.py::test_f",
+                "tests/test_mod.py::test_g",
+                "tests/test_old.py::test_f_again",
+            ],
+        )
+
+    def test_deleted_test_file_is_not_selected(self) -> None:
+        (self.tests_dir / "test_old.py").unlink()
+        self._edit("return 1", "return 10")
+
+        self.assertEqual(self._select(), ["tests/test_mod.py::test_f"])
+
+    def test_failed_full_run_keeps_tests_that_did_not_run(self) -> None:
+        assert CoverageData is not None
+        data_file = self.root / "failed.coverage"
+        data = CoverageData(basename=str(data_file))
+        data.set_context("tests/test_mod.py::test_g|run")  # -x stopped here
+        data.add_lines({str(self.module): [11]})
+        data.write()
+        db = ImpactDatabase(self.root, self.db_path)
+        try:
+            _ = db.record(data_file, self.tests_dir, full_run=True, fingerprint=False)
+        finally:
+            db.close()
+        self._edit("return 1", "return 10")
+
+        self.assertEqual(
+            self._select(),
+            ["tests/test_mod.py::test_f", "tests/test_old.py::test_f_again"],
+        )
+
+    def test_changed_config_falls_back_to_full_run(self) -> None:
+        _ = (self.root / "pytest.ini").write_text("[pytest]\n", encoding="utf-8")
+        self._edit("return 1", "return 10")
+
+        self.assertIsNone(self._select())
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
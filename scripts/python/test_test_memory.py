@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests for per-test peak memory records and the baseline gate."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from _pytest_memory import top_sites
+from _test_memory import (
+    TestMemory,
+    budget_bytes,
+    collect_memory_records,
+    find_memory_regressions,
+    load_memory_baseline,
+    save_memory_baseline,
+)
+
+_MIB = 1024 * 1024
+
+
+def _allocate() -> list[bytes]:
+    return [bytes(1024) for _ in range(2000)]
+
+
+class RecordTests(unittest.TestCase):
+    """Worker record files fold into one figure per test."""
+
+    def test_collect_keeps_larger_peak_and_skips_torn_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            record_dir = Path(tmp)
+            lines = [
+                {"nodeid": "tests/test_a.py::test_x", "peak": 100, "rss": 0},
+                {"nodeid": "tests/test_a.py::test_x", "peak": 300, "rss": 4096},
+            ]
+            _ = (record_dir / "gw0-1.jsonl").write_text(
+                "\n".join(json.dumps(line) for line in lines) + '\n{"nodeid": "tr',
+                encoding="utf-8",
+            )
+
+            records = collect_memory_records(record_dir)
+
+        self.assertEqual(records["tests/test_a.py::test_x"].peak_bytes, 300)
+        self.assertEqual(len(records), 1)
+
+    def test_top_sites_attribute_allocations_to_the_calling_line(self) -> None:
+        tracemalloc.start(8)
+        try:
+            data = _allocate()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        sites = top_sites(snapshot, Path(__file__).parent)
+
+        self.assertTrue(data)
+        self.assertTrue(sites[0][0].startswith(f"{Path(__file__).name}:"))
+        self.assertGreater(sites[0][1], 2000 * 1024)
+
+
+class BaselineTests(unittest.TestCase):
+    """Peaks beyond the growth budget fail; the baseline only grows new tests."""
+
+    def test_budget_uses_ratio_or_noise_floor(self) -> None:
+        self.assertEqual(budget_bytes(10 * _MIB, 50, _MIB), 15 * _MIB)
+        self.assertEqual(budget_bytes(1000, 50, _MIB), 1000 + _MIB)
+
+    def test_regression_beyond_budget(self) -> None:
+        records = {
+            "t::grew": TestMemory("t::grew", 20 * _MIB, 0, (("src/a.py:3", _MIB),)),
+            "t::steady": TestMemory("t::steady", 11 * _MIB, 0),
+            "t::new": TestMemory("t::new", 90 * _MIB, 0),
+        }
+        baseline = {"t::grew": 10 * _MIB, "t::steady": 10 * _MIB}
+
+        (regression,) = find_memory_regressions(records, baseline, 50, _MIB)
+
+        self.assertEqual(regression.nodeid, "t::grew")
+        self.assertEqual(regression.sites, (("src/a.py:3", _MIB),))
+
+    def test_save_adds_new_tests_unless_replacing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            first = {"tests/test_a.py::x": TestMemory("tests/test_a.py::x", 10, 1)}
+            second = {
+                "tests/test_a.py::x": TestMemory("tests/test_a.py::x", 99, 1),
+                "tests/test_b.py::y": TestMemory("tests/test_b.py::y", 5, 2),
+            }
+
+            _ = save_memory_baseline(path, first, replace=False)
+            added = save_memory_baseline(path, second, replace=False)
+            kept = load_memory_baseline(path)
+            _ = save_memory_baseline(path, second, replace=True)
+            replaced = load_memory_baseline(path)
+            modules = json.loads(path.read_text(encoding="utf-8"))["modules"]
+
+        self.assertEqual(added, 1)
+        self.assertEqual(kept, {"tests/test_a.py::x": 10, "tests/test_b.py::y": 5})
+        self.assertEqual(replaced["tests/test_a.py::x"], 99)
+        self.assertEqual(modules["tests/test_b.py"], {"peak": 5, "rss": 2})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Tests for the sampled test-suite profile and its hot-function ranking."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from _stack_sampler import collapse, path_labeler
+from _test_profile import collect_profile, hot_functions
+
+_PYTEST = "main:pytest_runtestloop:397;runner:call_and_report:236"
+
+
+class HotFunctionTests(unittest.TestCase):
+    """Samples are charged to the innermost source frame."""
+
+    def test_library_time_counts_against_source_caller(self) -> None:
+        counts = Counter(
+            {
+                f"{_PYTEST};src/cortex/a.py:load:3;decoder:JSONDecoder.decode:332": 6,
+                f"{_PYTEST};src/cortex/a.py:load:3;src/cortex/b.py:parse:9": 3,
+                f"{_PYTEST};tests/test_a.py:test_load:5": 1,
+            }
+        )
+
+        functions = hot_functions(counts, "src/cortex/")
+
+        self.assertEqual(
+            [(f.label, f.self_samples, f.total_samples) for f in functions],
+            [("src/cortex/a.py:load:3", 6, 9), ("src/cortex/b.py:parse:9", 3, 3)],
+        )
+
+    def test_collect_merges_worker_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            record_dir = Path(tmp)
+            _ = (record_dir / "gw0-1.collapsed").write_text("a;b 2\n", "utf-8")
+            _ = (record_dir / "gw1-2.collapsed").write_text("a;b 3\na 1\n", "utf-8")
+
+            counts = collect_profile(record_dir)
+
+        self.assertEqual(counts, Counter({"a;b": 5, "a": 1}))
+
+
+class PathLabelerTests(unittest.TestCase):
+    """Project frames carry their relative path; others keep module labels."""
+
+    def test_labels_project_frames_with_relative_path(self) -> None:
+        label = path_labeler(Path(__file__).resolve().parent)
+
+        stack = collapse(sys._getframe(), label=label).split(";")
+
+        self.assertEqual(
+            stack[-1].rsplit(":", 1)[0],
+            f"{Path(__file__).name}:{type(self).__qualname__}."
+            + "test_labels_project_frames_with_relative_path",
+        )
+        self.assertFalse(stack[0].startswith(Path(__file__).name))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Tests for the RAM-backed test session directory."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from _test_tmpfs import SESSION_PREFIX, start_tmpfs_session, sweep_stale_sessions
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    _ = proc.wait()
+    return proc.pid
+
+
+class TmpfsSessionTests(unittest.TestCase):
+    """Sessions redirect scratch I/O and always leave the tmpfs clean."""
+
+    def test_session_sets_and_restores_environment(self) -> None:
+        before = os.environ.get("COVERAGE_FILE")
+        with tempfile.TemporaryDirectory() as base, tempfile.TemporaryDirectory() as project:
+            session = start_tmpfs_session(Path(base))
+            assert session is not None
+            try:
+                self.assertEqual(os.environ["TMPDIR"], str(session.tmp_dir))
+                self.assertEqual(os.environ["COVERAGE_FILE"], str(session.data_file))
+                _ = session.report_path("xml").write_text("<coverage/>")
+                _ = session.data_file.write_bytes(b"data")
+                copied = session.copy_reports(Path(project))
+            finally:
+                session.close()
+
+            self.assertEqual(copied, [Path(project) / "coverage.xml"])
+            self.assertFalse(session.root.exists())
+            self.assertEqual(sorted(os.listdir(project)), ["coverage.xml"])
+        self.assertEqual(os.environ.get("COVERAGE_FILE"), before)
+
+    def test_sweep_removes_only_dead_sessions(self) -> None:
+        with tempfile.TemporaryDirectory() as base:
+            stale = Path(base) / f"{SESSION_PREFIX}{_dead_pid()}-abc"
+            live = Path(base) / f"{SESSION_PREFIX}{os.getpid()}-def"
+            stale.mkdir()
+            live.mkdir()
+
+            removed = sweep_stale_sessions(Path(base))
+
+            self.assertEqual(removed, 1)
+            self.assertFalse(stale.exists())
+            self.assertTrue(live.exists())
+
+    def test_unusable_base_falls_back_to_disk(self) -> None:
+        self.assertIsNone(start_tmpfs_session(Path("/nonexistent/tmpfs")))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Tests for gate phase tracing."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import _trace
+from _trace import Tracer, _command_label, span, traced
+
+
+class SpanTests(unittest.TestCase):
+    """Spans become complete events; they are free when tracing is off."""
+
+    def test_span_records_complete_event(self) -> None:
+        tracer = Tracer()
+
+        with tracer.span("parse", files=3):
+            pass
+
+        (event,) = tracer.events
+        self.assertEqual(event["name"], "parse")
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["pid"], os.getpid())
+        self.assertEqual(event["args"], {"files": 3})
+        self.assertGreaterEqual(float(str(event["dur"])), 0.0)
+
+    def test_disabled_tracing_is_a_no_op(self) -> None:
+        if _trace.tracing_enabled():
+            self.skipTest("GATE_TRACE is set for this run")
+
+        def work() -> int:
+            return 1
+
+        self.assertIs(span("a"), span("b"))
+        self.assertIs(traced("work")(work), work)
+
+
+class WriteTests(unittest.TestCase):
+    """Traces are written as Chrome trace JSON and merged across gates."""
+
+    def test_write_merges_into_existing_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "trace.json"
+            first, second = Tracer(), Tracer()
+            with first.span("discover"):
+                pass
+            with second.span("report"):
+                pass
+
+            _ = first.write(target)
+            _ = second.write(target)
+
+            events = json.loads(target.read_text(encoding="utf-8"))["traceEvents"]
+            names = [e["name"] for e in events if e["ph"] == "X"]
+            self.assertEqual(names, ["discover", "report"])
+            self.assertIn("process_name", [e["name"] for e in events])
+
+    def test_concurrent_writers_keep_every_event(self) -> None:
+        script = (
+            "import sys; from pathlib import Path; from _trace import Tracer\n"
+            + "for i in range(20):\n"
+            + "    tracer = Tracer()\n"
+            + "    with tracer.span(f'{sys.argv[2]}-{i}'):\n"
+            + "        pass\n"
+            + "    _ = tracer.write(Path(sys.argv[1]))\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "trace.json"
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, "-c", script, str(target), gate],
+                    cwd=Path(_trace.__file__).parent,
+                )
+                for gate in ("ruff", "pyright", "pytest", "docs")
+            ]
+            self.assertEqual([proc.wait() for proc in procs], [0, 0, 0, 0])
+
+            events = json.loads(target.read_text(encoding="utf-8"))["traceEvents"]
+            names = {e["name"] for e in events if e["ph"] == "X"}
+            self.assertEqual(len(names), 80)
+
+    def test_directory_target_gets_per_process_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            tracer = Tracer()
+            with tracer.span("visit"):
+                pass
+
+            path = tracer.write(Path(tmp))
+
+            self.assertEqual(path.parent, Path(tmp))
+            self.assertTrue(path.name.endswith(f"-{tracer.pid}.json"))
+
+
+class SubprocessTests(unittest.TestCase):
+    """Subprocess spawns are labelled after the tool being run."""
+
+    def test_command_label(self) -> None:
+        self.assertEqual(_command_label(["/venv/bin/ruff", "check"]), "ruff")
+        self.assertEqual(
+            _command_label([sys.executable, "-m", "pytest", "-q"]),
+            f"{Path(sys.executable).name} -m pytest",
+        )
+        self.assertEqual(_command_label("pyright src"), "pyright")
+        self.assertEqual(_command_label([]), "subprocess")
+
+    def test_gate_run_writes_trace_with_subprocess_events(self) -> None:
+        script = (
+            "import subprocess, sys\n"
+            "from _trace import span\n"
+            "with span('lint'):\n"
+            "    subprocess.run([sys.executable, '-c', 'pass'], check=True)\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "trace.json"
+            env = {**os.environ, "GATE_TRACE": str(target)}
+            env["PYTHONPATH"] = str(Path(__file__).parent)
+            _ = subprocess.run(
+                [sys.executable, "-c", script], env=env, check=True, cwd=tmp
+            )
+
+            events = json.loads(target.read_text(encoding="utf-8"))["traceEvents"]
+            names = {e["name"] for e in events if e["ph"] == "X"}
+            label = Path(sys.executable).name
+            self.assertTrue({"lint", f"spawn {label}", f"wait {label}"} <= names)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
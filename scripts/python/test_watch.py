@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Tests for watch-mode file mapping and the shared result cache."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _result_cache import ResultCache
+from watch import Gate, gates_for, is_watched, run_gate
+
+
+class GateMappingTests(unittest.TestCase):
+    """Changed files map to the gates for their language only."""
+
+    def test_maps_by_suffix_and_skips_excluded_dirs(self) -> None:
+        root = Path("/repo")
+        changed = [root / "src/a.py", root / "Sources/App/B.swift"]
+
+        mapping = {gate.name: files for gate, files in gates_for(changed).items()}
+
+        self.assertIn("py:ruff", mapping)
+        self.assertEqual(mapping["swift:no-print"], [root / "Sources/App/B.swift"])
+        self.assertFalse(any(name.startswith("php:") for name in mapping))
+        self.assertTrue(is_watched(root, root / "src/a.py"))
+        self.assertFalse(is_watched(root, root / ".venv/lib/x.py"))
+        self.assertFalse(is_watched(root, root / "README.md"))
+
+
+class ResultCacheTests(unittest.TestCase):
+    """Results are reused until file content or gate version changes."""
+
+    def test_hit_requires_same_content_and_version(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            path = root / "a.py"
+            _ = path.write_text("x = 1\n")
+            cache = ResultCache(root)
+            cache.store("py:ruff", "v1", path, ok=False, output="E1 bad")
+            cache.save()
+
+            reloaded = ResultCache(root)
+            hit = reloaded.lookup("py:ruff", "v1", path)
+            self.assertIsNotNone(hit)
+            assert hit is not None
+            self.assertFalse(hit.ok)
+            self.assertIsNone(reloaded.lookup("py:ruff", "v2", path))
+
+            _ = path.write_text("x = 2\n")
+            self.assertIsNone(ResultCache(root).lookup("py:ruff", "v1", path))
+
+
+class RunGateTests(unittest.TestCase):
+    """Per-file gates reuse cached results; whole-project gates always run."""
+
+    def _run_twice(self, gate: Gate, verdicts: list[tuple[bool, str]]) -> list[bool]:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            path = root / "a.php"
+            _ = path.write_text("<?php\n")
+            cache = ResultCache(root)
+            with mock.patch("watch._run_gate", side_effect=verdicts) as run:
+                outcomes = [run_gate(root, cache, gate, [path]) for _ in range(2)]
+            self.assertEqual(run.call_count, len(verdicts))
+            return [outcome.ok for outcome in outcomes]
+
+    def test_file_gate_result_is_reused(self) -> None:
+        gate = Gate("php:lint", (".php",), script="php/check_linting.py")
+
+        self.assertEqual(self._run_twice(gate, [(False, "bad")]), [False, False])
+
+    def test_whole_project_gate_is_never_cached(self) -> None:
+        # phpstan fails because of another file, which is then fixed
+        gate = Gate(
+            "php:types", (".php",), script="php/check_types.py", cacheable=False
+        )
+
+        self.assertEqual(
+            self._run_twice(gate, [(False, "B.php: error"), (True, "")]), [False, True]
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
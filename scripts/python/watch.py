@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""Watch the project and re-run only the gates affected by each change.
+
+Changed files are collected with inotify on Linux (polling elsewhere or with
+--poll), debounced so an editor's burst of writes becomes one batch, and
+mapped by suffix to the gates that check them: Python function-length and
+file-size gates plus ruff and black, the Swift lexer gates and the PHP gates,
+each run in dispatcher mode (FILES=<changed files>). Python files under src/
+or tests/ also re-run the tests that cover them (see post_edit_hook.py).
+
+Gate results are cached per file content (.cortex/.cache/gate_results), so a
+file saved without changes, or one already checked by a gate, is not
+re-analysed (except for whole-project gates such as PHP formatting and
+phpstan, whose verdict does not depend on the edited file alone); the cache
+persists across sessions and is invalidated when the gate script or project
+configuration changes. A compact status line is
+refreshed in place; failing output is printed above it.
+
+Usage:
+    .venv/bin/python .cortex/synapse/scripts/python/watch.py [--poll] [--no-tests]
+    .venv/bin/python .cortex/synapse/scripts/python/watch.py --once FILE [FILE ...]
+
+Configuration:
+    WATCH_DEBOUNCE_MS: Quiet period before a batch of changes runs (default: 300)
+    WATCH_POLL_INTERVAL_MS: Polling interval for the fallback watcher (default: 1000)
+    WATCH_GATE_TIMEOUT: Per-gate timeout in seconds (default: 120)
+    POST_EDIT_WARM: Set to 1 to run affected tests in the warm pytest worker
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import shutil
+import struct
+import sys
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+try:
+    from _pytest_warm import run_warm, start_server, warm_supported
+    from _result_cache import ResultCache
+    from _utils import get_config_int, get_project_root, run_streaming
+    from post_edit_hook import _pytest_cmd, _pytest_targets, _python_cmd
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from _pytest_warm import run_warm, start_server, warm_supported
+    from _result_cache import ResultCache
+    from _utils import get_config_int, get_project_root, run_streaming
+    from post_edit_hook import _pytest_cmd, _pytest_targets, _python_cmd
+
+WATCH_DEBOUNCE_MS = get_config_int("WATCH_DEBOUNCE_MS", 300)
+WATCH_POLL_INTERVAL_MS = get_config_int("WATCH_POLL_INTERVAL_MS", 1000)
+WATCH_GATE_TIMEOUT = get_config_int("WATCH_GATE_TIMEOUT", 120)
+POST_EDIT_WARM = get_config_int("POST_EDIT_WARM", 0)
+
+EXCLUDED_DIRS = frozenset(
+    {
+        ".git",
+        ".venv",
+        "venv",
+        ".cortex",
+        ".build",
+        "build",
+        "dist",
+        "node_modules",
+        "vendor",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+    }
+)
+_SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+_CONFIG_FILES = ("pyproject.toml", "ruff.toml", "Package.swift", "composer.json")
+_GATE_ENV_KEYS = (
+    "MAX_FILE_LINES",
+    "MAX_FUNCTION_LINES",
+    "SOURCES_DIR",
+    "SRC_DIR",
+    "TESTS_DIR",
+)
+_OUTPUT_LINES = 15
+_STATUS_REFRESH_S = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class Gate:
+    """A check that accepts an explicit file list.
+
+    ``script`` gates run ``<scripts>/<script>`` with FILES set; ``tool`` gates
+    run a project tool (``ruff check``, ``black --check``) with the files as
+    arguments. Gates that ignore FILES and check the whole project are not
+    ``cacheable``: their verdict depends on files other than the edited one.
+    """
+
+    name: str
+    suffixes: tuple[str, ...]
+    script: str = ""
+    tool: tuple[str, ...] = ()
+    cacheable: bool = True
+
+
+GATES: tuple[Gate, ...] = (
+    Gate("py:function-lengths", (".py",), script="python/check_function_lengths.py"),
+    Gate("py:file-sizes", (".py",), script="python/check_file_sizes.py"),
+    Gate("py:ruff", (".py",), tool=("ruff", "check", "--quiet")),
+    Gate("py:black", (".py",), tool=("black", "--check")),
+    Gate("swift:file-sizes", (".swift",), script="swift/check_file_sizes.py"),
+    Gate(
+        "swift:function-lengths", (".swift",), script="swift/check_function_lengths.py"
+    ),
+    Gate("swift:no-print", (".swift",), script="swift/validate_no_print.py"),
+    Gate(
+        "swift:no-force-unwrap", (".swift",), script="swift/validate_no_force_unwrap.py"
+    ),
+    Gate(
+        "swift:one-type-per-file",
+        (".swift",),
+        script="swift/check_one_type_per_file.py",
+    ),
+    Gate("swift:test-naming", (".swift",), script="swift/validate_test_naming.py"),
+    Gate("php:lint", (".php",), script="php/check_linting.py"),
+    Gate(
+        "php:formatting", (".php",), script="php/check_formatting.py", cacheable=False
+    ),
+    Gate("php:types", (".php",), script="php/check_types.py", cacheable=False),
+    Gate("php:file-sizes", (".php",), script="php/check_file_sizes.py"),
+    Gate("php:function-lengths", (".php",), script="php/check_function_lengths.py"),
+    Gate("php:test-naming", (".php",), script="php/check_test_naming.py"),
+)
+WATCHED_SUFFIXES = frozenset(s for gate in GATES for s in gate.suffixes)
+
+
+@dataclass(frozen=True, slots=True)
+class GateOutcome:
+    """Result of one gate over one batch of files."""
+
+    gate: str
+    files: tuple[Path, ...]
+    ok: bool
+    output: str
+    cached: int
+
+
+# ---------------------------------------------------------------------------
+# File -> gate mapping
+# ---------------------------------------------------------------------------
+
+
+def is_watched(project_root: Path, path: Path) -> bool:
+    """Return True for files some gate checks, outside excluded directories."""
+    if path.suffix not in WATCHED_SUFFIXES:
+        return False
+    try:
+        rel = path.relative_to(project_root)
+    except ValueError:
+        return False
+    return not any(part in EXCLUDED_DIRS for part in rel.parts[:-1])
+
+
+def gates_for(files: Iterable[Path]) -> dict[Gate, list[Path]]:
+    """Map each gate to the changed files it checks (gates with none omitted)."""
+    mapping: dict[Gate, list[Path]] = {}
+    for gate in GATES:
+        matched = sorted(f for f in files if f.suffix in gate.suffixes)
+        if matched:
+            mapping[gate] = matched
+    return mapping
+
+
+def affected_tests(project_root: Path, files: Iterable[Path]) -> list[str]:
+    """Test paths covering the changed Python files (unmapped files add none)."""
+    targets: set[str] = set()
+    for path in files:
+        found = _pytest_targets(project_root, path)
+        if found:
+            targets.update(found)
+    return sorted(targets)
+
+
+# ---------------------------------------------------------------------------
+# Running gates
+# ---------------------------------------------------------------------------
+
+
+def _tool_cmd(project_root: Path, tool: Sequence[str]) -> list[str] | None:
+    venv_tool = project_root / ".venv" / "bin" / tool[0]
+    if venv_tool.exists():
+        return [str(venv_tool), *tool[1:]]
+    if shutil.which(tool[0]) is not None:
+        return list(tool)
+    if shutil.which("uv") is not None:
+        return ["uv", "run", *tool]
+    return None
+
+
+def gate_version(project_root: Path, gate: Gate) -> str:
+    """Fingerprint of what a gate's verdict depends on besides the file.
+
+    Covers the gate script, project config files and the gate's env settings.
+    """
+    stamps: list[str] = [gate.name, *gate.tool]
+    paths = [_SCRIPTS_DIR / gate.script] if gate.script else []
+    paths.extend(project_root / name for name in _CONFIG_FILES)
+    for path in paths:
+        try:
+            stamps.append(f"{path.name}:{path.stat().st_mtime_ns}")
+        except OSError:
+            stamps.append(f"{path.name}:-")
+    stamps.extend(f"{key}={os.environ.get(key, '')}" for key in _GATE_ENV_KEYS)
+    return hashlib.sha1("\n".join(stamps).encode()).hexdigest()[:16]
+
+
+def _run_gate(project_root: Path, gate: Gate, files: list[Path]) -> tuple[bool, str]:
+    env = dict(os.environ)
+    if gate.script:
+        script = _SCRIPTS_DIR / gate.script
+        if not script.exists():
+            return True, ""
+        cmd = [sys.executable, str(script)]
+        env["FILES"] = "\n".join(str(f) for f in files)
+    else:
+        tool_cmd = _tool_cmd(project_root, gate.tool)
+        if tool_cmd is None:
+            return True, f"⚠️  {gate.tool[0]} not found (skipped)"
+        cmd = [*tool_cmd, *(str(f) for f in files)]
+    try:
+        result = run_streaming(
+            cmd,
+            cwd=project_root,
+            timeout=WATCH_GATE_TIMEOUT,
+            env=env,
+            echo=False,
+            tail_lines=_OUTPUT_LINES * 4,
+        )
+    except FileNotFoundError as e:
+        return True, f"⚠️  {e} (skipped)"
+    if result.timed_out:
+        return False, f"❌ {gate.name} timed out after {WATCH_GATE_TIMEOUT}s"
+    return result.returncode == 0, result.tail_text()
+
+
+def run_gate(
+    project_root: Path, cache: ResultCache, gate: Gate, files: list[Path]
+) -> GateOutcome:
+    """Run ``gate`` on the files whose cached result is missing or stale.
+
+    A passing run is cached for every file; a failing run only when it covered
+    a single file, since the failure cannot be attributed otherwise. Gates
+    that are not ``cacheable`` always run and never touch the cache.
+    """
+    if not gate.cacheable:
+        ok, output = _run_gate(project_root, gate, files)
+        return GateOutcome(gate.name, tuple(files), ok, "" if ok else output, 0)
+    version = gate_version(project_root, gate)
+    pending: list[Path] = []
+    failures: list[str] = []
+    for path in files:
+        cached = cache.lookup(gate.name, version, path)
+        if cached is None:
+            pending.append(path)
+        elif not cached.ok:
+            failures.append(cached.output)
+    ok, output = True, ""
+    if pending:
+        ok, output = _run_gate(project_root, gate, pending)
+        if ok or len(pending) == 1:
+            for path in pending:
+                cache.store(gate.name, version, path, ok, output if not ok else "")
+        if not ok:
+            failures.append(output)
+    return GateOutcome(
+        gate=gate.name,
+        files=tuple(files),
+        ok=not failures,
+        output="\n".join(failures),
+        cached=len(files) - len(pending),
+    )
+
+
+def run_tests(project_root: Path, targets: list[str]) -> GateOutcome:
+    """Run the affected tests (warm worker when enabled); never cached."""
+    args = [*targets, "-x", "-q", "-p", "no:cacheprovider"]
+    if POST_EDIT_WARM and warm_supported():
+        warm = run_warm(project_root, args)
+        if warm is not None:
+            return GateOutcome("tests", (), warm.returncode == 0, warm.output, 0)
+        start_server(project_root, _python_cmd(project_root))
+    cmd = _pytest_cmd(project_root)
+    if cmd is None:
+        return GateOutcome("tests", (), True, "⚠️  pytest not found (skipped)", 0)
+    result = run_streaming(
+        [*cmd, *args],
+        cwd=project_root,
+        timeout=WATCH_GATE_TIMEOUT,
+        echo=False,
+        tail_lines=_OUTPUT_LINES * 4,
+    )
+    return GateOutcome("tests", (), result.returncode == 0, result.tail_text(), 0)
+
+
+def run_batch(
+    project_root: Path,
+    cache: ResultCache,
+    changed: Iterable[Path],
+    with_tests: bool = True,
+) -> list[GateOutcome]:
+    """Run every gate (and test) affected by ``changed``, gates in parallel."""
+    existing: list[Path] = []
+    for path in changed:
+        if path.is_file():
+            existing.append(path)
+        else:
+            cache.forget(path)
+    mapping = gates_for(existing)
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        futures = [
+            pool.submit(run_gate, project_root, cache, gate, files)
+            for gate, files in mapping.items()
+        ]
+        outcomes = [future.result() for future in futures]
+    cache.save()
+    if with_tests:
+        targets = affected_tests(project_root, existing)
+        if targets:
+            outcomes.append(run_tests(project_root, targets))
+    return outcomes
+
+
+# ---------------------------------------------------------------------------
+# Watchers
+# ---------------------------------------------------------------------------
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk_dirs(root: Path) -> Iterable[Path]:
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        yield Path(dirpath)
+
+
+def snapshot_files(root: Path) -> dict[Path, tuple[int, int]]:
+    """Return ``{path: (mtime_ns, size)}`` for watched files under ``root``."""
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for directory in _walk_dirs(root):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            path = Path(entry.path)
+            if path.suffix not in WATCHED_SUFFIXES or not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class PollingWatcher:
+    """Detects changes by comparing (mtime, size) snapshots of watched files."""
+
+    name = "polling"
+
+    def __init__(self, project_root: Path):
+        """Take the initial snapshot."""
+        self.project_root = project_root
+        self._snapshot = snapshot_files(project_root)
+
+    def read(self, timeout: float) -> set[Path]:
+        """Wait up to ``timeout`` seconds, then return files that changed."""
+        time.sleep(min(timeout, WATCH_POLL_INTERVAL_MS / 1000))
+        current = snapshot_files(self.project_root)
+        changed = {p for p, stamp in current.items() if self._snapshot.get(p) != stamp}
+        changed.update(p for p in self._snapshot if p not in current)
+        self._snapshot = current
+        return changed
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over every non-excluded project directory."""
+
+    name = "inotify"
+
+    def __init__(self, project_root: Path):
+        """Watch every directory under ``project_root``.
+
+        Raises:
+            OSError: When inotify is unavailable or the watch limit is hit
+        """
+        self.project_root = project_root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = int(self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC))
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        try:
+            _ = self._add_tree(project_root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, root: Path) -> set[Path]:
+        """Watch ``root`` and its subdirectories.
+
+        Returns:
+            Watched files already inside them (for directories that appear
+            while watching, e.g. moved in or created by ``git checkout``)
+
+        Raises:
+            OSError: When a watch cannot be added (e.g. max_user_watches)
+        """
+        for directory in _walk_dirs(root):
+            wd = int(
+                self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(directory), _WATCH_MASK
+                )
+            )
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"inotify_add_watch failed: {directory}")
+            self._dirs[wd] = directory
+        return set(snapshot_files(root))
+
+    def read(self, timeout: float) -> set[Path]:
+        """Return files changed within ``timeout`` seconds (empty on timeout)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[Path] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            start = offset + _EVENT_HEADER.size
+            name = data[start : start + length].rstrip(b"\0")
+            offset = start + length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were dropped: treat every watched file as changed;
+                # the result cache skips the ones whose content is unchanged.
+                changed.update(snapshot_files(self.project_root))
+                continue
+            directory = self._dirs.get(wd)
+            if mask & _IN_IGNORED:
+                _ = self._dirs.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & _IN_ISDIR:
+                if (
+                    mask & (_IN_CREATE | _IN_MOVED_TO)
+                    and path.name not in EXCLUDED_DIRS
+                ):
+                    with contextlib.suppress(OSError):
+                        changed.update(self._add_tree(path))
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(project_root: Path, poll: bool) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher on Linux, else (or on failure) a polling one."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(project_root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}); polling instead", file=sys.stderr)
+    return PollingWatcher(project_root)
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+
+class StatusLine:
+    """A single status line, rewritten in place on a terminal."""
+
+    def __init__(self, stream: TextIO = sys.stdout):
+        """Write to ``stream``; in-place refresh only when it is a TTY."""
+        self.stream = stream
+        self.tty = stream.isatty()
+        self._shown = ""
+
+    def show(self, text: str) -> None:
+        """Replace the status line (printed as a new line when not a TTY)."""
+        if self.tty:
+            self.stream.write(f"\x1b[2K\r{text}")
+        elif text != self._shown:
+            self.stream.write(f"{text}\n")
+        self.stream.flush()
+        self._shown = text
+
+    def print_above(self, text: str) -> None:
+        """Print ``text`` above the status line, then redraw it."""
+        if self.tty:
+            self.stream.write("\x1b[2K\r")
+        self.stream.write(f"{text}\n")
+        if self.tty and self._shown:
+            self.stream.write(self._shown)
+        self.stream.flush()
+
+
+def _rel(project_root: Path, path: Path) -> str:
+    try:
+        return path.relative_to(project_root).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def summarize(outcomes: list[GateOutcome], files: int, elapsed: float) -> str:
+    """One-line summary of a batch."""
+    stamp = time.strftime("%H:%M:%S")
+    failed = [o.gate for o in outcomes if not o.ok]
+    cached = sum(o.cached for o in outcomes)
+    detail = f"{files} file(s) · {cached} cached · {elapsed:.2f}s"
+    if not outcomes:
+        return f"[{stamp}] 💤 no gates cover {files} changed file(s)"
+    if failed:
+        names = ", ".join(failed)
+        return f"[{stamp}] ❌ {len(failed)}/{len(outcomes)} failed: {names} · {detail}"
+    return f"[{stamp}] ✅ {len(outcomes)}/{len(outcomes)} passed · {detail}"
+
+
+def failure_report(project_root: Path, outcome: GateOutcome) -> str:
+    """Failure block printed above the status line."""
+    files = ", ".join(_rel(project_root, f) for f in outcome.files[:5])
+    if len(outcome.files) > 5:
+        files += f", +{len(outcome.files) - 5} more"
+    lines = outcome.output.strip().splitlines()[-_OUTPUT_LINES:]
+    header = f"🔴 {outcome.gate}" + (f" ({files})" if files else "")
+    return "\n".join([header, *(f"    {line}" for line in lines)])
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+
+def process(
+    project_root: Path,
+    cache: ResultCache,
+    status: StatusLine,
+    changed: set[Path],
+    with_tests: bool,
+) -> bool:
+    """Run one batch and report it; returns True when everything passed."""
+    files = sorted(changed)
+    names = ", ".join(_rel(project_root, f) for f in files[:3])
+    status.show(f"⏳ checking {names}{' …' if len(files) > 3 else ''}")
+    started = time.monotonic()
+    outcomes = run_batch(project_root, cache, files, with_tests)
+    for outcome in outcomes:
+        if not outcome.ok:
+            status.print_above(failure_report(project_root, outcome))
+    status.show(summarize(outcomes, len(files), time.monotonic() - started))
+    return all(o.ok for o in outcomes)
+
+
+def watch(project_root: Path, poll: bool, with_tests: bool) -> int:
+    """Watch until interrupted."""
+    cache = ResultCache(project_root)
+    status = StatusLine()
+    watcher = make_watcher(project_root, poll)
+    status.show(f"👀 watching {project_root.name} ({watcher.name}); Ctrl-C to stop")
+    debounce = WATCH_DEBOUNCE_MS / 1000
+    pending: set[Path] = set()
+    last_event = 0.0
+    try:
+        while True:
+            timeout = debounce if pending else _STATUS_REFRESH_S
+            events = {p for p in watcher.read(timeout) if is_watched(project_root, p)}
+            now = time.monotonic()
+            if events:
+                pending |= events
+                last_event = now
+            elif pending and now - last_event >= debounce:
+                batch, pending = pending, set()
+                _ = process(project_root, cache, status, batch, with_tests)
+    except KeyboardInterrupt:
+        status.print_above("")
+        return 0
+    finally:
+        watcher.close()
+        cache.save()
+
+
+def main() -> int:
+    """Parse arguments and watch (or check once)."""
+    parser = argparse.ArgumentParser(
+        description="Re-run the gates and tests affected by each file change."
+    )
+    _ = parser.add_argument(
+        "--poll", action="store_true", help="Poll for changes instead of inotify"
+    )
+    _ = parser.add_argument(
+        "--no-tests", action="store_true", help="Run gates only, not affected tests"
+    )
+    _ = parser.add_argument(
+        "--once",
+        nargs="+",
+        metavar="FILE",
+        help="Check these files once and exit (non-zero on failure)",
+    )
+    args = parser.parse_args()
+
+    project_root = get_project_root(Path(__file__))
+    with_tests = not args.no_tests
+    if args.once:
+        files = {(Path.cwd() / f).resolve() for f in args.once}
+        status = StatusLine()
+        ok = process(project_root, ResultCache(project_root), status, files, with_tests)
+        if status.tty:
+            print()
+        return 0 if ok else 1
+    return watch(project_root, args.poll, with_tests)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,9 +16,11 @@ import sys
 from pathlib import Path
 
 try:
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 
 
@@ -78,6 +80,7 @@ def collect_body(lines: list[str], start: int) -> list[str]:
     return body
 
 
+@traced("check file")
 def check_file(path: Path, project_root: Path) -> list[str]:
     """Analyse a single Swift file for complexity violations.
 
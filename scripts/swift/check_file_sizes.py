@@ -18,9 +18,11 @@ import sys
 from pathlib import Path
 
 try:
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 
 
@@ -37,6 +39,7 @@ _EXCLUDED_FILENAMES: frozenset[str] = frozenset(
 )
 
 
+@traced("count lines")
 def count_logical_lines(path: Path) -> int:
     """Count non-blank, non-comment lines in a Swift file.
 
@@ -17,9 +17,11 @@ import os
 from pathlib import Path
 
 try:
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+    from _trace import traced
     from _utils import get_config_int, get_config_path, get_project_root
 
 
@@ -81,6 +83,7 @@ def _get_files_from_env() -> list[Path] | None:
     return [Path(p) for p in files_env.strip().splitlines() if p]
 
 
+@traced("check file")
 def check_file(path: Path, project_root: Path) -> list[str]:
     """Check a single Swift file for function length violations.
 
@@ -31,10 +31,24 @@ if str(_SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPT_DIR))
 
 try:
-    from _utils import get_config_int, get_project_root
+    from _utils import (
+        LineCollector,
+        LineHandler,
+        StreamResult,
+        get_config_int,
+        get_project_root,
+        run_streaming,
+    )
 except ImportError:
     sys.path.insert(0, str(_SCRIPT_DIR.parent / "python"))
-    from _utils import get_config_int, get_project_root
+    from _utils import (
+        LineCollector,
+        LineHandler,
+        StreamResult,
+        get_config_int,
+        get_project_root,
+        run_streaming,
+    )
 
 from ensure_mlx_metallib import ensure_default_metallib  # noqa: E402
 from swift_toolchain import ensure_developer_dir_for_swiftpm, find_swift  # noqa: E402
@@ -57,24 +71,20 @@ def _run(
     cwd: Path,
     timeout: int,
     env: dict[str, str] | None = None,
-) -> subprocess.CompletedProcess[bytes]:
-    return subprocess.run(
+    handlers: list[LineHandler] | None = None,
+) -> StreamResult:
+    """Stream ``cmd`` live; exit the gate if it times out."""
+    result = run_streaming(
         cmd,
         cwd=cwd,
-        capture_output=True,
-        text=False,
-        check=False,
         timeout=timeout,
         env=env or os.environ.copy(),
+        handlers=handlers or [],
     )
-
-
-def _decode(raw: bytes | str | None) -> str:
-    if raw is None:
-        return ""
-    if isinstance(raw, bytes):
-        return raw.decode("utf-8", errors="replace")
-    return raw
+    if result.timed_out:
+        print(f"❌ swift {cmd[1]} timed out after {timeout}s.", file=sys.stderr)
+        sys.exit(1)
+    return result
 
 
 def _find_xctest_binaries(build_dir: Path) -> list[Path]:
@@ -164,12 +174,6 @@ def main() -> None:
         env["TMPDIR"] = str(tmp_dir)
 
         build_result = _run(build_cmd, project_root, TEST_TIMEOUT, env)
-        out = _decode(build_result.stdout)
-        err = _decode(build_result.stderr)
-        if out:
-            print(out)
-        if err:
-            print(err, file=sys.stderr)
         if build_result.returncode != 0:
             print("❌ Build failed — cannot measure coverage.", file=sys.stderr)
             sys.exit(1)
@@ -182,18 +186,15 @@ def main() -> None:
             test_cmd.extend(["--jobs", str(SWIFT_JOBS)])
 
         print(f"▶ Phase 2 — test with coverage: {' '.join(test_cmd)}")
-        test_result = _run(test_cmd, project_root, TEST_TIMEOUT, env)
-        t_out = _decode(test_result.stdout)
-        t_err = _decode(test_result.stderr)
-        if t_out:
-            print(t_out)
-        if t_err:
-            print(t_err, file=sys.stderr)
+        outcome_lines = LineCollector(re.compile(r"(?:passed|failed) after", re.I))
+        test_result = _run(
+            test_cmd, project_root, TEST_TIMEOUT, env, handlers=[outcome_lines]
+        )
 
         if test_result.returncode != 0:
             # AI: A non-zero exit can be a post-test SwiftPM signal (SIGBUS on Apple Silicon);
             # check for a "passed after" summary before declaring failure.
-            combined = t_out + t_err
+            combined = outcome_lines.text()
             if (
                 "passed after" not in combined.lower()
                 and "failed after" not in combined.lower()
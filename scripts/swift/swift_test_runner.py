@@ -44,10 +44,10 @@ if str(_SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPT_DIR))
 
 try:
-    from _utils import get_config_int, get_project_root
+    from _utils import LineCollector, get_config_int, get_project_root, run_streaming
 except ImportError:
     sys.path.insert(0, str(_SCRIPT_DIR.parent / "python"))
-    from _utils import get_config_int, get_project_root
+    from _utils import LineCollector, get_config_int, get_project_root, run_streaming
 
 from ensure_mlx_metallib import ensure_default_metallib  # noqa: E402
 from swift_toolchain import ensure_developer_dir_for_swiftpm, find_swift  # noqa: E402
@@ -88,6 +88,12 @@ _SWIFT_TESTING_FAILED_RE = re.compile(
     r"Test\s+run\s+with\s+(?P<total>\d+)\s+tests\s+in\s+\d+\s+suites?\s+failed\s+after",
     re.IGNORECASE,
 )
+# Lines the summary/transient-failure parsers look at; only these are kept from
+# the streamed output, so memory stays flat however much `swift test` logs.
+_SUMMARY_LINE_RE = re.compile(
+    r"Executed\s+\d+\s+tests?|Test\s+run\s+with|unexpected signal|(?:passed|failed)\s+after",
+    re.IGNORECASE,
+)
 
 
 def decode_process_output(raw_output: str | bytes | None) -> str:
@@ -410,21 +416,12 @@ def main() -> None:
             env = _swift_test_child_environment(test_isolation_root)
 
             for attempt in range(1, max_attempts + 1):
-                compile_result = subprocess.run(
-                    compile_cmd,
-                    cwd=project_root,
-                    capture_output=True,
-                    text=False,
-                    check=False,
-                    timeout=TEST_TIMEOUT,
-                    env=env,
+                compile_result = run_streaming(
+                    compile_cmd, cwd=project_root, timeout=TEST_TIMEOUT, env=env
                 )
-                compile_stdout = decode_process_output(compile_result.stdout)
-                compile_stderr = decode_process_output(compile_result.stderr)
-                if compile_stdout:
-                    print(compile_stdout)
-                if compile_stderr:
-                    print(compile_stderr, file=sys.stderr)
+                if compile_result.timed_out:
+                    print(f"❌ Tests timed out after {TEST_TIMEOUT}s.", file=sys.stderr)
+                    sys.exit(1)
                 if compile_result.returncode != 0:
                     print("❌ swift build --build-tests failed.", file=sys.stderr)
                     sys.exit(1)
@@ -433,25 +430,19 @@ def main() -> None:
                 # mlx.metallib beside the test binary after tests change cwd mid-run.
                 ensure_default_metallib(project_root, swift=swift)
 
-                result = subprocess.run(
+                summary_lines = LineCollector(_SUMMARY_LINE_RE)
+                result = run_streaming(
                     cmd,
                     cwd=project_root,
-                    capture_output=True,
-                    text=False,
-                    check=False,
                     timeout=TEST_TIMEOUT,
                     env=env,
+                    handlers=[summary_lines],
                 )
+                if result.timed_out:
+                    print(f"❌ Tests timed out after {TEST_TIMEOUT}s.", file=sys.stderr)
+                    sys.exit(1)
 
-                stdout = decode_process_output(result.stdout)
-                stderr = decode_process_output(result.stderr)
-
-                if stdout:
-                    print(stdout)
-                if stderr:
-                    print(stderr, file=sys.stderr)
-
-                combined_output = "\n".join(part for part in [stdout, stderr] if part)
+                combined_output = summary_lines.text()
                 total_tests, failed_tests = parse_swift_test_summary(combined_output)
                 normalized_success = did_tests_pass(
                     result.returncode, failed_tests, combined_output
@@ -516,9 +507,6 @@ def main() -> None:
                 print("❌ Tests failed.", file=sys.stderr)
                 sys.exit(1)
 
-    except subprocess.TimeoutExpired:
-        print(f"❌ Tests timed out after {TEST_TIMEOUT}s.", file=sys.stderr)
-        sys.exit(1)
     except FileNotFoundError:
         print(f"❌ swift not found: {swift}", file=sys.stderr)
         print(
@@ -10,18 +10,22 @@ Zero-tolerance: any violation exits with code 1.
 
 Configuration:
     SOURCES_DIR: Directory to scan (default: Sources/)
+    FILES: Newline-separated files to check instead of scanning (dispatcher mode)
 """
 
 from __future__ import annotations
 
+import os
 import re
 import sys
 from pathlib import Path
 
 try:
+    from _trace import span, traced
     from _utils import get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+    from _trace import span, traced
     from _utils import get_config_path, get_project_root
 
 
@@ -31,6 +35,15 @@ _ALLOWED_FILENAMES = {"cli.swift", "main.swift"}
 _PRINT_RE = re.compile(r"\bprint\s*\(")
 
 
+def _get_files_from_env() -> list[Path] | None:
+    """Return explicit file list from FILES env var, or None if not set."""
+    files_env = os.environ.get("FILES")
+    if not files_env:
+        return None
+    return [Path(p) for p in files_env.strip().splitlines() if p]
+
+
+@traced("check file")
 def check_file(path: Path, project_root: Path) -> list[str]:
     """Check a single Swift file for bare print() calls.
 
@@ -76,13 +89,26 @@ def main() -> None:
     else:
         sources_dir = project_root / "Sources"
 
-    if not sources_dir.exists():
+    files_from_env = _get_files_from_env()
+    if files_from_env is None and not sources_dir.exists():
         print(f"❌ Sources directory not found: {sources_dir}", file=sys.stderr)
         sys.exit(1)
 
     all_violations: list[str] = []
 
-    for swift_file in sorted(sources_dir.rglob("*.swift")):
+    if files_from_env is not None:
+        # Dispatcher mode: check only the provided files under sources_dir
+        root = sources_dir.resolve()
+        swift_files = [
+            f
+            for f in files_from_env
+            if f.suffix == ".swift" and f.resolve().is_relative_to(root)
+        ]
+    else:
+        with span("discover"):
+            swift_files = sorted(sources_dir.rglob("*.swift"))
+
+    for swift_file in swift_files:
         if any(swift_file.name.endswith(s) for s in _GENERATED_SUFFIXES):
             continue
         if "Tests" in swift_file.parts:
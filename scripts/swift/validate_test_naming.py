@@ -8,18 +8,22 @@ excluded from the naming check.
 
 Configuration:
     TESTS_DIR: Directory to scan (default: Tests/)
+    FILES: Newline-separated files to check instead of scanning (dispatcher mode)
 """
 
 from __future__ import annotations
 
+import os
 import re
 import sys
 from pathlib import Path
 
 try:
+    from _trace import span, traced
     from _utils import get_config_path, get_project_root
 except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+    from _trace import span, traced
     from _utils import get_config_path, get_project_root
 
 
@@ -31,6 +35,15 @@ _SWIFT_TESTING_RE = re.compile(r"@Test\b")
 _VALID_NAME_RE = re.compile(r"^test_[a-z][A-Za-z0-9]+_[a-z][A-Za-z0-9]+$")
 
 
+def _get_files_from_env() -> list[Path] | None:
+    """Return explicit file list from FILES env var, or None if not set."""
+    files_env = os.environ.get("FILES")
+    if not files_env:
+        return None
+    return [Path(p) for p in files_env.strip().splitlines() if p]
+
+
+@traced("check file")
 def check_file(path: Path, project_root: Path) -> list[str]:
     """Check a single test file for naming violations.
 
@@ -81,13 +94,26 @@ def main() -> None:
     else:
         tests_dir = project_root / "Tests"
 
-    if not tests_dir.exists():
+    files_from_env = _get_files_from_env()
+    if files_from_env is None and not tests_dir.exists():
         print(f"No Tests/ directory found at {tests_dir}, skipping.")
         sys.exit(0)
 
     all_violations: list[str] = []
 
-    for swift_file in sorted(tests_dir.rglob("*.swift")):
+    if files_from_env is not None:
+        # Dispatcher mode: check only the provided files under tests_dir
+        root = tests_dir.resolve()
+        swift_files = [
+            f
+            for f in files_from_env
+            if f.suffix == ".swift" and f.resolve().is_relative_to(root)
+        ]
+    else:
+        with span("discover"):
+            swift_files = sorted(tests_dir.rglob("*.swift"))
+
+    for swift_file in swift_files:
         all_violations.extend(check_file(swift_file, project_root))
 
     if all_violations: